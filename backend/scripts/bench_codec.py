@@ -0,0 +1,96 @@
+"""
+Benchmark: Pydantic JSON vs. the binary document codec.
+
+Compares the stored size and the encode/decode time of a document payload
+serialized with ``model_dump_json`` / ``model_validate_json`` (the previous
+storage path) against :mod:`diff_fuse.state.codec`.
+
+Usage
+-----
+    poetry run python -m scripts.bench_codec [--items N] [--repeat R]
+"""
+
+import argparse
+import random
+import time
+from collections.abc import Callable
+
+import orjson
+
+from diff_fuse.domain.fingerprint import document_content_hash
+from diff_fuse.domain.normalize import parse_and_normalize_json
+from diff_fuse.models.document import DocumentFormat, StoredDocument
+from diff_fuse.state import codec
+
+
+def _sample_document(items: int) -> StoredDocument:
+    """Build a config-like document with ``items`` array entries."""
+    rng = random.Random(42)
+    data = {
+        "version": 3,
+        "services": [
+            {
+                "id": f"svc-{i}",
+                "enabled": rng.random() > 0.2,
+                "replicas": rng.randint(1, 8),
+                "labels": {"team": rng.choice(["core", "infra", "data"]), "tier": rng.choice(["a", "b"])},
+                "ports": [{"name": "http", "port": 8000 + i % 100}, {"name": "metrics", "port": 9000}],
+                "weight": round(rng.random(), 4),
+            }
+            for i in range(items)
+        ],
+    }
+    raw = orjson.dumps(data, option=orjson.OPT_INDENT_2).decode()
+    return StoredDocument(
+        content_hash=document_content_hash("json", raw),
+        format=DocumentFormat.json,
+        ok=True,
+        error=None,
+        size_chars=len(raw),
+        raw=raw,
+        normalized=parse_and_normalize_json(raw),
+    )
+
+
+def _best_of(fn: Callable[[], object], repeat: int) -> float:
+    """Return the fastest of ``repeat`` runs, in milliseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000
+
+
+def main() -> None:
+    """Run the benchmark and print a comparison table."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--items", type=int, default=5000, help="array entries in the sample document")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per measurement (best is reported)")
+    args = parser.parse_args()
+
+    doc = _sample_document(args.items)
+
+    variants: dict[str, tuple[Callable[[], bytes], Callable[[bytes], object]]] = {
+        "pydantic json": (lambda: doc.model_dump_json().encode(), StoredDocument.model_validate_json),
+        "codec, none": (lambda: codec.encode_document(doc, compression=codec.COMPRESSION_NONE), codec.decode_document),
+        "codec, zlib": (lambda: codec.encode_document(doc, compression=codec.COMPRESSION_ZLIB), codec.decode_document),
+    }
+    if codec.default_compression() == codec.COMPRESSION_ZSTD:
+        variants["codec, zstd"] = (
+            lambda: codec.encode_document(doc, compression=codec.COMPRESSION_ZSTD),
+            codec.decode_document,
+        )
+
+    print(f"raw document: {len(doc.raw):,} chars, {args.items} items")
+    print(f"{'variant':<16}{'bytes':>14}{'encode ms':>12}{'decode ms':>12}")
+    for name, (encode, decode) in variants.items():
+        payload = encode()
+        assert decode(payload) == doc
+        enc_ms = _best_of(encode, args.repeat)
+        dec_ms = _best_of(lambda payload=payload, decode=decode: decode(payload), args.repeat)
+        print(f"{name:<16}{len(payload):>14,}{enc_ms:>12.2f}{dec_ms:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
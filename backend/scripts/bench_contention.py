@@ -0,0 +1,132 @@
+"""
+Benchmark: concurrent document appends to one Redis session.
+
+Compares two ways of appending documents while many workers hit the same
+session at once:
+
+- ``mutate``: the optimistic ``WATCH``/``MULTI`` read-modify-write, which
+  retries (and re-downloads the session) on every conflict and gives up after
+  a few attempts;
+- ``script``: :meth:`RedisSessionRepo.append_documents`, a single server-side
+  Lua script that cannot conflict.
+
+Usage
+-----
+    poetry run python -m scripts.bench_contention [--redis-url URL | --fake] [--workers W] [--appends N]
+
+``--fake`` runs against an in-process fakeredis server (requires the
+``fakeredis`` and ``lupa`` packages); timings are then only indicative.
+"""
+
+import argparse
+import threading
+import time
+from collections.abc import Callable
+
+import orjson
+from redis import Redis
+
+from diff_fuse.domain.fingerprint import document_content_hash
+from diff_fuse.domain.normalize import parse_and_normalize_json
+from diff_fuse.models.document import DocumentFormat, DocumentResult
+from diff_fuse.models.session import Session
+from diff_fuse.state.redis_session_repo import RedisSessionRepo
+
+
+def _document(doc_id: str) -> DocumentResult:
+    """Build a small parsed document."""
+    raw = orjson.dumps({"id": doc_id, "values": list(range(50))}).decode()
+    return DocumentResult(
+        doc_id=doc_id,
+        name=doc_id,
+        format=DocumentFormat.json,
+        ok=True,
+        error=None,
+        content_hash=document_content_hash("json", raw),
+        size_chars=len(raw),
+        raw=raw,
+        normalized=parse_and_normalize_json(raw),
+    )
+
+
+def _via_mutate(repo: RedisSessionRepo, session_id: str, doc: DocumentResult) -> None:
+    """Append with a client-side read-modify-write."""
+
+    def _fn(session: Session) -> Session:
+        session.documents_results.append(doc)
+        return session
+
+    repo.mutate(session_id, _fn)
+
+
+def _via_script(repo: RedisSessionRepo, session_id: str, doc: DocumentResult) -> None:
+    """Append with the server-side script."""
+    repo.append_documents(session_id, [doc])
+
+
+def _run(
+    repo: RedisSessionRepo,
+    append: Callable[[RedisSessionRepo, str, DocumentResult], None],
+    *,
+    label: str,
+    workers: int,
+    appends: int,
+) -> tuple[float, int, int]:
+    """Run ``workers`` threads doing ``appends`` appends each; return seconds, successes and failures."""
+    session = repo.create(documents_results=[_document(f"{label}-base")])
+    failures = 0
+    lock = threading.Lock()
+    start = threading.Barrier(workers)
+
+    def _worker(w: int) -> None:
+        nonlocal failures
+        start.wait()
+        for i in range(appends):
+            try:
+                append(repo, session.session_id, _document(f"{label}-{w}-{i}"))
+            except RuntimeError:
+                with lock:
+                    failures += 1
+
+    threads = [threading.Thread(target=_worker, args=(w,)) for w in range(workers)]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - t0
+
+    stored = len(repo.get_meta(session.session_id).documents_meta) - 1
+    return elapsed, stored, failures
+
+
+def main() -> None:
+    """Run the benchmark and print a comparison table."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--redis-url", default="redis://localhost:6379/15", help="Redis database to use")
+    target.add_argument("--fake", action="store_true", help="use an in-process fakeredis server")
+    parser.add_argument("--workers", type=int, default=16, help="concurrent threads")
+    parser.add_argument("--appends", type=int, default=20, help="appends per thread")
+    args = parser.parse_args()
+
+    if args.fake:
+        import fakeredis
+
+        redis: Redis = fakeredis.FakeRedis()
+    else:
+        redis = Redis.from_url(args.redis_url)
+
+    repo = RedisSessionRepo(redis, ttl_seconds=600, key_prefix="diff-fuse:bench:session:")
+    attempted = args.workers * args.appends
+
+    print(f"{args.workers} workers x {args.appends} appends to one session")
+    print(f"{'variant':<10}{'seconds':>10}{'appends/s':>12}{'stored':>10}{'failed':>10}")
+    for label, append in (("mutate", _via_mutate), ("script", _via_script)):
+        elapsed, stored, failures = _run(repo, append, label=label, workers=args.workers, appends=args.appends)
+        stored_of = f"{stored}/{attempted}"
+        print(f"{label:<10}{elapsed:>10.2f}{stored / elapsed:>12.0f}{stored_of:>10}{failures:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,438 @@
+"""
+HTTP body compression for diff-fuse.
+
+Documents and diff trees are highly repetitive JSON and typically compress
+10-20x. This module provides an ASGI middleware that handles both directions:
+
+- Request bodies sent with ``Content-Encoding: gzip`` or ``zstd`` are
+  decompressed before they reach FastAPI.
+- Responses are compressed with the best encoding the client accepts
+  (``Accept-Encoding``), unless they are smaller than a configured threshold.
+
+Safety
+------
+The request-size limit is always checked on the *decompressed* size, and
+decompression stops as soon as the limit is crossed, so a small compressed
+upload cannot expand unchecked in memory. Uncompressed bodies are counted as
+the application reads them, so a chunked upload without ``Content-Length`` is
+bounded too (see :class:`_BodyLimit`).
+
+Notes
+-----
+``zstd`` support requires the ``zstandard`` package (the ``zstd`` extra:
+``pip install diff-fuse[zstd]``). Without it, only ``gzip`` is offered and
+``zstd`` request bodies are rejected.
+
+A strong ``ETag`` on a compressed response gets the content coding appended
+(``"<tag>-gzip"``, see :func:`encoded_etag`), since the compressed bytes are a
+different representation.
+"""
+
+from __future__ import annotations
+
+import gzip
+import io
+import uuid
+import zlib
+from collections.abc import Callable
+from typing import Protocol
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from diff_fuse.api.dto.errors import APIError, APIErrorResponse
+from diff_fuse.domain.errors import DomainError, DomainValidationError, LimitsExceededError
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+
+class _Encoder(Protocol):
+    """Incremental compressor used for one response body."""
+
+    def compress(self, data: bytes) -> bytes:
+        """Compress a chunk, returning whatever output is ready."""
+        ...
+
+    def finish(self) -> bytes:
+        """Flush and terminate the compressed stream."""
+        ...
+
+
+class _GzipEncoder:
+    """Incremental gzip compressor."""
+
+    def __init__(self) -> None:
+        self._c = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._c.compress(data)
+
+    def finish(self) -> bytes:
+        return self._c.flush()
+
+
+class _ZstdEncoder:
+    """Incremental zstd compressor."""
+
+    def __init__(self) -> None:
+        assert zstandard is not None
+        self._c = zstandard.ZstdCompressor(level=3).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._c.compress(data)
+
+    def finish(self) -> bytes:
+        return self._c.flush()
+
+
+def _open_gzip_reader(body: bytes) -> io.BufferedIOBase:
+    return gzip.GzipFile(fileobj=io.BytesIO(body), mode="rb")
+
+
+def _open_zstd_reader(body: bytes) -> io.BufferedIOBase:
+    assert zstandard is not None
+    return zstandard.ZstdDecompressor().stream_reader(io.BytesIO(body), read_across_frames=True)
+
+
+def supported_encodings() -> list[str]:
+    """
+    Return the content codings supported by this server, best first.
+
+    Returns
+    -------
+    list[str]
+        ``["zstd", "gzip"]`` when ``zstandard`` is installed, else ``["gzip"]``.
+    """
+    return ["zstd", "gzip"] if zstandard is not None else ["gzip"]
+
+
+_ENCODERS: dict[str, Callable[[], _Encoder]] = {"gzip": _GzipEncoder, "zstd": _ZstdEncoder}
+_READERS: dict[str, Callable[[bytes], io.BufferedIOBase]] = {"gzip": _open_gzip_reader, "zstd": _open_zstd_reader}
+_DECODE_ERRORS: tuple[type[Exception], ...] = (OSError, EOFError, zlib.error) + (
+    (zstandard.ZstdError,) if zstandard is not None else ()
+)
+
+
+def encoded_etag(etag: str, encoding: str) -> str:
+    """
+    Return the tag of a representation compressed with ``encoding``.
+
+    Parameters
+    ----------
+    etag : str
+        Strong entity tag of the uncompressed representation, quoted.
+    encoding : str
+        Content coding applied to the body (e.g. ``"gzip"``).
+
+    Returns
+    -------
+    str
+        The tag with the coding appended inside the quotes; weak tags are
+        returned unchanged.
+    """
+    if not etag.startswith('"'):
+        return etag
+    return f'{etag[:-1]}-{encoding}"'
+
+
+def negotiate_encoding(accept_encoding: str) -> str | None:
+    """
+    Pick the response content coding for an ``Accept-Encoding`` header.
+
+    Parameters
+    ----------
+    accept_encoding : str
+        Raw header value, e.g. ``"gzip, deflate, br, zstd"`` or ``"gzip;q=0.5, zstd;q=1"``.
+
+    Returns
+    -------
+    str | None
+        The supported coding with the highest client quality value, ties broken
+        by server preference; None if the client accepts none of them.
+    """
+    quality: dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        quality[name] = q
+
+    best: str | None = None
+    best_q = 0.0
+    for enc in supported_encodings():
+        q = quality.get(enc, quality.get("*", 0.0))
+        if q > best_q:
+            best, best_q = enc, q
+    return best
+
+
+def _error_response(scope: Scope, status_code: int, exc: DomainError) -> JSONResponse:
+    """Build the standard API error payload for a failure detected in the middleware."""
+    rid = Headers(scope=scope).get("x-request-id") or uuid.uuid4().hex
+    payload = APIErrorResponse(
+        error=APIError(code=exc.code, message=exc.message, details=exc.as_details(), request_id=rid)
+    )
+    return JSONResponse(status_code=status_code, content=payload.model_dump())
+
+
+class _BodyLimit:
+    """
+    Count the bytes of an uncompressed request body as the application reads it.
+
+    Once the body passes the limit, reading more raises
+    :class:`LimitsExceededError` in the application, and whatever response the
+    application then sends is dropped so the middleware can answer ``413``
+    instead. A response the application started before that is left alone.
+    """
+
+    def __init__(self, receive: Receive, send: Send, max_bytes: int) -> None:
+        self._receive = receive
+        self._send = send
+        self._max_bytes = max_bytes
+        self._size = 0
+        self.started = False
+        self.exceeded: LimitsExceededError | None = None
+
+    async def receive(self) -> Message:
+        message = await self._receive()
+        if message["type"] == "http.request":
+            self._size += len(message.get("body", b""))
+            if self._size > self._max_bytes:
+                self.exceeded = LimitsExceededError(
+                    "Request body too large", size_bytes=self._size, max_request_body_bytes=self._max_bytes
+                )
+                raise self.exceeded
+        return message
+
+    async def send(self, message: Message) -> None:
+        if self.exceeded is not None and not self.started:
+            return
+        if message["type"] == "http.response.start":
+            self.started = True
+        await self._send(message)
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware for request decompression and response compression.
+
+    Parameters
+    ----------
+    app : ASGIApp
+        Wrapped application.
+    minimum_size : int
+        Responses with a smaller body are sent uncompressed.
+    max_request_body_bytes : int
+        Maximum request body size, measured after decompression.
+    """
+
+    def __init__(self, app: ASGIApp, *, minimum_size: int, max_request_body_bytes: int) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.max_request_body_bytes = max_request_body_bytes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Decompress the request body if needed, then compress the response if negotiated."""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        limit: _BodyLimit | None = None
+
+        content_encoding = headers.get("content-encoding", "identity").strip().lower()
+        if content_encoding not in ("", "identity"):
+            try:
+                body = await self._read_decompressed(receive, content_encoding)
+            except LimitsExceededError as e:
+                await _error_response(scope, 413, e)(scope, receive, send)
+                return
+            except DomainValidationError as e:
+                await _error_response(scope, 400, e)(scope, receive, send)
+                return
+
+            scope = self._with_plain_body_headers(scope, len(body))
+            receive = self._replay(body, receive)
+        else:
+            declared = headers.get("content-length")
+            if declared is not None and declared.isdigit() and int(declared) > self.max_request_body_bytes:
+                exc = LimitsExceededError(
+                    "Request body too large",
+                    size_bytes=int(declared),
+                    max_request_body_bytes=self.max_request_body_bytes,
+                )
+                await _error_response(scope, 413, exc)(scope, receive, send)
+                return
+            limit = _BodyLimit(receive, send, self.max_request_body_bytes)
+
+        app_receive, app_send = (limit.receive, limit.send) if limit is not None else (receive, send)
+        encoding = negotiate_encoding(headers.get("accept-encoding", ""))
+        if encoding is not None:
+            app_send = _CompressingSender(app_send, _ENCODERS[encoding](), encoding, self.minimum_size).send
+
+        try:
+            await self.app(scope, app_receive, app_send)
+        except LimitsExceededError as e:
+            if limit is None or e is not limit.exceeded:
+                raise
+        if limit is not None and limit.exceeded is not None and not limit.started:
+            await _error_response(scope, 413, limit.exceeded)(scope, receive, send)
+
+    async def _read_decompressed(self, receive: Receive, content_encoding: str) -> bytes:
+        """
+        Read the full request body and decompress it under the size limit.
+
+        Raises
+        ------
+        DomainValidationError
+            If the coding is unsupported or the body is not valid compressed data.
+        LimitsExceededError
+            If the compressed or decompressed body exceeds ``max_request_body_bytes``.
+        """
+        open_reader = _READERS.get(content_encoding)
+        if open_reader is None or content_encoding not in supported_encodings():
+            raise DomainValidationError(
+                field="content-encoding",
+                reason=f"Unsupported content encoding '{content_encoding}'. Supported: {supported_encodings()}",
+            )
+
+        compressed = bytearray()
+        more_body = True
+        while more_body:
+            message = await receive()
+            compressed += message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if len(compressed) > self.max_request_body_bytes:
+                raise LimitsExceededError(
+                    "Request body too large",
+                    size_bytes=len(compressed),
+                    max_request_body_bytes=self.max_request_body_bytes,
+                )
+
+        try:
+            with open_reader(bytes(compressed)) as reader:
+                # Read one byte past the limit: enough to detect an overflow
+                # without ever inflating more than that.
+                body = reader.read(self.max_request_body_bytes + 1)
+        except _DECODE_ERRORS as e:
+            raise DomainValidationError(field="content-encoding", reason=f"Invalid {content_encoding} body") from e
+
+        if len(body) > self.max_request_body_bytes:
+            raise LimitsExceededError(
+                "Decompressed request body too large",
+                max_request_body_bytes=self.max_request_body_bytes,
+            )
+        return body
+
+    @staticmethod
+    def _with_plain_body_headers(scope: Scope, size: int) -> Scope:
+        """Return a scope whose headers describe the decompressed body."""
+        raw = [(k, v) for k, v in scope["headers"] if k not in (b"content-encoding", b"content-length")]
+        raw.append((b"content-length", str(size).encode("latin-1")))
+        return {**scope, "headers": raw}
+
+    @staticmethod
+    def _replay(body: bytes, receive: Receive) -> Receive:
+        """
+        Build a ``receive`` callable that yields the buffered body once.
+
+        Later calls are delegated to the original ``receive`` so disconnect
+        detection keeps working for streaming responses.
+        """
+        sent = False
+
+        async def replay() -> Message:
+            nonlocal sent
+            if sent:
+                return await receive()
+            sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        return replay
+
+
+class _CompressingSender:
+    """
+    Wrap ``send`` to compress one response body.
+
+    The start message is held back until the first body chunk, so the decision
+    (compress or not, and which headers to send) can take the body size into
+    account. Streaming responses are always compressed incrementally.
+    """
+
+    def __init__(self, send: Send, encoder: _Encoder, encoding: str, minimum_size: int) -> None:
+        self._send = send
+        self._encoder = encoder
+        self._encoding = encoding
+        self._minimum_size = minimum_size
+        self._start: Message | None = None
+        self._passthrough = False
+
+    async def send(self, message: Message) -> None:
+        message_type = message["type"]
+
+        if message_type == "http.response.start":
+            headers = Headers(raw=message["headers"])
+            self._start = message
+            self._passthrough = "content-encoding" in headers or message["status"] in (204, 304)
+            return
+
+        if message_type != "http.response.body":
+            if self._start is not None:
+                await self._send(self._start)
+                self._start = None
+            await self._send(message)
+            return
+
+        if self._passthrough:
+            if self._start is not None:
+                await self._send(self._start)
+                self._start = None
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self._start is None:
+            # Continuation of a stream that is already being compressed.
+            out = self._encoder.compress(body)
+            if not more_body:
+                out += self._encoder.finish()
+            await self._send({"type": "http.response.body", "body": out, "more_body": more_body})
+            return
+
+        start, self._start = self._start, None
+        headers = MutableHeaders(raw=start["headers"])
+
+        if not more_body and len(body) < self._minimum_size:
+            self._passthrough = True
+            await self._send(start)
+            await self._send(message)
+            return
+
+        out = self._encoder.compress(body)
+        if not more_body:
+            out += self._encoder.finish()
+            headers["Content-Length"] = str(len(out))
+        elif "content-length" in headers:
+            del headers["Content-Length"]
+        headers["Content-Encoding"] = self._encoding
+        headers.add_vary_header("Accept-Encoding")
+        if "etag" in headers:
+            headers["ETag"] = encoded_etag(headers["ETag"], self._encoding)
+
+        await self._send(start)
+        await self._send({"type": "http.response.body", "body": out, "more_body": more_body})
@@ -0,0 +1,76 @@
+"""
+Conditional request handling (``ETag`` / ``If-None-Match``).
+
+Diff, merge and export responses are a pure function of the session's
+documents and of the request body, so their entity tag can be computed from
+session metadata before any tree is built (see
+:func:`diff_fuse.services.shared.request_etag`). A client that sends the tag
+it last saw in ``If-None-Match`` gets ``304 Not Modified`` without a body when
+nothing changed.
+
+Compression
+-----------
+Entity tags are strong, so a compressed representation needs its own tag:
+:class:`diff_fuse.api.compression.CompressionMiddleware` appends the content
+coding to the tag (``"<tag>-gzip"``). :func:`etag_matches` accepts both forms.
+"""
+
+from __future__ import annotations
+
+from fastapi import Request, Response
+
+from diff_fuse.api.compression import encoded_etag, supported_encodings
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """
+    Check an ``If-None-Match`` header against an entity tag.
+
+    Parameters
+    ----------
+    if_none_match : str | None
+        Header value: ``*`` or a comma-separated list of tags.
+    etag : str
+        Current strong tag of the uncompressed representation.
+
+    Returns
+    -------
+    bool
+        True if any listed tag matches ``etag``, or one of its compressed
+        variants (weak comparison, as RFC 9110 prescribes for
+        ``If-None-Match``).
+    """
+    if not if_none_match:
+        return False
+    accepted = {etag, *(encoded_etag(etag, encoding) for encoding in supported_encodings())}
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate in accepted:
+            return True
+    return False
+
+
+def not_modified(request: Request, etag: str) -> Response | None:
+    """
+    Answer a conditional request whose representation has not changed.
+
+    Parameters
+    ----------
+    request : fastapi.Request
+        Incoming request.
+    etag : str
+        Current entity tag of the response the request would produce.
+
+    Returns
+    -------
+    fastapi.Response | None
+        A ``304 Not Modified`` response carrying the tag if the client's
+        ``If-None-Match`` matches; otherwise None.
+    """
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    return None
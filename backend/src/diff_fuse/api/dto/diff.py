@@ -42,8 +42,9 @@ class DiffRequest(DiffFuseModel):
     from the session identified in the route.
 
     `null_mode` should be sent consistently to the diff, merge and export
-    endpoints: each rebuilds the tree from the request, and changing the mode
-    changes which nodes exist, so selections keyed by node id may no longer match.
+    endpoints: each rebuilds the tree from the request (unless it references
+    the diff by ``diff_id``), and changing the mode changes which nodes exist,
+    so selections keyed by node id may no longer match.
     """
 
     array_strategies_by_node_id: dict[str, ArrayStrategy] = Field(default_factory=dict)
@@ -64,6 +65,15 @@ class DiffResponse(DiffFuseModel):
         The root node has:
         - ``path == ""``
         - ``key is None``
+    diff_id : str | None
+        Handle of this diff: a fingerprint of the session's documents and the
+        diff request. Merge and export requests may send it instead of the
+        diff request; the server then reuses the tree it just built, for as
+        long as it keeps it.
     """
 
     root: DiffNode
+    diff_id: str | None = Field(
+        default=None,
+        description="Handle to reference this diff from merge and export requests.",
+    )
@@ -31,6 +31,7 @@ class ExportRequest(DiffFuseModel):
         Rationale:
         Nesting the merge request ensures the frontend can reuse the
         exact same state object across merge and export operations.
+        Its ``diff_id`` lets the export reuse the diff on screen.
     pretty : bool, default=True
         Whether the exported text should be pretty-printed (indented).
         If False, the output is compact.
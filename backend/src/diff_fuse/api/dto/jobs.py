@@ -0,0 +1,24 @@
+"""
+DTOs for background diff and merge jobs.
+
+Jobs are submitted with the same request bodies as the synchronous diff and
+merge endpoints (:class:`diff_fuse.api.dto.diff.DiffRequest`,
+:class:`diff_fuse.api.dto.merge.MergeRequest`); their result is the body the
+synchronous endpoint would have returned.
+"""
+
+from diff_fuse.models.job import Job
+
+
+class JobResponse(Job):
+    """
+    Status and progress of a background job.
+
+    Notes
+    -----
+    Progress is ``nodes_processed`` out of ``nodes_estimated``; the estimate
+    is a lower bound and may grow while the job runs. Progress is published
+    periodically, not for every node.
+    """
+
+    ...
@@ -16,23 +16,54 @@ from typing import Any
 from pydantic import Field
 
 from diff_fuse.models.base import DiffFuseModel
-from diff_fuse.models.merge import MergedNodeRef, MergeSelection
+from diff_fuse.models.merge import MergedNodeRef, MergedRefColumns, MergePolicy, MergeSelection, RefEncoding, RefScope
 
 from .diff import DiffRequest
 
 
+class MergeRefsOptions(DiffFuseModel):
+    """
+    Which merged-node references a merge reports, and how.
+
+    Attributes
+    ----------
+    scope : RefScope
+        ``all`` (default), ``none``, ``nodes`` (only ``node_ids``) or
+        ``subtrees`` (``node_ids`` and their descendants).
+    node_ids : list[str]
+        Nodes requested by the ``nodes`` and ``subtrees`` scopes, e.g. those
+        of the client's viewport. Must be empty for the other scopes.
+    encoding : RefEncoding
+        ``map`` returns ``resolved_ref_by_node_id``; ``columnar`` returns the
+        same references as parallel arrays in ``resolved_ref_columns``.
+
+    Notes
+    -----
+    References outside the scope are not computed at all, which saves most
+    of a large merge's time and payload.
+    """
+
+    scope: RefScope = RefScope.all
+    node_ids: list[str] = Field(default_factory=list)
+    encoding: RefEncoding = RefEncoding.map
+
+
 class MergeRequest(DiffFuseModel):
     """
     Request payload for computing a merged document.
 
     Attributes
     ----------
-    diff_request : DiffRequest
+    diff_request : DiffRequest | None
         Diff configuration reused during merge, primarily to supply
         per-path array strategies.
         Rationale:
         Keeping this nested ensures the frontend can reuse the same
         configuration object for both diff and merge operations.
+    diff_id : str | None
+        Handle returned by the diff endpoint. When the server still holds that
+        diff for the session's current documents, it is reused instead of
+        being rebuilt from ``diff_request``.
     selections_by_node_id : dict[str, MergeSelection]
         Mapping from canonical node IDs -> user selection.
         Semantics:
@@ -40,24 +71,63 @@ class MergeRequest(DiffFuseModel):
         - Each selection determines which document (or manual value)
           is chosen at that location.
         - Selections inherit down the subtree unless overridden.
+    policies : list[MergePolicy]
+        Rules resolving, in bulk, the conflicts no selection covers: prefer
+        a document (optionally under a path prefix), take the non-null
+        value, or take the largest number. The first applicable policy wins.
+        They may be combined with ``review_revision``.
+    review_revision : int | None
+        Merge with the review state stored for the session instead of
+        ``diff_request`` and ``selections_by_node_id``, which must then be
+        omitted. The stored state must still be at this revision; otherwise
+        the request fails with ``review_conflict``.
+    refs : MergeRefsOptions
+        Which references the response reports, and how. Defaults to all of
+        them, as a map. Ignored by exports, which report none.
 
     Notes
     -----
     Missing selections for conflicting nodes will result in unresolved
     paths in the response.
+
+    Unless ``review_revision`` is given, at least one of ``diff_request`` and
+    ``diff_id`` is required. When both are sent, ``diff_request`` decides the
+    tree (reused if cached, rebuilt otherwise) and ``diff_id`` is ignored;
+    with ``diff_id`` alone, an expired handle is reported as ``diff_expired``.
     """
 
     # Keep same shape as diff request to avoid frontend duplication.
-    diff_request: DiffRequest = Field(
-        ...,
+    diff_request: DiffRequest | None = Field(
+        default=None,
         description="Diff configuration reused during merge.",
     )
 
+    diff_id: str | None = Field(
+        default=None,
+        description="Handle of a diff computed earlier (see DiffResponse.diff_id).",
+    )
+
     selections_by_node_id: dict[str, MergeSelection] = Field(
         default_factory=dict,
         description="Map node ID -> selection (doc/manual).",
     )
 
+    policies: list[MergePolicy] = Field(
+        default_factory=list,
+        description="Rules resolving conflicts without a selection, in priority order.",
+    )
+
+    review_revision: int | None = Field(
+        default=None,
+        ge=0,
+        description="Use the session's stored review state, expected at this revision.",
+    )
+
+    refs: MergeRefsOptions = Field(
+        default_factory=MergeRefsOptions,
+        description="Which merged-node references to report, and how.",
+    )
+
 
 class MergeResponse(DiffFuseModel):
     """
@@ -74,7 +144,10 @@ class MergeResponse(DiffFuseModel):
     resolved_ref_by_node_id : dict[str, MergedNodeRef]
         Machine-readable mapping describing where each diff node ended up
         in the merged output. This allows the frontend to render merged
-        previews without relying on display paths.
+        previews without relying on display paths. Limited to the nodes in
+        the requested ``refs.scope``; empty with columnar encoding.
+    resolved_ref_columns : MergedRefColumns | None
+        The same references as parallel arrays, with columnar encoding only.
 
     Notes
     -----
@@ -85,3 +158,65 @@ class MergeResponse(DiffFuseModel):
     merged: Any
     unresolved_node_ids: list[str] = Field(default_factory=list)
     resolved_ref_by_node_id: dict[str, MergedNodeRef] = Field(default_factory=dict)
+    resolved_ref_columns: MergedRefColumns | None = None
+
+
+class MergeDeltaRequest(MergeRequest):
+    """
+    Request payload for an incremental merge.
+
+    Attributes
+    ----------
+    base_merge_id : str | None
+        ``merge_id`` of the client's previous incremental merge of the same
+        diff. When the server still holds it, only the subtrees affected by
+        changed selections are recomputed and the response is a delta
+        against it.
+
+    Notes
+    -----
+    A base serves once: the next request should name the ``merge_id`` of
+    this one's response.
+
+    Incremental merges track every reference to compute their deltas, so
+    ``refs`` must keep its defaults.
+    """
+
+    base_merge_id: str | None = Field(
+        default=None,
+        description="merge_id of the previous incremental merge to compute a delta against.",
+    )
+
+
+class MergeDeltaResponse(DiffFuseModel):
+    """
+    Response payload of an incremental merge.
+
+    Attributes
+    ----------
+    merge_id : str
+        Identifier of this merge, to send as ``base_merge_id`` next.
+    base_merge_id : str | None
+        The base this response is a delta against, or None for a full
+        response (no base requested, or the base is no longer held).
+    merged : Any
+        Full response only: the merged document.
+    unresolved_node_ids : list[str]
+        All unresolved node IDs, in both forms of the response.
+    resolved_ref_by_node_id : dict[str, MergedNodeRef]
+        Full response: every reference. Delta: the references that were
+        added or changed.
+    value_by_node_id : dict[str, Any]
+        Delta only: new merged values of the topmost changed subtrees, to be
+        placed where their (new) references point.
+    dropped_ref_node_ids : list[str]
+        Delta only: nodes that no longer have a reference.
+    """
+
+    merge_id: str
+    base_merge_id: str | None = None
+    merged: Any = None
+    unresolved_node_ids: list[str] = Field(default_factory=list)
+    resolved_ref_by_node_id: dict[str, MergedNodeRef] = Field(default_factory=dict)
+    value_by_node_id: dict[str, Any] = Field(default_factory=dict)
+    dropped_ref_node_ids: list[str] = Field(default_factory=list)
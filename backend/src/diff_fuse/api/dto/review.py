@@ -0,0 +1,76 @@
+"""
+DTOs for the review state stored with a session.
+
+Clients may keep their diff configuration and merge selections on the server
+instead of resending them with every merge and export: they update the
+stored state with small deltas, and refer to it from merge and export
+requests by revision (see ``MergeRequest.review_revision``).
+"""
+
+from pydantic import Field
+
+from diff_fuse.models.base import DiffFuseModel
+from diff_fuse.models.merge import MergeSelection
+from diff_fuse.models.review import ReviewDelta
+
+from .diff import DiffRequest
+
+
+class ReviewResponse(DiffFuseModel):
+    """
+    Review state of a session.
+
+    Attributes
+    ----------
+    revision : int
+        Current revision; ``0`` when no state is stored (never set, or
+        expired).
+    diff_request : DiffRequest
+        Stored diff configuration.
+    selections_by_node_id : dict[str, MergeSelection]
+        Stored merge selections.
+
+    Notes
+    -----
+    Shaped like a ``MergeRequest``, so clients can restore their state from
+    it as is.
+    """
+
+    revision: int
+    diff_request: DiffRequest
+    selections_by_node_id: dict[str, MergeSelection] = Field(default_factory=dict)
+
+
+class ReviewPatchRequest(ReviewDelta):
+    """
+    Delta to apply to a session's review state.
+
+    Attributes
+    ----------
+    base_revision : int | None
+        Revision the client last saw. When given, the delta is rejected with
+        ``review_conflict`` if the state has changed since (e.g. from another
+        tab, or because it expired).
+
+    Notes
+    -----
+    In ``array_strategies_by_node_id`` and ``selections_by_node_id``, a value
+    sets the node's entry and ``null`` clears it; other nodes keep theirs.
+    ``replace`` starts from an empty state, to upload a whole state at once.
+    """
+
+    base_revision: int | None = Field(default=None, ge=0)
+
+
+class ReviewRevisionResponse(DiffFuseModel):
+    """
+    Outcome of a review state update.
+
+    Attributes
+    ----------
+    revision : int
+        Revision of the updated state, to send as ``base_revision`` or
+        ``review_revision`` next.
+    """
+
+    revision: int
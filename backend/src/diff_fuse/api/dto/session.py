@@ -12,7 +12,7 @@ Session creation performs parsing and normalization so downstream
 operations can reuse cached results.
 """
 
-from pydantic import Field
+from pydantic import Field, computed_field
 
 from diff_fuse.models.base import DiffFuseModel
 from diff_fuse.models.document import DocumentMeta, InputDocument
@@ -79,7 +79,11 @@ class SessionResponse(DiffFuseModel):
         contents.
     documents_meta : list[DocumentMeta]
         Metadata describing the stored documents, including their
-        ``doc_id``, display name, declared format, and parse status.
+        ``doc_id``, display name, declared format, parse status and
+        approximate in-memory size.
+    approx_bytes : int
+        Approximate in-memory size of the whole session (sum over
+        ``documents_meta``); what counts against ``max_session_bytes``.
 
     Notes
     -----
@@ -90,10 +94,21 @@ class SessionResponse(DiffFuseModel):
     session_id: str
     documents_meta: list[DocumentMeta]
 
+    @computed_field(description="Approximate in-memory size of the session's documents, in bytes.")
+    @property
+    def approx_bytes(self) -> int:
+        """Sum of the documents' ``approx_bytes``."""
+        return sum(m.approx_bytes for m in self.documents_meta)
+
 
 class FullSessionResponse(Session):
     """
     Extended session response including the full session state.
+
+    Notes
+    -----
+    ``raw`` is ``None`` for successfully parsed documents when the server
+    runs with the ``raw_on_error`` storage policy.
     """
 
     ...
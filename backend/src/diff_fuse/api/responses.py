@@ -0,0 +1,92 @@
+"""
+Fast JSON responses for large response models.
+
+A route that returns a Pydantic model lets FastAPI serialize it: the model is
+dumped to a dict, *re-validated* against ``response_model``, dumped again to
+JSON-compatible data and finally encoded with :func:`json.dumps`, all on the
+event loop. For a diff tree of a few thousand nodes that is several hundred
+milliseconds spent re-checking data the service built itself.
+
+Routes with large responses (diff, merge, text export) keep declaring
+``response_model`` so the OpenAPI schema, and the frontend client generated
+from it, do not change, but return :func:`model_response` instead: FastAPI
+passes a :class:`~fastapi.Response` through untouched, and the body is encoded
+once with :mod:`orjson` in the worker thread pool.
+
+Byte compatibility
+------------------
+The body is byte-for-byte what FastAPI's ``JSONResponse`` would send (compact
+separators, non-ASCII characters unescaped, fields in declaration order).
+orjson and ``json.dumps`` format every value identically except floats in
+``[1e-9, 1e-4)``, which Python writes with a two-digit exponent (``1e-05``,
+``1e-07``) and orjson as ``0.00001`` or ``1e-7``, and integers beyond 64
+bits, which orjson rejects. :func:`model_json_bytes` detects both and falls
+back to the standard library encoder for that response.
+"""
+
+from __future__ import annotations
+
+import json
+from collections.abc import Mapping
+
+import orjson
+from fastapi import Response
+from pydantic import BaseModel
+
+from diff_fuse.domain.json_stream import DIVERGENT_FLOAT
+from diff_fuse.services.shared import run_cpu_bound
+
+
+def model_json_bytes(model: BaseModel) -> bytes:
+    """
+    Encode a response model as FastAPI's ``JSONResponse`` would.
+
+    Parameters
+    ----------
+    model : pydantic.BaseModel
+        Response model, already valid (it is not validated again).
+
+    Returns
+    -------
+    bytes
+        Compact UTF-8 JSON, fields by alias.
+
+    Notes
+    -----
+    The fallback also triggers when a *string* happens to contain one of
+    those spellings; the output is the same, only slower.
+    """
+    try:
+        body = orjson.dumps(model.model_dump(by_alias=True))
+    except orjson.JSONEncodeError:
+        body = None
+    if body is None or DIVERGENT_FLOAT.search(body):
+        text = json.dumps(
+            model.model_dump(mode="json", by_alias=True),
+            ensure_ascii=False,
+            allow_nan=False,
+            separators=(",", ":"),
+        )
+        body = text.encode("utf-8")
+    return body
+
+
+async def model_response(model: BaseModel, *, headers: Mapping[str, str] | None = None) -> Response:
+    """
+    Build a JSON response from a model without FastAPI's re-validation.
+
+    Parameters
+    ----------
+    model : pydantic.BaseModel
+        Response model. The route should still declare its class as
+        ``response_model`` so it appears in the OpenAPI schema.
+    headers : Mapping[str, str] | None, default=None
+        Extra response headers (e.g. ``ETag``).
+
+    Returns
+    -------
+    fastapi.Response
+        ``application/json`` response with the encoded model.
+    """
+    body = await run_cpu_bound(model_json_bytes, model)
+    return Response(content=body, media_type="application/json", headers=dict(headers or {}))
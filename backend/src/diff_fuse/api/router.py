@@ -11,7 +11,9 @@ from fastapi import APIRouter
 from .routes.array_keys import router as arrays_router
 from .routes.diff import router as diff_router
 from .routes.export import router as export_router
+from .routes.jobs import router as jobs_router
 from .routes.merge import router as merge_router
+from .routes.review import router as review_router
 from .routes.session import router as base_router
 
 router = APIRouter()
@@ -21,3 +23,5 @@ router.include_router(diff_router)
 router.include_router(merge_router)
 router.include_router(arrays_router)
 router.include_router(export_router)
+router.include_router(jobs_router)
+router.include_router(review_router)
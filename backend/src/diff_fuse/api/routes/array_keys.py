@@ -18,7 +18,7 @@ router = APIRouter()
 
 
 @router.post("/{session_id}/arrays/suggest-keys", response_model=SuggestArrayKeysResponse)
-def suggest_keys(session_id: str, req: SuggestArrayKeysRequest) -> SuggestArrayKeysResponse:
+async def suggest_keys(session_id: str, req: SuggestArrayKeysRequest) -> SuggestArrayKeysResponse:
     """
     Suggest candidate key fields for an array node within a session.
 
@@ -54,4 +54,4 @@ def suggest_keys(session_id: str, req: SuggestArrayKeysRequest) -> SuggestArrayK
     - Suggestions are heuristic and should be treated as guidance,
       not guarantees of uniqueness.
     """
-    return suggest_array_keys_in_session(session_id, req)
+    return await suggest_array_keys_in_session(session_id, req)
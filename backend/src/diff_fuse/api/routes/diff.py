@@ -11,16 +11,19 @@ The diff operation is stateless with respect to selections but depends on:
 - the provided per-path array strategies
 """
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Request, Response
 
+from diff_fuse.api.conditional import not_modified
 from diff_fuse.api.dto.diff import DiffRequest, DiffResponse
+from diff_fuse.api.responses import model_response
 from diff_fuse.services.diff_service import diff_in_session
+from diff_fuse.services.shared import request_etag
 
 router = APIRouter()
 
 
-@router.post("/{session_id}/diff", response_model=DiffResponse)
-def diff(session_id: str, req: DiffRequest) -> DiffResponse:
+@router.post("/{session_id}/diff", response_model=DiffResponse, responses={304: {"description": "Not modified"}})
+async def diff(session_id: str, req: DiffRequest, request: Request) -> Response:
     """
     Compute the diff tree for a session.
 
@@ -35,6 +38,8 @@ def diff(session_id: str, req: DiffRequest) -> DiffResponse:
     req : DiffRequest
         Diff configuration payload, containing per-array
         matching strategies.
+    request : fastapi.Request
+        Incoming request, for ``If-None-Match``.
 
     Returns
     -------
@@ -48,8 +53,20 @@ def diff(session_id: str, req: DiffRequest) -> DiffResponse:
 
     Notes
     -----
-    - The diff is recomputed on each call using cached normalized documents.
+    - The diff is computed from the stored normalized documents; a diff
+      computed recently for the same documents and request is reused.
+    - The response's `diff_id` can be sent to the merge and export
+      endpoints instead of the diff request.
     - Array handling behavior depends on `array_strategies`.
     - The returned tree uses stable canonical node IDs suitable for UI state.
+    - Conditional: the response carries a strong `ETag` computed from the
+      documents' content hashes and the request; a matching `If-None-Match`
+      is answered with `304 Not Modified` before any tree is built.
+    - `response_model` only documents the schema: the body is encoded
+      directly with orjson, without re-validation
+      (see :mod:`diff_fuse.api.responses`).
     """
-    return diff_in_session(session_id, req)
+    etag = await request_etag(session_id, "diff", req)
+    if (cached := not_modified(request, etag)) is not None:
+        return cached
+    return await model_response(await diff_in_session(session_id, req), headers={"ETag": etag})
@@ -10,19 +10,35 @@ Notes
 -----
 Both endpoints rely on the same underlying merge computation and therefore
 share the same conflict semantics.
+Like merges, exports may refer to the session's stored review state with
+``merge_request.review_revision``.
 """
 
-from fastapi import APIRouter
-from fastapi.responses import Response
+from fastapi import APIRouter, Request, Response
+from fastapi.responses import StreamingResponse
 
+from diff_fuse.api.conditional import not_modified
 from diff_fuse.api.dto.export import ExportRequest, ExportTextResponse
-from diff_fuse.services.export_service import export_merged_bytes, export_merged_text
+from diff_fuse.api.responses import model_response
+from diff_fuse.services.export_service import export_merged_stream, export_merged_text
+from diff_fuse.services.review_service import with_review
+from diff_fuse.services.shared import request_etag
 
 router = APIRouter()
 
 
-@router.post("/{session_id}/export/text", response_model=ExportTextResponse)
-def export_text(session_id: str, req: ExportRequest) -> ExportTextResponse:
+async def _with_review(session_id: str, req: ExportRequest) -> ExportRequest:
+    """Resolve the merge request's reference to the stored review state, if any."""
+    merge_request = await with_review(session_id, req.merge_request)
+    if merge_request is req.merge_request:
+        return req
+    return req.model_copy(update={"merge_request": merge_request})
+
+
+@router.post(
+    "/{session_id}/export/text", response_model=ExportTextResponse, responses={304: {"description": "Not modified"}}
+)
+async def export_text(session_id: str, req: ExportRequest, request: Request) -> Response:
     """
     Return the merged document as formatted text.
 
@@ -40,6 +56,8 @@ def export_text(session_id: str, req: ExportRequest) -> ExportTextResponse:
         - merge request (diff config + selections)
         - pretty-print preference
         - conflict requirements
+    request : fastapi.Request
+        Incoming request, for ``If-None-Match``.
 
     Returns
     -------
@@ -51,12 +69,25 @@ def export_text(session_id: str, req: ExportRequest) -> ExportTextResponse:
     ------
     DomainError
         If the session does not exist or has expired.
+
+    Notes
+    -----
+    - Conditional: the response carries a strong `ETag` computed from the
+      documents' content hashes and the request; a matching `If-None-Match`
+      is answered with `304 Not Modified` before any tree is built.
+    - `response_model` only documents the schema: the body is encoded
+      directly with orjson, without re-validation
+      (see :mod:`diff_fuse.api.responses`).
     """
-    return export_merged_text(session_id, req)
+    req = await _with_review(session_id, req)
+    etag = await request_etag(session_id, "export/text", req)
+    if (cached := not_modified(request, etag)) is not None:
+        return cached
+    return await model_response(await export_merged_text(session_id, req), headers={"ETag": etag})
 
 
-@router.post("/{session_id}/export/download")
-def export_download(session_id: str, req: ExportRequest):
+@router.post("/{session_id}/export/download", responses={304: {"description": "Not modified"}})
+async def export_download(session_id: str, req: ExportRequest, request: Request) -> Response:
     """
     Download the merged document as a JSON file.
 
@@ -69,14 +100,16 @@ def export_download(session_id: str, req: ExportRequest):
         Identifier of the session containing the documents to merge.
     req : ExportRequest
         Export configuration controlling merge behavior and formatting.
+    request : fastapi.Request
+        Incoming request, for ``If-None-Match``.
 
     Returns
     -------
-    Response
-        Binary HTTP response with:
+    StreamingResponse
+        Streamed HTTP response with:
         - media type: application/json
         - content-disposition: attachment
-        - body: UTF-8 encoded JSON
+        - body: UTF-8 encoded JSON, sent in chunks as it is serialized
 
     Raises
     ------
@@ -86,11 +119,18 @@ def export_download(session_id: str, req: ExportRequest):
     Notes
     -----
     The downloaded JSON is identical to the text export output, aside from
-    transport encoding.
+    transport encoding and a trailing newline. Unresolved conflicts (with
+    `require_resolved`) are detected before streaming starts and reported as
+    a regular error response. The response carries an `ETag` and honors
+    `If-None-Match` like the other export endpoint.
     """
-    data = export_merged_bytes(session_id, req)
-    return Response(
-        content=data,
+    req = await _with_review(session_id, req)
+    etag = await request_etag(session_id, "export/download", req)
+    if (cached := not_modified(request, etag)) is not None:
+        return cached
+    chunks = await export_merged_stream(session_id, req)
+    return StreamingResponse(
+        content=chunks,
         media_type="application/json",
-        headers={"Content-Disposition": 'attachment; filename="merged.json"'},
+        headers={"Content-Disposition": 'attachment; filename="merged.json"', "ETag": etag},
     )
@@ -0,0 +1,176 @@
+"""
+Background job API routes.
+
+Opt-in asynchronous variants of the diff and merge endpoints, for sessions
+too large to diff within a request:
+
+- ``POST /{session_id}/jobs/diff`` and ``POST /{session_id}/jobs/merge``
+  submit a job and answer ``202 Accepted`` at once;
+- ``GET /{session_id}/jobs/{job_id}`` reports its status and progress;
+- ``POST /{session_id}/jobs/{job_id}/cancel`` cancels it;
+- ``GET /{session_id}/jobs/{job_id}/result`` returns the result once it has
+  succeeded.
+
+Notes
+-----
+Jobs expire with the session TTL. See :mod:`diff_fuse.services.job_service`.
+"""
+
+from fastapi import APIRouter, Response
+
+from diff_fuse.api.dto.diff import DiffRequest, DiffResponse
+from diff_fuse.api.dto.jobs import JobResponse
+from diff_fuse.api.dto.merge import MergeRequest, MergeResponse
+from diff_fuse.models.job import Job
+from diff_fuse.services.job_service import cancel_job, get_job, get_job_result, submit_diff_job, submit_merge_job
+
+router = APIRouter()
+
+
+def _response(job: Job) -> JobResponse:
+    """Convert a job record to its response model."""
+    return JobResponse.model_validate(job.model_dump())
+
+
+def _accepted(job: Job, response: Response) -> JobResponse:
+    """Point the client of a submission at the job's status URL."""
+    response.headers["Location"] = f"/{job.session_id}/jobs/{job.job_id}"
+    return _response(job)
+
+
+@router.post("/{session_id}/jobs/diff", response_model=JobResponse, status_code=202)
+async def submit_diff(session_id: str, req: DiffRequest, response: Response) -> JobResponse:
+    """
+    Submit a diff of the session as a background job.
+
+    Parameters
+    ----------
+    session_id : str
+        Identifier of the session to diff.
+    req : DiffRequest
+        Diff configuration, as for ``POST /{session_id}/diff``.
+    response : fastapi.Response
+        Outgoing response, to set ``Location`` on.
+
+    Returns
+    -------
+    JobResponse
+        The queued job. Its result is a ``DiffResponse``.
+
+    Raises
+    ------
+    DomainError
+        If the session does not exist (404) or the worker pool is full (503).
+    """
+    return _accepted(await submit_diff_job(session_id, req), response)
+
+
+@router.post("/{session_id}/jobs/merge", response_model=JobResponse, status_code=202)
+async def submit_merge(session_id: str, req: MergeRequest, response: Response) -> JobResponse:
+    """
+    Submit a merge of the session as a background job.
+
+    Parameters
+    ----------
+    session_id : str
+        Identifier of the session to merge.
+    req : MergeRequest
+        Merge configuration, as for ``POST /{session_id}/merge``.
+    response : fastapi.Response
+        Outgoing response, to set ``Location`` on.
+
+    Returns
+    -------
+    JobResponse
+        The queued job. Its result is a ``MergeResponse``.
+
+    Raises
+    ------
+    DomainError
+        If the request names no diff (400), the session does not exist (404)
+        or the worker pool is full (503).
+    """
+    return _accepted(await submit_merge_job(session_id, req), response)
+
+
+@router.get("/{session_id}/jobs/{job_id}", response_model=JobResponse)
+async def status(session_id: str, job_id: str) -> JobResponse:
+    """
+    Report a job's status and progress.
+
+    Parameters
+    ----------
+    session_id : str
+        Session the job belongs to.
+    job_id : str
+        Job identifier.
+
+    Returns
+    -------
+    JobResponse
+        Current status, progress and, for failed jobs, the error.
+
+    Raises
+    ------
+    DomainError
+        If the job does not exist or has expired (404).
+    """
+    return _response(await get_job(session_id, job_id))
+
+
+@router.post("/{session_id}/jobs/{job_id}/cancel", response_model=JobResponse)
+async def cancel(session_id: str, job_id: str) -> JobResponse:
+    """
+    Cancel a job.
+
+    Parameters
+    ----------
+    session_id : str
+        Session the job belongs to.
+    job_id : str
+        Job identifier.
+
+    Returns
+    -------
+    JobResponse
+        Updated status. A queued job is cancelled at once; a running one
+        reports ``cancel_requested`` until it stops; a finished one is left
+        as it is.
+
+    Raises
+    ------
+    DomainError
+        If the job does not exist or has expired (404).
+    """
+    return _response(await cancel_job(session_id, job_id))
+
+
+@router.get(
+    "/{session_id}/jobs/{job_id}/result",
+    response_model=DiffResponse | MergeResponse,
+    responses={409: {"description": "Job not finished, or cancelled"}},
+)
+async def result(session_id: str, job_id: str) -> Response:
+    """
+    Return the result of a succeeded job.
+
+    Parameters
+    ----------
+    session_id : str
+        Session the job belongs to.
+    job_id : str
+        Job identifier.
+
+    Returns
+    -------
+    fastapi.Response
+        The ``DiffResponse`` or ``MergeResponse`` body, byte for byte what
+        the synchronous endpoint would have returned.
+
+    Raises
+    ------
+    DomainError
+        If the job does not exist or has expired (404), has not finished or
+        was cancelled (409), or failed (the job's own error and status).
+    """
+    return Response(content=await get_job_result(session_id, job_id), media_type="application/json")
@@ -13,16 +13,20 @@ The merge operation depends on:
 - the user-provided path selections
 """
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Request, Response
 
-from diff_fuse.api.dto.merge import MergeRequest, MergeResponse
-from diff_fuse.services.merge_service import merge_in_session
+from diff_fuse.api.conditional import not_modified
+from diff_fuse.api.dto.merge import MergeDeltaRequest, MergeDeltaResponse, MergeRequest, MergeResponse
+from diff_fuse.api.responses import model_response
+from diff_fuse.services.merge_service import merge_delta_in_session, merge_in_session
+from diff_fuse.services.review_service import with_review
+from diff_fuse.services.shared import request_etag
 
 router = APIRouter()
 
 
-@router.post("/{session_id}/merge", response_model=MergeResponse)
-def merge(session_id: str, req: MergeRequest) -> MergeResponse:
+@router.post("/{session_id}/merge", response_model=MergeResponse, responses={304: {"description": "Not modified"}})
+async def merge(session_id: str, req: MergeRequest, request: Request) -> Response:
     """
     Produce a merged document for a session.
 
@@ -38,6 +42,8 @@ def merge(session_id: str, req: MergeRequest) -> MergeResponse:
         Merge configuration including:
         - diff configuration (array strategies)
         - per-path merge selections
+    request : fastapi.Request
+        Incoming request, for ``If-None-Match``.
 
     Returns
     -------
@@ -54,5 +60,55 @@ def merge(session_id: str, req: MergeRequest) -> MergeResponse:
     - Merge behavior is deterministic given the same selections.
     - Container nodes inherit selections down the tree unless overridden.
     - Paths listed in `unresolved_paths` require user intervention.
+    - With `review_revision`, the session's stored review state stands in
+      for the diff configuration and selections (see
+      :mod:`diff_fuse.services.review_service`).
+    - Conditional: the response carries a strong `ETag` computed from the
+      documents' content hashes and the request; a matching `If-None-Match`
+      is answered with `304 Not Modified` before any tree is built.
+    - `response_model` only documents the schema: the body is encoded
+      directly with orjson, without re-validation
+      (see :mod:`diff_fuse.api.responses`).
     """
-    return merge_in_session(session_id, req)
+    req = await with_review(session_id, req)
+    etag = await request_etag(session_id, "merge", req)
+    if (cached := not_modified(request, etag)) is not None:
+        return cached
+    return await model_response(await merge_in_session(session_id, req), headers={"ETag": etag})
+
+
+@router.post("/{session_id}/merge/delta", response_model=MergeDeltaResponse)
+async def merge_delta(session_id: str, req: MergeDeltaRequest) -> Response:
+    """
+    Re-merge a session incrementally after selection changes.
+
+    Parameters
+    ----------
+    session_id : str
+        Identifier of the session containing the documents to merge.
+    req : MergeDeltaRequest
+        Merge configuration, as for ``/merge``, plus the ``base_merge_id``
+        returned by the previous call.
+
+    Returns
+    -------
+    MergeDeltaResponse
+        The changes since the base merge, or the full merge when the base is
+        not (or no longer) held by this server process.
+
+    Raises
+    ------
+    DomainError
+        If the session does not exist or has expired.
+
+    Notes
+    -----
+    - Only the subtrees affected by changed selections are recomputed (see
+      :mod:`diff_fuse.domain.incremental_merge`).
+    - To apply a delta: put each of ``value_by_node_id`` where its reference
+      in the updated reference map points, remove object members whose
+      reference became absent, and forget ``dropped_ref_node_ids``.
+    - Not conditional: each response starts a new base.
+    """
+    req = await with_review(session_id, req)
+    return await model_response(await merge_delta_in_session(session_id, req))
@@ -0,0 +1,79 @@
+"""
+Review state API routes.
+
+Long reviews accumulate thousands of merge selections. Rather than resending
+them with every merge and export, clients may keep them on the server:
+
+- ``GET /{session_id}/review`` returns the stored state and its revision;
+- ``PATCH /{session_id}/review`` sets or clears individual entries;
+- merge and export requests then send ``review_revision`` instead of their
+  diff configuration and selections.
+
+Notes
+-----
+Review state expires after the session TTL without use. See
+:mod:`diff_fuse.services.review_service`.
+"""
+
+from fastapi import APIRouter
+
+from diff_fuse.api.dto.review import ReviewPatchRequest, ReviewResponse, ReviewRevisionResponse
+from diff_fuse.services.review_service import get_review, patch_review
+
+router = APIRouter()
+
+
+@router.get("/{session_id}/review", response_model=ReviewResponse)
+async def read_review(session_id: str) -> ReviewResponse:
+    """
+    Return the review state stored for a session.
+
+    Parameters
+    ----------
+    session_id : str
+        Target session identifier.
+
+    Returns
+    -------
+    ReviewResponse
+        Revision, diff configuration and selections; revision ``0`` and an
+        empty state when none is stored.
+
+    Raises
+    ------
+    DomainError
+        If the session does not exist or has expired.
+    """
+    return await get_review(session_id)
+
+
+@router.patch("/{session_id}/review", response_model=ReviewRevisionResponse)
+async def update_review(session_id: str, req: ReviewPatchRequest) -> ReviewRevisionResponse:
+    """
+    Apply a delta to the review state stored for a session.
+
+    Parameters
+    ----------
+    session_id : str
+        Target session identifier.
+    req : ReviewPatchRequest
+        Entries to set (a value) or clear (``null``), an optional new
+        ``null_mode``, and optionally the ``base_revision`` they apply to.
+
+    Returns
+    -------
+    ReviewRevisionResponse
+        The new revision. The state itself is not echoed back.
+
+    Raises
+    ------
+    DomainError
+        If the session does not exist (404) or ``base_revision`` is not the
+        current revision (409 ``review_conflict``).
+
+    Notes
+    -----
+    Only the entries mentioned are written, so an update costs the same
+    however large the stored state is.
+    """
+    return await patch_review(session_id, req)
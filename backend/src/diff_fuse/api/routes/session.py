@@ -32,7 +32,7 @@ router = APIRouter()
 
 
 @router.post("/", response_model=SessionResponse)
-def create(req: AddDocsSessionRequest) -> SessionResponse:
+async def create(req: AddDocsSessionRequest) -> SessionResponse:
     """
     Create a new session.
 
@@ -59,11 +59,11 @@ def create(req: AddDocsSessionRequest) -> SessionResponse:
     - Document parsing errors (if any) are captured in the stored
       `DocumentResult` objects and surfaced in later operations.
     """
-    return create_session(req)
+    return await create_session(req)
 
 
 @router.post("/{session_id}/add-docs", response_model=SessionResponse)
-def add_docs(session_id: str, req: AddDocsSessionRequest) -> SessionResponse:
+async def add_docs(session_id: str, req: AddDocsSessionRequest) -> SessionResponse:
     """
     Add documents to an existing session.
 
@@ -88,11 +88,11 @@ def add_docs(session_id: str, req: AddDocsSessionRequest) -> SessionResponse:
     This operation mutates the session by appending new documents. The
     existing documents remain unchanged.
     """
-    return add_docs_in_session(session_id, req)
+    return await add_docs_in_session(session_id, req)
 
 
 @router.post("/{session_id}/remove-doc", response_model=SessionResponse)
-def remove_doc(session_id: str, req: RemoveDocSessionRequest) -> SessionResponse:
+async def remove_doc(session_id: str, req: RemoveDocSessionRequest) -> SessionResponse:
     """
     Remove a document from an existing session.
 
@@ -117,11 +117,11 @@ def remove_doc(session_id: str, req: RemoveDocSessionRequest) -> SessionResponse
     - This operation mutates the session by removing the specified document. The
     remaining documents remain unchanged.
     """
-    return remove_doc_in_session(session_id, req)
+    return await remove_doc_in_session(session_id, req)
 
 
 @router.get("/{session_id}/docs-meta", response_model=SessionResponse)
-def list_docs_meta(session_id: str) -> SessionResponse:
+async def list_docs_meta(session_id: str) -> SessionResponse:
     """
     List metadata for all documents in a session.
 
@@ -135,11 +135,11 @@ def list_docs_meta(session_id: str) -> SessionResponse:
     SessionResponse
         Session metadata including document metadata for all documents in the session.
     """
-    return list_docs_meta_in_session(session_id)
+    return await list_docs_meta_in_session(session_id)
 
 
 @router.get("/{session_id}/full", response_model=FullSessionResponse)
-def get_full_session_state(session_id: str) -> FullSessionResponse:
+async def get_full_session_state(session_id: str) -> FullSessionResponse:
     """
     Retrieve the full session state, including all documents and their parse results.
 
@@ -158,4 +158,4 @@ def get_full_session_state(session_id: str) -> FullSessionResponse:
     This endpoint is primarily intended for debugging and development purposes,
     as it may return large payloads depending on the number and size of documents in the session.
     """
-    return get_full_session(session_id)
+    return await get_full_session(session_id)
@@ -1,36 +1,139 @@
 """
 Session repository dependency wiring.
 
-This module provides the application-wide factory for obtaining the
-configured :class:`SessionRepo` implementation.
+This module provides the application-wide factories for obtaining the
+configured :class:`SessionRepo` implementation and its asynchronous
+counterpart (:class:`AsyncSessionRepo`), which request handlers use.
 
 Backend selection
 -----------------
 The repository is chosen using the following settings:
 - ``session_backend = "memory"``
-    -> :class:`MemorySessionRepo`
+    -> :class:`MemorySessionRepo` with a :class:`MemoryDocumentStore`
 - ``session_backend = "redis"``
-    -> :class:`RedisSessionRepo`
+    -> :class:`RedisSessionRepo` with a :class:`RedisDocumentStore`
+- ``session_backend = "sqlite"``
+    -> :class:`SqliteSessionRepo` with a :class:`SqliteDocumentStore`
+- ``session_backend = "tmpfs"``
+    -> the same, on a database file on a tmpfs, not synced to disk
 
-In the ``prod`` environment, Redis is required to avoid data loss and
-multi-instance inconsistencies.
+Asynchronous repositories:
+- ``session_backend = "memory"``, ``"sqlite"`` or ``"tmpfs"``
+    -> the repository above, wrapped in a :class:`ThreadedSessionRepo`
+- ``session_backend = "redis"``
+    -> :class:`AsyncRedisSessionRepo` on a ``redis.asyncio`` connection pool
+
+With ``redis_cluster = True`` both Redis repositories use a cluster client
+(``RedisCluster``, one connection pool per node) and hash-tagged session keys.
+
+Review state
+------------
+The review state of sessions lives in the session backend too, on the same
+client or database as the synchronous repository (:func:`get_review_store`).
+
+Background jobs
+---------------
+Job records live in the session backend, on the same client or database as
+the synchronous repository (:func:`get_job_store`), and run on a per-process
+:class:`JobPool` (:func:`get_job_pool`).
+
+In the ``prod`` environment, a shared backend (Redis, or SQLite on disk or
+on a tmpfs on a single host) is required to avoid data loss.
 
 Warnings
 --------
-The in-memory backend is **not safe** for multi-instance deployments.
-Always use Redis in production.
+The in-memory backend is **not safe** for multi-instance deployments, and
+the SQLite and tmpfs backends only for instances sharing one host. Use Redis when
+instances run on several hosts.
 """
 
 from __future__ import annotations
 
-from redis import Redis
+from redis import Redis, RedisCluster
+from redis.asyncio import BlockingConnectionPool, Redis as AsyncRedis, RedisCluster as AsyncRedisCluster
 
-from diff_fuse.settings import get_settings
+from diff_fuse.settings import Settings, get_settings
+from diff_fuse.state.async_redis_document_store import AsyncRedisDocumentStore
+from diff_fuse.state.async_redis_session_repo import AsyncRedisSessionRepo
+from diff_fuse.state.diff_cache import DiffCache
+from diff_fuse.state.job_pool import JobPool
+from diff_fuse.state.job_store import JobStore
+from diff_fuse.state.memory_document_store import MemoryDocumentStore
+from diff_fuse.state.memory_job_store import MemoryJobStore
+from diff_fuse.state.memory_review_store import MemoryReviewStore
 from diff_fuse.state.memory_session_repo import MemorySessionRepo
+from diff_fuse.state.merge_memo import MergeMemo
+from diff_fuse.state.redis_document_store import RedisDocumentStore
+from diff_fuse.state.redis_job_store import RedisJobStore
+from diff_fuse.state.redis_review_store import RedisReviewStore
 from diff_fuse.state.redis_session_repo import RedisSessionRepo
-from diff_fuse.state.session_repo import SessionRepo
+from diff_fuse.state.review_store import ReviewStore
+from diff_fuse.state.session_cache import SessionCache
+from diff_fuse.state.session_repo import AsyncSessionRepo, SessionRepo
+from diff_fuse.state.sqlite_database import SqliteDatabase
+from diff_fuse.state.sqlite_document_store import SqliteDocumentStore
+from diff_fuse.state.sqlite_job_store import SqliteJobStore
+from diff_fuse.state.sqlite_review_store import SqliteReviewStore
+from diff_fuse.state.sqlite_session_repo import SqliteSessionRepo
+from diff_fuse.state.storage_policy import DecodeCache
+from diff_fuse.state.threaded_session_repo import ThreadedSessionRepo
 
 _repo: SessionRepo | None = None
+_async_repo: AsyncSessionRepo | None = None
+_diff_cache: DiffCache | None = None
+_redis: Redis | RedisCluster | None = None
+_sqlite_db: SqliteDatabase | None = None
+_job_store: JobStore | None = None
+_job_pool: JobPool | None = None
+_review_store: ReviewStore | None = None
+_merge_memo: MergeMemo | None = None
+
+
+def _check_backend(s: Settings) -> None:
+    """Refuse backend configurations that would lose or split session state."""
+    # Safety guard: never allow memory sessions in prod
+    if s.environment == "prod" and s.session_backend == "memory":
+        raise RuntimeError(
+            "In production you must use shared sessions (DIFF_FUSE_SESSION_BACKEND=redis, sqlite or tmpfs)."
+        )
+
+    # Worker processes of one host can share a SQLite file, but not memory.
+    if s.uvicorn_workers > 1 and s.session_backend == "memory":
+        raise RuntimeError("Multiple workers require Redis, SQLite or tmpfs sessions.")
+
+
+def _decode_cache(s: Settings) -> DecodeCache | None:
+    """Build the decode cache required by the ``raw_only`` storage policy."""
+    return DecodeCache(s.document_decode_cache_entries) if s.document_storage_policy == "raw_only" else None
+
+
+def _session_cache(s: Settings) -> SessionCache | None:
+    """Build the per-process session cache used in front of Redis, if enabled."""
+    if s.session_cache_max_entries <= 0:
+        return None
+    return SessionCache(s.session_cache_max_entries, demote_after_seconds=s.session_demote_after_seconds)
+
+
+def _redis_client(s: Settings) -> Redis | RedisCluster:
+    """Return the synchronous Redis client shared by the session repository and job store."""
+    global _redis
+    if _redis is None:
+        # decode_responses must stay False: document payloads are binary
+        _redis = RedisCluster.from_url(s.redis_url) if s.redis_cluster else Redis.from_url(s.redis_url)
+    return _redis
+
+
+def _sqlite_database(s: Settings) -> SqliteDatabase:
+    """Return the SQLite database shared by the session repository and job store."""
+    global _sqlite_db
+    if _sqlite_db is None:
+        tmpfs = s.session_backend == "tmpfs"
+        _sqlite_db = SqliteDatabase(
+            s.tmpfs_path if tmpfs else s.sqlite_path,
+            mmap_bytes=s.sqlite_mmap_bytes,
+            durable=not tmpfs,
+        )
+    return _sqlite_db
 
 
 def get_session_repo() -> SessionRepo:
@@ -48,33 +151,233 @@ def get_session_repo() -> SessionRepo:
     Raises
     ------
     RuntimeError
-        If the application is running in production environment but the
-        session backend is not Redis;
-        If multiple Uvicorn workers are configured but the session backend
-        is not Redis.
+        If the application is running in production environment with the
+        memory session backend;
+        If multiple Uvicorn workers are configured with the memory session
+        backend.
     """
     global _repo
     if _repo is not None:
         return _repo
 
     s = get_settings()
-
-    # Safety guard: never allow memory sessions in prod
-    if s.environment == "prod" and s.session_backend != "redis":
-        raise RuntimeError("In production you must use Redis sessions (DIFF_FUSE_SESSION_BACKEND=redis).")
-
-    if s.uvicorn_workers > 1 and s.session_backend != "redis":
-        raise RuntimeError("Multiple workers require Redis sessions.")
+    _check_backend(s)
+    decode_cache = _decode_cache(s)
 
     if s.session_backend == "redis":
-        # decode_responses=False is fine; handled downstream
-        r = Redis.from_url(s.redis_url)
+        r = _redis_client(s)
         _repo = RedisSessionRepo(
             r,
             ttl_seconds=s.session_ttl_seconds,
             key_prefix=s.redis_key_prefix,
+            hash_tag=s.redis_cluster,
+            document_store=RedisDocumentStore(
+                r,
+                ttl_seconds=s.session_ttl_seconds,
+                key_prefix=s.redis_document_key_prefix,
+                policy=s.document_storage_policy,
+                decode_cache=decode_cache,
+            ),
+            cache=_session_cache(s),
+        )
+    elif s.session_backend in ("sqlite", "tmpfs"):
+        db = _sqlite_database(s)
+        _repo = SqliteSessionRepo(
+            db,
+            ttl_seconds=s.session_ttl_seconds,
+            document_store=SqliteDocumentStore(
+                db,
+                policy=s.document_storage_policy,
+                decode_cache=decode_cache,
+                hot_entries=s.sqlite_hot_documents,
+            ),
         )
     else:
-        _repo = MemorySessionRepo(ttl_seconds=s.session_ttl_seconds)
+        _repo = MemorySessionRepo(
+            ttl_seconds=s.session_ttl_seconds,
+            document_store=MemoryDocumentStore(policy=s.document_storage_policy, decode_cache=decode_cache),
+            max_sessions=s.memory_max_sessions,
+            max_bytes=s.memory_max_bytes,
+            lock_stripes=s.memory_lock_stripes,
+            demote_after_seconds=s.session_demote_after_seconds,
+        )
 
     return _repo
+
+
+def get_async_session_repo() -> AsyncSessionRepo:
+    """
+    Return the configured asynchronous session repository singleton.
+
+    Returns
+    -------
+    AsyncSessionRepo
+        The active asynchronous repository implementation.
+
+    Raises
+    ------
+    RuntimeError
+        Under the same conditions as :func:`get_session_repo`.
+
+    Notes
+    -----
+    With the memory, SQLite and tmpfs backends this wraps the
+    :func:`get_session_repo` singleton, so both views share the same sessions. With Redis, the async
+    client owns its own connection pool
+    (``DIFF_FUSE_REDIS_MAX_CONNECTIONS``, per node on a cluster); it is bound
+    to the event loop that first uses it.
+    """
+    global _async_repo
+    if _async_repo is not None:
+        return _async_repo
+
+    s = get_settings()
+    _check_backend(s)
+
+    if s.session_backend == "redis":
+        # decode_responses must stay False: document payloads are binary
+        r: AsyncRedis | AsyncRedisCluster
+        if s.redis_cluster:
+            r = AsyncRedisCluster.from_url(s.redis_url, max_connections=s.redis_max_connections)
+        else:
+            pool = BlockingConnectionPool.from_url(s.redis_url, max_connections=s.redis_max_connections)
+            r = AsyncRedis(connection_pool=pool)
+        _async_repo = AsyncRedisSessionRepo(
+            r,
+            ttl_seconds=s.session_ttl_seconds,
+            key_prefix=s.redis_key_prefix,
+            hash_tag=s.redis_cluster,
+            document_store=AsyncRedisDocumentStore(
+                r,
+                ttl_seconds=s.session_ttl_seconds,
+                key_prefix=s.redis_document_key_prefix,
+                policy=s.document_storage_policy,
+                decode_cache=_decode_cache(s),
+            ),
+            cache=_session_cache(s),
+        )
+    else:
+        _async_repo = ThreadedSessionRepo(get_session_repo())
+
+    return _async_repo
+
+
+def get_diff_cache() -> DiffCache:
+    """
+    Return the per-process cache of computed diff trees.
+
+    Returns
+    -------
+    DiffCache
+        Cache sized by ``diff_cache_max_entries`` and ``diff_cache_ttl_seconds``.
+    """
+    global _diff_cache
+    if _diff_cache is None:
+        s = get_settings()
+        _diff_cache = DiffCache(s.diff_cache_max_entries, s.diff_cache_ttl_seconds)
+    return _diff_cache
+
+
+def get_merge_memo() -> MergeMemo:
+    """
+    Return the per-process store of memoized merges.
+
+    Returns
+    -------
+    MergeMemo
+        Store sized by ``merge_memo_max_entries`` and ``merge_memo_ttl_seconds``.
+    """
+    global _merge_memo
+    if _merge_memo is None:
+        s = get_settings()
+        _merge_memo = MergeMemo(s.merge_memo_max_entries, s.merge_memo_ttl_seconds)
+    return _merge_memo
+
+
+def get_job_store() -> JobStore:
+    """
+    Return the job store of the configured session backend.
+
+    Returns
+    -------
+    JobStore
+        :class:`RedisJobStore` or :class:`SqliteJobStore` sharing the
+        session repository's client or database, so every worker process
+        sees every job; :class:`MemoryJobStore` with the memory backend.
+        Jobs expire after ``session_ttl_seconds``.
+
+    Raises
+    ------
+    RuntimeError
+        Under the same conditions as :func:`get_session_repo`.
+    """
+    global _job_store
+    if _job_store is not None:
+        return _job_store
+
+    s = get_settings()
+    _check_backend(s)
+
+    if s.session_backend == "redis":
+        _job_store = RedisJobStore(
+            _redis_client(s), ttl_seconds=s.session_ttl_seconds, key_prefix=s.redis_job_key_prefix
+        )
+    elif s.session_backend in ("sqlite", "tmpfs"):
+        _job_store = SqliteJobStore(_sqlite_database(s), ttl_seconds=s.session_ttl_seconds)
+    else:
+        _job_store = MemoryJobStore(ttl_seconds=s.session_ttl_seconds)
+
+    return _job_store
+
+
+def get_job_pool() -> JobPool:
+    """
+    Return the per-process pool running background jobs.
+
+    Returns
+    -------
+    JobPool
+        Pool sized by ``job_workers`` and ``job_max_pending``.
+    """
+    global _job_pool
+    if _job_pool is None:
+        s = get_settings()
+        _job_pool = JobPool(s.job_workers, s.job_max_pending)
+    return _job_pool
+
+
+def get_review_store() -> ReviewStore:
+    """
+    Return the review store of the configured session backend.
+
+    Returns
+    -------
+    ReviewStore
+        :class:`RedisReviewStore` or :class:`SqliteReviewStore` sharing the
+        session repository's client or database, so every worker process
+        sees the same review state; :class:`MemoryReviewStore` with the
+        memory backend. Review state expires after ``session_ttl_seconds``
+        without use.
+
+    Raises
+    ------
+    RuntimeError
+        Under the same conditions as :func:`get_session_repo`.
+    """
+    global _review_store
+    if _review_store is not None:
+        return _review_store
+
+    s = get_settings()
+    _check_backend(s)
+
+    if s.session_backend == "redis":
+        _review_store = RedisReviewStore(
+            _redis_client(s), ttl_seconds=s.session_ttl_seconds, key_prefix=s.redis_review_key_prefix
+        )
+    elif s.session_backend in ("sqlite", "tmpfs"):
+        _review_store = SqliteReviewStore(_sqlite_database(s), ttl_seconds=s.session_ttl_seconds)
+    else:
+        _review_store = MemoryReviewStore(ttl_seconds=s.session_ttl_seconds)
+
+    return _review_store
@@ -36,6 +36,7 @@ from diff_fuse.domain.array_match.value import group_by_value
 from diff_fuse.domain.errors import LimitsExceededError
 from diff_fuse.domain.node_ids import Token, child_node_id, root_node_id
 from diff_fuse.domain.normalize import json_type
+from diff_fuse.domain.progress import Progress
 from diff_fuse.models.arrays import ArrayStrategy, ArrayStrategyMode
 from diff_fuse.models.diff import (
     ArrayMeta,
@@ -54,6 +55,7 @@ from diff_fuse.settings import get_settings
 @dataclass
 class _Budget:
     remaining: int
+    progress: Progress | None = None
 
 
 def _kind_from_type(t: JsonType) -> NodeKind:
@@ -641,6 +643,8 @@ def build_diff_tree(
     if _budget.remaining <= 0:
         raise LimitsExceededError("Diff tree too large (node limit exceeded).")
     _budget.remaining -= 1
+    if _budget.progress is not None:
+        _budget.progress.advance()
 
     if parent_tokens is None:
         parent_tokens = []
@@ -782,6 +786,7 @@ def build_stable_root_diff_tree(
     per_doc_values: dict[str, ValueInput],
     array_strategies_by_node_id: dict[str, ArrayStrategy],
     null_mode: NullMode = NullMode.missing,
+    progress: Progress | None = None,
 ) -> DiffNode:
     """
     Build the diff tree with a stable root node even when all documents are missing.
@@ -801,6 +806,9 @@ def build_stable_root_diff_tree(
         Array strategies for each node.
     null_mode: NullMode
         How JSON null is interpreted. See `build_diff_tree`.
+    progress: Progress | None
+        Counter advanced for every node built (see `diff_fuse.domain.progress`).
+        Exceptions raised by its observer abort the build.
 
     Returns
     -------
@@ -818,6 +826,7 @@ def build_stable_root_diff_tree(
         parent_tokens=None,
         token=None,
         null_mode=null_mode,
+        _budget=_Budget(remaining=get_settings().max_diff_nodes, progress=progress),
     )
 
     # If nothing parsed, root builder returns missing-ish node; override to stable object
@@ -173,3 +173,117 @@ class ConflictUnresolvedError(DomainError):
             message="Unresolved merge conflicts",
             details={"unresolved": unresolved},
         )
+
+
+class DiffExpiredError(DomainError):
+    """
+    Raised when a diff handle is no longer available and cannot be rebuilt.
+
+    Parameters
+    ----------
+    diff_id : str
+        The expired handle (see :class:`diff_fuse.api.dto.diff.DiffResponse`).
+    """
+
+    def __init__(self, diff_id: str) -> None:
+        super().__init__(
+            code="diff_expired",
+            message="Diff expired; send the diff request again",
+            details={"diff_id": diff_id},
+        )
+
+
+class JobNotFoundError(DomainError):
+    """
+    Raised when a background job does not exist, belongs to another session,
+    or has expired.
+
+    Parameters
+    ----------
+    job_id : str
+        Identifier of the missing job.
+    """
+
+    def __init__(self, job_id: str) -> None:
+        super().__init__(
+            code="job_not_found",
+            message="Job not found",
+            details={"job_id": job_id},
+        )
+
+
+class JobNotFinishedError(DomainError):
+    """
+    Raised when the result of a job that is still queued or running is requested.
+
+    Parameters
+    ----------
+    job_id : str
+        Identifier of the job.
+    status : str
+        Its current status.
+    """
+
+    def __init__(self, job_id: str, status: str) -> None:
+        super().__init__(
+            code="job_not_finished",
+            message="Job has not finished yet",
+            details={"job_id": job_id, "status": status},
+        )
+
+
+class JobCancelledError(DomainError):
+    """
+    Raised when a job is cancelled: inside the job to abort it, and when the
+    result of a cancelled job is requested.
+
+    Parameters
+    ----------
+    job_id : str
+        Identifier of the cancelled job.
+    """
+
+    def __init__(self, job_id: str) -> None:
+        super().__init__(
+            code="job_cancelled",
+            message="Job was cancelled",
+            details={"job_id": job_id},
+        )
+
+
+class JobQueueFullError(DomainError):
+    """
+    Raised when a job is submitted while the worker pool has no room left.
+
+    Parameters
+    ----------
+    max_pending : int
+        Maximum number of queued and running jobs per process.
+    """
+
+    def __init__(self, max_pending: int) -> None:
+        super().__init__(
+            code="job_queue_full",
+            message="Too many jobs in progress; try again later",
+            details={"max_pending": max_pending},
+        )
+
+
+class ReviewConflictError(DomainError):
+    """
+    Raised when a request refers to another revision of a session's review state.
+
+    Parameters
+    ----------
+    expected : int
+        Revision the client based its request on.
+    actual : int
+        Current revision (``0`` once the review state has expired).
+    """
+
+    def __init__(self, expected: int, actual: int) -> None:
+        super().__init__(
+            code="review_conflict",
+            message="Review state has changed",
+            details={"expected_revision": expected, "revision": actual},
+        )
@@ -0,0 +1,80 @@
+"""
+Content fingerprints.
+
+This module computes stable content hashes used to identify documents
+independently of the session they were uploaded to. Two uploads with the same
+format and the same raw text always produce the same hash, which lets the
+storage layer keep a single copy of repeated documents.
+
+:func:`diff_fingerprint` builds on those hashes to identify a computed diff:
+the same documents diffed with the same options always give the same tree,
+so the fingerprint can name it without looking at any document content.
+"""
+
+import hashlib
+from collections.abc import Iterable
+
+HASH_PREFIX = "sha256:"
+
+
+def document_content_hash(format: str, content: str) -> str:
+    """
+    Compute the content address of a raw document.
+
+    Parameters
+    ----------
+    format : str
+        Declared document format (e.g. ``"json"``). Part of the hash, because
+        the same text may normalize differently under another format.
+    content : str
+        Raw document text, exactly as uploaded.
+
+    Returns
+    -------
+    str
+        Hash of the form ``"sha256:<hex digest>"``.
+
+    Notes
+    -----
+    Lone surrogates are encoded with ``surrogatepass`` so that any Python
+    string can be hashed, including text that later fails to parse.
+    """
+    h = hashlib.sha256()
+    h.update(format.encode("utf-8"))
+    h.update(b"\0")
+    h.update(content.encode("utf-8", "surrogatepass"))
+    return HASH_PREFIX + h.hexdigest()
+
+
+def diff_fingerprint(documents: Iterable[tuple[str, str]], options: bytes) -> str:
+    """
+    Compute the identity of a diff from its inputs.
+
+    Parameters
+    ----------
+    documents : Iterable[tuple[str, str]]
+        ``(doc_id, content_hash)`` of each diffed document, in session order
+        (the order is part of the diff).
+    options : bytes
+        Canonical serialization of the diff options (e.g. sorted-key JSON of
+        the diff request).
+
+    Returns
+    -------
+    str
+        Hash of the form ``"sha256:<hex digest>"``.
+
+    Notes
+    -----
+    Only metadata is hashed, so the fingerprint of a stored session can be
+    computed without loading its documents.
+    """
+    h = hashlib.sha256()
+    for doc_id, content_hash in documents:
+        h.update(doc_id.encode("utf-8", "surrogatepass"))
+        h.update(b"\0")
+        h.update(content_hash.encode("utf-8"))
+        h.update(b"\0")
+    h.update(b"\1")
+    h.update(options)
+    return HASH_PREFIX + h.hexdigest()
@@ -0,0 +1,359 @@
+"""
+Incremental merge engine.
+
+While reviewing, a client changes one selection at a time and re-merges after
+each click. :func:`diff_fuse.domain.merge.try_merge_from_diff_tree_with_refs`
+then rebuilds the whole merged document and a reference for every node,
+although almost all of it is unchanged.
+
+This module produces the same merge (same merged document, unresolved node
+IDs and node references) but keeps, in a :class:`MergeState`, the merged value
+of every node it visited. Re-merging with new selections recomputes only:
+
+- the nodes whose selection changed, together with the subtree their
+  selection is inherited by;
+- the ancestors of those nodes, which rebuild their container from their
+  children's memoized values.
+
+Every other subtree is reused as is: a node's merged value only depends on
+its effective selection (its own, or the one it inherits) and on the
+selections inside its subtree, and both are unchanged there. It also depends
+on the merge policies, which apply everywhere: a re-merge with other policies
+starts from scratch.
+
+Deltas
+------
+Alongside the new state, a re-merge reports what changed as a
+:class:`MergeDelta`: the references that changed or disappeared, and the new
+values of the topmost recomputed subtrees. Ancestors that were only rebuilt
+around a changed child are not repeated, except arrays whose elements
+appeared or disappeared: their indices shift, so they are reported whole.
+
+Notes
+-----
+Merged values are never mutated once built: a recomputed container is a new
+object holding its children's (possibly reused) values. Values handed out by
+an earlier merge therefore stay valid; the state's own maps, however, are
+updated in place.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from typing import Any
+
+from diff_fuse.domain.merge import (
+    _MISSING,
+    _is_type_error_origin,
+    _pick_present_value,
+    _resolve_by_policies,
+    _value_for_doc,
+)
+from diff_fuse.models.diff import DiffNode, DiffStatus, NodeKind
+from diff_fuse.models.merge import MergedNodeRef, MergePolicy, MergeSelection
+
+_ABSENT = MergedNodeRef(present=False)
+
+
+@dataclass(frozen=True, slots=True)
+class TreeIndex:
+    """
+    Structure of a diff tree needed to re-merge it.
+
+    Attributes
+    ----------
+    parent_by_node_id : dict[str, str | None]
+        Parent of every node (None for the root).
+    order_by_node_id : dict[str, int]
+        Pre-order position of every node, to report unresolved nodes in tree
+        order.
+    """
+
+    parent_by_node_id: dict[str, str | None]
+    order_by_node_id: dict[str, int]
+
+
+def index_tree(root: DiffNode) -> TreeIndex:
+    """
+    Index a diff tree.
+
+    Parameters
+    ----------
+    root : DiffNode
+        Root of the tree.
+
+    Returns
+    -------
+    TreeIndex
+        Parent links and pre-order positions.
+    """
+    parents: dict[str, str | None] = {root.node_id: None}
+    order: dict[str, int] = {}
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        order[node.node_id] = len(order)
+        for child in node.children:
+            parents[child.node_id] = node.node_id
+        stack.extend(reversed(node.children))
+    return TreeIndex(parent_by_node_id=parents, order_by_node_id=order)
+
+
+@dataclass(slots=True)
+class MergeState:
+    """
+    Memoized merge of one diff tree.
+
+    Attributes
+    ----------
+    index : TreeIndex
+        Structure of the merged tree.
+    selections : dict[str, MergeSelection]
+        Selections the state was merged with.
+    value_by_node_id : dict[str, Any]
+        Merged value of every visited node (the module's missing sentinel for
+        nodes absent from the output).
+    ref_by_node_id : dict[str, MergedNodeRef]
+        Reference of every visited node, as returned by the full merge.
+    unresolved : set[str]
+        Unresolved node IDs.
+    policies : tuple[MergePolicy, ...]
+        Policies the state was merged with.
+    """
+
+    index: TreeIndex
+    selections: dict[str, MergeSelection]
+    policies: tuple[MergePolicy, ...] = ()
+    value_by_node_id: dict[str, Any] = field(default_factory=dict)
+    ref_by_node_id: dict[str, MergedNodeRef] = field(default_factory=dict)
+    unresolved: set[str] = field(default_factory=set)
+
+    def merged(self, root: DiffNode) -> Any:
+        """Return the merged document (``{}`` when the root is absent)."""
+        value = self.value_by_node_id[root.node_id]
+        return {} if value is _MISSING else value
+
+    def unresolved_node_ids(self) -> list[str]:
+        """Return the unresolved node IDs in tree order."""
+        return sorted(self.unresolved, key=self.index.order_by_node_id.__getitem__)
+
+
+@dataclass(slots=True)
+class MergeDelta:
+    """
+    Changes between two merges of the same diff tree.
+
+    Attributes
+    ----------
+    value_by_node_id : dict[str, Any]
+        New merged values of the topmost recomputed subtrees that are present
+        in the output, in tree order. Nodes that became absent are reported
+        through their reference instead.
+    changed_ref_by_node_id : dict[str, MergedNodeRef]
+        References that were added or changed.
+    dropped_ref_node_ids : list[str]
+        Nodes that no longer have a reference, because the merge no longer
+        descends into them (e.g. under a manual selection).
+    """
+
+    value_by_node_id: dict[str, Any] = field(default_factory=dict)
+    changed_ref_by_node_id: dict[str, MergedNodeRef] = field(default_factory=dict)
+    dropped_ref_node_ids: list[str] = field(default_factory=list)
+
+
+def _changed_node_ids(old: dict[str, MergeSelection], new: dict[str, MergeSelection]) -> set[str]:
+    """Return the node IDs whose selection differs between two selection maps."""
+    return {node_id for node_id in old.keys() | new.keys() if old.get(node_id) != new.get(node_id)}
+
+
+def _dirty_node_ids(index: TreeIndex, changed: set[str]) -> set[str]:
+    """Return the changed nodes of the tree and all their ancestors."""
+    dirty: set[str] = set()
+    parents = index.parent_by_node_id
+    for node_id in changed:
+        current: str | None = node_id if node_id in parents else None
+        while current is not None and current not in dirty:
+            dirty.add(current)
+            current = parents[current]
+    return dirty
+
+
+class _Remerge:
+    """One merge pass over a tree, reusing the memoized values of a state."""
+
+    def __init__(
+        self,
+        state: MergeState,
+        selections: dict[str, MergeSelection],
+        *,
+        dirty: set[str],
+        track: bool,
+    ) -> None:
+        self.state = state
+        self.old_selections = state.selections
+        self.selections = selections
+        self.dirty = dirty
+        self.track = track
+        self.emitted: list[tuple[str, Any]] = []
+        self.delta = MergeDelta()
+
+    def node(
+        self, node: DiffNode, inherited: MergeSelection | None, inherited_old: MergeSelection | None, emitting: bool
+    ) -> Any:
+        """Return the merged value of a node, recomputing it only if needed."""
+        node_id = node.node_id
+        values = self.state.value_by_node_id
+        sel = self.selections.get(node_id, inherited)
+        sel_old = self.old_selections.get(node_id, inherited_old)
+
+        rebuild_only = node_id in values and sel == sel_old
+        if rebuild_only and node_id not in self.dirty:
+            return values[node_id]
+
+        emit = self.track and not emitting and not rebuild_only
+        mark = len(self.emitted)
+        value, reshaped = self._compute(node, sel, sel_old, emitting or emit)
+        values[node_id] = value
+
+        if self.track and not emitting and (emit or reshaped):
+            del self.emitted[mark:]
+            if value is not _MISSING:
+                self.emitted.append((node_id, value))
+        return value
+
+    def _compute(
+        self, node: DiffNode, sel: MergeSelection | None, sel_old: MergeSelection | None, emitting: bool
+    ) -> tuple[Any, bool]:
+        """Merge a node under its effective selection; also report whether array indices shifted."""
+        self.state.unresolved.discard(node.node_id)
+        is_container = node.kind in (NodeKind.object, NodeKind.array)
+
+        if sel is not None:
+            if sel.kind == "manual":
+                self._drop_children(node)
+                return sel.manual_value, False
+            chosen = _value_for_doc(node, sel.doc_id)
+            if chosen is _MISSING or _is_type_error_origin(node) or not is_container:
+                self._drop_children(node)
+                return chosen, False
+            return self._children(node, sel, sel_old, emitting)
+
+        if is_container and not _is_type_error_origin(node):
+            return self._children(node, None, sel_old, emitting)
+        if not is_container and node.status in (DiffStatus.same, DiffStatus.missing):
+            return _pick_present_value(node), False
+
+        resolved = _resolve_by_policies(node, self.state.policies)
+        if resolved is _MISSING:
+            self.state.unresolved.add(node.node_id)
+        return resolved, False
+
+    def _children(
+        self, node: DiffNode, sel: MergeSelection | None, sel_old: MergeSelection | None, emitting: bool
+    ) -> tuple[Any, bool]:
+        """Merge a container through its children, updating their references."""
+        is_array = node.kind == NodeKind.array
+        out_list: list[Any] = []
+        out_dict: dict[str, Any] = {}
+        refs = self.state.ref_by_node_id
+        reshaped = False
+
+        for child in node.children:
+            value = self.node(child, sel, sel_old, emitting)
+            old = refs.get(child.node_id)
+            if value is _MISSING:
+                ref = _ABSENT if old is None or old.present else old
+            elif is_array:
+                index = len(out_list)
+                out_list.append(value)
+                ref = old if old is not None and old.present and old.array_index == index else None
+                ref = ref or MergedNodeRef(present=True, array_index=index)
+            else:
+                assert child.key is not None
+                out_dict[child.key] = value
+                ref = old if old is not None and old.present and old.object_key == child.key else None
+                ref = ref or MergedNodeRef(present=True, object_key=child.key)
+
+            if ref is not old:
+                refs[child.node_id] = ref
+                if self.track:
+                    self.delta.changed_ref_by_node_id[child.node_id] = ref
+                    reshaped = reshaped or (is_array and (old is None or old.present != ref.present))
+
+        if not any(vp.present for vp in node.per_doc.values()):
+            return _MISSING, reshaped
+        return (out_list if is_array else out_dict), reshaped
+
+    def _drop_children(self, node: DiffNode) -> None:
+        """Forget the values and references of descendants a merge no longer visits."""
+        if not node.children or node.children[0].node_id not in self.state.value_by_node_id:
+            return
+        for child in node.children:
+            self.state.value_by_node_id.pop(child.node_id, None)
+            self.state.unresolved.discard(child.node_id)
+            if self.state.ref_by_node_id.pop(child.node_id, None) is not None and self.track:
+                self.delta.dropped_ref_node_ids.append(child.node_id)
+                self.delta.changed_ref_by_node_id.pop(child.node_id, None)
+            self._drop_children(child)
+
+
+def merge_incremental(
+    root: DiffNode,
+    selections: dict[str, MergeSelection],
+    base: MergeState | None = None,
+    policies: Sequence[MergePolicy] = (),
+) -> tuple[MergeState, MergeDelta | None]:
+    """
+    Merge a diff tree, reusing an earlier merge of the same tree.
+
+    Parameters
+    ----------
+    root : DiffNode
+        Root of the diff tree.
+    selections : dict[str, MergeSelection]
+        User merge selections.
+    base : MergeState | None, default=None
+        State of an earlier merge of the *same* tree. It is updated in place
+        and returned; do not use it concurrently. Ignored when it was merged
+        with other policies.
+    policies : Sequence[MergePolicy], default=()
+        Rules resolving the conflicts no selection covers.
+
+    Returns
+    -------
+    tuple[MergeState, MergeDelta | None]
+        The state of this merge, and the changes since ``base`` (None when
+        there is no base, i.e. everything is new).
+
+    Notes
+    -----
+    The merged document, unresolved node IDs and references of the returned
+    state equal those of
+    :func:`diff_fuse.domain.merge.try_merge_from_diff_tree_with_refs`.
+    """
+    policies = tuple(policies)
+    if base is not None and base.policies != policies:
+        base = None
+    if base is None:
+        state = MergeState(index=index_tree(root), selections={}, policies=policies)
+        dirty: set[str] = set()
+    else:
+        state = base
+        dirty = _dirty_node_ids(state.index, _changed_node_ids(state.selections, selections))
+
+    remerge = _Remerge(state, selections, dirty=dirty, track=base is not None)
+    value = remerge.node(root, None, None, emitting=False)
+    state.selections = selections
+
+    # Root is always represented explicitly, as in the full merge.
+    old_root_ref = state.ref_by_node_id.get(root.node_id)
+    root_ref = MergedNodeRef(present=value is not _MISSING)
+    if old_root_ref != root_ref:
+        state.ref_by_node_id[root.node_id] = root_ref
+        remerge.delta.changed_ref_by_node_id[root.node_id] = root_ref
+
+    if base is None:
+        return state, None
+    remerge.delta.value_by_node_id = dict(remerge.emitted)
+    return state, remerge.delta
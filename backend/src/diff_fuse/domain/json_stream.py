@@ -0,0 +1,109 @@
+"""
+Chunked JSON serialization of merged documents.
+
+Exports are the largest payloads the service produces. Serializing a merged
+document with the standard library into one ``str`` and encoding that to
+``bytes`` holds several full copies of the output at once, and the stdlib
+encoder is slow on large structures.
+
+:func:`iter_json_bytes` walks the outer levels of the value itself and hands
+every deeper subtree to :mod:`orjson` in one call, yielding the output in
+chunks of bounded size. A streaming response can send each chunk as soon as it
+is ready, so at most one chunk plus one serialized subtree is held at a time.
+
+Output format
+-------------
+Keys are sorted. Pretty output uses two-space indentation and is identical to
+``json.dumps(value, indent=2, sort_keys=True, ensure_ascii=False)``; compact
+output has no whitespace at all. Subtrees orjson cannot encode (integers
+beyond 64 bits), or would spell differently (floats in ``[1e-9, 1e-4)``, which
+orjson writes as ``0.00001`` where the stdlib writes ``1e-05``), fall back to
+the stdlib encoder.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from collections.abc import Iterator
+from typing import Any
+
+import orjson
+
+STREAM_DEPTH = 2
+"""Container levels walked in Python; deeper subtrees are serialized in one orjson call."""
+
+DEFAULT_CHUNK_BYTES = 65_536
+"""Approximate size of the chunks yielded by :func:`iter_json_bytes`."""
+
+DIVERGENT_FLOAT = re.compile(rb"0\.0000|\de-[6-9](?!\d)")
+"""orjson's spelling of floats in ``[1e-9, 1e-4)``; ``repr`` never writes these inside a number."""
+
+
+def _dumps(value: Any, *, pretty: bool) -> bytes:
+    """Serialize a subtree with orjson, or with the stdlib encoder where orjson cannot or would differ."""
+    try:
+        data = orjson.dumps(value, option=orjson.OPT_SORT_KEYS | (orjson.OPT_INDENT_2 if pretty else 0))
+    except orjson.JSONEncodeError:
+        data = None
+    if data is not None and not DIVERGENT_FLOAT.search(data):
+        return data
+    # Also taken when a string merely contains such a spelling: same output, only slower.
+    separators = None if pretty else (",", ":")
+    text = json.dumps(value, indent=2 if pretty else None, separators=separators, sort_keys=True, ensure_ascii=False)
+    return text.encode("utf-8", "surrogatepass")
+
+
+def _pieces(value: Any, depth: int, *, pretty: bool) -> Iterator[bytes]:
+    """Yield the serialization of ``value`` nested ``depth`` levels deep, in pieces."""
+    if depth >= STREAM_DEPTH or not isinstance(value, dict | list) or not value:
+        data = _dumps(value, pretty=pretty)
+        if pretty and depth:
+            # Newlines only occur as formatting: newlines inside strings are escaped.
+            data = data.replace(b"\n", b"\n" + b"  " * depth)
+        yield data
+        return
+
+    is_dict = isinstance(value, dict)
+    member_prefix = b"\n" + b"  " * (depth + 1) if pretty else b""
+    key_separator = b": " if pretty else b":"
+
+    yield b"{" if is_dict else b"["
+    for i, key in enumerate(sorted(value) if is_dict else range(len(value))):
+        yield b"," + member_prefix if i else member_prefix
+        if is_dict:
+            yield orjson.dumps(key) + key_separator
+        yield from _pieces(value[key], depth + 1, pretty=pretty)
+    if pretty:
+        yield b"\n" + b"  " * depth
+    yield b"}" if is_dict else b"]"
+
+
+def iter_json_bytes(value: Any, *, pretty: bool, chunk_bytes: int = DEFAULT_CHUNK_BYTES) -> Iterator[bytes]:
+    """
+    Serialize a JSON-compatible value to UTF-8 JSON, chunk by chunk.
+
+    Parameters
+    ----------
+    value : Any
+        JSON-compatible value (dicts with string keys, lists, scalars).
+    pretty : bool
+        Indent with two spaces; otherwise emit compact JSON.
+    chunk_bytes : int, default=DEFAULT_CHUNK_BYTES
+        Pieces are buffered until they reach this size. A single subtree
+        larger than that is yielded as one chunk.
+
+    Yields
+    ------
+    bytes
+        Consecutive parts of the document; their concatenation is the full
+        JSON text (without a trailing newline).
+    """
+    buffer = bytearray()
+    for piece in _pieces(value, 0, pretty=pretty):
+        buffer += piece
+        if len(buffer) >= chunk_bytes:
+            yield bytes(buffer)
+            buffer.clear()
+    if buffer:
+        yield bytes(buffer)
@@ -16,8 +16,8 @@ Core ideas
 - Object nodes merge by keys (children), array nodes merge by element children.
 - Selecting a document where a node is missing deletes that node in the output.
 - Leaf nodes with status `same` or `missing` can be auto-resolved safely.
-- Leaf nodes with status `diff` require a selection; otherwise they are reported
-  as unresolved merge conflicts.
+- Leaf nodes with status `diff` require a selection or an applicable policy;
+  otherwise they are reported as unresolved merge conflicts.
 - Nodes where a type error *originates* also require a selection. They are
   identified by `_is_type_error_origin` rather than by status, because
   `type_error` is aggregated upward: an ancestor that merely inherits the status
@@ -32,13 +32,48 @@ nodes for containers rather than copying container values directly.
 
 Type-error origins are the exception: they have no children to recurse through,
 so the diff builder embeds their values and a selection copies one directly.
+
+Subtree copies
+--------------
+Rebuilding a large `same` subtree leaf by leaf is wasted work: every document
+holds it. When the caller passes the normalized source documents, a container
+node with status `same` and no selection inside its subtree is instead copied
+from a source in one step, located by decoding its node ID into tokens. Its
+descendants' references are then derived from the tree alone.
+
+The copy is only taken when it provably equals the leaf-by-leaf merge: the
+subtree must be equal in every document. Under `NullMode.missing` a `same`
+subtree may still differ (an explicit null in one document, an absent key in
+another); such subtrees, and everything below them, merge the regular way.
+Copies are rebuilt with object keys in sorted order, as the leaf-by-leaf merge
+emits them, so the output does not depend on the sources' key order.
+
+Policies
+--------
+Merge policies (see `diff_fuse.models.merge.MergePolicy`) resolve conflicts in
+bulk: a node that would be reported as unresolved -- a conflicting leaf or a
+type-error origin, with no selection -- takes the value of the first policy
+that applies to it. They are evaluated during the same traversal, only at
+those nodes, so large selection maps are no longer needed to resolve many
+conflicts the same way.
+
+Reference scopes
+----------------
+By default every node's `MergedNodeRef` is reported. Callers that need only
+some of them (a viewport, or none at all for an export) pass the node IDs they
+want, optionally with their whole subtrees; other references are never built.
 """
 
+from collections.abc import Collection, Iterable, Sequence
+from dataclasses import dataclass
 from typing import Any
 
 from diff_fuse.domain.errors import ConflictUnresolvedError
+from diff_fuse.domain.node_access import get_value_at_node_tokens
+from diff_fuse.domain.node_ids import decode_node_id, encode_node_id
 from diff_fuse.models.diff import DiffNode, DiffStatus, NodeKind, ValuePresence
-from diff_fuse.models.merge import MergedNodeRef, MergeSelection
+from diff_fuse.models.document import ValueInput
+from diff_fuse.models.merge import MergedNodeRef, MergePolicy, MergeSelection
 
 # Sentinel used internally to represent "deleted / not present in merged output".
 _MISSING = object()
@@ -69,6 +104,146 @@ def _dedupe_preserve_order(ids: list[str]) -> list[str]:
     return out
 
 
+@dataclass(frozen=True, slots=True)
+class _SubtreeSources:
+    """
+    Source documents that `same` subtrees can be copied from.
+
+    Attributes
+    ----------
+    roots : dict[str, Any]
+        Normalized root value of every present document.
+    blocked : frozenset[str]
+        Strict ancestors of the selected nodes. Their subtree holds a selection,
+        so it must be merged node by node.
+    """
+
+    roots: dict[str, Any]
+    blocked: frozenset[str]
+
+    def copy(self, node: DiffNode, sel: MergeSelection | None) -> Any:
+        """
+        Copy a `same` subtree from the sources.
+
+        Parameters
+        ----------
+        node : DiffNode
+            Container node with status `same` and no selection below it.
+        sel : MergeSelection | None
+            Document selection active at the node, if any.
+
+        Returns
+        -------
+        Any
+            A copy of the selected (or any) document's value, or `_MISSING`
+            if the documents' subtrees differ or cannot be located.
+        """
+        tokens = decode_node_id(node.node_id)
+        values: dict[str, Any] = {}
+        for doc_id in node.per_doc:
+            root = self.roots.get(doc_id, _MISSING)
+            if root is _MISSING:
+                return _MISSING
+            vp = get_value_at_node_tokens(root, tokens)
+            if not vp.present:
+                return _MISSING
+            values[doc_id] = vp.value
+
+        first, *others = values.values()
+        if any(v != first for v in others):
+            return _MISSING
+        value = first if sel is None else values.get(sel.doc_id, _MISSING)
+        return value if value is _MISSING else _with_sorted_keys(value)
+
+
+def _with_sorted_keys(value: Any) -> Any:
+    """Copy a JSON value with object keys in sorted order."""
+    if isinstance(value, dict):
+        return {k: _with_sorted_keys(value[k]) for k in sorted(value)}
+    if isinstance(value, list):
+        return [_with_sorted_keys(v) for v in value]
+    return value
+
+
+@dataclass(frozen=True, slots=True)
+class _RefScope:
+    """
+    Nodes whose reference a merge reports, when not all of them.
+
+    Attributes
+    ----------
+    node_ids : frozenset[str]
+        Requested nodes.
+    subtrees : bool
+        Whether the requested nodes' descendants are reported too.
+    ancestors : frozenset[str]
+        Strict ancestors of the requested nodes, to skip subtrees holding none.
+    """
+
+    node_ids: frozenset[str]
+    subtrees: bool
+    ancestors: frozenset[str]
+
+    def below(self, node_id: str) -> "_RefScope | None":
+        """Return the scope of a node's descendants (None: all of them)."""
+        return None if self.subtrees and node_id in self.node_ids else self
+
+
+def _strict_ancestors(node_ids: Iterable[str]) -> frozenset[str]:
+    """Return the IDs of the strict ancestors of the given nodes."""
+    ancestors: set[str] = set()
+    for node_id in node_ids:
+        try:
+            tokens = decode_node_id(node_id)
+        except ValueError:
+            # Not a node of any tree: it has no ancestors to mark.
+            continue
+        for depth in range(len(tokens) - 1, -1, -1):
+            ancestor = encode_node_id(tokens[:depth])
+            if ancestor in ancestors:
+                break
+            ancestors.add(ancestor)
+    return frozenset(ancestors)
+
+
+def _subtree_sources(
+    sources: dict[str, ValueInput] | None, selections: dict[str, MergeSelection]
+) -> _SubtreeSources | None:
+    """Prepare the sources for subtree copies, blocking the ancestors of every selected node."""
+    if sources is None:
+        return None
+    roots = {doc_id: value for doc_id, (present, value) in sources.items() if present}
+    return _SubtreeSources(roots=roots, blocked=_strict_ancestors(selections))
+
+
+def _ref_scope(ref_node_ids: Collection[str] | None, ref_subtrees: bool) -> _RefScope | None:
+    """Prepare the reference scope of a merge (None: every reference)."""
+    if ref_node_ids is None:
+        return None
+    return _RefScope(node_ids=frozenset(ref_node_ids), subtrees=ref_subtrees, ancestors=_strict_ancestors(ref_node_ids))
+
+
+def _add_subtree_refs(
+    node: DiffNode, resolved_ref_by_node_id: ResolvedRefByNodeId, ref_scope: _RefScope | None
+) -> None:
+    """Record the references of a copied subtree's descendants, all of which are present."""
+    stack = [(node, ref_scope)]
+    while stack:
+        current, scope = stack.pop()
+        is_array = current.kind == NodeKind.array
+        for idx, child in enumerate(current.children):
+            if scope is None or child.node_id in scope.node_ids:
+                resolved_ref_by_node_id[child.node_id] = (
+                    MergedNodeRef(present=True, array_index=idx)
+                    if is_array
+                    else MergedNodeRef(present=True, object_key=child.key)
+                )
+            if child.children and (
+                scope is None or child.node_id in scope.ancestors or child.node_id in scope.node_ids
+            ):
+                stack.append((child, None if scope is None else scope.below(child.node_id)))
+
+
 def _is_type_error_origin(node: DiffNode) -> bool:
     """
     Whether a node is where a type error originates, rather than inheriting one.
@@ -164,6 +339,59 @@ def _value_for_doc(node: DiffNode, doc_id: str) -> Any:
     return vp.value
 
 
+def _under_path_prefix(path: str, prefix: str | None) -> bool:
+    """Whether a canonical path is `prefix` itself or one of its descendants."""
+    if not prefix:
+        return True
+    return path == prefix or (path.startswith(prefix) and path[len(prefix)] in ".[")
+
+
+def _resolve_by_policies(node: DiffNode, policies: Sequence[MergePolicy]) -> Any:
+    """
+    Resolve an otherwise unresolved node with the first applicable policy.
+
+    Parameters
+    ----------
+    node : DiffNode
+        Conflicting leaf or type-error origin without a selection.
+    policies : Sequence[MergePolicy]
+        Policies, in priority order.
+
+    Returns
+    -------
+    Any
+        The resolved value, or `_MISSING` if no policy applies.
+
+    Example
+    -------
+    A leaf holding 3 in doc "A" and 5 in doc "B" resolves to 5 under
+    `numeric_max`; under `prefer_doc` with doc "A", to 3.
+    """
+    for policy in policies:
+        if not _under_path_prefix(node.path, policy.path_prefix):
+            continue
+
+        if policy.kind == "prefer_doc":
+            value = _value_for_doc(node, policy.doc_id)
+        else:
+            non_null = [vp for vp in node.per_doc.values() if vp.present and vp.value_type != "null"]
+            if not non_null:
+                continue
+            if policy.kind == "non_null":
+                # Compare types too: 1 == True in Python, but not in JSON.
+                first = non_null[0]
+                agree = all(vp.value_type == first.value_type and vp.value == first.value for vp in non_null[1:])
+                value = first.value if agree else _MISSING
+            elif all(vp.value_type == "number" for vp in non_null):
+                value = max(vp.value for vp in non_null)
+            else:
+                value = _MISSING
+
+        if value is not _MISSING:
+            return value
+    return _MISSING
+
+
 def _effective_selection(
     node: DiffNode,
     selections: dict[str, MergeSelection],
@@ -208,6 +436,9 @@ def _merge_object_children(
     inherited: MergeSelection | None,
     unresolved: list[str],
     resolved_ref_by_node_id: ResolvedRefByNodeId,
+    subtree: _SubtreeSources | None = None,
+    ref_scope: _RefScope | None = None,
+    policies: Sequence[MergePolicy] = (),
 ) -> Any:
     """
     Merge an object node by merging its children.
@@ -220,24 +451,30 @@ def _merge_object_children(
     out: dict[str, Any] = {}
 
     for child in node.children:
+        record = ref_scope is None or child.node_id in ref_scope.node_ids
         merged_child = _merge_node(
             child,
             selections,
             inherited,
             unresolved,
             resolved_ref_by_node_id,
+            subtree,
+            None if ref_scope is None else ref_scope.below(child.node_id),
+            policies,
         )
 
         if merged_child is _MISSING:
-            resolved_ref_by_node_id[child.node_id] = MergedNodeRef(present=False)
+            if record:
+                resolved_ref_by_node_id[child.node_id] = MergedNodeRef(present=False)
             continue
 
         assert child.key is not None
         out[child.key] = merged_child
-        resolved_ref_by_node_id[child.node_id] = MergedNodeRef(
-            present=True,
-            object_key=child.key,
-        )
+        if record:
+            resolved_ref_by_node_id[child.node_id] = MergedNodeRef(
+                present=True,
+                object_key=child.key,
+            )
 
     node_exists_somewhere = any(vp.present for vp in node.per_doc.values())
     return out if node_exists_somewhere else _MISSING
@@ -249,6 +486,9 @@ def _merge_array_children(
     inherited: MergeSelection | None,
     unresolved: list[str],
     resolved_ref_by_node_id: ResolvedRefByNodeId,
+    subtree: _SubtreeSources | None = None,
+    ref_scope: _RefScope | None = None,
+    policies: Sequence[MergePolicy] = (),
 ) -> Any:
     """
     Merge an array node by merging its element children.
@@ -264,24 +504,30 @@ def _merge_array_children(
     out_list: list[Any] = []
 
     for child in node.children:
+        record = ref_scope is None or child.node_id in ref_scope.node_ids
         merged_child = _merge_node(
             child,
             selections,
             inherited,
             unresolved,
             resolved_ref_by_node_id,
+            subtree,
+            None if ref_scope is None else ref_scope.below(child.node_id),
+            policies,
         )
 
         if merged_child is _MISSING:
-            resolved_ref_by_node_id[child.node_id] = MergedNodeRef(present=False)
+            if record:
+                resolved_ref_by_node_id[child.node_id] = MergedNodeRef(present=False)
             continue
 
         idx = len(out_list)
         out_list.append(merged_child)
-        resolved_ref_by_node_id[child.node_id] = MergedNodeRef(
-            present=True,
-            array_index=idx,
-        )
+        if record:
+            resolved_ref_by_node_id[child.node_id] = MergedNodeRef(
+                present=True,
+                array_index=idx,
+            )
 
     node_exists_somewhere = any(vp.present for vp in node.per_doc.values())
     return out_list if node_exists_somewhere else _MISSING
@@ -293,6 +539,9 @@ def _apply_selection_to_node(
     selections: dict[str, MergeSelection],
     unresolved: list[str],
     resolved_ref_by_node_id: ResolvedRefByNodeId,
+    subtree: _SubtreeSources | None = None,
+    ref_scope: _RefScope | None = None,
+    policies: Sequence[MergePolicy] = (),
 ) -> Any:
     """
     Apply a selection to a node.
@@ -328,6 +577,9 @@ def _apply_selection_to_node(
             inherited=sel,
             unresolved=unresolved,
             resolved_ref_by_node_id=resolved_ref_by_node_id,
+            subtree=subtree,
+            ref_scope=ref_scope,
+            policies=policies,
         )
 
     if node.kind == NodeKind.array:
@@ -337,6 +589,9 @@ def _apply_selection_to_node(
             inherited=sel,
             unresolved=unresolved,
             resolved_ref_by_node_id=resolved_ref_by_node_id,
+            subtree=subtree,
+            ref_scope=ref_scope,
+            policies=policies,
         )
 
     return chosen
@@ -348,6 +603,9 @@ def _merge_node(
     inherited: MergeSelection | None,
     unresolved: list[str],
     resolved_ref_by_node_id: ResolvedRefByNodeId,
+    subtree: _SubtreeSources | None = None,
+    ref_scope: _RefScope | None = None,
+    policies: Sequence[MergePolicy] = (),
 ) -> Any:
     """
     Merge a single node recursively.
@@ -362,6 +620,21 @@ def _merge_node(
     """
     sel = _effective_selection(node, selections, inherited)
 
+    if (
+        subtree is not None
+        and node.status == DiffStatus.same
+        and node.kind in (NodeKind.object, NodeKind.array)
+        and node.node_id not in subtree.blocked
+        and (sel is None or sel.kind == "doc")
+    ):
+        copied = subtree.copy(node, sel)
+        if copied is not _MISSING:
+            _add_subtree_refs(node, resolved_ref_by_node_id, ref_scope)
+            return copied
+        # The documents differ somewhere below (see "Subtree copies"): merge
+        # this subtree the regular way, without retrying at every level.
+        subtree = None
+
     if sel is not None:
         return _apply_selection_to_node(
             node,
@@ -369,14 +642,19 @@ def _merge_node(
             selections,
             unresolved,
             resolved_ref_by_node_id,
+            subtree,
+            ref_scope,
+            policies,
         )
 
     # A type-error origin needs an explicit selection. Checked before the kind
     # dispatch below, because such a node can have kind=array (a failed array
     # strategy) and would otherwise merge to [] instead of being reported.
     if _is_type_error_origin(node):
-        unresolved.append(node.node_id)
-        return _MISSING
+        resolved = _resolve_by_policies(node, policies)
+        if resolved is _MISSING:
+            unresolved.append(node.node_id)
+        return resolved
 
     # Dispatch on kind alone: a childless container is still a container, and must
     # merge to {} / [] rather than falling through to the scalar path (where
@@ -388,6 +666,9 @@ def _merge_node(
             inherited=None,
             unresolved=unresolved,
             resolved_ref_by_node_id=resolved_ref_by_node_id,
+            subtree=subtree,
+            ref_scope=ref_scope,
+            policies=policies,
         )
 
     if node.kind == NodeKind.array:
@@ -397,13 +678,18 @@ def _merge_node(
             inherited=None,
             unresolved=unresolved,
             resolved_ref_by_node_id=resolved_ref_by_node_id,
+            subtree=subtree,
+            ref_scope=ref_scope,
+            policies=policies,
         )
 
     if node.status in (DiffStatus.same, DiffStatus.missing):
         return _pick_present_value(node)
 
-    unresolved.append(node.node_id)
-    return _MISSING
+    resolved = _resolve_by_policies(node, policies)
+    if resolved is _MISSING:
+        unresolved.append(node.node_id)
+    return resolved
 
 
 def _merge_from_diff_tree_detailed(
@@ -411,6 +697,10 @@ def _merge_from_diff_tree_detailed(
     selections: dict[str, MergeSelection],
     *,
     raise_on_conflict: bool,
+    sources: dict[str, ValueInput] | None = None,
+    ref_node_ids: Collection[str] | None = None,
+    ref_subtrees: bool = False,
+    policies: Sequence[MergePolicy] = (),
 ) -> tuple[Any, list[str], ResolvedRefByNodeId]:
     """
     Detailed version of merge that also tracks resolved node references.
@@ -418,9 +708,14 @@ def _merge_from_diff_tree_detailed(
     - merged output
     - unresolved node ids
     - resolved refs by node id
+
+    `sources`, when given, enables subtree copies; `ref_node_ids` and
+    `ref_subtrees` restrict the references; `policies` resolve conflicts
+    without selections (see the module notes).
     """
     unresolved: list[str] = []
     resolved_ref_by_node_id: ResolvedRefByNodeId = {}
+    ref_scope = _ref_scope(ref_node_ids, ref_subtrees)
 
     merged = _merge_node(
         root,
@@ -428,16 +723,20 @@ def _merge_from_diff_tree_detailed(
         inherited=None,
         unresolved=unresolved,
         resolved_ref_by_node_id=resolved_ref_by_node_id,
+        subtree=_subtree_sources(sources, selections),
+        ref_scope=None if ref_scope is None else ref_scope.below(root.node_id),
+        policies=policies,
     )
 
     unresolved = _dedupe_preserve_order(unresolved)
 
     merged_out = {} if merged is _MISSING else merged
 
-    # Root is always represented explicitly for completeness.
-    resolved_ref_by_node_id[root.node_id] = MergedNodeRef(
-        present=(merged is not _MISSING),
-    )
+    # Root is always represented explicitly for completeness (when in scope).
+    if ref_scope is None or root.node_id in ref_scope.node_ids:
+        resolved_ref_by_node_id[root.node_id] = MergedNodeRef(
+            present=(merged is not _MISSING),
+        )
 
     if unresolved and raise_on_conflict:
         raise ConflictUnresolvedError(unresolved)
@@ -448,6 +747,11 @@ def _merge_from_diff_tree_detailed(
 def try_merge_from_diff_tree_with_refs(
     root: DiffNode,
     selections: dict[str, MergeSelection],
+    sources: dict[str, ValueInput] | None = None,
+    *,
+    ref_node_ids: Collection[str] | None = None,
+    ref_subtrees: bool = False,
+    policies: Sequence[MergePolicy] = (),
 ) -> tuple[Any, list[str], ResolvedRefByNodeId]:
     """
     Best-effort merge that never raises and also returns merged-node refs.
@@ -458,6 +762,18 @@ def try_merge_from_diff_tree_with_refs(
         Root node of the diff tree.
     selections : dict[str, MergeSelection]
         User merge selections.
+    sources : dict[str, ValueInput] | None, default=None
+        The normalized documents the tree was built from (``doc_id ->
+        (present, value)``). When given, `same` subtrees without selections
+        are copied from them instead of being rebuilt node by node; the
+        result is the same.
+    ref_node_ids : Collection[str] | None, default=None
+        Nodes whose references to report. None reports every node's; an
+        empty collection, none.
+    ref_subtrees : bool, default=False
+        Also report the references of all descendants of `ref_node_ids`.
+    policies : Sequence[MergePolicy], default=()
+        Rules resolving the conflicts no selection covers, in priority order.
 
     Returns
     -------
@@ -476,4 +792,8 @@ def try_merge_from_diff_tree_with_refs(
         root,
         selections,
         raise_on_conflict=False,
+        sources=sources,
+        ref_node_ids=ref_node_ids,
+        ref_subtrees=ref_subtrees,
+        policies=policies,
     )
@@ -0,0 +1,100 @@
+"""
+Progress reporting for long diff builds.
+
+Diffs run as background jobs (see :mod:`diff_fuse.services.job_service`)
+report how far they got. The diff engine counts every node it builds on a
+:class:`Progress`, which calls an observer every few thousand nodes; the
+observer may publish the count, and may abort the build by raising.
+
+The total is not known before the tree is built. :func:`estimate_diff_nodes`
+gives a cheap estimate from the inputs: every value of the largest document
+becomes at least one node, so the estimate is a lower bound that is exact
+for documents with the same shape.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable
+from typing import Any
+
+from diff_fuse.models.document import ValueInput
+
+REPORT_EVERY_NODES = 2048
+"""Nodes built between two calls of a :class:`Progress` observer."""
+
+
+class Progress:
+    """
+    Counter of diff nodes built so far.
+
+    Parameters
+    ----------
+    estimated : int
+        Expected number of nodes (see :func:`estimate_diff_nodes`).
+    report : Callable[[Progress], None] | None, default=None
+        Called every ``every`` nodes with this counter. Exceptions it raises
+        propagate out of the diff build and abort it.
+    every : int, default=REPORT_EVERY_NODES
+        Reporting period, in nodes.
+
+    Notes
+    -----
+    Not thread-safe: one build updates it, observers only read ``done``.
+    """
+
+    __slots__ = ("done", "estimated", "_report", "_every", "_next")
+
+    def __init__(
+        self, estimated: int, report: Callable[[Progress], None] | None = None, *, every: int = REPORT_EVERY_NODES
+    ) -> None:
+        self.done = 0
+        self.estimated = max(0, int(estimated))
+        self._report = report
+        self._every = max(1, int(every))
+        self._next = self._every
+
+    @property
+    def total(self) -> int:
+        """Best known total: the estimate, or the count once it has been exceeded."""
+        return max(self.estimated, self.done)
+
+    def advance(self) -> None:
+        """Count one node, and call the observer if a reporting period ended."""
+        self.done += 1
+        if self.done >= self._next:
+            self._next += self._every
+            if self._report is not None:
+                self._report(self)
+
+
+def _count_values(value: Any) -> int:
+    """Count the JSON values (containers included) of a structure, iteratively."""
+    count = 0
+    stack = [value]
+    while stack:
+        v = stack.pop()
+        count += 1
+        if isinstance(v, dict):
+            stack.extend(v.values())
+        elif isinstance(v, list):
+            stack.extend(v)
+    return count
+
+
+def estimate_diff_nodes(root_inputs: dict[str, ValueInput] | Iterable[ValueInput]) -> int:
+    """
+    Estimate the number of nodes of a diff tree from its inputs.
+
+    Parameters
+    ----------
+    root_inputs : dict[str, ValueInput] | Iterable[ValueInput]
+        ``doc_id -> (present, value)`` mapping, or its values.
+
+    Returns
+    -------
+    int
+        Number of values of the largest present document (at least 1, the
+        root).
+    """
+    inputs = root_inputs.values() if isinstance(root_inputs, dict) else root_inputs
+    return max((_count_values(v) for present, v in inputs if present), default=1)
@@ -0,0 +1,73 @@
+"""
+Approximate in-memory size of parsed documents.
+
+Input limits count uploaded characters, but what a session really costs is
+the Python object graph of its normalized documents: every dict, list, key,
+string and number is a separate heap object, typically 5-10x the size of the
+JSON text. :func:`approx_document_bytes` estimates that footprint once, at
+ingestion, so per-session limits and process-wide memory budgets can be
+enforced from metadata alone.
+
+Notes
+-----
+The estimate sums :func:`sys.getsizeof` over every object reachable from the
+value, counting shared objects (interned keys, small integers, ``None``) once
+per reference. It is an upper bound, meant for budgeting, not a measurement.
+"""
+
+import sys
+from typing import Any
+
+
+def approx_object_bytes(value: Any) -> int:
+    """
+    Estimate the memory held by a JSON-compatible Python structure.
+
+    Parameters
+    ----------
+    value : Any
+        Parsed JSON value (dicts, lists and scalars).
+
+    Returns
+    -------
+    int
+        Approximate size in bytes, containers and their contents included.
+
+    Notes
+    -----
+    Iterative, so arbitrarily deep structures do not hit the recursion limit.
+    """
+    total = 0
+    stack = [value]
+    while stack:
+        v = stack.pop()
+        total += sys.getsizeof(v)
+        if isinstance(v, dict):
+            for k, child in v.items():
+                total += sys.getsizeof(k)
+                stack.append(child)
+        elif isinstance(v, list):
+            stack.extend(v)
+    return total
+
+
+def approx_document_bytes(raw: str | None, normalized: Any | None) -> int:
+    """
+    Estimate the in-memory size of a parsed document.
+
+    Parameters
+    ----------
+    raw : str | None
+        Raw document text, if kept.
+    normalized : Any | None
+        Normalized structure, if the document parsed.
+
+    Returns
+    -------
+    int
+        Approximate size in bytes of both forms.
+    """
+    total = sys.getsizeof(raw) if raw is not None else 0
+    if normalized is not None:
+        total += approx_object_bytes(normalized)
+    return total
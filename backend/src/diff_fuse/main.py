@@ -8,11 +8,14 @@ Key responsibilities
 --------------------
 - Create the :class:`fastapi.FastAPI` application.
 - Configure CORS for browser-based clients.
+- Configure request decompression and response compression.
 - Install global exception handlers:
   - Domain errors raised by the service/domain layers.
   - Request validation errors raised by FastAPI/Pydantic.
   - Unexpected errors (failsafe).
-- Expose lightweight health endpoint for deployments.
+- Run the background expiry sweeper of the in-memory session backend.
+- Shut the background job pool down on exit.
+- Expose lightweight health endpoints for deployments.
 
 Error handling contract
 -----------------------
@@ -31,11 +34,16 @@ from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 
+from diff_fuse.api.compression import CompressionMiddleware
 from diff_fuse.api.dto.errors import APIError, APIErrorResponse
 from diff_fuse.api.router import router
-from diff_fuse.deps import get_session_repo
+from diff_fuse.deps import get_async_session_repo, get_diff_cache, get_job_pool, get_merge_memo, get_session_repo
 from diff_fuse.domain.errors import DomainError
+from diff_fuse.services.job_service import shutdown_jobs
 from diff_fuse.settings import get_settings
+from diff_fuse.state.memory_session_repo import MemorySessionRepo
+from diff_fuse.state.sqlite_session_repo import SqliteSessionRepo
+from diff_fuse.state.sweeper import Sweeper
 
 settings = get_settings()
 
@@ -49,21 +57,53 @@ async def lifespan(app: FastAPI):
     -------
     - Resolve the configured SessionRepo to validate settings.
     - Optionally "touch" Redis to fail fast if unavailable.
+    - Start the expiry sweeper of the memory and SQLite backends.
+    - Start demoting idle entries of the per-process session caches.
+
+    Shutdown
+    --------
+    - Cancel background jobs still queued or running in this process, and
+      record the queued ones as cancelled.
+    - Stop the expiry sweeper and cache demotion.
+    - Close the session repository's connections.
     """
     # Validate session backend selection early
     repo = get_session_repo()
+    async_repo = get_async_session_repo()
 
     # Optional: if Redis repo, ping it once to fail fast
     # Keep it defensive: don't crash dev if Redis not configured.
     try:
-        if hasattr(repo, "_r"):  # RedisSessionRepo internal
-            repo._r.ping()
+        if hasattr(async_repo, "ping"):  # AsyncRedisSessionRepo
+            await async_repo.ping()
     except Exception as e:
         # In prod, fail fast if Redis is required but unreachable
         if settings.environment == "prod":
             raise RuntimeError("Redis session backend is configured but Redis is unreachable.") from e
 
-    yield
+    sweeping = isinstance(repo, MemorySessionRepo | SqliteSessionRepo) and settings.session_sweep_interval_seconds > 0
+    if sweeping:
+        repo.start_sweeper(settings.session_sweep_interval_seconds)
+
+    # Per-process session caches (Redis) demote idle entries on their own schedule.
+    caches = {id(c): c for r in (repo, async_repo) if (c := getattr(r, "cache", None)) is not None}
+    demoters = [
+        Sweeper(c.demote_idle, interval_seconds=c.demote_after_seconds / 4, name="diff-fuse-cache-demoter")
+        for c in caches.values()
+        if c.demote_after_seconds > 0
+    ]
+    for d in demoters:
+        d.start()
+
+    try:
+        yield
+    finally:
+        await shutdown_jobs()
+        for d in demoters:
+            d.stop()
+        if sweeping:
+            repo.stop_sweeper()
+        await async_repo.close()
 
 
 app = FastAPI(title=settings.app_name, version="0.1.0", lifespan=lifespan)
@@ -119,6 +159,13 @@ async def handle_domain_error(request: Request, exc: DomainError):
     status_by_code = {
         "session_not_found": 404,
         "merge_conflict": 409,
+        "diff_expired": 410,
+        "job_not_found": 404,
+        "job_not_finished": 409,
+        "job_cancelled": 409,
+        "job_queue_full": 503,
+        "review_conflict": 409,
+        "internal_error": 500,
         "limits_exceeded": 413,
         "validation_error": 422,
         "document_parse_error": 400,
@@ -192,12 +239,20 @@ async def handle_unexpected_error(request: Request, exc: Exception):
     return JSONResponse(status_code=500, content=payload.model_dump())
 
 
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.compression_min_size_bytes,
+    max_request_body_bytes=settings.max_request_body_bytes,
+)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.cors_allow_origins,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Lets browser clients read the tag to send it back in If-None-Match.
+    expose_headers=["ETag"],
 )
 
 app.include_router(router)
@@ -214,3 +269,24 @@ def health() -> dict[str, str]:
         Minimal health payload. Intended for load balancers and orchestration checks.
     """
     return {"status": "ok", "env": settings.environment}
+
+
+@app.get("/health/sessions")
+def health_sessions() -> dict[str, str | int]:
+    """
+    Session backend statistics.
+
+    Returns
+    -------
+    dict[str, str | int]
+        The configured backend name and its counters (see
+        :meth:`diff_fuse.state.session_repo.SessionRepo.stats`), plus the
+        diff cache, merge memo and background job pool counters.
+    """
+    return {
+        "backend": settings.session_backend,
+        **get_async_session_repo().stats(),
+        **get_diff_cache().stats(),
+        **get_merge_memo().stats(),
+        **get_job_pool().stats(),
+    }
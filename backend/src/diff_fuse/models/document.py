@@ -6,7 +6,7 @@ their processing state.
 """
 
 from enum import StrEnum
-from typing import Any
+from typing import Any, Self
 
 from pydantic import Field
 
@@ -87,10 +87,64 @@ class DocumentMeta(_DocumentBase):
         Whether parsing and normalization succeeded.
     error : str | None
         Human-readable error message when ``ok=False``.
+    content_hash : str
+        Content address of the raw document (see
+        :func:`diff_fuse.domain.fingerprint.document_content_hash`). Identical
+        uploads share the same hash, within and across sessions.
+    size_chars : int
+        Length of the raw document in characters. Lets limits be enforced
+        without loading document contents.
+    approx_bytes : int
+        Approximate in-memory size of the parsed document (raw text plus
+        normalized object graph, see :mod:`diff_fuse.domain.sizing`),
+        computed at ingestion. ``0`` for documents stored before it existed.
     """
 
     ok: bool = Field(..., description="Whether the document parsed successfully.")
     error: str | None = Field(None, description="Parse/validation error message when ok=False.")
+    content_hash: str = Field(..., description="Content address of the raw document.")
+    size_chars: int = Field(..., ge=0, description="Length of the raw document in characters.")
+    approx_bytes: int = Field(0, ge=0, description="Approximate in-memory size of the parsed document, in bytes.")
+
+
+class StoredDocument(DiffFuseModel):
+    """
+    Content-addressed document payload.
+
+    This is the part of a document that depends only on its content, not on
+    the session it belongs to. It is stored once per ``content_hash`` and
+    shared by every session that references it.
+
+    Attributes
+    ----------
+    content_hash : str
+        Content address of the raw document.
+    format : DocumentFormat
+        Declared format of the document content.
+    ok : bool
+        Whether parsing and normalization succeeded.
+    error : str | None
+        Human-readable error message when ``ok=False``.
+    size_chars : int
+        Length of the raw document in characters, kept even when ``raw`` is not.
+    approx_bytes : int
+        Approximate in-memory size of the parsed document, computed at ingestion.
+    raw : str | None
+        The original raw document content. May be dropped by the storage
+        policy (see :mod:`diff_fuse.state.storage_policy`).
+    normalized : Any | None
+        Parsed and normalized document content when ``ok=True``. May be
+        dropped by the storage policy and re-derived from ``raw``.
+    """
+
+    content_hash: str
+    format: DocumentFormat
+    ok: bool
+    error: str | None = None
+    size_chars: int
+    approx_bytes: int = 0
+    raw: str | None = None
+    normalized: Any | None = None
 
 
 class DocumentResult(DocumentMeta):
@@ -103,8 +157,9 @@ class DocumentResult(DocumentMeta):
 
     Attributes
     ----------
-    raw : str
-        The original raw document content.
+    raw : str | None
+        The original raw document content. ``None`` when the configured
+        storage policy keeps only the normalized form of valid documents.
     normalized : Any | None
         Parsed and normalized document content when ``ok=True``.
         The structure is backend-defined and treated as opaque by the API.
@@ -114,7 +169,7 @@ class DocumentResult(DocumentMeta):
     - When ``ok=False``, ``normalized`` is typically ``None``.
     """
 
-    raw: str
+    raw: str | None = None
     normalized: Any | None = None
 
     def build_root_input(self) -> ValueInput:
@@ -133,6 +188,58 @@ class DocumentResult(DocumentMeta):
         """
         return (self.ok, self.normalized if self.ok else None)
 
+    @classmethod
+    def from_stored(cls, stored: StoredDocument, *, doc_id: str, name: str) -> Self:
+        """
+        Build a session document from a shared stored payload.
+
+        Parameters
+        ----------
+        stored : StoredDocument
+            Content-addressed payload.
+        doc_id : str
+            Session-specific document identifier.
+        name : str
+            Session-specific display name.
+
+        Returns
+        -------
+        Self
+            Document result that references (does not copy) ``stored.normalized``.
+        """
+        return cls(
+            doc_id=doc_id,
+            name=name,
+            format=stored.format,
+            ok=stored.ok,
+            error=stored.error,
+            content_hash=stored.content_hash,
+            size_chars=stored.size_chars,
+            approx_bytes=stored.approx_bytes,
+            raw=stored.raw,
+            normalized=stored.normalized,
+        )
+
+    def to_stored(self) -> StoredDocument:
+        """
+        Extract the content-addressed part of this document.
+
+        Returns
+        -------
+        StoredDocument
+            Payload suitable for a :class:`diff_fuse.state.document_store.DocumentStore`.
+        """
+        return StoredDocument(
+            content_hash=self.content_hash,
+            format=self.format,
+            ok=self.ok,
+            error=self.error,
+            size_chars=self.size_chars,
+            approx_bytes=self.approx_bytes,
+            raw=self.raw,
+            normalized=self.normalized,
+        )
+
     def to_meta(self) -> DocumentMeta:
         """
         Convert this result into the lightweight API metadata view.
@@ -148,4 +255,7 @@ class DocumentResult(DocumentMeta):
             format=self.format,
             ok=self.ok,
             error=self.error,
+            content_hash=self.content_hash,
+            size_chars=self.size_chars,
+            approx_bytes=self.approx_bytes,
         )
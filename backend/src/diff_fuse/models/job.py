@@ -0,0 +1,127 @@
+"""
+Background job model.
+
+Diffs and merges of large sessions can take longer than proxies allow a
+request to run. They can instead be submitted as background jobs: the client
+gets a job id immediately, polls the job's status and progress, may cancel
+it, and fetches the result once it has succeeded.
+
+A :class:`Job` is the job's status record, kept in the configured job store
+(see :mod:`diff_fuse.state.job_store`) so every worker process can answer for
+it. Results are stored next to it as encoded response bodies.
+"""
+
+from datetime import datetime
+from enum import StrEnum
+from typing import Any
+
+from pydantic import Field
+
+from diff_fuse.models.base import DiffFuseModel
+
+
+class JobKind(StrEnum):
+    """
+    Operation performed by a job.
+
+    Attributes
+    ----------
+    diff : str
+        Build the diff tree (result: a ``DiffResponse``).
+    merge : str
+        Merge with selections (result: a ``MergeResponse``).
+    """
+
+    diff = "diff"
+    merge = "merge"
+
+
+class JobStatus(StrEnum):
+    """
+    Lifecycle state of a job.
+
+    Attributes
+    ----------
+    queued : str
+        Accepted, waiting for a worker.
+    running : str
+        Being computed.
+    succeeded : str
+        Finished; the result can be fetched.
+    failed : str
+        Finished with an error, described by ``Job.error``.
+    cancelled : str
+        Cancelled before it finished.
+    """
+
+    queued = "queued"
+    running = "running"
+    succeeded = "succeeded"
+    failed = "failed"
+    cancelled = "cancelled"
+
+    @property
+    def finished(self) -> bool:
+        """Whether the job has reached a final state."""
+        return self in (JobStatus.succeeded, JobStatus.failed, JobStatus.cancelled)
+
+
+class JobError(DiffFuseModel):
+    """
+    Error a failed job ended with.
+
+    Attributes
+    ----------
+    code : str
+        Stable error code, as in API error responses.
+    message : str
+        Human-readable summary.
+    details : dict[str, Any]
+        Structured error context.
+    """
+
+    code: str
+    message: str
+    details: dict[str, Any] = Field(default_factory=dict)
+
+
+class Job(DiffFuseModel):
+    """
+    Status record of a background job.
+
+    Attributes
+    ----------
+    job_id : str
+        Opaque unique identifier of the job.
+    session_id : str
+        Session the job operates on.
+    kind : JobKind
+        Diff or merge.
+    status : JobStatus
+        Current lifecycle state.
+    nodes_processed : int
+        Diff nodes built so far.
+    nodes_estimated : int | None
+        Estimated total number of diff nodes, once the job has started. A
+        lower bound: it grows to ``nodes_processed`` if that exceeds it.
+    cancel_requested : bool
+        Whether cancellation was requested; a running job stops at its next
+        progress report.
+    error : JobError | None
+        Why the job failed, for ``status == "failed"``.
+    created_at : datetime
+        UTC timestamp of the submission.
+    updated_at : datetime
+        UTC timestamp of the last status or progress change.
+    """
+
+    job_id: str
+    session_id: str
+    kind: JobKind
+    status: JobStatus = JobStatus.queued
+    nodes_processed: int = 0
+    nodes_estimated: int | None = None
+    cancel_requested: bool = False
+    error: JobError | None = None
+    created_at: datetime
+    updated_at: datetime
@@ -10,8 +10,11 @@ Design goals
 - Explicit and machine-readable resolution intent.
 - Support both document-based and manual overrides.
 - Allow hierarchical inheritance down the diff tree.
+- Resolve many conflicts at once with declarative policies, rather than one
+  selection per node.
 """
 
+from enum import StrEnum
 from typing import Annotated, Any, Literal
 
 from pydantic import Field
@@ -69,6 +72,84 @@ MergeSelection = Annotated[
 ]
 
 
+class _PolicyBase(DiffFuseModel):
+    """
+    Fields shared by every merge policy.
+
+    Attributes
+    ----------
+    path_prefix : str | None
+        Restrict the policy to the node at this canonical path (e.g.
+        ``"spec.steps"``) and its descendants. None applies it everywhere.
+    """
+
+    path_prefix: str | None = Field(
+        default=None,
+        description="Only apply under this canonical path (e.g. 'spec.steps').",
+    )
+
+
+class PreferDocPolicy(_PolicyBase):
+    """
+    Resolve conflicts with a given document's value.
+
+    Attributes
+    ----------
+    kind : Literal["prefer_doc"]
+        Discriminator.
+    doc_id : str
+        Document whose value wins. Conflicts at nodes the document lacks are
+        left to the next policy.
+    """
+
+    kind: Literal["prefer_doc"] = "prefer_doc"
+    doc_id: str
+
+
+class NonNullPolicy(_PolicyBase):
+    """
+    Resolve conflicts where all documents holding a non-null value agree.
+
+    Typically a null against a value under ``NullMode.value``.
+
+    Attributes
+    ----------
+    kind : Literal["non_null"]
+        Discriminator.
+    """
+
+    kind: Literal["non_null"] = "non_null"
+
+
+class NumericMaxPolicy(_PolicyBase):
+    """
+    Resolve conflicts between numbers with the largest one.
+
+    Nulls are ignored; conflicts involving any other type are left to the
+    next policy.
+
+    Attributes
+    ----------
+    kind : Literal["numeric_max"]
+        Discriminator.
+    """
+
+    kind: Literal["numeric_max"] = "numeric_max"
+
+
+MergePolicy = Annotated[
+    PreferDocPolicy | NonNullPolicy | NumericMaxPolicy,
+    Field(discriminator="kind"),
+]
+"""
+Declarative rule resolving conflicts that no selection covers.
+
+Policies apply to the nodes a merge would otherwise report as unresolved, in
+the order given; the first one that yields a value wins. Selections, explicit
+or inherited, always take precedence.
+"""
+
+
 class MergedNodeRef(DiffFuseModel):
     """
     Machine-readable locator for a diff node inside the merged output.
@@ -116,3 +197,85 @@ class MergedNodeRef(DiffFuseModel):
         ge=0,
         description="Index under the parent merged array, when applicable.",
     )
+
+
+class RefScope(StrEnum):
+    """
+    Which nodes' `MergedNodeRef` a merge response reports.
+
+    Attributes
+    ----------
+    all : str
+        Every node of the diff tree (the default).
+    none : str
+        No node. For clients that only need the merged document.
+    nodes : str
+        Only the requested nodes.
+    subtrees : str
+        The requested nodes and all their descendants.
+    """
+
+    all = "all"
+    none = "none"
+    nodes = "nodes"
+    subtrees = "subtrees"
+
+
+class RefEncoding(StrEnum):
+    """
+    How a merge response encodes its references.
+
+    Attributes
+    ----------
+    map : str
+        A ``node_id -> MergedNodeRef`` object (the default).
+    columnar : str
+        Parallel arrays (see `MergedRefColumns`), which repeat no field names.
+    """
+
+    map = "map"
+    columnar = "columnar"
+
+
+class MergedRefColumns(DiffFuseModel):
+    """
+    Merged-node references encoded as parallel arrays.
+
+    Entry ``i`` of every array describes node ``node_ids[i]``, like one
+    `MergedNodeRef`.
+
+    Attributes
+    ----------
+    node_ids : list[str]
+        Node IDs.
+    present : list[bool]
+        Whether each node is present in the merged output.
+    locators : list[str | int | None]
+        Where each present node is under its parent: an object key (string)
+        or an array index (integer). None for absent nodes and the root.
+    """
+
+    node_ids: list[str] = Field(default_factory=list)
+    present: list[bool] = Field(default_factory=list)
+    locators: list[str | int | None] = Field(default_factory=list)
+
+    @classmethod
+    def from_refs(cls, refs: dict[str, MergedNodeRef]) -> "MergedRefColumns":
+        """
+        Encode a reference map.
+
+        Parameters
+        ----------
+        refs : dict[str, MergedNodeRef]
+            References by node ID.
+
+        Returns
+        -------
+        MergedRefColumns
+            The same references, in the map's order.
+        """
+        return cls.model_construct(
+            node_ids=list(refs),
+            present=[ref.present for ref in refs.values()],
+            locators=[ref.object_key if ref.array_index is None else ref.array_index for ref in refs.values()],
+        )
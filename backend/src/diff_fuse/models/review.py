@@ -0,0 +1,107 @@
+"""
+Review state model.
+
+During a long review the client accumulates array strategy overrides and
+merge selections, often thousands of them, keyed by long node IDs. Instead of
+resending all of them with every merge and export, the client may keep them
+on the server as the session's :class:`Review` and send only what changes, as
+a :class:`ReviewDelta`.
+
+Every applied delta increments the review's revision. Requests that rely on
+the stored state name the revision they expect, so a client never merges
+with a state it has not seen (another tab's changes, or an expired review
+starting over at revision ``0``).
+"""
+
+from pydantic import Field
+
+from diff_fuse.models.arrays import ArrayStrategy
+from diff_fuse.models.base import DiffFuseModel
+from diff_fuse.models.diff import NullMode
+from diff_fuse.models.merge import MergeSelection
+
+
+class Review(DiffFuseModel):
+    """
+    Diff configuration and merge selections stored for a session.
+
+    Attributes
+    ----------
+    revision : int
+        Number of deltas applied so far; ``0`` for a session without review
+        state.
+    null_mode : NullMode
+        How JSON null is interpreted (see ``DiffRequest.null_mode``).
+    array_strategies_by_node_id : dict[str, ArrayStrategy]
+        Per-node array strategy overrides (see
+        ``DiffRequest.array_strategies_by_node_id``).
+    selections_by_node_id : dict[str, MergeSelection]
+        Merge selections (see ``MergeRequest.selections_by_node_id``).
+    """
+
+    revision: int = Field(default=0, ge=0)
+    null_mode: NullMode = NullMode.missing
+    array_strategies_by_node_id: dict[str, ArrayStrategy] = Field(default_factory=dict)
+    selections_by_node_id: dict[str, MergeSelection] = Field(default_factory=dict)
+
+
+class ReviewDelta(DiffFuseModel):
+    """
+    Change to a session's review state.
+
+    Maps follow JSON Merge Patch semantics: an entry sets the override or
+    selection of its node, a ``null`` entry clears it, and nodes not
+    mentioned keep theirs.
+
+    Attributes
+    ----------
+    replace : bool
+        Clear every override and selection, and reset ``null_mode``, before
+        applying the rest of the delta.
+    null_mode : NullMode | None
+        New null mode; unchanged when None.
+    array_strategies_by_node_id : dict[str, ArrayStrategy | None]
+        Array strategy overrides to set (or clear, with ``null``).
+    selections_by_node_id : dict[str, MergeSelection | None]
+        Merge selections to set (or clear, with ``null``).
+    """
+
+    replace: bool = False
+    null_mode: NullMode | None = None
+    array_strategies_by_node_id: dict[str, ArrayStrategy | None] = Field(default_factory=dict)
+    selections_by_node_id: dict[str, MergeSelection | None] = Field(default_factory=dict)
+
+    def apply_to(self, review: Review) -> Review:
+        """
+        Return ``review`` with this delta applied and its revision incremented.
+
+        Parameters
+        ----------
+        review : Review
+            Current state; left unchanged.
+
+        Returns
+        -------
+        Review
+            The new state.
+        """
+        base = Review() if self.replace else review
+        strategies = dict(base.array_strategies_by_node_id)
+        selections = dict(base.selections_by_node_id)
+        _patch(strategies, self.array_strategies_by_node_id)
+        _patch(selections, self.selections_by_node_id)
+        return Review.model_construct(
+            revision=review.revision + 1,
+            null_mode=self.null_mode if self.null_mode is not None else base.null_mode,
+            array_strategies_by_node_id=strategies,
+            selections_by_node_id=selections,
+        )
+
+
+def _patch[T](target: dict[str, T], changes: dict[str, T | None]) -> None:
+    """Set or (for None) remove the entries of ``changes`` in ``target``."""
+    for node_id, value in changes.items():
+        if value is None:
+            target.pop(node_id, None)
+        else:
+            target[node_id] = value
@@ -12,7 +12,33 @@ from datetime import datetime
 from pydantic import Field
 
 from diff_fuse.models.base import DiffFuseModel
-from diff_fuse.models.document import DocumentResult, ValueInput
+from diff_fuse.models.document import DocumentMeta, DocumentResult, ValueInput
+
+
+class SessionMeta(DiffFuseModel):
+    """
+    Session state without document contents.
+
+    Used by operations that only need to know *which* documents a session
+    holds (listing, validation before adding documents), so storage backends
+    can answer them without loading raw or normalized payloads.
+
+    Attributes
+    ----------
+    session_id : str
+        Opaque unique identifier for the session.
+    created_at : datetime
+        UTC timestamp when the session was created.
+    updated_at : datetime
+        UTC timestamp of the last access or modification.
+    documents_meta : list[DocumentMeta]
+        Per-document metadata, in input order.
+    """
+
+    session_id: str
+    created_at: datetime
+    updated_at: datetime
+    documents_meta: list[DocumentMeta] = Field(default_factory=list)
 
 
 class Session(DiffFuseModel):
@@ -61,3 +87,19 @@ class Session(DiffFuseModel):
         intentionally not stored to avoid duplication and staleness.
         """
         return {dr.doc_id: dr.build_root_input() for dr in self.documents_results}
+
+    def to_meta(self) -> SessionMeta:
+        """
+        Drop document contents, keeping only metadata.
+
+        Returns
+        -------
+        SessionMeta
+            Metadata view of this session.
+        """
+        return SessionMeta(
+            session_id=self.session_id,
+            created_at=self.created_at,
+            updated_at=self.updated_at,
+            documents_meta=[dr.to_meta() for dr in self.documents_results],
+        )
@@ -3,22 +3,48 @@ Diff service.
 
 This module implements the service-layer logic for computing structural
 diffs between documents stored in a session.
+
+Diff handles
+------------
+Every computed diff is identified by a ``diff_id``, a fingerprint of the
+session's documents (ids and content hashes) and of the canonical diff
+request. Built trees are kept for a while in the per-process
+:class:`diff_fuse.state.diff_cache.DiffCache`, so repeated diffs and the
+merges and exports that follow them (see :func:`resolve_diff_root`) reuse the
+tree instead of rebuilding it. Cache lookups need only session metadata.
+
+Background jobs
+---------------
+:func:`build_and_cache` and :func:`resolve_loaded_diff_root` are the
+synchronous building blocks of the request handlers below. Background jobs
+(:mod:`diff_fuse.services.job_service`) call them directly from their worker
+thread, with a :class:`~diff_fuse.domain.progress.Progress` counter.
 """
 
 from __future__ import annotations
 
+from collections.abc import Iterable
+
+import orjson
+
 from diff_fuse.api.dto.diff import DiffRequest, DiffResponse
+from diff_fuse.deps import get_diff_cache
 from diff_fuse.domain.diff import build_stable_root_diff_tree
+from diff_fuse.domain.errors import DiffExpiredError, DomainValidationError
+from diff_fuse.domain.fingerprint import diff_fingerprint
+from diff_fuse.domain.progress import Progress
 from diff_fuse.models.arrays import ArrayStrategy
 from diff_fuse.models.diff import DiffNode, NullMode
-from diff_fuse.models.document import ValueInput
-from diff_fuse.services.shared import fetch_session
+from diff_fuse.models.document import DocumentMeta, DocumentResult, ValueInput
+from diff_fuse.models.session import Session
+from diff_fuse.services.shared import fetch_session, fetch_session_meta, run_cpu_bound
 
 
 def build_diff_root(
     root_inputs: dict[str, ValueInput],
     array_strategies_by_node_id: dict[str, ArrayStrategy],
     null_mode: NullMode = NullMode.missing,
+    progress: Progress | None = None,
 ) -> DiffNode:
     """
     Build the root diff tree for a set of normalized documents.
@@ -32,6 +58,8 @@ def build_diff_root(
         Optional per-node overrides controlling how arrays are aligned.
     null_mode : NullMode
         How JSON null is interpreted. See `diff_fuse.models.diff.NullMode`.
+    progress : Progress | None, default=None
+        Counter advanced for every node built.
 
     Returns
     -------
@@ -46,11 +74,150 @@ def build_diff_root(
         per_doc_values=root_inputs,
         array_strategies_by_node_id=array_strategies_by_node_id,
         null_mode=null_mode,
+        progress=progress,
+    )
+    return root
+
+
+def _diffed_documents(documents: Iterable[DocumentMeta | DocumentResult]) -> tuple[tuple[str, str], ...]:
+    """Return the ``(doc_id, content_hash)`` pairs a diff fingerprint covers."""
+    return tuple((d.doc_id, d.content_hash) for d in documents)
+
+
+def diff_id_for(documents: tuple[tuple[str, str], ...], req: DiffRequest) -> str:
+    """
+    Compute the handle of a diff.
+
+    Parameters
+    ----------
+    documents : tuple[tuple[str, str], ...]
+        ``(doc_id, content_hash)`` of the session's documents, in order.
+    req : DiffRequest
+        Diff configuration.
+
+    Returns
+    -------
+    str
+        Diff identifier. Requests that differ only in key order or in
+        spelling out defaults get the same identifier.
+    """
+    options = orjson.dumps(req.model_dump(mode="json"), option=orjson.OPT_SORT_KEYS)
+    return diff_fingerprint(documents, options)
+
+
+def build_and_cache(s: Session, req: DiffRequest, *, progress: Progress | None = None) -> tuple[str, DiffNode]:
+    """
+    Build the diff tree of a loaded session and cache it under its handle.
+
+    Parameters
+    ----------
+    s : Session
+        Session with its documents.
+    req : DiffRequest
+        Diff configuration.
+    progress : Progress | None, default=None
+        Counter advanced for every node built.
+
+    Returns
+    -------
+    tuple[str, DiffNode]
+        The diff identifier and the tree.
+
+    Notes
+    -----
+    CPU-bound; request handlers run it in the worker thread pool. The
+    normalized documents are cached with the tree, for merges to copy from.
+    """
+    root_inputs = s.root_inputs
+    root = build_diff_root(
+        root_inputs=root_inputs,
+        array_strategies_by_node_id=req.array_strategies_by_node_id,
+        null_mode=req.null_mode,
+        progress=progress,
     )
+    documents = _diffed_documents(s.documents_results)
+    diff_id = diff_id_for(documents, req)
+    get_diff_cache().put(diff_id, root, documents, sources=root_inputs)
+    return diff_id, root
+
+
+def require_diff_source(diff_id: str | None, diff_request: DiffRequest | None) -> None:
+    """
+    Check that a merge or export names the diff it applies to.
+
+    Raises
+    ------
+    DomainValidationError
+        If neither ``diff_id`` nor ``diff_request`` is given.
+    """
+    if diff_id is None and diff_request is None:
+        raise DomainValidationError("diff_request", "Either diff_request or diff_id is required")
+
+
+def _diff_handle(documents: tuple[tuple[str, str], ...], diff_id: str | None, diff_request: DiffRequest | None) -> str:
+    """
+    Return the handle to look a merge's diff tree up under.
+
+    ``diff_request`` decides the tree whenever it is given: its own handle is
+    used and ``diff_id`` is ignored, so a request naming a handle of another
+    configuration gets the same tree whether or not that handle is cached.
+    """
+    if diff_request is not None:
+        return diff_id_for(documents, diff_request)
+    assert diff_id is not None
+    return diff_id
+
+
+def resolve_loaded_diff_root(
+    s: Session,
+    *,
+    diff_id: str | None,
+    diff_request: DiffRequest | None,
+    progress: Progress | None = None,
+) -> DiffNode:
+    """
+    Return the diff tree a merge refers to, for a session already loaded.
+
+    Synchronous counterpart of :func:`resolve_diff_root`; ``diff_request``
+    takes precedence over ``diff_id`` in the same way.
+
+    Parameters
+    ----------
+    s : Session
+        Session with its documents.
+    diff_id : str | None
+        Handle of a previously computed diff.
+    diff_request : DiffRequest | None
+        Diff configuration to build the tree from.
+    progress : Progress | None, default=None
+        Counter advanced for every node built, if the tree has to be built.
+
+    Returns
+    -------
+    DiffNode
+        The cached tree, or a newly built one.
+
+    Raises
+    ------
+    DomainValidationError
+        If neither ``diff_id`` nor ``diff_request`` is given.
+    DiffExpiredError
+        If the handle is no longer usable and no ``diff_request`` was given.
+    """
+    require_diff_source(diff_id, diff_request)
+    documents = _diffed_documents(s.documents_results)
+    diff_id = _diff_handle(documents, diff_id, diff_request)
+    root = get_diff_cache().get(diff_id, documents)
+    if root is not None:
+        return root
+    if diff_request is None:
+        raise DiffExpiredError(diff_id)
+
+    _, root = build_and_cache(s, diff_request, progress=progress)
     return root
 
 
-def diff_in_session(session_id: str, req: DiffRequest) -> DiffResponse:
+async def diff_in_session(session_id: str, req: DiffRequest) -> DiffResponse:
     """
     Compute a diff for an existing session.
 
@@ -65,13 +232,98 @@ def diff_in_session(session_id: str, req: DiffRequest) -> DiffResponse:
     -------
     DiffResponse
         Response containing the diff tree.
+
+    Notes
+    -----
+    The tree is built in the worker thread pool, unless the same diff is
+    still cached; documents are loaded only when it has to be built.
     """
-    s = fetch_session(session_id)
+    meta = await fetch_session_meta(session_id)
+    documents = _diffed_documents(meta.documents_meta)
+    diff_id = diff_id_for(documents, req)
 
-    root = build_diff_root(
-        root_inputs=s.root_inputs,
-        array_strategies_by_node_id=req.array_strategies_by_node_id,
-        null_mode=req.null_mode,
-    )
+    root = get_diff_cache().get(diff_id, documents)
+    if root is None:
+        diff_id, root = await run_cpu_bound(build_and_cache, await fetch_session(session_id), req)
+
+    return DiffResponse(root=root, diff_id=diff_id)
+
+
+async def resolve_diff(
+    session_id: str, *, diff_id: str | None, diff_request: DiffRequest | None
+) -> tuple[str, DiffNode, dict[str, ValueInput]]:
+    """
+    Return the diff tree a merge or export refers to, with its handle and sources.
 
-    return DiffResponse(root=root)
+    Parameters
+    ----------
+    session_id : str
+        Session identifier.
+    diff_id : str | None
+        Handle of a previously computed diff, if the client sent one.
+    diff_request : DiffRequest | None
+        Diff configuration to rebuild the tree from.
+
+    Returns
+    -------
+    tuple[str, DiffNode, dict[str, ValueInput]]
+        The diff identifier, the tree and the normalized documents it was
+        built from (``doc_id -> (present, value)``). When ``diff_request`` is
+        given it decides the tree, cached or rebuilt, and ``diff_id`` is
+        ignored; otherwise the tree cached under ``diff_id`` for the
+        session's current documents.
+
+    Raises
+    ------
+    DomainValidationError
+        If neither ``diff_id`` nor ``diff_request`` is given.
+    DiffExpiredError
+        If the handle is no longer usable and no ``diff_request`` was given.
+    SessionNotFoundError
+        If the session does not exist.
+    """
+    require_diff_source(diff_id, diff_request)
+
+    meta = await fetch_session_meta(session_id)
+    documents = _diffed_documents(meta.documents_meta)
+    diff_id = _diff_handle(documents, diff_id, diff_request)
+    hit = get_diff_cache().lookup(diff_id, documents)
+    if hit is not None:
+        return diff_id, *hit
+    if diff_request is None:
+        raise DiffExpiredError(diff_id)
+
+    s = await fetch_session(session_id)
+    diff_id, root = await run_cpu_bound(build_and_cache, s, diff_request)
+    return diff_id, root, s.root_inputs
+
+
+async def resolve_diff_root(session_id: str, *, diff_id: str | None, diff_request: DiffRequest | None) -> DiffNode:
+    """
+    Return the diff tree a merge or export refers to.
+
+    Parameters
+    ----------
+    session_id : str
+        Session identifier.
+    diff_id : str | None
+        Handle of a previously computed diff, if the client sent one.
+    diff_request : DiffRequest | None
+        Diff configuration to rebuild the tree from.
+
+    Returns
+    -------
+    DiffNode
+        See :func:`resolve_diff`.
+
+    Raises
+    ------
+    DomainValidationError
+        If neither ``diff_id`` nor ``diff_request`` is given.
+    DiffExpiredError
+        If the handle is no longer usable and no ``diff_request`` was given.
+    SessionNotFoundError
+        If the session does not exist.
+    """
+    _, root, _ = await resolve_diff(session_id, diff_id=diff_id, diff_request=diff_request)
+    return root
@@ -3,19 +3,73 @@ Export service.
 
 This module provides functionality for serializing merged results into
 text or byte representations suitable for download or clipboard usage.
+
+Both forms are produced by :func:`diff_fuse.domain.json_stream.iter_json_bytes`
+(orjson, sorted keys), so the downloaded file and the text export are the
+same JSON. Downloads are streamed chunk by chunk instead of being built as one
+string first.
 """
 
 from __future__ import annotations
 
-import json
+from collections.abc import Iterator
+from typing import Any
 
 from diff_fuse.api.dto.export import ExportRequest, ExportTextResponse
-from diff_fuse.api.dto.merge import MergeRequest
+from diff_fuse.api.dto.merge import MergeRefsOptions, MergeRequest
 from diff_fuse.domain.errors import ConflictUnresolvedError
+from diff_fuse.domain.json_stream import iter_json_bytes
+from diff_fuse.models.merge import RefScope
 from diff_fuse.services.merge_service import merge_in_session
+from diff_fuse.services.shared import run_cpu_bound
+
+_NO_REFS = MergeRefsOptions(scope=RefScope.none)
+
+
+async def get_merged(
+    session_id: str,
+    *,
+    merge_req: MergeRequest,
+    require_resolved: bool,
+) -> tuple[list[str], Any]:
+    """
+    Compute the merged result to export.
+
+    Parameters
+    ----------
+    session_id : str
+        Session identifier.
+    merge_req : MergeRequest
+        Merge configuration (diff settings or diff handle, plus selections).
+    require_resolved : bool
+        If True, raise an error when unresolved conflicts remain.
+
+    Returns
+    -------
+    tuple[list[str], Any]
+        Unresolved node IDs and the merged JSON-like structure.
+
+    Raises
+    ------
+    ConflictUnresolvedError
+        If `require_resolved=True` and unresolved conflicts remain.
+    """
+    # An export only needs the document: skip building merged-node references.
+    merge_req = merge_req.model_copy(update={"refs": _NO_REFS})
+    merge_response = await merge_in_session(session_id=session_id, req=merge_req)
+
+    if require_resolved and merge_response.unresolved_node_ids:
+        raise ConflictUnresolvedError(merge_response.unresolved_node_ids)
 
+    return merge_response.unresolved_node_ids, merge_response.merged
 
-def get_merged_text(
+
+def _join_text(merged: Any, pretty: bool) -> str:
+    """Serialize ``merged`` to one string."""
+    return b"".join(iter_json_bytes(merged, pretty=pretty)).decode("utf-8", "surrogatepass")
+
+
+async def get_merged_text(
     session_id: str,
     *,
     merge_req: MergeRequest,
@@ -50,23 +104,16 @@ def get_merged_text(
     ConflictUnresolvedError
         If `require_resolved=True` and unresolved conflicts remain.
     """
-    merge_response = merge_in_session(session_id=session_id, req=merge_req)
-
-    if require_resolved and merge_response.unresolved_node_ids:
-        raise ConflictUnresolvedError(merge_response.unresolved_node_ids)
-
-    indent = 2 if pretty else None
-    text = json.dumps(
-        merge_response.merged,
-        indent=indent,
-        ensure_ascii=False,
-        sort_keys=True,
+    unresolved_node_ids, merged = await get_merged(
+        session_id,
+        merge_req=merge_req,
+        require_resolved=require_resolved,
     )
-
-    return merge_response.unresolved_node_ids, text
+    text = await run_cpu_bound(_join_text, merged, pretty)
+    return unresolved_node_ids, text
 
 
-def export_merged_text(session_id: str, req: ExportRequest) -> ExportTextResponse:
+async def export_merged_text(session_id: str, req: ExportRequest) -> ExportTextResponse:
     """
     Export merged output as structured text response.
 
@@ -82,10 +129,7 @@ def export_merged_text(session_id: str, req: ExportRequest) -> ExportTextRespons
     ExportTextResponse
         Response containing unresolved paths and JSON text.
     """
-    # Ensure session exists early (consistent error semantics)
-    # _ = fetch_session(session_id)
-
-    unresolved_node_ids, text = get_merged_text(
+    unresolved_node_ids, text = await get_merged_text(
         session_id=session_id,
         merge_req=req.merge_request,
         pretty=req.pretty,
@@ -98,9 +142,9 @@ def export_merged_text(session_id: str, req: ExportRequest) -> ExportTextRespons
     )
 
 
-def export_merged_bytes(session_id: str, req: ExportRequest) -> bytes:
+async def export_merged_stream(session_id: str, req: ExportRequest) -> Iterator[bytes]:
     """
-    Export merged output as UTF-8 encoded bytes.
+    Export merged output as a stream of UTF-8 encoded JSON chunks.
 
     Parameters
     ----------
@@ -111,17 +155,30 @@ def export_merged_bytes(session_id: str, req: ExportRequest) -> bytes:
 
     Returns
     -------
-    bytes
-        UTF-8 encoded JSON payload with trailing newline.
-    """
-    # Ensure session exists early (consistent error semantics)
-    # _ = fetch_session(session_id)
+    Iterator[bytes]
+        Chunks of the JSON payload, followed by a trailing newline.
 
-    _, text = get_merged_text(
-        session_id=session_id,
+    Raises
+    ------
+    ConflictUnresolvedError
+        If ``req.require_resolved`` is set and unresolved conflicts remain.
+        Raised before the first chunk, so the error can still be sent as a
+        regular error response.
+
+    Notes
+    -----
+    The merge runs before this coroutine returns; serialization happens
+    lazily, as the (synchronous) iterator is consumed. Streaming responses
+    consume such iterators in the worker thread pool.
+    """
+    _, merged = await get_merged(
+        session_id,
         merge_req=req.merge_request,
-        pretty=req.pretty,
         require_resolved=req.require_resolved,
     )
 
-    return (text + "\n").encode("utf-8")
+    def _chunks() -> Iterator[bytes]:
+        yield from iter_json_bytes(merged, pretty=req.pretty)
+        yield b"\n"
+
+    return _chunks()
@@ -0,0 +1,373 @@
+"""
+Background job service.
+
+Diffs and merges of large sessions can outlast proxy timeouts. Clients may
+instead submit them as background jobs: submission returns a :class:`Job`
+right away, and the client polls it, may cancel it, and fetches the result
+once it has succeeded.
+
+Execution
+---------
+Jobs run on the per-process :class:`diff_fuse.state.job_pool.JobPool`, away
+from the threads serving requests. A job thread loads the session through the
+synchronous repository and builds the tree with the same code as the request
+handlers (:func:`diff_fuse.services.diff_service.build_and_cache`), counting
+nodes on a :class:`diff_fuse.domain.progress.Progress`. The result is stored
+as the exact response body the synchronous endpoint would have sent (see
+:func:`diff_fuse.api.responses.model_json_bytes`).
+
+State
+-----
+Records and results live in the job store of the session backend (see
+:func:`diff_fuse.deps.get_job_store`) and expire with the session TTL, so
+with Redis or SQLite any worker process can report on a job, cancel it, or
+return its result. Progress is written at most every
+``job_progress_interval_seconds``.
+
+Cancellation
+------------
+A job still queued in the process receiving the cancellation is dropped at
+once. A running job, or one queued in another process, stops at its next
+progress check: it watches its pool's cancellation event and the flag
+returned by every progress write.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from collections.abc import Callable
+from datetime import UTC, datetime
+from functools import partial
+from threading import Event
+from uuid import uuid4
+
+from anyio import to_thread
+from pydantic import BaseModel
+
+from diff_fuse.api.dto.diff import DiffRequest, DiffResponse
+from diff_fuse.api.dto.merge import MergeRequest, MergeResponse
+from diff_fuse.api.responses import model_json_bytes
+from diff_fuse.deps import get_job_pool, get_job_store, get_session_repo
+from diff_fuse.domain.errors import (
+    DomainError,
+    JobCancelledError,
+    JobNotFinishedError,
+    JobNotFoundError,
+    JobQueueFullError,
+    SessionNotFoundError,
+)
+from diff_fuse.domain.merge import try_merge_from_diff_tree_with_refs
+from diff_fuse.domain.progress import Progress, estimate_diff_nodes
+from diff_fuse.models.job import Job, JobError, JobKind, JobStatus
+from diff_fuse.models.session import Session
+from diff_fuse.services.diff_service import build_and_cache, require_diff_source, resolve_loaded_diff_root
+from diff_fuse.services.merge_service import merge_engine_options, merge_response
+from diff_fuse.services.review_service import with_review
+from diff_fuse.services.shared import fetch_session_meta
+from diff_fuse.settings import get_settings
+from diff_fuse.state.job_store import JobStore
+
+logger = logging.getLogger(__name__)
+
+JobBody = Callable[[Session, Progress], BaseModel]
+"""Computation of a job: session and progress counter in, response model out."""
+
+
+def _diff_body(req: DiffRequest) -> JobBody:
+    """Return the computation of a diff job."""
+
+    def run(s: Session, progress: Progress) -> DiffResponse:
+        diff_id, root = build_and_cache(s, req, progress=progress)
+        return DiffResponse(root=root, diff_id=diff_id)
+
+    return run
+
+
+def _merge_body(req: MergeRequest) -> JobBody:
+    """Return the computation of a merge job."""
+
+    def run(s: Session, progress: Progress) -> MergeResponse:
+        options = merge_engine_options(req.refs)
+        root = resolve_loaded_diff_root(s, diff_id=req.diff_id, diff_request=req.diff_request, progress=progress)
+        merged, unresolved_node_ids, resolved_ref_by_node_id = try_merge_from_diff_tree_with_refs(
+            root, req.selections_by_node_id, s.root_inputs, policies=req.policies, **options
+        )
+        return merge_response(merged, unresolved_node_ids, resolved_ref_by_node_id, req.refs)
+
+    return run
+
+
+def _finish(
+    store: JobStore, job: Job, status: JobStatus, *, error: JobError | None = None, result: bytes | None = None
+) -> None:
+    """Record the final state of a job."""
+    job.status = status
+    job.error = error
+    job.updated_at = datetime.now(UTC)
+    store.save(job, result=result)
+
+
+def _run_job(store: JobStore, job: Job, body: JobBody, cancelled: Event) -> None:
+    """
+    Run a job in a pool thread, recording its progress and outcome.
+
+    Parameters
+    ----------
+    store : JobStore
+        Where the job's record and result are kept.
+    job : Job
+        The queued job's record.
+    body : JobBody
+        The computation.
+    cancelled : threading.Event
+        Set when the job is cancelled in this process.
+    """
+    interval = get_settings().job_progress_interval_seconds
+    last_write = time.monotonic()
+
+    def report(progress: Progress) -> None:
+        nonlocal last_write
+        if cancelled.is_set():
+            raise JobCancelledError(job.job_id)
+        now = time.monotonic()
+        if now - last_write < interval:
+            return
+        last_write = now
+        job.nodes_processed, job.nodes_estimated = progress.done, progress.total
+        job.updated_at = datetime.now(UTC)
+        if store.save(job):
+            raise JobCancelledError(job.job_id)
+
+    try:
+        job.status = JobStatus.running
+        job.updated_at = datetime.now(UTC)
+        if store.save(job) or cancelled.is_set():
+            raise JobCancelledError(job.job_id)
+
+        s = get_session_repo().get(job.session_id)
+        if s is None:
+            raise SessionNotFoundError(job.session_id)
+        progress = Progress(estimate_diff_nodes(s.root_inputs), report)
+        job.nodes_estimated = progress.total
+
+        response = body(s, progress)
+        job.nodes_processed, job.nodes_estimated = progress.done, progress.total
+        _finish(store, job, JobStatus.succeeded, result=model_json_bytes(response))
+    except JobCancelledError:
+        _finish(store, job, JobStatus.cancelled)
+    except DomainError as e:
+        _finish(store, job, JobStatus.failed, error=JobError(code=e.code, message=e.message, details=e.as_details()))
+    except Exception:
+        logger.exception("Background job %s failed", job.job_id)
+        _finish(store, job, JobStatus.failed, error=JobError(code="internal_error", message="Internal server error"))
+
+
+async def _submit(session_id: str, kind: JobKind, body: JobBody) -> Job:
+    """Record a new job and queue it on the pool."""
+    await fetch_session_meta(session_id)
+
+    now = datetime.now(UTC)
+    job = Job(job_id=uuid4().hex, session_id=session_id, kind=kind, created_at=now, updated_at=now)
+    store = get_job_store()
+    await to_thread.run_sync(store.save, job)
+
+    try:
+        get_job_pool().submit(job.job_id, partial(_run_job, store, job.model_copy(), body))
+    except JobQueueFullError as e:
+        error = JobError(code=e.code, message=e.message, details=e.as_details())
+        await to_thread.run_sync(partial(_finish, store, job, JobStatus.failed, error=error))
+        raise
+    return job
+
+
+async def submit_diff_job(session_id: str, req: DiffRequest) -> Job:
+    """
+    Submit a diff as a background job.
+
+    Parameters
+    ----------
+    session_id : str
+        Session to diff.
+    req : DiffRequest
+        Diff configuration.
+
+    Returns
+    -------
+    Job
+        The queued job.
+
+    Raises
+    ------
+    SessionNotFoundError
+        If the session does not exist.
+    JobQueueFullError
+        If this process has too many jobs in progress.
+    """
+    return await _submit(session_id, JobKind.diff, _diff_body(req))
+
+
+async def submit_merge_job(session_id: str, req: MergeRequest) -> Job:
+    """
+    Submit a merge as a background job.
+
+    Parameters
+    ----------
+    session_id : str
+        Session to merge.
+    req : MergeRequest
+        Merge configuration. A ``diff_id`` sent without ``diff_request`` is
+        honored when the job runs in the process holding that diff; with a
+        ``diff_request``, that decides the tree (see
+        :func:`~diff_fuse.services.diff_service.resolve_loaded_diff_root`). A
+        ``review_revision`` is resolved at submission.
+
+    Returns
+    -------
+    Job
+        The queued job.
+
+    Raises
+    ------
+    DomainValidationError
+        If neither ``diff_request`` nor ``diff_id`` is given, or ``refs`` is
+        inconsistent.
+    ReviewConflictError
+        If the stored review state is not at ``review_revision``.
+    SessionNotFoundError
+        If the session does not exist.
+    JobQueueFullError
+        If this process has too many jobs in progress.
+    """
+    req = await with_review(session_id, req)
+    require_diff_source(req.diff_id, req.diff_request)
+    merge_engine_options(req.refs)
+    return await _submit(session_id, JobKind.merge, _merge_body(req))
+
+
+async def get_job(session_id: str, job_id: str) -> Job:
+    """
+    Return a job's status and progress.
+
+    Parameters
+    ----------
+    session_id : str
+        Session the job belongs to.
+    job_id : str
+        Job identifier.
+
+    Returns
+    -------
+    Job
+        Current record.
+
+    Raises
+    ------
+    JobNotFoundError
+        If the job does not exist, belongs to another session, or expired.
+    """
+    job = await to_thread.run_sync(get_job_store().get, job_id)
+    if job is None or job.session_id != session_id:
+        raise JobNotFoundError(job_id)
+    return job
+
+
+async def cancel_job(session_id: str, job_id: str) -> Job:
+    """
+    Request cancellation of a job.
+
+    Parameters
+    ----------
+    session_id : str
+        Session the job belongs to.
+    job_id : str
+        Job identifier.
+
+    Returns
+    -------
+    Job
+        Updated record. A job that already finished keeps its status; a
+        running one reports ``cancel_requested`` until it stops.
+
+    Raises
+    ------
+    JobNotFoundError
+        If the job does not exist, belongs to another session, or expired.
+    """
+    job = await get_job(session_id, job_id)
+    if job.status.finished:
+        return job
+
+    store = get_job_store()
+    job = await to_thread.run_sync(store.request_cancel, job_id)
+    if job is None:
+        raise JobNotFoundError(job_id)
+    if get_job_pool().cancel(job_id):
+        # Dropped before it started: nothing else will record the outcome.
+        await to_thread.run_sync(partial(_finish, store, job, JobStatus.cancelled))
+    return job
+
+
+async def shutdown_jobs() -> None:
+    """
+    Stop this process's job pool, recording the jobs it drops as cancelled.
+
+    Notes
+    -----
+    Queued jobs are dropped and marked ``cancelled`` in the store before the
+    pool shuts down; otherwise their records would stay ``queued`` until they
+    expire. Running jobs are signalled and record their own outcome if they
+    get to their next progress check.
+    """
+    pool = get_job_pool()
+    dropped = pool.drop_queued()
+    if dropped:
+        store = get_job_store()
+        for job_id in dropped:
+            job = await to_thread.run_sync(store.request_cancel, job_id)
+            if job is not None:
+                await to_thread.run_sync(partial(_finish, store, job, JobStatus.cancelled))
+    pool.shutdown()
+
+
+async def get_job_result(session_id: str, job_id: str) -> bytes:
+    """
+    Return the result of a succeeded job.
+
+    Parameters
+    ----------
+    session_id : str
+        Session the job belongs to.
+    job_id : str
+        Job identifier.
+
+    Returns
+    -------
+    bytes
+        The JSON body of the corresponding synchronous endpoint's response.
+
+    Raises
+    ------
+    JobNotFoundError
+        If the job does not exist, belongs to another session, or expired.
+    JobNotFinishedError
+        If the job is still queued or running.
+    JobCancelledError
+        If the job was cancelled.
+    DomainError
+        The error a failed job ended with, with its original code.
+    """
+    job = await get_job(session_id, job_id)
+    match job.status:
+        case JobStatus.succeeded:
+            result = await to_thread.run_sync(get_job_store().get_result, job_id)
+            if result is None:
+                raise JobNotFoundError(job_id)
+            return result
+        case JobStatus.cancelled:
+            raise JobCancelledError(job_id)
+        case JobStatus.failed:
+            assert job.error is not None
+            raise DomainError(code=job.error.code, message=job.error.message, details=job.error.details)
+        case _:
+            raise JobNotFinishedError(job_id, job.status)
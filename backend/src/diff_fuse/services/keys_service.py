@@ -16,7 +16,7 @@ from diff_fuse.domain.node_access import get_value_at_node_tokens
 from diff_fuse.domain.node_ids import decode_node_id
 from diff_fuse.models.array_keys import KeySuggestion
 from diff_fuse.models.document import DocumentResult
-from diff_fuse.services.shared import fetch_session
+from diff_fuse.services.shared import fetch_session, run_cpu_bound
 
 
 def _collect_arrays_at_path(
@@ -96,7 +96,7 @@ def compute_key_suggestions(
     return suggest_keys_for_array(arrays_by_doc, top_k=top_k)
 
 
-def suggest_array_keys_in_session(session_id: str, req: SuggestArrayKeysRequest) -> SuggestArrayKeysResponse:
+async def suggest_array_keys_in_session(session_id: str, req: SuggestArrayKeysRequest) -> SuggestArrayKeysResponse:
     """
     Suggest candidate keys for keyed array matching within a session.
 
@@ -121,9 +121,10 @@ def suggest_array_keys_in_session(session_id: str, req: SuggestArrayKeysRequest)
     InvalidPath
         If `req.node_id` is not a valid canonical node ID.
     """
-    s = fetch_session(session_id)
+    s = await fetch_session(session_id)
 
-    suggestions = compute_key_suggestions(
+    suggestions = await run_cpu_bound(
+        compute_key_suggestions,
         s.documents_results,
         node_id=req.node_id,
         top_k=req.top_k,
@@ -3,21 +3,114 @@ Merge service.
 
 This module implements the service-layer logic for producing merged
 documents based on a diff and user selections.
+
+Incremental merges
+------------------
+:func:`merge_delta_in_session` serves clients that re-merge after every
+selection change. It merges with :func:`diff_fuse.domain.incremental_merge.merge_incremental`
+and keeps the memoized state in the per-process
+:class:`diff_fuse.state.merge_memo.MergeMemo` under a fresh ``merge_id``. The
+next request names it as its base and receives only what changed.
+
+Reference scopes
+----------------
+A request's ``refs`` options restrict the merged-node references to the
+requested nodes; the engine then builds no others. :func:`merge_engine_options`
+and :func:`merge_response` translate the options for the engine and encode the
+references it returns, for both request handlers and background jobs.
 """
 
 from typing import Any
+from uuid import uuid4
 
 from diff_fuse.api.dto.diff import DiffRequest
-from diff_fuse.api.dto.merge import MergeRequest, MergeResponse
+from diff_fuse.api.dto.merge import MergeDeltaRequest, MergeDeltaResponse, MergeRefsOptions, MergeRequest, MergeResponse
+from diff_fuse.deps import get_merge_memo
+from diff_fuse.domain.errors import DomainValidationError
+from diff_fuse.domain.incremental_merge import merge_incremental
 from diff_fuse.domain.merge import try_merge_from_diff_tree_with_refs
-from diff_fuse.models.merge import MergedNodeRef, MergeSelection
-from diff_fuse.services.diff_service import diff_in_session
+from diff_fuse.models.merge import MergedNodeRef, MergedRefColumns, MergePolicy, MergeSelection, RefEncoding, RefScope
+from diff_fuse.services.diff_service import resolve_diff
+from diff_fuse.services.shared import run_cpu_bound
+
+
+def merge_engine_options(refs: MergeRefsOptions) -> dict[str, Any]:
+    """
+    Translate reference options into merge engine arguments.
+
+    Parameters
+    ----------
+    refs : MergeRefsOptions
+        Requested reference scope.
+
+    Returns
+    -------
+    dict[str, Any]
+        Keyword arguments for
+        :func:`diff_fuse.domain.merge.try_merge_from_diff_tree_with_refs`.
+
+    Raises
+    ------
+    DomainValidationError
+        If ``node_ids`` are sent with a scope that does not use them.
+    """
+    match refs.scope:
+        case RefScope.all | RefScope.none if refs.node_ids:
+            raise DomainValidationError("refs.node_ids", f"node_ids cannot be sent with scope '{refs.scope}'")
+        case RefScope.all:
+            return {}
+        case RefScope.none:
+            return {"ref_node_ids": ()}
+        case _:
+            return {"ref_node_ids": refs.node_ids, "ref_subtrees": refs.scope == RefScope.subtrees}
+
+
+def merge_response(
+    merged: Any,
+    unresolved_node_ids: list[str],
+    resolved_ref_by_node_id: dict[str, MergedNodeRef],
+    refs: MergeRefsOptions,
+) -> MergeResponse:
+    """
+    Build a merge response, encoding its references as requested.
+
+    Parameters
+    ----------
+    merged : Any
+        Merged document.
+    unresolved_node_ids : list[str]
+        Unresolved node IDs.
+    resolved_ref_by_node_id : dict[str, MergedNodeRef]
+        References returned by the merge engine.
+    refs : MergeRefsOptions
+        Requested reference options.
+
+    Returns
+    -------
+    MergeResponse
+        The response.
+    """
+    if refs.encoding == RefEncoding.columnar:
+        return MergeResponse(
+            merged=merged,
+            unresolved_node_ids=unresolved_node_ids,
+            resolved_ref_columns=MergedRefColumns.from_refs(resolved_ref_by_node_id),
+        )
+    return MergeResponse(
+        merged=merged,
+        unresolved_node_ids=unresolved_node_ids,
+        resolved_ref_by_node_id=resolved_ref_by_node_id,
+    )
 
 
-def build_merged(
+async def build_merged(
     session_id: str,
-    diff_req: DiffRequest,
+    diff_req: DiffRequest | None,
     selections_by_node_id: dict[str, MergeSelection],
+    *,
+    diff_id: str | None = None,
+    refs: MergeRefsOptions | None = None,
+    policies: list[MergePolicy] | None = None,
 ) -> tuple[Any, list[str], dict[str, MergedNodeRef]]:
     """
     Compute merged output for a session.
@@ -26,10 +119,16 @@ def build_merged(
     ----------
     session_id : str
         Session identifier.
-    diff_req : DiffRequest
+    diff_req : DiffRequest | None
         Diff configuration used to rebuild the diff tree.
     selections_by_node_id : dict[str, MergeSelection]
         Mapping from node ID -> merge selection.
+    diff_id : str | None, default=None
+        Handle of a previously computed diff to reuse.
+    refs : MergeRefsOptions | None, default=None
+        Which references to compute. None computes all of them.
+    policies : list[MergePolicy] | None, default=None
+        Rules resolving the conflicts no selection covers.
 
     Returns
     -------
@@ -40,17 +139,35 @@ def build_merged(
         - unresolved_paths : list[str]
             Paths that could not be resolved automatically.
         - resolved_ref_by_node_id : dict[str, MergedNodeRef]
-            Mapping from node ID to resolved node reference.
+            Mapping from node ID to resolved node reference, for the nodes
+            in the scope of ``refs``.
+
+    Raises
+    ------
+    DomainValidationError
+        If ``refs`` is inconsistent.
+
+    Notes
+    -----
+    The diff tree is taken from the diff cache when ``diff_id`` is still held
+    (see :func:`diff_fuse.services.diff_service.resolve_diff`). The documents
+    it was built from, cached with it or loaded to rebuild it, let the merge
+    copy unchanged subtrees instead of rebuilding them.
     """
-    diff_response = diff_in_session(session_id=session_id, req=diff_req)
-    merged, unresolved_node_ids, resolved_ref_by_node_id = try_merge_from_diff_tree_with_refs(
-        diff_response.root,
+    options = merge_engine_options(refs) if refs is not None else {}
+    _, root, sources = await resolve_diff(session_id, diff_id=diff_id, diff_request=diff_req)
+    merged, unresolved_node_ids, resolved_ref_by_node_id = await run_cpu_bound(
+        try_merge_from_diff_tree_with_refs,
+        root,
         selections_by_node_id,
+        sources,
+        policies=policies or (),
+        **options,
     )
     return merged, unresolved_node_ids, resolved_ref_by_node_id
 
 
-def merge_in_session(session_id: str, req: MergeRequest) -> MergeResponse:
+async def merge_in_session(session_id: str, req: MergeRequest) -> MergeResponse:
     """
     Apply merge selections for an existing session.
 
@@ -60,25 +177,81 @@ def merge_in_session(session_id: str, req: MergeRequest) -> MergeResponse:
         Identifier of the target session.
     req : MergeRequest
         Merge configuration including:
-        - diff request (array strategies)
-        - per-node selections
+        - diff request (array strategies) and/or diff handle
+        - per-node selections and merge policies
+        - which references to report, and how
 
     Returns
     -------
     MergeResponse
         Contains the merged output and any unresolved conflicts.
     """
-    # Ensure session exists (fail fast with proper domain error)
-    # _ = fetch_session(session_id)
-
-    merged, unresolved_node_ids, resolved_ref_by_node_id = build_merged(
+    merged, unresolved_node_ids, resolved_ref_by_node_id = await build_merged(
         session_id=session_id,
         diff_req=req.diff_request,
         selections_by_node_id=req.selections_by_node_id,
+        diff_id=req.diff_id,
+        refs=req.refs,
+        policies=req.policies,
     )
+    return merge_response(merged, unresolved_node_ids, resolved_ref_by_node_id, req.refs)
 
-    return MergeResponse(
-        merged=merged,
-        unresolved_node_ids=unresolved_node_ids,
-        resolved_ref_by_node_id=resolved_ref_by_node_id,
-    )
+
+async def merge_delta_in_session(session_id: str, req: MergeDeltaRequest) -> MergeDeltaResponse:
+    """
+    Merge incrementally, answering with a delta against the client's base.
+
+    Parameters
+    ----------
+    session_id : str
+        Identifier of the target session.
+    req : MergeDeltaRequest
+        Merge configuration, with the ``merge_id`` of the previous merge as
+        ``base_merge_id``.
+
+    Returns
+    -------
+    MergeDeltaResponse
+        A delta against ``req.base_merge_id`` when that merge is still held
+        for the same diff; otherwise the full merge. Either way, a new
+        ``merge_id``.
+
+    Raises
+    ------
+    DomainValidationError
+        If neither ``diff_request`` nor ``diff_id`` is given, or ``refs`` is
+        not left at its defaults.
+    DiffExpiredError
+        If the diff handle is no longer usable and no ``diff_request`` was given.
+    SessionNotFoundError
+        If the session does not exist.
+    """
+    if req.refs != MergeRefsOptions():
+        raise DomainValidationError("refs", "Incremental merges always report every reference")
+
+    diff_id, root, _ = await resolve_diff(session_id, diff_id=req.diff_id, diff_request=req.diff_request)
+    memo = get_merge_memo()
+    base = memo.take(req.base_merge_id, diff_id) if req.base_merge_id is not None else None
+
+    state, delta = await run_cpu_bound(merge_incremental, root, req.selections_by_node_id, base, req.policies)
+    merge_id = uuid4().hex
+
+    if delta is None:
+        # The state is updated in place by the next merge: copy what the response keeps.
+        response = MergeDeltaResponse(
+            merge_id=merge_id,
+            merged=state.merged(root),
+            unresolved_node_ids=state.unresolved_node_ids(),
+            resolved_ref_by_node_id=dict(state.ref_by_node_id),
+        )
+    else:
+        response = MergeDeltaResponse(
+            merge_id=merge_id,
+            base_merge_id=req.base_merge_id,
+            unresolved_node_ids=state.unresolved_node_ids(),
+            resolved_ref_by_node_id=delta.changed_ref_by_node_id,
+            value_by_node_id=delta.value_by_node_id,
+            dropped_ref_node_ids=delta.dropped_ref_node_ids,
+        )
+    memo.put(merge_id, diff_id, state)
+    return response
@@ -0,0 +1,161 @@
+"""
+Review state service.
+
+A session's review state (see :mod:`diff_fuse.models.review`) holds the
+client's diff configuration and merge selections, so that long reviews need
+not resend thousands of selections with every merge and export. Clients
+update it with deltas and refer to it by revision.
+
+Merges and exports
+------------------
+Before a merge or export is served, :func:`with_review` replaces a request's
+``review_revision`` by the stored configuration and selections. Everything
+downstream (entity tags, diff handles, background jobs) then sees an ordinary
+request, so a response computed from stored state is identical to one
+computed from the same state sent inline.
+"""
+
+from functools import partial
+
+from anyio import to_thread
+
+from diff_fuse.api.dto.diff import DiffRequest
+from diff_fuse.api.dto.merge import MergeRequest
+from diff_fuse.api.dto.review import ReviewPatchRequest, ReviewResponse, ReviewRevisionResponse
+from diff_fuse.deps import get_review_store
+from diff_fuse.domain.errors import DomainValidationError, ReviewConflictError
+from diff_fuse.models.review import Review
+from diff_fuse.services.shared import fetch_session_meta
+
+
+def _diff_request(review: Review) -> DiffRequest:
+    """Return the diff configuration held by a review state."""
+    return DiffRequest(array_strategies_by_node_id=review.array_strategies_by_node_id, null_mode=review.null_mode)
+
+
+async def load_review(session_id: str) -> Review:
+    """
+    Return a session's review state.
+
+    Parameters
+    ----------
+    session_id : str
+        Session identifier.
+
+    Returns
+    -------
+    Review
+        The stored state, or an empty one at revision ``0``.
+
+    Raises
+    ------
+    SessionNotFoundError
+        If the session does not exist.
+    """
+    await fetch_session_meta(session_id)
+    review = await to_thread.run_sync(get_review_store().get, session_id)
+    return review if review is not None else Review()
+
+
+async def get_review(session_id: str) -> ReviewResponse:
+    """
+    Return a session's review state in request shape.
+
+    Parameters
+    ----------
+    session_id : str
+        Session identifier.
+
+    Returns
+    -------
+    ReviewResponse
+        Revision, diff configuration and selections.
+
+    Raises
+    ------
+    SessionNotFoundError
+        If the session does not exist.
+    """
+    review = await load_review(session_id)
+    return ReviewResponse(
+        revision=review.revision,
+        diff_request=_diff_request(review),
+        selections_by_node_id=review.selections_by_node_id,
+    )
+
+
+async def patch_review(session_id: str, req: ReviewPatchRequest) -> ReviewRevisionResponse:
+    """
+    Apply a delta to a session's review state.
+
+    Parameters
+    ----------
+    session_id : str
+        Session identifier.
+    req : ReviewPatchRequest
+        Delta, optionally with the revision it is based on.
+
+    Returns
+    -------
+    ReviewRevisionResponse
+        The new revision.
+
+    Raises
+    ------
+    SessionNotFoundError
+        If the session does not exist.
+    ReviewConflictError
+        If ``req.base_revision`` is not the current revision.
+    """
+    await fetch_session_meta(session_id)
+    revision = await to_thread.run_sync(
+        partial(get_review_store().apply, session_id, req, base_revision=req.base_revision)
+    )
+    return ReviewRevisionResponse(revision=revision)
+
+
+async def with_review[R: MergeRequest](session_id: str, req: R) -> R:
+    """
+    Resolve a merge request's reference to the stored review state.
+
+    Parameters
+    ----------
+    session_id : str
+        Session identifier.
+    req : MergeRequest
+        Merge request (or subclass), possibly with ``review_revision``.
+
+    Returns
+    -------
+    MergeRequest
+        ``req`` itself when it does not use the review state; otherwise a
+        copy carrying the stored diff configuration and selections instead
+        of ``review_revision``.
+
+    Raises
+    ------
+    DomainValidationError
+        If the request sends selections or a diff configuration along with
+        ``review_revision``.
+    ReviewConflictError
+        If the stored state is not at ``review_revision``.
+    SessionNotFoundError
+        If the session does not exist.
+    """
+    if req.review_revision is None:
+        return req
+    if req.diff_request is not None or req.selections_by_node_id:
+        raise DomainValidationError(
+            "review_revision", "diff_request and selections_by_node_id cannot be sent with review_revision"
+        )
+
+    review = await load_review(session_id)
+    if review.revision != req.review_revision:
+        raise ReviewConflictError(req.review_revision, review.revision)
+    return req.model_copy(
+        update={
+            "diff_request": _diff_request(review),
+            "selections_by_node_id": review.selections_by_node_id,
+            "review_revision": None,
+        }
+    )
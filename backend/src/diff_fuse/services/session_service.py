@@ -11,16 +11,19 @@ from diff_fuse.api.dto.session import (
     RemoveDocSessionRequest,
     SessionResponse,
 )
-from diff_fuse.deps import get_session_repo
+from diff_fuse.deps import get_async_session_repo
 from diff_fuse.domain.errors import DocumentParseError, DomainValidationError, LimitsExceededError, SessionNotFoundError
+from diff_fuse.domain.fingerprint import document_content_hash
 from diff_fuse.domain.normalize import parse_and_normalize_json
+from diff_fuse.domain.sizing import approx_document_bytes
 from diff_fuse.models.document import DocumentFormat, DocumentResult, InputDocument
-from diff_fuse.models.session import Session
-from diff_fuse.services.shared import fetch_session
+from diff_fuse.models.session import SessionMeta
+from diff_fuse.services.shared import fetch_session, fetch_session_meta, run_cpu_bound
 from diff_fuse.settings import get_settings
+from diff_fuse.state.session_repo import SessionLimits
 
 
-def enforce_session_input_limits(documents: list[InputDocument], existing_session: Session | None = None) -> None:
+def enforce_session_input_limits(documents: list[InputDocument], existing_session: SessionMeta | None = None) -> None:
     """
     Enforce defensive limits for session creation.
 
@@ -28,15 +31,23 @@ def enforce_session_input_limits(documents: list[InputDocument], existing_sessio
     ----------
     documents : list[InputDocument]
         Documents proposed for session creation.
+    existing_session : SessionMeta | None, default=None
+        Session the documents are added to, if any.
 
     Raises
     ------
     LimitsExceededError
         If any configured limit is exceeded.
+
+    Notes
+    -----
+    Sizes are always counted in uploaded characters (``size_chars``),
+    whatever the document storage policy. The in-memory size of parsed
+    documents is checked separately by :func:`enforce_session_memory_limits`.
     """
     s = get_settings()
 
-    nr_docs = len(documents) + (len(existing_session.documents_results) if existing_session else 0)
+    nr_docs = len(documents) + (len(existing_session.documents_meta) if existing_session else 0)
 
     if nr_docs > s.max_documents_per_session:
         raise LimitsExceededError(
@@ -58,8 +69,8 @@ def enforce_session_input_limits(documents: list[InputDocument], existing_sessio
             )
         total_chars += n
 
-    for d in existing_session.documents_results if existing_session else []:
-        total_chars += len(d.raw)
+    for d in existing_session.documents_meta if existing_session else []:
+        total_chars += d.size_chars
 
     if total_chars > s.max_total_chars_per_session:
         raise LimitsExceededError(
@@ -69,7 +80,46 @@ def enforce_session_input_limits(documents: list[InputDocument], existing_sessio
         )
 
 
-def validate_unique_doc_ids(documents: list[InputDocument], existing_session: Session | None = None) -> None:
+def enforce_session_memory_limits(
+    documents_results: list[DocumentResult], existing_session: SessionMeta | None = None
+) -> None:
+    """
+    Enforce the per-session memory limit on parsed documents.
+
+    Parameters
+    ----------
+    documents_results : list[DocumentResult]
+        Parsed documents proposed for the session.
+    existing_session : SessionMeta | None, default=None
+        Session the documents are added to, if any.
+
+    Raises
+    ------
+    LimitsExceededError
+        If the approximate in-memory size of the session (``approx_bytes``
+        of all its documents) exceeds ``max_session_bytes``.
+
+    Notes
+    -----
+    Runs after parsing, since the size of the normalized structure is only
+    known then. Documents stored before sizes were recorded count as ``0``.
+    """
+    s = get_settings()
+    if not s.max_session_bytes:
+        return
+
+    approx_bytes = sum(d.approx_bytes for d in documents_results)
+    approx_bytes += sum(d.approx_bytes for d in existing_session.documents_meta) if existing_session else 0
+
+    if approx_bytes > s.max_session_bytes:
+        raise LimitsExceededError(
+            "Session too large in memory",
+            approx_bytes=approx_bytes,
+            max_session_bytes=s.max_session_bytes,
+        )
+
+
+def validate_unique_doc_ids(documents: list[InputDocument], existing_session: SessionMeta | None = None) -> None:
     """
     Validate that all document ids are unique within the request.
 
@@ -77,6 +127,8 @@ def validate_unique_doc_ids(documents: list[InputDocument], existing_session: Se
     ----------
     documents : list[InputDocument]
         Documents to validate.
+    existing_session : SessionMeta | None, default=None
+        Session the documents are added to, if any.
 
     Raises
     ------
@@ -88,7 +140,7 @@ def validate_unique_doc_ids(documents: list[InputDocument], existing_session: Se
     ``doc_id`` is used as the stable identifier for per-document state and for
     merge selections. Duplicates would make downstream results ambiguous.
     """
-    existing_ids = {dr.doc_id for dr in existing_session.documents_results} if existing_session else set()
+    existing_ids = {m.doc_id for m in existing_session.documents_meta} if existing_session else set()
     new_ids = [d.doc_id for d in documents]
 
     # duplicates inside the new payload
@@ -101,7 +153,46 @@ def validate_unique_doc_ids(documents: list[InputDocument], existing_session: Se
         raise DomainValidationError(field="doc_id", reason=f"Document IDs already exist in session: {sorted(overlap)}")
 
 
-def parse_and_normalize_documents(documents: list[InputDocument]) -> list[DocumentResult]:
+def _content_hashes(documents: list[InputDocument]) -> list[str]:
+    """Compute the content hash of each input document."""
+    return [document_content_hash(d.format, d.content) for d in documents]
+
+
+def _parse_document(d: InputDocument, content_hash: str) -> DocumentResult:
+    """
+    Parse and normalize one input document.
+
+    Unsupported formats and parse failures are recorded in the result
+    (``ok=False``) rather than raised.
+    """
+    r = DocumentResult(
+        doc_id=d.doc_id,
+        name=d.name,
+        format=d.format,
+        ok=True,
+        error=None,
+        content_hash=content_hash,
+        size_chars=len(d.content),
+        raw=d.content,
+    )
+
+    if d.format != DocumentFormat.json:
+        r.ok = False
+        r.error = f"Unsupported format '{d.format}'. Only 'json' is supported currently."
+        r.approx_bytes = approx_document_bytes(r.raw, None)
+        return r
+
+    try:
+        r.normalized = parse_and_normalize_json(d.content)
+    except DocumentParseError as e:
+        r.ok = False
+        r.error = e.as_details().get("reason", e.message)
+
+    r.approx_bytes = approx_document_bytes(r.raw, r.normalized)
+    return r
+
+
+async def parse_and_normalize_documents(documents: list[InputDocument]) -> list[DocumentResult]:
     """
     Parse and normalize input documents.
 
@@ -122,30 +213,28 @@ def parse_and_normalize_documents(documents: list[InputDocument]) -> list[Docume
       failing the whole request. This allows the UI to show per-document
       feedback.
     - Parse failures are captured as ``ok=False`` results.
+    - Documents whose content hash is already stored (by any session) are not
+      parsed again: the stored result is reused.
+    - Hashing and parsing run in the worker thread pool; the stored-document
+      lookups are batched into a single repository call (one pipelined round
+      trip with Redis).
     """
-    results: list[DocumentResult] = []
+    repo = get_async_session_repo()
 
-    for d in documents:
-        r = DocumentResult(doc_id=d.doc_id, name=d.name, format=d.format, ok=True, error=None, raw=d.content)
-
-        if d.format != DocumentFormat.json:
-            r.ok = False
-            r.error = f"Unsupported format '{d.format}'. Only 'json' is supported currently."
-            results.append(r)
-            continue
-
-        try:
-            r.normalized = parse_and_normalize_json(d.content)
-        except DocumentParseError as e:
-            r.ok = False
-            r.error = e.as_details().get("reason", e.message)
+    hashes = await run_cpu_bound(_content_hashes, documents)
+    stored = await repo.find_documents(hashes)
 
-        results.append(r)
+    missing = [i for i, st in enumerate(stored) if st is None]
+    parsed = await run_cpu_bound(lambda: [_parse_document(documents[i], hashes[i]) for i in missing])
+    parsed_by_index = dict(zip(missing, parsed, strict=True))
 
-    return results
+    return [
+        DocumentResult.from_stored(st, doc_id=d.doc_id, name=d.name) if st is not None else parsed_by_index[i]
+        for i, (d, st) in enumerate(zip(documents, stored, strict=True))
+    ]
 
 
-def create_session(req: AddDocsSessionRequest) -> SessionResponse:
+async def create_session(req: AddDocsSessionRequest) -> SessionResponse:
     """
     Create a new session and persist its documents.
 
@@ -166,11 +255,11 @@ def create_session(req: AddDocsSessionRequest) -> SessionResponse:
     enforce_session_input_limits(req.documents)
     validate_unique_doc_ids(req.documents)
 
-    documents_results = parse_and_normalize_documents(req.documents)
+    documents_results = await parse_and_normalize_documents(req.documents)
+    enforce_session_memory_limits(documents_results)
 
-    repo = get_session_repo()
-    # repo.cleanup()  # no-op for Redis; useful for memory repo
-    session = repo.create(documents_results=documents_results)
+    repo = get_async_session_repo()
+    session = await repo.create(documents_results=documents_results)
 
     return SessionResponse(
         session_id=session.session_id,
@@ -178,7 +267,7 @@ def create_session(req: AddDocsSessionRequest) -> SessionResponse:
     )
 
 
-def add_docs_in_session(session_id: str, req: AddDocsSessionRequest) -> SessionResponse:
+async def add_docs_in_session(session_id: str, req: AddDocsSessionRequest) -> SessionResponse:
     """
     Add documents to an existing session.
 
@@ -198,30 +287,33 @@ def add_docs_in_session(session_id: str, req: AddDocsSessionRequest) -> SessionR
     -----
     This operation mutates the session by appending new documents. The
     existing documents remain unchanged.
+
+    The session limits are checked up front against the metadata read here,
+    to fail before parsing, and again by the repository atomically with the
+    append, so concurrent additions cannot exceed them together.
     """
-    s = fetch_session(session_id)
+    s = await fetch_session_meta(session_id)
     enforce_session_input_limits(req.documents, existing_session=s)
     validate_unique_doc_ids(req.documents, existing_session=s)
 
-    documents_results = parse_and_normalize_documents(req.documents)
-
-    def _fn(s: Session) -> Session:
-        # Merge existing and new documents
-        s.documents_results.extend(documents_results)
-        return s
+    documents_results = await parse_and_normalize_documents(req.documents)
+    enforce_session_memory_limits(documents_results, existing_session=s)
 
-    repo = get_session_repo()
-    updated_session = repo.mutate(session_id, _fn)
-    if updated_session is None:
+    settings = get_settings()
+    limits = SessionLimits(
+        max_documents=settings.max_documents_per_session,
+        max_total_chars=settings.max_total_chars_per_session,
+        max_bytes=settings.max_session_bytes,
+    )
+    repo = get_async_session_repo()
+    updated = await repo.append_documents(session_id, documents_results, limits)
+    if updated is None:
         raise SessionNotFoundError(session_id=session_id)
 
-    return SessionResponse(
-        session_id=updated_session.session_id,
-        documents_meta=[dr.to_meta() for dr in updated_session.documents_results],
-    )
+    return SessionResponse(session_id=updated.session_id, documents_meta=updated.documents_meta)
 
 
-def remove_doc_in_session(session_id: str, req: RemoveDocSessionRequest) -> SessionResponse:
+async def remove_doc_in_session(session_id: str, req: RemoveDocSessionRequest) -> SessionResponse:
     """
     Remove a document from an existing session.
 
@@ -249,38 +341,15 @@ def remove_doc_in_session(session_id: str, req: RemoveDocSessionRequest) -> Sess
     This operation mutates the session by removing the specified document.
     If the document ID does not exist in the session, a validation error is raised.
     """
-
-    def _fn(s: Session) -> Session:
-        before = len(s.documents_results)
-        updated = [dr for dr in s.documents_results if dr.doc_id != req.doc_id]
-
-        if len(updated) == before:
-            raise DomainValidationError(
-                field="doc_id",
-                reason=f"Document '{req.doc_id}' does not exist in this session",
-            )
-
-        if len(updated) < 1:
-            raise DomainValidationError(
-                field="documents",
-                reason=f"Cannot remove document '{req.doc_id}' because a session must have at least 1 document",
-            )
-
-        s.documents_results = updated
-        return s
-
-    repo = get_session_repo()
-    updated_session = repo.mutate(session_id, _fn)
-    if updated_session is None:
+    repo = get_async_session_repo()
+    updated = await repo.remove_document(session_id, req.doc_id)
+    if updated is None:
         raise SessionNotFoundError(session_id=session_id)
 
-    return SessionResponse(
-        session_id=updated_session.session_id,
-        documents_meta=[dr.to_meta() for dr in updated_session.documents_results],
-    )
+    return SessionResponse(session_id=updated.session_id, documents_meta=updated.documents_meta)
 
 
-def list_docs_meta_in_session(session_id: str) -> SessionResponse:
+async def list_docs_meta_in_session(session_id: str) -> SessionResponse:
     """
     List metadata for all documents in a session.
 
@@ -294,15 +363,12 @@ def list_docs_meta_in_session(session_id: str) -> SessionResponse:
     SessionResponse
         Session metadata including the list of documents with their parsing status.
     """
-    s = fetch_session(session_id)
+    s = await fetch_session_meta(session_id)
 
-    return SessionResponse(
-        session_id=s.session_id,
-        documents_meta=[dr.to_meta() for dr in s.documents_results],
-    )
+    return SessionResponse(session_id=s.session_id, documents_meta=s.documents_meta)
 
 
-def get_full_session(session_id: str) -> FullSessionResponse:
+async def get_full_session(session_id: str) -> FullSessionResponse:
     """
     Retrieve the full session state, including all document details.
 
@@ -316,5 +382,5 @@ def get_full_session(session_id: str) -> FullSessionResponse:
     FullSessionResponse
         Complete session state including per-document parsing results and normalized content.
     """
-    s = fetch_session(session_id)
+    s = await fetch_session(session_id)
     return FullSessionResponse.model_validate(s, from_attributes=True)
@@ -3,14 +3,52 @@ Shared service utilities.
 
 This module contains small helper functions used across service-layer
 implementations.
+
+Concurrency model
+-----------------
+Services are coroutines. They await session storage through the
+:class:`diff_fuse.state.session_repo.AsyncSessionRepo` and hand CPU-heavy
+work (parsing, diffing, merging, serialization) to the worker thread pool
+with :func:`run_cpu_bound`, so worker threads are only occupied by
+computation, never by I/O waits.
 """
 
-from diff_fuse.deps import get_session_repo
+from collections.abc import Callable
+from functools import partial
+
+import orjson
+from anyio import to_thread
+
+from diff_fuse.deps import get_async_session_repo
 from diff_fuse.domain.errors import SessionNotFoundError
-from diff_fuse.models.session import Session
+from diff_fuse.domain.fingerprint import diff_fingerprint
+from diff_fuse.models.base import DiffFuseModel
+from diff_fuse.models.session import Session, SessionMeta
+
+RESPONSE_FORMAT_VERSION = 1
+"""Part of every entity tag; bump it when responses change for identical inputs."""
+
+
+async def run_cpu_bound[T](fn: Callable[..., T], /, *args, **kwargs) -> T:
+    """
+    Run a CPU-heavy function in the worker thread pool.
+
+    Parameters
+    ----------
+    fn : Callable[..., T]
+        Function to run.
+    *args, **kwargs
+        Arguments forwarded to ``fn``.
+
+    Returns
+    -------
+    T
+        The function's return value (exceptions propagate unchanged).
+    """
+    return await to_thread.run_sync(partial(fn, *args, **kwargs))
 
 
-def fetch_session(session_id: str) -> Session:
+async def fetch_session(session_id: str) -> Session:
     """
     Retrieve an existing session or raise a domain error.
 
@@ -36,8 +74,79 @@ def fetch_session(session_id: str) -> Session:
     - Services should prefer this helper over directly calling the
       repository to maintain consistent error behavior.
     """
-    repo = get_session_repo()
-    s = repo.get(session_id)
+    repo = get_async_session_repo()
+    s = await repo.get(session_id)
+    if s is None:
+        raise SessionNotFoundError(session_id)
+    return s
+
+
+async def fetch_session_meta(session_id: str) -> SessionMeta:
+    """
+    Retrieve an existing session's metadata or raise a domain error.
+
+    Parameters
+    ----------
+    session_id : str
+        Opaque session identifier provided by the client.
+
+    Returns
+    -------
+    SessionMeta
+        The session metadata, without document contents.
+
+    Raises
+    ------
+    SessionNotFoundError
+        If no active session exists for the given identifier.
+
+    Notes
+    -----
+    Prefer this over :func:`fetch_session` for operations that do not need
+    document contents; storage backends can then skip loading them.
+    """
+    repo = get_async_session_repo()
+    s = await repo.get_meta(session_id)
     if s is None:
         raise SessionNotFoundError(session_id)
     return s
+
+
+async def request_etag(session_id: str, kind: str, req: DiffFuseModel) -> str:
+    """
+    Compute the entity tag of a diff, merge or export response.
+
+    Parameters
+    ----------
+    session_id : str
+        Session identifier.
+    kind : str
+        Endpoint name (e.g. ``"diff"``); responses of different endpoints to
+        the same request body get different tags.
+    req : DiffFuseModel
+        Request body. Hashed in canonical form (sorted keys, defaults spelled
+        out), so equivalent requests get the same tag.
+
+    Returns
+    -------
+    str
+        Strong, quoted entity tag.
+
+    Raises
+    ------
+    SessionNotFoundError
+        If no active session exists for the given identifier.
+
+    Notes
+    -----
+    Only session metadata is read: the tag combines the documents' content
+    hashes with the request, so no document is loaded or deserialized.
+    """
+    meta = await fetch_session_meta(session_id)
+    options = b"%d\0%s\0%s" % (
+        RESPONSE_FORMAT_VERSION,
+        kind.encode(),
+        orjson.dumps(req.model_dump(mode="json"), option=orjson.OPT_SORT_KEYS),
+    )
+    fingerprint = diff_fingerprint(((m.doc_id, m.content_hash) for m in meta.documents_meta), options)
+    return f'"{fingerprint}"'
@@ -38,8 +38,12 @@ class Settings(BaseSettings):
         Uvicorn runtime configuration.
     CORS
         Browser access configuration.
+    HTTP compression
+        Request decompression and response compression.
     Sessions
         Session storage backend and limits.
+    Background jobs
+        Worker pool of asynchronous diff and merge jobs.
     Safety limits
         Defensive guards against pathological inputs.
 
@@ -88,7 +92,8 @@ class Settings(BaseSettings):
     Notes
     -----
     - For development (reload=True), workers should remain 1.
-    - For production, workers > 1 requires a shared session backend (e.g., Redis).
+    - For production, workers > 1 requires a shared session backend (Redis, or
+      SQLite on a single host).
     """
 
     # ------------------------------------------------------------------
@@ -102,13 +107,38 @@ class Settings(BaseSettings):
     In production this should be explicitly restricted.
     """
 
+    # ------------------------------------------------------------------
+    # HTTP compression
+    # ------------------------------------------------------------------
+
+    compression_min_size_bytes: int = 1024
+    """
+    Responses smaller than this many bytes are sent uncompressed.
+
+    Compressing tiny payloads costs more CPU than it saves in transfer time.
+    """
+
+    max_request_body_bytes: int = 32_000_000
+    """
+    Maximum request body size in bytes, measured **after** decompression.
+
+    Guards against compressed uploads that expand far beyond their transfer size.
+    """
+
     # ------------------------------------------------------------------
     # Session backend
     # ------------------------------------------------------------------
 
-    session_backend: Literal["memory", "redis"] = "memory"
+    session_backend: Literal["memory", "redis", "sqlite", "tmpfs"] = "memory"
     """
     Session storage backend.
+
+    - ``"memory"``: process memory; development only.
+    - ``"redis"``: shared Redis; required for multi-host deployments.
+    - ``"sqlite"``: local SQLite file; persistent, single host.
+    - ``"tmpfs"``: the SQLite backend on a tmpfs, not synced to disk;
+      single host, lost on reboot. Each worker process still reads and
+      decodes documents on its own.
     """
 
     session_ttl_seconds: int = 3600
@@ -117,9 +147,148 @@ class Settings(BaseSettings):
     redis_url: str = "redis://localhost:6379/0"
     """Redis connection URL (used when ``session_backend='redis'``)."""
 
+    redis_cluster: bool = False
+    """
+    Connect to a Redis Cluster instead of a single Redis server.
+
+    ``redis_url`` then names any node of the cluster; the others are
+    discovered. Session ids are wrapped in hash tags so that all keys of one
+    session live in the same slot.
+    """
+
+    redis_max_connections: int = 64
+    """
+    Size of the async Redis connection pool used by request handlers.
+
+    Requests wait for a free connection when the pool is exhausted. With
+    ``redis_cluster``, this is the limit per cluster node.
+    """
+
     redis_key_prefix: str = "diff-fuse:session:"
     """Prefix for Redis session keys."""
 
+    redis_document_key_prefix: str = "diff-fuse:doc:"
+    """Prefix for Redis keys of content-addressed documents shared across sessions."""
+
+    redis_job_key_prefix: str = "diff-fuse:job:"
+    """Prefix for Redis keys of background jobs."""
+
+    redis_review_key_prefix: str = "diff-fuse:review:"
+    """Prefix for Redis keys of the review state of sessions."""
+
+    document_storage_policy: Literal["full", "raw_on_error", "raw_only"] = "full"
+    """
+    Which forms of each document are stored (see :mod:`diff_fuse.state.storage_policy`).
+
+    - ``"full"``: raw text and normalized structure.
+    - ``"raw_on_error"``: normalized structure; raw text only for documents
+      that failed to parse.
+    - ``"raw_only"``: compressed raw text; the normalized structure is
+      re-derived on access through a per-process decode cache.
+    """
+
+    document_decode_cache_entries: int = 32
+    """Number of re-derived normalized documents each process caches (``raw_only`` policy)."""
+
+    session_cache_max_entries: int = 64
+    """
+    Number of decoded sessions each process keeps in memory in front of Redis.
+
+    Cached sessions are validated against a version counter on every access,
+    so they are never served stale. ``0`` disables the cache.
+    """
+
+    sqlite_path: str = "diff-fuse-sessions.sqlite3"
+    """Database file of the SQLite backend (used when ``session_backend='sqlite'``)."""
+
+    tmpfs_path: str = "/dev/shm/diff-fuse-sessions.sqlite3"
+    """
+    Database file of the tmpfs backend (used when ``session_backend='tmpfs'``).
+    Must be on a tmpfs.
+    """
+
+    sqlite_mmap_bytes: int = 268_435_456
+    """
+    How much of the SQLite database file is memory-mapped. Reads of mapped
+    pages are served from the OS page cache. ``0`` disables memory mapping.
+    """
+
+    sqlite_hot_documents: int = 128
+    """Number of decoded documents each process caches in front of the SQLite and tmpfs backends."""
+
+    memory_max_sessions: int = 10_000
+    """
+    Maximum number of live sessions in the memory backend. ``0`` means unlimited.
+
+    When exceeded, least recently used sessions are evicted.
+    """
+
+    memory_max_bytes: int = 1_000_000_000
+    """
+    Process-wide memory budget of the memory backend: approximate maximum
+    in-memory size of all live sessions, in bytes. ``0`` means unlimited.
+
+    When exceeded, least recently used sessions are evicted; a session that
+    does not fit in the budget on its own is rejected.
+    """
+
+    memory_lock_stripes: int = 64
+    """
+    Number of stripes of the per-session lock table in the memory backend.
+    """
+
+    session_demote_after_seconds: float = 300.0
+    """
+    Idle time after which documents of the memory backend, and sessions in the
+    per-process session cache, are kept compressed until their next access.
+    ``0`` keeps everything decoded.
+    """
+
+    diff_cache_max_entries: int = 8
+    """
+    Number of computed diff trees each process keeps, so merge and export
+    requests can reference a diff by its ``diff_id``. ``0`` disables the cache.
+    """
+
+    diff_cache_ttl_seconds: float = 300.0
+    """How long an unused diff tree is kept (see ``diff_cache_max_entries``)."""
+
+    merge_memo_max_entries: int = 8
+    """
+    Number of memoized merges each process keeps as bases for incremental
+    merges (``POST /{session_id}/merge/delta``). Each holds one reference per
+    diff node. ``0`` disables incremental merges: every merge is then full.
+    """
+
+    merge_memo_ttl_seconds: float = 300.0
+    """How long a memoized merge is kept (see ``merge_memo_max_entries``)."""
+
+    session_sweep_interval_seconds: float = 60.0
+    """
+    Maximum delay between background sweeps of expired sessions in the memory
+    and SQLite backends. ``0`` disables the sweeper (sessions then expire lazily on access).
+    """
+
+    # ------------------------------------------------------------------
+    # Background jobs
+    # ------------------------------------------------------------------
+
+    job_workers: int = 2
+    """Number of background diff and merge jobs each process runs concurrently."""
+
+    job_max_pending: int = 16
+    """
+    Maximum number of queued and running jobs per process. Further
+    submissions are refused with ``503`` until one finishes.
+    """
+
+    job_progress_interval_seconds: float = 0.5
+    """
+    Minimum time between two progress updates of a running job in the job
+    store. Cancellation requested through another process is noticed at the
+    next update.
+    """
+
     # ------------------------------------------------------------------
     # Defensive limits
     # ------------------------------------------------------------------
@@ -133,6 +302,12 @@ class Settings(BaseSettings):
     max_total_chars_per_session: int = 3_000_000
     """Maximum combined size of all documents in a session."""
 
+    max_session_bytes: int = 300_000_000
+    """
+    Maximum approximate in-memory size of a session's parsed documents, in
+    bytes (raw text plus normalized object graph). ``0`` disables the check.
+    """
+
     max_json_depth: int = 60
     """
     Maximum allowed JSON nesting depth.
@@ -4,9 +4,17 @@ Session state backends and repository abstractions.
 This package defines the storage layer for diff-fuse sessions. It provides:
 
 - A repository protocol (:class:`SessionRepo`) that defines the required
-  storage interface.
+  storage interface, and its asynchronous counterpart (:class:`AsyncSessionRepo`)
+  used by request handlers.
 - A local in-memory implementation for development.
-- A Redis-backed implementation for production and multi-instance deployments.
+- A Redis-backed implementation for production and multi-instance deployments,
+  with a ``redis.asyncio`` variant.
+- A content-addressed document store (:class:`DocumentStore`) used by both
+  repositories, so identical documents are stored once across sessions.
+- Job stores (:class:`JobStore`) keeping background job records next to the
+  sessions, and the per-process :class:`JobPool` running the jobs.
+- Review stores (:class:`ReviewStore`) keeping each session's diff
+  configuration and merge selections, updated by deltas.
 
 Architecture
 ------------
@@ -0,0 +1,112 @@
+"""
+Asynchronous Redis-backed content-addressed document store.
+
+Companion of :class:`diff_fuse.state.async_redis_session_repo.AsyncRedisSessionRepo`.
+Uses the same keys, payload codec and reference counting as
+:class:`diff_fuse.state.redis_document_store.RedisDocumentStore`, so sync and
+async clients can share one Redis database.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+
+from redis.asyncio import Redis
+
+from diff_fuse.models.document import StoredDocument
+from diff_fuse.state.codec import decode_document, encode_document
+from diff_fuse.state.document_store import AsyncDocumentStore
+from diff_fuse.state.redis_document_store import RELEASE_SCRIPT
+from diff_fuse.state.storage_policy import DecodeCache, StoragePolicy, restore_document, strip_document
+
+
+class AsyncRedisDocumentStore(AsyncDocumentStore):
+    """
+    ``redis.asyncio`` implementation of :class:`AsyncDocumentStore`.
+
+    Parameters
+    ----------
+    redis : redis.asyncio.Redis
+        Initialized async Redis client. Must return raw bytes
+        (``decode_responses=False``), since payloads are binary.
+    ttl_seconds : int
+        Document time-to-live in seconds. Should match the session TTL.
+    key_prefix : str, default="diff-fuse:doc:"
+        Prefix used for Redis keys.
+    policy : StoragePolicy, default="full"
+        Which forms of each document to keep.
+    decode_cache : DecodeCache | None, default=None
+        Cache of re-derived normalized documents, used with ``"raw_only"``.
+
+    Notes
+    -----
+    Payloads are encoded and decoded on the calling thread: the codec is
+    fast compared to the network round trip it accompanies.
+    """
+
+    def __init__(
+        self,
+        redis: Redis,
+        *,
+        ttl_seconds: int,
+        key_prefix: str = "diff-fuse:doc:",
+        policy: StoragePolicy = "full",
+        decode_cache: DecodeCache | None = None,
+    ) -> None:
+        self._r = redis
+        self._ttl = int(ttl_seconds)
+        self._prefix = key_prefix
+        self._policy = policy
+        self._decode_cache = decode_cache
+        self._release = self._r.register_script(RELEASE_SCRIPT)
+
+    def _key(self, content_hash: str) -> str:
+        """Build the Redis key for a document."""
+        return f"{self._prefix}{content_hash}"
+
+    def _decode(self, raw: bytes | None) -> StoredDocument | None:
+        """Deserialize a stored payload, tolerating missing entries."""
+        if raw is None:
+            return None
+        return restore_document(decode_document(raw), self._decode_cache)
+
+    async def get(self, content_hash: str) -> StoredDocument | None:
+        """Return the stored document for ``content_hash``, if any."""
+        return self._decode(await self._r.hget(self._key(content_hash), "data"))
+
+    async def get_many(self, content_hashes: list[str], *, refresh_ttl: bool = False) -> list[StoredDocument | None]:
+        """Return the stored documents for ``content_hashes`` using one pipeline."""
+        if not content_hashes:
+            return []
+        async with self._r.pipeline(transaction=False) as pipe:
+            for h in content_hashes:
+                pipe.hget(self._key(h), "data")
+                if refresh_ttl:
+                    pipe.expire(self._key(h), self._ttl)
+            replies = await pipe.execute()
+        step = 2 if refresh_ttl else 1
+        return [self._decode(raw) for raw in replies[::step]]
+
+    async def acquire(self, document: StoredDocument) -> StoredDocument:
+        """Store ``document`` if absent, add a reference and refresh its TTL."""
+        key = self._key(document.content_hash)
+        async with self._r.pipeline(transaction=True) as pipe:
+            pipe.hsetnx(key, "data", encode_document(strip_document(document, self._policy)))
+            pipe.hincrby(key, "refs", 1)
+            pipe.expire(key, self._ttl)
+            await pipe.execute()
+        return document
+
+    async def release(self, content_hash: str) -> None:
+        """Drop a reference to ``content_hash``; delete the document at zero."""
+        await self._release(keys=[self._key(content_hash)])
+
+    async def touch(self, content_hashes: Iterable[str]) -> None:
+        """Refresh the TTL of the given documents."""
+        unique = set(content_hashes)
+        if not unique:
+            return
+        async with self._r.pipeline(transaction=False) as pipe:
+            for h in unique:
+                pipe.expire(self._key(h), self._ttl)
+            await pipe.execute()
@@ -0,0 +1,485 @@
+"""
+Asynchronous Redis-backed session repository.
+
+This module provides the ``redis.asyncio`` counterpart of
+:class:`diff_fuse.state.redis_session_repo.RedisSessionRepo`. Request
+handlers await it directly, so a request waiting on Redis releases the event
+loop instead of occupying a worker thread.
+
+Design characteristics
+----------------------
+- Same storage model as the synchronous repository (see
+  :mod:`diff_fuse.state.redis_session_fields`); both can serve the same
+  database at once.
+- Connections come from the client's connection pool, sized by the
+  application settings. A ``redis.asyncio.RedisCluster`` client works too,
+  with ``hash_tag=True`` (see :func:`diff_fuse.state.redis_session_fields.session_key`).
+- Sliding expiration, diff writes, the version counter and the optional
+  per-process :class:`SessionCache` behave exactly as in the synchronous
+  repository.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from datetime import UTC, datetime
+from uuid import uuid4
+
+from redis.asyncio import Redis, RedisCluster
+from redis.asyncio.client import Pipeline
+from redis.exceptions import WatchError
+
+from diff_fuse.models.document import DocumentResult, StoredDocument
+from diff_fuse.models.session import Session, SessionMeta
+from diff_fuse.state.async_redis_document_store import AsyncRedisDocumentStore
+from diff_fuse.state.document_store import AsyncDocumentStore, acquire_new_refs_async, hydrate_session
+from diff_fuse.state.redis_session_fields import (
+    APPEND_DOCUMENTS_SCRIPT,
+    REMOVE_DOCUMENT_SCRIPT,
+    VERSION_FIELD,
+    append_documents_args,
+    changed_session_fields,
+    parse_append_reply,
+    parse_remove_reply,
+    parse_session_fields,
+    parse_version,
+    session_fields,
+    session_key,
+)
+from diff_fuse.state.session_cache import SessionCache
+from diff_fuse.state.session_repo import AsyncSessionRepo, SessionLimits, append_documents_to, remove_document_from
+
+
+class AsyncRedisSessionRepo(AsyncSessionRepo):
+    """
+    ``redis.asyncio`` implementation of :class:`AsyncSessionRepo`.
+
+    Parameters
+    ----------
+    redis : redis.asyncio.Redis | redis.asyncio.RedisCluster
+        Initialized async Redis or Redis Cluster client (``decode_responses=False``).
+    ttl_seconds : int
+        Session time-to-live in seconds.
+    key_prefix : str, default="diff-fuse:session:"
+        Prefix used for Redis keys.
+    hash_tag : bool, default=False
+        Wrap session ids in a hash tag, for Redis Cluster.
+    document_store : AsyncDocumentStore | None, default=None
+        Content-addressed store for document payloads. An
+        :class:`AsyncRedisDocumentStore` on the same client is created when
+        omitted.
+    cache : SessionCache | None, default=None
+        Per-process cache of decoded sessions, validated against the
+        ``version`` field before use.
+    """
+
+    def __init__(
+        self,
+        redis: Redis | RedisCluster,
+        *,
+        ttl_seconds: int,
+        key_prefix: str = "diff-fuse:session:",
+        hash_tag: bool = False,
+        document_store: AsyncDocumentStore | None = None,
+        cache: SessionCache | None = None,
+    ) -> None:
+        self._r = redis
+        self._ttl = int(ttl_seconds)
+        self._prefix = key_prefix
+        self._hash_tag = hash_tag
+        self._documents = (
+            document_store if document_store is not None else AsyncRedisDocumentStore(redis, ttl_seconds=ttl_seconds)
+        )
+        self._cache = cache
+        self._append = redis.register_script(APPEND_DOCUMENTS_SCRIPT)
+        self._remove = redis.register_script(REMOVE_DOCUMENT_SCRIPT)
+
+    def _key(self, session_id: str) -> str:
+        """Build the Redis key for a session."""
+        return session_key(self._prefix, session_id, hash_tag=self._hash_tag)
+
+    async def _hydrate(self, meta: SessionMeta) -> Session | None:
+        """Attach document payloads to session metadata, refreshing their TTL."""
+        stored_docs = await self._documents.get_many([m.content_hash for m in meta.documents_meta], refresh_ttl=True)
+        return hydrate_session(meta, stored_docs)
+
+    async def _read_meta(self, session_id: str) -> tuple[SessionMeta, int] | None:
+        """Read session metadata and version, sliding the session TTL in the same round trip."""
+        key = self._key(session_id)
+        async with self._r.pipeline(transaction=False) as pipe:
+            pipe.hgetall(key)
+            pipe.expire(key, self._ttl)
+            raw, _ = await pipe.execute()
+        meta = parse_session_fields(raw)
+        if meta is None:
+            return None
+        return meta, parse_version(raw)
+
+    async def _read_version(self, session_id: str) -> int | None:
+        """Read the session version, sliding the session TTL in the same round trip."""
+        key = self._key(session_id)
+        async with self._r.pipeline(transaction=False) as pipe:
+            pipe.hget(key, VERSION_FIELD)
+            pipe.expire(key, self._ttl)
+            version, _ = await pipe.execute()
+        return int(version) if version is not None else None
+
+    def _remember(self, session: Session, version: int) -> None:
+        """Store ``session`` in the cache, if enabled."""
+        if self._cache is not None:
+            self._cache.put(session, version)
+
+    def _write(self, pipe: Pipeline, session: Session, *, previous: SessionMeta | None) -> None:
+        """
+        Queue the commands that persist ``session`` on a buffered pipeline.
+
+        The new version is the reply of the second-to-last queued command
+        (see :meth:`diff_fuse.state.redis_session_repo.RedisSessionRepo._write`).
+        """
+        key = self._key(session.session_id)
+
+        if previous is None:
+            pipe.delete(key)
+            fields = session_fields(session)
+        else:
+            removed, fields = changed_session_fields(session, previous)
+            if removed:
+                pipe.hdel(key, *removed)
+
+        if fields:
+            pipe.hset(key, mapping=fields)
+        pipe.hincrby(key, VERSION_FIELD, 1)
+        pipe.expire(key, self._ttl)
+
+    async def _load_watched(self, pipe: Pipeline, session_id: str) -> Session | None:
+        """Load a session on a pipeline in WATCH mode, preferring the cache."""
+        key = self._key(session_id)
+        if self._cache is not None:
+            version = await pipe.hget(key, VERSION_FIELD)
+            if version is None:
+                self._cache.invalidate(session_id)
+                return None
+            cached = self._cache.get(session_id, int(version))
+            if cached is not None:
+                return cached
+
+        meta = parse_session_fields(await pipe.hgetall(key))
+        return await self._hydrate(meta) if meta is not None else None
+
+    async def _release_all(self, content_hashes: list[str]) -> None:
+        """Release one reference per entry of ``content_hashes``."""
+        for content_hash in content_hashes:
+            await self._documents.release(content_hash)
+
+    async def create(self, *, documents_results: list[DocumentResult]) -> Session:
+        """
+        Create and persist a new session.
+
+        Parameters
+        ----------
+        documents_results : list[DocumentResult]
+            Parsed/normalized document results.
+
+        Returns
+        -------
+        Session
+            Newly created session.
+        """
+        now = datetime.now(UTC)
+        results, _, _ = await acquire_new_refs_async(self._documents, [], documents_results)
+        session = Session(session_id=uuid4().hex, created_at=now, updated_at=now, documents_results=results)
+
+        async with self._r.pipeline(transaction=True) as pipe:
+            self._write(pipe, session, previous=None)
+            version = (await pipe.execute())[-2]
+        self._remember(session, version)
+        return session
+
+    async def get(self, session_id: str) -> Session | None:
+        """
+        Retrieve a session, sliding its TTL and the TTL of its documents.
+
+        Parameters
+        ----------
+        session_id : str
+            Session identifier.
+
+        Returns
+        -------
+        Session | None
+            The session if found; otherwise None.
+        """
+        if self._cache is not None:
+            version = await self._read_version(session_id)
+            if version is None:
+                self._cache.invalidate(session_id)
+                return None
+            cached = self._cache.get(session_id, version)
+            if cached is not None:
+                await self._documents.touch(dr.content_hash for dr in cached.documents_results)
+                return cached
+
+        loaded = await self._read_meta(session_id)
+        if loaded is None:
+            return None
+        meta, version = loaded
+        session = await self._hydrate(meta)
+        if session is not None:
+            self._remember(session, version)
+        return session
+
+    async def get_meta(self, session_id: str) -> SessionMeta | None:
+        """
+        Retrieve a session's metadata without loading document payloads.
+
+        Parameters
+        ----------
+        session_id : str
+            Session identifier.
+
+        Returns
+        -------
+        SessionMeta | None
+            The session metadata if found; otherwise None.
+        """
+        loaded = await self._read_meta(session_id)
+        if loaded is None:
+            return None
+        meta, _ = loaded
+        await self._documents.touch(m.content_hash for m in meta.documents_meta)
+        return meta
+
+    async def save(self, session: Session) -> Session:
+        """
+        Update an existing session in Redis.
+
+        Parameters
+        ----------
+        session : Session
+            The session instance to update. Must have a valid session_id.
+
+        Returns
+        -------
+        Session
+            The updated session instance.
+        """
+        loaded = await self._read_meta(session.session_id)
+        previous = loaded[0] if loaded is not None else None
+        before = previous.documents_meta if previous is not None else []
+        session.documents_results, _, released = await acquire_new_refs_async(
+            self._documents, before, session.documents_results
+        )
+        await self._release_all(released)
+
+        session.updated_at = datetime.now(UTC)
+        async with self._r.pipeline(transaction=True) as pipe:
+            self._write(pipe, session, previous=previous)
+            version = (await pipe.execute())[-2]
+        self._remember(session, version)
+        return session
+
+    async def mutate(self, session_id: str, fn: Callable[[Session], Session]) -> Session | None:
+        """
+        Atomically fetch and update a session.
+
+        Parameters
+        ----------
+        session_id : str
+            Session identifier.
+        fn : Callable[[Session], Session]
+            A function that takes the current session state and returns an updated session.
+
+        Returns
+        -------
+        Session | None
+            The updated session if it exists; otherwise None.
+
+        Notes
+        -----
+        Optimistic ``WATCH``/``MULTI`` transaction with a few retries, as in
+        :meth:`diff_fuse.state.redis_session_repo.RedisSessionRepo.mutate`.
+        """
+        key = self._key(session_id)
+
+        for _ in range(5):  # small retry loop
+            acquired: list[str] = []
+            async with self._r.pipeline(transaction=True) as pipe:
+                try:
+                    await pipe.watch(key)
+                    session = await self._load_watched(pipe, session_id)
+                    if session is None:
+                        await pipe.unwatch()
+                        return None
+                    meta = session.to_meta()
+
+                    session = fn(session)
+                    session.updated_at = datetime.now(UTC)
+
+                    session.documents_results, acquired, released = await acquire_new_refs_async(
+                        self._documents, meta.documents_meta, session.documents_results
+                    )
+
+                    pipe.multi()
+                    self._write(pipe, session, previous=meta)
+                    version = (await pipe.execute())[-2]
+                except WatchError:
+                    # someone else updated it: undo our acquisitions and retry
+                    await self._release_all(acquired)
+                    continue
+
+                await self._release_all(released)
+                self._remember(session, version)
+                return session
+
+        raise RuntimeError("Failed to update session due to repeated concurrent modifications")
+
+    async def append_documents(
+        self, session_id: str, documents_results: list[DocumentResult], limits: SessionLimits | None = None
+    ) -> SessionMeta | None:
+        """
+        Atomically append documents to a session with one server-side script.
+
+        Parameters
+        ----------
+        session_id : str
+            Session identifier.
+        documents_results : list[DocumentResult]
+            Documents to append, in order.
+        limits : SessionLimits | None, default=None
+            Limits checked by the script, against the metadata it appends to.
+
+        Returns
+        -------
+        SessionMeta | None
+            The updated session metadata, or None if the session does not exist.
+
+        Raises
+        ------
+        DomainValidationError
+            If a document id is already used in the session.
+        LimitsExceededError
+            If the session would exceed ``limits`` (nothing is written).
+
+        Notes
+        -----
+        Payloads are stored before the script runs, so the session never
+        references a missing document; they are released again if the script
+        writes nothing. No ``WATCH`` is involved: concurrent appends to the
+        same session never conflict or retry.
+        """
+        now = datetime.now(UTC)
+        results, acquired, _ = await acquire_new_refs_async(self._documents, [], documents_results)
+        args = append_documents_args(self._ttl, now, [dr.to_meta() for dr in results], limits)
+
+        try:
+            loaded = parse_append_reply(await self._append(keys=[self._key(session_id)], args=args), limits)
+        except Exception:
+            await self._release_all(acquired)
+            raise
+        if loaded is None:
+            await self._release_all(acquired)
+            return None
+
+        meta, version = loaded
+        await self._documents.touch(m.content_hash for m in meta.documents_meta)
+        if self._cache is not None:
+
+            def _apply(session: Session) -> Session:
+                session = append_documents_to(session, results)
+                session.updated_at = meta.updated_at
+                return session
+
+            self._cache.advance(session_id, version, _apply)
+        return meta
+
+    async def remove_document(self, session_id: str, doc_id: str) -> SessionMeta | None:
+        """
+        Atomically remove one document from a session with one server-side script.
+
+        Parameters
+        ----------
+        session_id : str
+            Session identifier.
+        doc_id : str
+            Document to remove.
+
+        Returns
+        -------
+        SessionMeta | None
+            The updated session metadata, or None if the session does not exist.
+
+        Raises
+        ------
+        DomainValidationError
+            If the document is not in the session, or is its last document.
+        """
+        reply = await self._remove(
+            keys=[self._key(session_id)], args=[self._ttl, datetime.now(UTC).isoformat(), doc_id]
+        )
+        loaded = parse_remove_reply(reply, doc_id)
+        if loaded is None:
+            return None
+
+        meta, version, removed = loaded
+        await self._documents.release(removed.content_hash)
+        await self._documents.touch(m.content_hash for m in meta.documents_meta)
+        if self._cache is not None:
+
+            def _apply(session: Session) -> Session:
+                session = remove_document_from(session, doc_id)
+                session.updated_at = meta.updated_at
+                return session
+
+            self._cache.advance(session_id, version, _apply)
+        return meta
+
+    async def find_document(self, content_hash: str) -> StoredDocument | None:
+        """
+        Look up an already stored document by content hash.
+
+        Parameters
+        ----------
+        content_hash : str
+            Content address of the document.
+
+        Returns
+        -------
+        StoredDocument | None
+            The stored payload if it has not expired; otherwise None.
+        """
+        return await self._documents.get(content_hash)
+
+    async def find_documents(self, content_hashes: list[str]) -> list[StoredDocument | None]:
+        """Look up several stored documents in one pipelined round trip (per cluster node)."""
+        return await self._documents.get_many(content_hashes)
+
+    async def cleanup(self) -> int:
+        """No-op: Redis expires sessions natively. Always returns 0."""
+        return 0
+
+    def stats(self) -> dict[str, int]:
+        """
+        Report the per-process session cache counters.
+
+        Returns
+        -------
+        dict[str, int]
+            Cache hits, misses, cached sessions and tiering counters (see
+            :meth:`SessionCache.stats`); all zero when the cache is disabled.
+        """
+        if self._cache is None:
+            return SessionCache(0).stats()
+        return self._cache.stats()
+
+    @property
+    def cache(self) -> SessionCache | None:
+        """The per-process session cache, if enabled."""
+        return self._cache
+
+    async def ping(self) -> bool:
+        """Check that Redis is reachable."""
+        return bool(await self._r.ping())
+
+    async def close(self) -> None:
+        """Close the client and disconnect its connection pool."""
+        await self._r.aclose()
@@ -0,0 +1,169 @@
+"""
+Binary codec for stored documents.
+
+Persistent backends used to store documents with ``model_dump_json`` and read
+them back with ``model_validate_json``. That validates the ``Any``-typed
+normalized tree node by node on every read and stores raw and normalized text
+uncompressed. This module provides a compact, versioned alternative.
+
+Wire format
+-----------
+``b"DF" | version (1 byte) | flags (1 byte) | body``
+
+- ``version``: codec version, currently ``1``.
+- ``flags``: low nibble is the compression (``0`` none, ``1`` zlib,
+  ``2`` zstd); bit ``0x10`` marks a body written with the standard library
+  ``json`` module instead of orjson (see below).
+- ``body``: JSON object with the :class:`StoredDocument` fields, compressed
+  as declared by the flags.
+
+Notes
+-----
+- Decoding builds the model with ``model_construct``: stored payloads were
+  validated when they were first written, so ``normalized`` is not walked again.
+- orjson rejects strings with lone surrogates, which JSON request bodies can
+  carry through escaped surrogate code points. Such payloads fall back to the
+  standard library encoder.
+- Payloads that do not start with the magic bytes are decoded as legacy
+  Pydantic JSON, so data written before this codec existed stays readable.
+- zstd requires the optional ``zstandard`` package; zlib is used otherwise.
+"""
+
+from __future__ import annotations
+
+import json
+import zlib
+
+import orjson
+
+from diff_fuse.models.document import DocumentFormat, StoredDocument
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+MAGIC = b"DF"
+VERSION = 1
+
+COMPRESSION_NONE = 0
+COMPRESSION_ZLIB = 1
+COMPRESSION_ZSTD = 2
+
+_COMPRESSION_MASK = 0x0F
+_FLAG_STDLIB_JSON = 0x10
+
+# Below this size, compression framing costs more than it saves.
+_MIN_COMPRESS_BYTES = 256
+
+
+def default_compression() -> int:
+    """
+    Return the best compression available in this environment.
+
+    Returns
+    -------
+    int
+        :data:`COMPRESSION_ZSTD` when ``zstandard`` is installed, else
+        :data:`COMPRESSION_ZLIB`.
+    """
+    return COMPRESSION_ZSTD if zstandard is not None else COMPRESSION_ZLIB
+
+
+def _compress(body: bytes, compression: int) -> bytes:
+    if compression == COMPRESSION_ZSTD:
+        assert zstandard is not None
+        return zstandard.ZstdCompressor(level=3).compress(body)
+    if compression == COMPRESSION_ZLIB:
+        return zlib.compress(body, 6)
+    return body
+
+
+def _decompress(body: bytes, compression: int) -> bytes:
+    if compression == COMPRESSION_ZSTD:
+        if zstandard is None:
+            raise ValueError("Payload is zstd-compressed but the 'zstandard' package is not installed")
+        return zstandard.ZstdDecompressor().decompress(body)
+    if compression == COMPRESSION_ZLIB:
+        return zlib.decompress(body)
+    if compression == COMPRESSION_NONE:
+        return body
+    raise ValueError(f"Unknown compression id {compression}")
+
+
+def encode_document(document: StoredDocument, *, compression: int | None = None) -> bytes:
+    """
+    Serialize a stored document to the binary wire format.
+
+    Parameters
+    ----------
+    document : StoredDocument
+        Document to encode.
+    compression : int | None, default=None
+        One of the ``COMPRESSION_*`` constants. Defaults to
+        :func:`default_compression`.
+
+    Returns
+    -------
+    bytes
+        Encoded payload.
+    """
+    fields = {
+        "content_hash": document.content_hash,
+        "format": document.format.value,
+        "ok": document.ok,
+        "error": document.error,
+        "size_chars": document.size_chars,
+        "approx_bytes": document.approx_bytes,
+        "raw": document.raw,
+        "normalized": document.normalized,
+    }
+
+    flags = 0
+    try:
+        body = orjson.dumps(fields)
+    except TypeError:
+        body = json.dumps(fields, ensure_ascii=True, separators=(",", ":")).encode("ascii")
+        flags |= _FLAG_STDLIB_JSON
+
+    if compression is None:
+        compression = default_compression()
+    if len(body) < _MIN_COMPRESS_BYTES:
+        compression = COMPRESSION_NONE
+    flags |= compression
+
+    return MAGIC + bytes((VERSION, flags)) + _compress(body, compression)
+
+
+def decode_document(payload: bytes) -> StoredDocument:
+    """
+    Deserialize a payload written by :func:`encode_document`.
+
+    Parameters
+    ----------
+    payload : bytes
+        Encoded payload, or legacy Pydantic JSON.
+
+    Returns
+    -------
+    StoredDocument
+        The decoded document. ``normalized`` is not re-validated.
+
+    Raises
+    ------
+    ValueError
+        If the payload uses an unknown codec version or compression.
+    """
+    if not payload.startswith(MAGIC):
+        return StoredDocument.model_validate_json(payload)
+
+    version, flags = payload[2], payload[3]
+    if version != VERSION:
+        raise ValueError(f"Unsupported document codec version {version}")
+
+    body = _decompress(payload[4:], flags & _COMPRESSION_MASK)
+    fields = json.loads(body) if flags & _FLAG_STDLIB_JSON else orjson.loads(body)
+    fields["format"] = DocumentFormat(fields["format"])
+    fields.setdefault("size_chars", len(fields["raw"] or ""))
+    fields.setdefault("approx_bytes", 0)
+    return StoredDocument.model_construct(**fields)
@@ -0,0 +1,154 @@
+"""
+Per-process cache of computed diff trees.
+
+A client typically diffs a session, then asks for merge previews and an export
+of the very same diff. Each of those used to rebuild the tree from scratch.
+This module keeps recently built trees for a short time, keyed by their diff
+id (see :func:`diff_fuse.domain.fingerprint.diff_fingerprint`), so follow-up
+requests can reference a diff instead of recomputing it.
+
+Entries remember which documents they were built from. A lookup names the
+session's current documents and misses when they differ, so a handle never
+outlives a change to the session it came from.
+
+Entries also keep the normalized documents themselves, so that merges of a
+cached tree can copy unchanged subtrees from them (see
+:mod:`diff_fuse.domain.merge`) without loading the session again.
+
+Notes
+-----
+The cache is per process: with several workers, a request landing on another
+worker misses and the caller rebuilds the tree. Trees are shared between
+callers and must be treated as immutable.
+"""
+
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from threading import Lock
+
+from diff_fuse.models.diff import DiffNode
+from diff_fuse.models.document import ValueInput
+
+
+@dataclass(slots=True)
+class _Entry:
+    """A cached diff tree and the documents it was built from."""
+
+    root: DiffNode
+    documents: tuple[tuple[str, str], ...]
+    expires_at: float
+    sources: dict[str, ValueInput]
+
+
+class DiffCache:
+    """
+    Thread-safe LRU cache of diff trees with a sliding TTL.
+
+    Parameters
+    ----------
+    max_entries : int
+        Maximum number of cached trees. ``0`` disables caching.
+    ttl_seconds : float
+        How long an unused tree is kept. Every hit extends it.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float) -> None:
+        self._max = max(0, int(max_entries))
+        self._ttl = max(0.0, float(ttl_seconds))
+        self._lock = Lock()
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, diff_id: str, documents: tuple[tuple[str, str], ...]) -> DiffNode | None:
+        """
+        Return the cached tree for ``diff_id`` if it was built from ``documents``.
+
+        Parameters
+        ----------
+        diff_id : str
+            Diff identifier.
+        documents : tuple[tuple[str, str], ...]
+            ``(doc_id, content_hash)`` of the session's current documents.
+
+        Returns
+        -------
+        DiffNode | None
+            The cached root, or None if absent, expired or built from other
+            documents.
+        """
+        hit = self.lookup(diff_id, documents)
+        return None if hit is None else hit[0]
+
+    def lookup(
+        self, diff_id: str, documents: tuple[tuple[str, str], ...]
+    ) -> tuple[DiffNode, dict[str, ValueInput]] | None:
+        """
+        Return the cached tree for ``diff_id`` and the documents it was built from.
+
+        Parameters
+        ----------
+        diff_id : str
+            Diff identifier.
+        documents : tuple[tuple[str, str], ...]
+            ``(doc_id, content_hash)`` of the session's current documents.
+
+        Returns
+        -------
+        tuple[DiffNode, dict[str, ValueInput]] | None
+            The cached root and the normalized documents (``doc_id ->
+            (present, value)``), or None if absent, expired or built from
+            other documents.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(diff_id)
+            if entry is None or entry.expires_at <= now or entry.documents != documents:
+                if entry is not None and entry.expires_at <= now:
+                    del self._entries[diff_id]
+                self.misses += 1
+                return None
+            entry.expires_at = now + self._ttl
+            self._entries.move_to_end(diff_id)
+            self.hits += 1
+            return entry.root, entry.sources
+
+    def put(
+        self,
+        diff_id: str,
+        root: DiffNode,
+        documents: tuple[tuple[str, str], ...],
+        sources: dict[str, ValueInput],
+    ) -> None:
+        """
+        Cache a freshly built tree.
+
+        Parameters
+        ----------
+        diff_id : str
+            Diff identifier.
+        root : DiffNode
+            Root of the tree.
+        documents : tuple[tuple[str, str], ...]
+            ``(doc_id, content_hash)`` of the documents it was built from.
+        sources : dict[str, ValueInput]
+            The normalized documents themselves, kept for merges.
+        """
+        if self._max == 0 or self._ttl == 0:
+            return
+        entry = _Entry(root=root, documents=documents, expires_at=time.monotonic() + self._ttl, sources=sources)
+        with self._lock:
+            self._entries[diff_id] = entry
+            self._entries.move_to_end(diff_id)
+            while len(self._entries) > self._max:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def stats(self) -> dict[str, int]:
+        """Report hit/miss counters and the number of cached trees."""
+        with self._lock:
+            return {"diff_cache_hits": self.hits, "diff_cache_misses": self.misses, "cached_diffs": len(self._entries)}
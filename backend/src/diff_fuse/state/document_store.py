@@ -0,0 +1,311 @@
+"""
+Content-addressed document storage abstractions.
+
+Sessions frequently share documents: a CI job may compare the same baseline
+against hundreds of candidates. Instead of storing the raw text and the
+normalized structure once per session, documents are stored once under their
+content hash (see :func:`diff_fuse.domain.fingerprint.document_content_hash`)
+and sessions keep only references.
+
+Lifecycle
+---------
+- A session repository *acquires* a document for every reference it stores
+  and *releases* it when the reference goes away (document removed, session
+  deleted or expired).
+- A document is dropped once no reference remains.
+- Backends with native key expiry (Redis) additionally attach a TTL to each
+  document and refresh it whenever a referencing session is touched, so a
+  document is released at the latest when the last session referencing it
+  expires.
+"""
+
+from collections import Counter
+from collections.abc import Iterable, Sequence
+from typing import Protocol
+
+from diff_fuse.models.document import DocumentMeta, DocumentResult, StoredDocument
+from diff_fuse.models.session import Session, SessionMeta
+
+
+class DocumentStore(Protocol):
+    """
+    Storage interface for content-addressed documents.
+
+    Implementations must be safe to share between concurrently used sessions.
+    Stored documents are immutable: a content hash always maps to the same
+    payload.
+    """
+
+    def get(self, content_hash: str) -> StoredDocument | None:
+        """
+        Fetch a stored document.
+
+        Parameters
+        ----------
+        content_hash : str
+            Content address of the document.
+
+        Returns
+        -------
+        StoredDocument | None
+            The stored payload, or None if no session references it anymore.
+        """
+        ...
+
+    def get_many(self, content_hashes: list[str], *, refresh_ttl: bool = False) -> list[StoredDocument | None]:
+        """
+        Fetch several stored documents in one round trip where possible.
+
+        Parameters
+        ----------
+        content_hashes : list[str]
+            Content addresses to fetch.
+        refresh_ttl : bool, default=False
+            Also extend the lifetime of the fetched documents, as :meth:`touch`
+            would, in the same round trip.
+
+        Returns
+        -------
+        list[StoredDocument | None]
+            One entry per requested hash, in request order.
+        """
+        ...
+
+    def acquire(self, document: StoredDocument) -> StoredDocument:
+        """
+        Store a document if needed and add one reference to it.
+
+        Parameters
+        ----------
+        document : StoredDocument
+            Payload to store. Ignored if an identical hash is already stored.
+
+        Returns
+        -------
+        StoredDocument
+            The canonical stored instance. In-process backends return the
+            already-stored instance, so all sessions share one object graph.
+        """
+        ...
+
+    def release(self, content_hash: str) -> None:
+        """
+        Drop one reference to a document, deleting it when none remain.
+
+        Parameters
+        ----------
+        content_hash : str
+            Content address of the document.
+        """
+        ...
+
+    def touch(self, content_hashes: Iterable[str]) -> None:
+        """
+        Extend the lifetime of documents referenced by an accessed session.
+
+        Parameters
+        ----------
+        content_hashes : Iterable[str]
+            Content addresses referenced by the session.
+
+        Notes
+        -----
+        A no-op for backends that only rely on reference counts.
+        """
+        ...
+
+
+class AsyncDocumentStore(Protocol):
+    """
+    Asynchronous variant of :class:`DocumentStore`, for network backends.
+
+    Methods have the same semantics as their :class:`DocumentStore`
+    counterparts.
+    """
+
+    async def get(self, content_hash: str) -> StoredDocument | None:
+        """Return the stored document for ``content_hash``, if any."""
+        ...
+
+    async def get_many(self, content_hashes: list[str], *, refresh_ttl: bool = False) -> list[StoredDocument | None]:
+        """Return the stored documents for ``content_hashes``, in order."""
+        ...
+
+    async def acquire(self, document: StoredDocument) -> StoredDocument:
+        """Store ``document`` if absent, add a reference and return the canonical copy."""
+        ...
+
+    async def release(self, content_hash: str) -> None:
+        """Drop one reference to a document."""
+        ...
+
+    async def touch(self, content_hashes: Iterable[str]) -> None:
+        """Extend the lifetime of documents referenced by an accessed session."""
+        ...
+
+
+def _plan_ref_changes(before: Sequence[DocumentMeta], after: list[DocumentResult]) -> tuple[list[bool], list[str]]:
+    """
+    Decide which documents of ``after`` need a new reference.
+
+    Returns one flag per entry of ``after`` (True if it must be acquired) and
+    the content hashes whose references should be released.
+    """
+    remaining = Counter(dr.content_hash for dr in before)
+    needed: list[bool] = []
+    for dr in after:
+        if remaining[dr.content_hash] > 0:
+            remaining[dr.content_hash] -= 1
+            needed.append(False)
+        else:
+            needed.append(True)
+    released = [h for h, count in remaining.items() for _ in range(count)]
+    return needed, released
+
+
+def acquire_new_refs(
+    store: DocumentStore,
+    before: Sequence[DocumentMeta],
+    after: list[DocumentResult],
+) -> tuple[list[DocumentResult], list[str], list[str]]:
+    """
+    Acquire references for documents added by a change, without releasing.
+
+    This is the first half of :func:`sync_document_refs`, for backends that
+    must publish the new session state between acquiring and releasing (so a
+    concurrent reader never sees a session referencing a missing document).
+
+    Parameters
+    ----------
+    store : DocumentStore
+        Store to update.
+    before : Sequence[DocumentMeta]
+        Documents referenced before the change (metadata is enough).
+    after : list[DocumentResult]
+        Documents referenced after the change.
+
+    Returns
+    -------
+    tuple[list[DocumentResult], list[str], list[str]]
+        - ``after``, with newly acquired documents rebound to the canonical
+          stored payload
+        - content hashes acquired (one entry per new reference)
+        - content hashes whose references should now be released
+    """
+    needed, released = _plan_ref_changes(before, after)
+    out: list[DocumentResult] = []
+    acquired: list[str] = []
+
+    for dr, need in zip(after, needed, strict=True):
+        if not need:
+            out.append(dr)
+            continue
+
+        stored = store.acquire(dr.to_stored())
+        acquired.append(dr.content_hash)
+        out.append(DocumentResult.from_stored(stored, doc_id=dr.doc_id, name=dr.name))
+
+    return out, acquired, released
+
+
+async def acquire_new_refs_async(
+    store: AsyncDocumentStore,
+    before: Sequence[DocumentMeta],
+    after: list[DocumentResult],
+) -> tuple[list[DocumentResult], list[str], list[str]]:
+    """
+    Asynchronous variant of :func:`acquire_new_refs`.
+
+    Parameters
+    ----------
+    store : AsyncDocumentStore
+        Store to update.
+    before : Sequence[DocumentMeta]
+        Documents referenced before the change.
+    after : list[DocumentResult]
+        Documents referenced after the change.
+
+    Returns
+    -------
+    tuple[list[DocumentResult], list[str], list[str]]
+        Same as :func:`acquire_new_refs`.
+    """
+    needed, released = _plan_ref_changes(before, after)
+    out: list[DocumentResult] = []
+    acquired: list[str] = []
+
+    for dr, need in zip(after, needed, strict=True):
+        if not need:
+            out.append(dr)
+            continue
+
+        stored = await store.acquire(dr.to_stored())
+        acquired.append(dr.content_hash)
+        out.append(DocumentResult.from_stored(stored, doc_id=dr.doc_id, name=dr.name))
+
+    return out, acquired, released
+
+
+def sync_document_refs(
+    store: DocumentStore,
+    before: Sequence[DocumentMeta],
+    after: list[DocumentResult],
+) -> list[DocumentResult]:
+    """
+    Reconcile store references after a session's documents changed.
+
+    Documents present in ``after`` but not in ``before`` are acquired, and
+    documents no longer referenced are released. References are counted per
+    occurrence, so a session holding the same content twice holds two
+    references.
+
+    Parameters
+    ----------
+    store : DocumentStore
+        Store to update.
+    before : Sequence[DocumentMeta]
+        Documents referenced before the change (empty for a new session).
+    after : list[DocumentResult]
+        Documents referenced after the change.
+
+    Returns
+    -------
+    list[DocumentResult]
+        ``after``, with newly acquired documents rebound to the canonical
+        stored payload so that identical documents share one object graph.
+    """
+    out, _, released = acquire_new_refs(store, before, after)
+    for content_hash in released:
+        store.release(content_hash)
+    return out
+
+
+def hydrate_session(meta: SessionMeta, stored_docs: Sequence[StoredDocument | None]) -> Session | None:
+    """
+    Combine session metadata with the stored payloads of its documents.
+
+    Parameters
+    ----------
+    meta : SessionMeta
+        Session metadata.
+    stored_docs : Sequence[StoredDocument | None]
+        Payloads for ``meta.documents_meta``, in the same order (as returned
+        by :meth:`DocumentStore.get_many`).
+
+    Returns
+    -------
+    Session | None
+        The full session, or None if a referenced document is missing.
+    """
+    documents_results: list[DocumentResult] = []
+    for m, stored in zip(meta.documents_meta, stored_docs, strict=True):
+        if stored is None:
+            return None
+        documents_results.append(DocumentResult.from_stored(stored, doc_id=m.doc_id, name=m.name))
+
+    return Session(
+        session_id=meta.session_id,
+        created_at=meta.created_at,
+        updated_at=meta.updated_at,
+        documents_results=documents_results,
+    )
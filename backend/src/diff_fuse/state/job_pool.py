@@ -0,0 +1,145 @@
+"""
+Bounded worker pool for background jobs.
+
+Background jobs (see :mod:`diff_fuse.services.job_service`) run on a
+dedicated, fixed-size thread pool, so long diffs neither occupy the threads
+serving requests nor pile up without limit: a process accepts at most
+``max_pending`` queued and running jobs and refuses more with
+:class:`diff_fuse.domain.errors.JobQueueFullError`.
+
+Every job gets a :class:`threading.Event` set when the job is cancelled in
+this process. Jobs check it, together with the job store's cancellation flag,
+whenever they report progress.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from threading import Event, Lock
+
+from diff_fuse.domain.errors import JobQueueFullError
+
+
+class JobPool:
+    """
+    Fixed-size thread pool with a bounded queue and per-job cancellation events.
+
+    Parameters
+    ----------
+    workers : int
+        Number of jobs run concurrently.
+    max_pending : int
+        Maximum number of queued and running jobs (at least ``workers``).
+    """
+
+    def __init__(self, workers: int, max_pending: int) -> None:
+        self._workers = max(1, int(workers))
+        self._max_pending = max(self._workers, int(max_pending))
+        self._executor = ThreadPoolExecutor(max_workers=self._workers, thread_name_prefix="diff-fuse-job")
+        self._lock = Lock()
+        self._jobs: dict[str, tuple[Future[None], Event]] = {}
+
+    def _run(self, job_id: str, fn: Callable[[Event], object], cancelled: Event) -> None:
+        """Run a job and forget it once it is done."""
+        try:
+            fn(cancelled)
+        finally:
+            with self._lock:
+                self._jobs.pop(job_id, None)
+
+    def submit(self, job_id: str, fn: Callable[[Event], object]) -> None:
+        """
+        Queue a job.
+
+        Parameters
+        ----------
+        job_id : str
+            Job identifier, for :meth:`cancel`.
+        fn : Callable[[threading.Event], object]
+            The job. It receives its cancellation event and is expected to
+            handle its own errors.
+
+        Raises
+        ------
+        JobQueueFullError
+            If ``max_pending`` jobs are already queued or running.
+        """
+        cancelled = Event()
+        with self._lock:
+            if len(self._jobs) >= self._max_pending:
+                raise JobQueueFullError(self._max_pending)
+            future = self._executor.submit(self._run, job_id, fn, cancelled)
+            self._jobs[job_id] = (future, cancelled)
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Cancel a job of this process.
+
+        Parameters
+        ----------
+        job_id : str
+            Job identifier.
+
+        Returns
+        -------
+        bool
+            True if the job was still queued and has been dropped: it will
+            never run, so the caller must record its cancellation. False if
+            it is running (its event is set, it stops at its next check), or
+            not known to this process.
+        """
+        with self._lock:
+            entry = self._jobs.get(job_id)
+            if entry is None:
+                return False
+            future, cancelled = entry
+            cancelled.set()
+            if future.cancel():
+                del self._jobs[job_id]
+                return True
+            return False
+
+    def stats(self) -> dict[str, int]:
+        """
+        Return the pool's counters.
+
+        Returns
+        -------
+        dict[str, int]
+            ``jobs_running`` and ``jobs_queued`` in this process.
+        """
+        with self._lock:
+            running = sum(1 for future, _ in self._jobs.values() if future.running())
+            return {"jobs_running": running, "jobs_queued": len(self._jobs) - running}
+
+    def drop_queued(self) -> list[str]:
+        """
+        Drop every job that has not started yet.
+
+        Returns
+        -------
+        list[str]
+            The dropped jobs. They will never run, so the caller must record
+            their cancellation (see :meth:`cancel`).
+        """
+        dropped = []
+        with self._lock:
+            for job_id, (future, cancelled) in list(self._jobs.items()):
+                if future.cancel():
+                    cancelled.set()
+                    del self._jobs[job_id]
+                    dropped.append(job_id)
+        return dropped
+
+    def shutdown(self) -> None:
+        """
+        Cancel every job and release the worker threads without waiting for them.
+
+        Jobs still queued are dropped without a trace; call
+        :meth:`drop_queued` first to record their outcome.
+        """
+        with self._lock:
+            for _, cancelled in self._jobs.values():
+                cancelled.set()
+        self._executor.shutdown(wait=False, cancel_futures=True)
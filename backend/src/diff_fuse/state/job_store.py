@@ -0,0 +1,98 @@
+"""
+Background job storage abstraction.
+
+Job status records and results (see :mod:`diff_fuse.models.job`) are kept in
+the same backend as sessions, so that any worker process can report on, or
+cancel, a job running in another one:
+
+- :class:`diff_fuse.state.memory_job_store.MemoryJobStore` (single process);
+- :class:`diff_fuse.state.sqlite_job_store.SqliteJobStore` (processes of one
+  host, on the sessions database);
+- :class:`diff_fuse.state.redis_job_store.RedisJobStore` (any deployment).
+
+Records and results expire like sessions: every write gives the job a fresh
+session TTL.
+
+Cancellation
+------------
+The cancellation flag is stored apart from the record, so that a worker
+updating a running job's progress cannot overwrite a cancellation requested
+through another worker. :meth:`JobStore.save` reports the flag back, which
+lets a running job notice cancellation at every progress update.
+"""
+
+from typing import Protocol
+
+from diff_fuse.models.job import Job
+
+
+class JobStore(Protocol):
+    """Storage interface for background job records and results."""
+
+    def save(self, job: Job, *, result: bytes | None = None) -> bool:
+        """
+        Store a job record, and optionally its result, refreshing its expiry.
+
+        Parameters
+        ----------
+        job : Job
+            Record to store; its ``cancel_requested`` field is ignored.
+        result : bytes | None, default=None
+            Encoded result body, for a succeeded job.
+
+        Returns
+        -------
+        bool
+            Whether cancellation of the job has been requested.
+        """
+        ...
+
+    def get(self, job_id: str) -> Job | None:
+        """
+        Fetch a job record.
+
+        Parameters
+        ----------
+        job_id : str
+            Job identifier.
+
+        Returns
+        -------
+        Job | None
+            The record with ``cancel_requested`` filled in, or None if the job
+            does not exist or has expired.
+        """
+        ...
+
+    def get_result(self, job_id: str) -> bytes | None:
+        """
+        Fetch the result of a succeeded job.
+
+        Parameters
+        ----------
+        job_id : str
+            Job identifier.
+
+        Returns
+        -------
+        bytes | None
+            Encoded result body, or None if there is none (yet).
+        """
+        ...
+
+    def request_cancel(self, job_id: str) -> Job | None:
+        """
+        Flag a job for cancellation.
+
+        Parameters
+        ----------
+        job_id : str
+            Job identifier.
+
+        Returns
+        -------
+        Job | None
+            The updated record, or None if the job does not exist or has
+            expired.
+        """
+        ...
@@ -0,0 +1,171 @@
+"""
+Locking primitives for in-process session state.
+
+A single repository-wide lock serializes every request, even requests for
+unrelated sessions. This module provides finer-grained primitives:
+
+- :class:`RWLock`: a readers/writer lock. Any number of readers may hold it
+  at once; a writer holds it exclusively. Waiting writers block new readers,
+  so a steady stream of reads cannot starve a mutation.
+- :class:`KeyedRWLock`: one :class:`RWLock` per key (e.g. per session id),
+  created on demand and discarded once unused. The table of locks is itself
+  split into stripes, each guarded by its own mutex, so looking up the lock
+  of one key never contends with lookups of keys in other stripes.
+
+Notes
+-----
+Locks are not reentrant: a thread holding a read lock must not try to take
+the write lock of the same key (or vice versa).
+"""
+
+from collections.abc import Iterator
+from contextlib import contextmanager
+from threading import Condition, Lock
+
+
+class RWLock:
+    """
+    Writer-preferring readers/writer lock.
+
+    Notes
+    -----
+    Use the :meth:`read` and :meth:`write` context managers rather than the
+    acquire/release methods directly.
+    """
+
+    def __init__(self) -> None:
+        self._cond = Condition(Lock())
+        self._readers = 0
+        self._writer = False
+        self._waiting_writers = 0
+
+    def acquire_read(self) -> None:
+        """Block until no writer holds or waits for the lock, then take a read hold."""
+        with self._cond:
+            while self._writer or self._waiting_writers:
+                self._cond.wait()
+            self._readers += 1
+
+    def release_read(self) -> None:
+        """Release a read hold."""
+        with self._cond:
+            self._readers -= 1
+            if self._readers == 0:
+                self._cond.notify_all()
+
+    def acquire_write(self) -> None:
+        """Block until the lock is free, then take it exclusively."""
+        with self._cond:
+            self._waiting_writers += 1
+            try:
+                while self._writer or self._readers:
+                    self._cond.wait()
+            finally:
+                self._waiting_writers -= 1
+            self._writer = True
+
+    def release_write(self) -> None:
+        """Release the exclusive hold."""
+        with self._cond:
+            self._writer = False
+            self._cond.notify_all()
+
+    @contextmanager
+    def read(self) -> Iterator[None]:
+        """Hold the lock for reading within a ``with`` block."""
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+
+    @contextmanager
+    def write(self) -> Iterator[None]:
+        """Hold the lock for writing within a ``with`` block."""
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
+
+
+class KeyedRWLock:
+    """
+    Per-key readers/writer locks behind a striped lock table.
+
+    Parameters
+    ----------
+    stripes : int, default=64
+        Number of independently guarded partitions of the lock table.
+
+    Notes
+    -----
+    A key's lock exists only while some thread holds or waits for it, so the
+    table does not grow with the number of keys ever seen.
+    """
+
+    def __init__(self, stripes: int = 64) -> None:
+        n = max(1, int(stripes))
+        self._guards = [Lock() for _ in range(n)]
+        # key -> [lock, number of threads holding or waiting for it]
+        self._tables: list[dict[str, list]] = [{} for _ in range(n)]
+
+    def _stripe(self, key: str) -> int:
+        """Return the stripe index of ``key``."""
+        return hash(key) % len(self._guards)
+
+    def _checkout(self, key: str) -> RWLock:
+        """Return the lock of ``key``, registering the caller as a user."""
+        i = self._stripe(key)
+        with self._guards[i]:
+            entry = self._tables[i].get(key)
+            if entry is None:
+                entry = self._tables[i][key] = [RWLock(), 0]
+            entry[1] += 1
+            return entry[0]
+
+    def _checkin(self, key: str) -> None:
+        """Unregister the caller; discard the lock once nobody uses it."""
+        i = self._stripe(key)
+        with self._guards[i]:
+            entry = self._tables[i][key]
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self._tables[i][key]
+
+    @contextmanager
+    def read(self, key: str) -> Iterator[None]:
+        """
+        Hold the read lock of ``key`` within a ``with`` block.
+
+        Parameters
+        ----------
+        key : str
+            Lock key (e.g. a session id).
+        """
+        lock = self._checkout(key)
+        try:
+            with lock.read():
+                yield
+        finally:
+            self._checkin(key)
+
+    @contextmanager
+    def write(self, key: str) -> Iterator[None]:
+        """
+        Hold the write lock of ``key`` within a ``with`` block.
+
+        Parameters
+        ----------
+        key : str
+            Lock key (e.g. a session id).
+        """
+        lock = self._checkout(key)
+        try:
+            with lock.write():
+                yield
+        finally:
+            self._checkin(key)
+
+    def __len__(self) -> int:
+        return sum(len(t) for t in self._tables)
@@ -0,0 +1,191 @@
+"""
+In-memory content-addressed document store.
+
+Companion of :class:`diff_fuse.state.memory_session_repo.MemorySessionRepo`.
+Documents are kept in a dictionary keyed by content hash, together with a
+reference count. With the default ``"full"`` storage policy every session
+referencing the same content shares one normalized object graph; with
+``"raw_only"`` documents are kept as compressed codec payloads instead (see
+:mod:`diff_fuse.state.storage_policy`). Documents that sit unused can also be
+demoted to compressed payloads and are inflated again on the next read.
+"""
+
+import time
+from collections.abc import Iterable
+from threading import Lock
+
+from diff_fuse.models.document import StoredDocument
+from diff_fuse.state.codec import decode_document, encode_document
+from diff_fuse.state.document_store import DocumentStore
+from diff_fuse.state.storage_policy import DecodeCache, StoragePolicy, restore_document, strip_document
+
+
+class MemoryDocumentStore(DocumentStore):
+    """
+    In-memory implementation of :class:`DocumentStore`.
+
+    Documents live exactly as long as at least one reference is held. There is
+    no TTL of its own: the session repository releases references when its
+    sessions expire.
+
+    Parameters
+    ----------
+    policy : StoragePolicy, default="full"
+        Which forms of each document to keep.
+    decode_cache : DecodeCache | None, default=None
+        Cache of re-derived normalized documents, used with ``"raw_only"``.
+
+    Notes
+    -----
+    Stored documents must be treated as immutable, since the same instance is
+    handed to every session that references it.
+
+    Tiering: :meth:`demote_idle` re-encodes documents nobody read for a while
+    into compressed codec payloads (the *cold* tier); the next read inflates
+    them back into the *hot* tier transparently. With ``"raw_only"`` every
+    entry is already compressed, so there is nothing to demote.
+    """
+
+    def __init__(self, *, policy: StoragePolicy = "full", decode_cache: DecodeCache | None = None) -> None:
+        self._lock = Lock()
+        self._policy = policy
+        self._decode_cache = decode_cache
+        self._docs: dict[str, StoredDocument | bytes] = {}
+        self._refs: dict[str, int] = {}
+        # Monotonic time of the last read or acquire, per content hash.
+        self._last_used: dict[str, float] = {}
+        self._inflations = 0
+        self._inflate_ns = 0
+
+    def _load(self, content_hash: str, entry: StoredDocument | bytes | None) -> StoredDocument | None:
+        """
+        Turn a stored entry back into a document with ``normalized`` populated.
+
+        Runs without ``self._lock``. Demoted entries are promoted back to the
+        hot tier.
+        """
+        if entry is None:
+            return None
+        if isinstance(entry, StoredDocument):
+            return restore_document(entry, self._decode_cache)
+        if self._policy == "raw_only":
+            return restore_document(decode_document(entry), self._decode_cache)
+
+        start = time.perf_counter_ns()
+        document = restore_document(decode_document(entry), self._decode_cache)
+        elapsed = time.perf_counter_ns() - start
+        with self._lock:
+            self._inflations += 1
+            self._inflate_ns += elapsed
+            # Promote unless it changed meanwhile (released, or inflated by another reader).
+            if self._docs.get(content_hash) is entry:
+                self._docs[content_hash] = document
+        return document
+
+    def get(self, content_hash: str) -> StoredDocument | None:
+        """Return the stored document for ``content_hash``, if any."""
+        return self.get_many([content_hash])[0]
+
+    def get_many(self, content_hashes: list[str], *, refresh_ttl: bool = False) -> list[StoredDocument | None]:
+        """Return the stored documents for ``content_hashes``, in order."""
+        now = time.monotonic()
+        with self._lock:
+            entries = [self._docs.get(h) for h in content_hashes]
+            for h, e in zip(content_hashes, entries, strict=True):
+                if e is not None:
+                    self._last_used[h] = now
+        return [self._load(h, e) for h, e in zip(content_hashes, entries, strict=True)]
+
+    def acquire(self, document: StoredDocument) -> StoredDocument:
+        """Store ``document`` if absent and add a reference to it."""
+        with self._lock:
+            entry = self._docs.get(document.content_hash)
+            if entry is None:
+                stripped = strip_document(document, self._policy)
+                entry = encode_document(stripped) if self._policy == "raw_only" else stripped
+                self._docs[document.content_hash] = entry
+            self._refs[document.content_hash] = self._refs.get(document.content_hash, 0) + 1
+            self._last_used[document.content_hash] = time.monotonic()
+
+        if isinstance(entry, StoredDocument):
+            return entry
+        # Compressed entry: the caller's complete document is the cheapest copy.
+        return document
+
+    def release(self, content_hash: str) -> None:
+        """Drop a reference to ``content_hash``; delete the document at zero."""
+        with self._lock:
+            n = self._refs.get(content_hash, 0) - 1
+            if n > 0:
+                self._refs[content_hash] = n
+                return
+            self._refs.pop(content_hash, None)
+            self._docs.pop(content_hash, None)
+            self._last_used.pop(content_hash, None)
+
+    def touch(self, content_hashes: Iterable[str]) -> None:
+        """No-op: in-memory documents are kept alive by reference counts alone."""
+        return None
+
+    def demote_idle(self, idle_seconds: float) -> int:
+        """
+        Compress documents that were not used for ``idle_seconds``.
+
+        Parameters
+        ----------
+        idle_seconds : float
+            Minimum time since the last read or acquire.
+
+        Returns
+        -------
+        int
+            Number of documents demoted to the cold tier.
+
+        Notes
+        -----
+        Encoding runs without the lock; a document used or released while it
+        is being encoded is left alone.
+        """
+        if self._policy == "raw_only":
+            return 0
+
+        cutoff = time.monotonic() - idle_seconds
+        with self._lock:
+            idle = [
+                (h, e)
+                for h, e in self._docs.items()
+                if isinstance(e, StoredDocument) and self._last_used.get(h, 0.0) <= cutoff
+            ]
+
+        demoted = 0
+        for content_hash, document in idle:
+            payload = encode_document(document)
+            with self._lock:
+                if self._docs.get(content_hash) is document and self._last_used.get(content_hash, 0.0) <= cutoff:
+                    self._docs[content_hash] = payload
+                    demoted += 1
+        return demoted
+
+    def stats(self) -> dict[str, int]:
+        """
+        Report tiering counters.
+
+        Returns
+        -------
+        dict[str, int]
+            Documents in the hot (decoded) and cold (compressed) tiers, the
+            number of cold reads that inflated a document, and the total time
+            spent inflating, in microseconds.
+        """
+        with self._lock:
+            cold = sum(1 for e in self._docs.values() if isinstance(e, bytes))
+            return {
+                "hot_documents": len(self._docs) - cold,
+                "cold_documents": cold,
+                "inflations": self._inflations,
+                "inflate_us": self._inflate_ns // 1000,
+            }
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._docs)
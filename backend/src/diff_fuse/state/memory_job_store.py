@@ -0,0 +1,98 @@
+"""
+In-memory job store.
+
+Keeps background job records and results in a dictionary of the current
+process. Suitable for the memory session backend, where jobs, like sessions,
+are only visible to the process that created them.
+
+Expired jobs are dropped lazily when accessed, and swept whenever a new job
+is stored.
+"""
+
+import time
+from dataclasses import dataclass
+from threading import Lock
+
+from diff_fuse.models.job import Job
+from diff_fuse.state.job_store import JobStore
+
+
+@dataclass(slots=True)
+class _Entry:
+    """A stored job with its result and cancellation flag."""
+
+    job: Job
+    result: bytes | None
+    cancel: bool
+    expires_at: float
+
+
+class MemoryJobStore(JobStore):
+    """
+    Thread-safe in-memory implementation of :class:`JobStore`.
+
+    Parameters
+    ----------
+    ttl_seconds : int
+        How long a job is kept after its last update.
+    """
+
+    def __init__(self, ttl_seconds: int) -> None:
+        self._ttl = float(ttl_seconds)
+        self._lock = Lock()
+        self._entries: dict[str, _Entry] = {}
+
+    def _live(self, job_id: str, now: float) -> _Entry | None:
+        """Return a job's entry, dropping it if expired. Caller holds the lock."""
+        entry = self._entries.get(job_id)
+        if entry is not None and entry.expires_at <= now:
+            del self._entries[job_id]
+            return None
+        return entry
+
+    def _sweep(self, now: float) -> None:
+        """Drop every expired entry. Caller holds the lock."""
+        for job_id in [k for k, e in self._entries.items() if e.expires_at <= now]:
+            del self._entries[job_id]
+
+    def save(self, job: Job, *, result: bytes | None = None) -> bool:
+        """See :meth:`JobStore.save`."""
+        now = time.monotonic()
+        record = job.model_copy(update={"cancel_requested": False})
+        with self._lock:
+            entry = self._live(job.job_id, now)
+            if entry is None:
+                self._sweep(now)
+                entry = self._entries[job.job_id] = _Entry(record, None, False, 0.0)
+            entry.job = record
+            if result is not None:
+                entry.result = result
+            entry.expires_at = now + self._ttl
+            return entry.cancel
+
+    def get(self, job_id: str) -> Job | None:
+        """See :meth:`JobStore.get`."""
+        with self._lock:
+            entry = self._live(job_id, time.monotonic())
+            if entry is None:
+                return None
+            return entry.job.model_copy(update={"cancel_requested": entry.cancel})
+
+    def get_result(self, job_id: str) -> bytes | None:
+        """See :meth:`JobStore.get_result`."""
+        with self._lock:
+            entry = self._live(job_id, time.monotonic())
+            return entry.result if entry is not None else None
+
+    def request_cancel(self, job_id: str) -> Job | None:
+        """See :meth:`JobStore.request_cancel`."""
+        with self._lock:
+            entry = self._live(job_id, time.monotonic())
+            if entry is None:
+                return None
+            entry.cancel = True
+            return entry.job.model_copy(update={"cancel_requested": True})
+
+    def __len__(self) -> int:
+        """Return the number of stored jobs, expired ones included until swept."""
+        return len(self._entries)
@@ -0,0 +1,88 @@
+"""
+In-memory review store.
+
+Keeps the review state of sessions in a dictionary of the current process.
+Suitable for the memory session backend, where review state, like sessions,
+is only visible to the process that created it.
+
+Expired states are dropped lazily when accessed, and swept whenever a new
+one is stored.
+"""
+
+import time
+from dataclasses import dataclass
+from threading import Lock
+
+from diff_fuse.domain.errors import ReviewConflictError
+from diff_fuse.models.review import Review, ReviewDelta
+from diff_fuse.state.review_store import ReviewStore
+
+
+@dataclass(slots=True)
+class _Entry:
+    """A stored review state with its expiry."""
+
+    review: Review
+    expires_at: float
+
+
+class MemoryReviewStore(ReviewStore):
+    """
+    Thread-safe in-memory implementation of :class:`ReviewStore`.
+
+    Parameters
+    ----------
+    ttl_seconds : int
+        How long review state is kept after its last use.
+
+    Notes
+    -----
+    Stored states are never mutated: applying a delta replaces the state, so
+    readers may keep what :meth:`get` returned.
+    """
+
+    def __init__(self, ttl_seconds: int) -> None:
+        self._ttl = float(ttl_seconds)
+        self._lock = Lock()
+        self._entries: dict[str, _Entry] = {}
+
+    def _live(self, session_id: str, now: float) -> _Entry | None:
+        """Return a session's entry, dropping it if expired. Caller holds the lock."""
+        entry = self._entries.get(session_id)
+        if entry is not None and entry.expires_at <= now:
+            del self._entries[session_id]
+            return None
+        return entry
+
+    def _sweep(self, now: float) -> None:
+        """Drop every expired entry. Caller holds the lock."""
+        for session_id in [k for k, e in self._entries.items() if e.expires_at <= now]:
+            del self._entries[session_id]
+
+    def get(self, session_id: str) -> Review | None:
+        """See :meth:`ReviewStore.get`."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._live(session_id, now)
+            if entry is None:
+                return None
+            entry.expires_at = now + self._ttl
+            return entry.review
+
+    def apply(self, session_id: str, delta: ReviewDelta, *, base_revision: int | None = None) -> int:
+        """See :meth:`ReviewStore.apply`."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._live(session_id, now)
+            current = entry.review if entry is not None else Review()
+            if base_revision is not None and base_revision != current.revision:
+                raise ReviewConflictError(base_revision, current.revision)
+            if entry is None:
+                self._sweep(now)
+            review = delta.apply_to(current)
+            self._entries[session_id] = _Entry(review, now + self._ttl)
+            return review.revision
+
+    def __len__(self) -> int:
+        """Return the number of stored states, expired ones included until swept."""
+        return len(self._entries)
@@ -8,47 +8,94 @@ each process maintains its own isolated memory state.
 
 Design characteristics
 ----------------------
-- Thread-safe via a single global lock.
-- TTL-based expiration checked lazily on access and during cleanup.
+- Thread-safe via per-session readers/writer locks (see
+  :mod:`diff_fuse.state.locks`) plus a short-lived lock around the shared
+  index. Reads of different sessions never contend, reads of one session run
+  concurrently, and a slow mutation only blocks its own session.
+- TTL-based expiration checked lazily on access, during cleanup, and by an
+  optional background sweeper driven by an expiry heap.
+- Optional tiering: documents every referencing session left idle are
+  compressed by the sweeper and inflated again on the next read.
+- Optional global caps on the number of sessions and on their approximate
+  in-memory size, enforced by evicting least recently used sessions; a
+  session larger than the whole memory budget is rejected.
 - No persistence across process restarts.
 - O(1) access by session id.
+- Sessions hold metadata only; document payloads live in a content-addressed
+  :class:`MemoryDocumentStore` shared by all sessions, and are attached on
+  each read. Identical uploads are stored once.
 
 For production environments, prefer a distributed backend (e.g., Redis).
 """
 
+import heapq
+import time
+from collections import OrderedDict
+from collections.abc import Sequence
 from datetime import UTC, datetime, timedelta
 from threading import Lock
 from uuid import uuid4
 
-from diff_fuse.models.document import DocumentResult
-from diff_fuse.models.session import Session
-from diff_fuse.state.session_repo import SessionRepo
+from diff_fuse.domain.errors import LimitsExceededError
+from diff_fuse.models.document import DocumentMeta, DocumentResult, StoredDocument
+from diff_fuse.models.session import Session, SessionMeta
+from diff_fuse.state.document_store import DocumentStore, acquire_new_refs, hydrate_session
+from diff_fuse.state.locks import KeyedRWLock
+from diff_fuse.state.memory_document_store import MemoryDocumentStore
+from diff_fuse.state.session_repo import SessionLimits, SessionRepo, append_documents_to, remove_document_from
+from diff_fuse.state.sweeper import Sweeper
 
 
 class MemorySessionRepo(SessionRepo):
     """
     In-memory implementation of :class:`SessionRepo`.
 
-    This repository stores all sessions in a local dictionary protected by
-    a thread lock. Sessions expire after a configurable TTL.
+    This repository stores session metadata in a local dictionary. Sessions
+    expire after a configurable TTL.
 
     Parameters
     ----------
     ttl_seconds : int, default=3600
         Time-to-live for sessions in seconds. Expiration is enforced lazily
         on access and during explicit cleanup calls.
+    document_store : DocumentStore | None, default=None
+        Content-addressed store for document payloads. A private
+        :class:`MemoryDocumentStore` is created when omitted.
+    max_sessions : int, default=0
+        Maximum number of live sessions. ``0`` means unlimited.
+    max_bytes : int, default=0
+        Memory budget: maximum approximate in-memory size of all live
+        sessions, in bytes. ``0`` means unlimited.
+    lock_stripes : int, default=64
+        Number of stripes of the per-session lock table.
+    demote_after_seconds : float, default=0
+        Idle time after which the background sweeper compresses a document
+        (see :meth:`MemoryDocumentStore.demote_idle`). ``0`` keeps every
+        document decoded.
 
     Notes
     -----
     Limitations:
     - Not safe for multi-instance deployments (each process has its own memory).
     - Not persistent (sessions are lost on process restart).
-    - Single lock may become a bottleneck under very high concurrency.
+    - Eviction and expiry do not wait for in-flight requests: a read racing
+      the removal of its session simply reports the session as missing.
+    - Session sizes are estimated at ingestion (see
+      :mod:`diff_fuse.domain.sizing`), not measured.
 
     For production workloads, a Redis-backed implementation is recommended.
     """
 
-    def __init__(self, *, ttl_seconds: int = 3600) -> None:
+    def __init__(
+        self,
+        *,
+        ttl_seconds: int = 3600,
+        document_store: DocumentStore | None = None,
+        max_sessions: int = 0,
+        max_bytes: int = 0,
+        lock_stripes: int = 64,
+        demote_after_seconds: float = 0,
+    ) -> None:
         """
         Initialize the in-memory repository.
 
@@ -56,10 +103,188 @@ class MemorySessionRepo(SessionRepo):
         ----------
         ttl_seconds : int, default=3600
             Session expiration time in seconds.
+        document_store : DocumentStore | None, default=None
+            Content-addressed document store shared by all sessions.
+        max_sessions : int, default=0
+            Session count cap (``0`` disables it).
+        max_bytes : int, default=0
+            Approximate total size cap (``0`` disables it).
+        lock_stripes : int, default=64
+            Number of stripes of the per-session lock table.
+        demote_after_seconds : float, default=0
+            Idle time before documents are compressed (``0`` disables it).
         """
         self._ttl = timedelta(seconds=ttl_seconds)
+        # Lock ordering: session lock, then index lock, then document store.
+        self._session_locks = KeyedRWLock(lock_stripes)
+        # Guards the index, size accounting and expiry heap; held briefly.
         self._lock = Lock()
-        self._sessions: dict[str, Session] = {}
+        # Ordered from least to most recently used.
+        self._sessions: OrderedDict[str, SessionMeta] = OrderedDict()
+        self._documents = document_store if document_store is not None else MemoryDocumentStore()
+
+        self._max_sessions = max(0, int(max_sessions))
+        self._max_bytes = max(0, int(max_bytes))
+        self._sizes: dict[str, int] = {}
+        self._total_bytes = 0
+        self._evictions = 0
+        self._expirations = 0
+
+        # (deadline, session_id); entries may be stale, see `sweep`.
+        self._expiry_heap: list[tuple[datetime, str]] = []
+        self._sweeper: Sweeper | None = None
+        self._demote_after = max(0.0, float(demote_after_seconds))
+        self._last_demotion = 0.0
+
+    @staticmethod
+    def _approx_size(documents: Sequence[DocumentMeta]) -> int:
+        """
+        Approximate the memory held by a session.
+
+        Uses the in-memory size recorded for its documents at ingestion,
+        falling back to their uploaded size for documents without one.
+        Documents shared with other sessions are counted once per session,
+        so this is an upper bound.
+        """
+        return sum(m.approx_bytes or m.size_chars for m in documents)
+
+    def _drop(self, session_id: str) -> None:
+        """
+        Remove a session and release its document references.
+
+        Must be called with ``self._lock`` held.
+        """
+        meta = self._sessions.pop(session_id)
+        self._total_bytes -= self._sizes.pop(session_id, 0)
+        for m in meta.documents_meta:
+            self._documents.release(m.content_hash)
+
+    def _touch(self, session_id: str) -> SessionMeta | None:
+        """
+        Return live session metadata and refresh its TTL, dropping it if expired.
+
+        Must be called with ``self._lock`` held.
+        """
+        now = datetime.now(UTC)
+
+        meta = self._sessions.get(session_id)
+        if meta is None:
+            return None
+
+        # TTL expiration check
+        if now - meta.updated_at > self._ttl:
+            self._drop(session_id)
+            self._expirations += 1
+            return None
+
+        # Sliding expiration
+        meta.updated_at = now
+        self._sessions.move_to_end(session_id)
+        return meta
+
+    def _snapshot(self, session_id: str) -> SessionMeta | None:
+        """
+        Touch a session and return a private copy of its metadata.
+
+        Takes ``self._lock``; the caller should hold the session's lock so the
+        snapshot stays current while it is used.
+        """
+        with self._lock:
+            meta = self._touch(session_id)
+            if meta is None:
+                return None
+            return meta.model_copy(update={"documents_meta": list(meta.documents_meta)})
+
+    def _hydrate(self, meta: SessionMeta) -> Session | None:
+        """
+        Attach document payloads to session metadata.
+
+        Runs without ``self._lock``. Returns None if the session was evicted
+        or expired concurrently and its documents are gone.
+        """
+        return hydrate_session(meta, self._documents.get_many([m.content_hash for m in meta.documents_meta]))
+
+    def _commit(self, session: Session, before: list[DocumentMeta], *, existing: bool) -> bool:
+        """
+        Reconcile document references and publish the session's metadata.
+
+        Must be called with the session's write lock held, and without
+        ``self._lock`` (taken here only around the index update).
+
+        Parameters
+        ----------
+        session : Session
+            New session state.
+        before : list[DocumentMeta]
+            Documents the stored session referenced before the change.
+        existing : bool
+            Whether the session is expected to still be stored. If it was
+            evicted or expired in the meantime, nothing is published.
+
+        Returns
+        -------
+        bool
+            Whether the session was published.
+
+        Raises
+        ------
+        LimitsExceededError
+            If the session alone exceeds the memory budget (nothing is written).
+        """
+        size = self._approx_size(session.documents_results)
+        if self._max_bytes and size > self._max_bytes:
+            raise LimitsExceededError(
+                "Session does not fit in the memory budget",
+                approx_bytes=size,
+                max_bytes=self._max_bytes,
+            )
+
+        # Acquire before publishing and release after, so a concurrent reader
+        # never finds a session referencing a missing document.
+        after, acquired, released = acquire_new_refs(self._documents, before, session.documents_results)
+        session.documents_results = after
+
+        sid = session.session_id
+        meta = session.to_meta()
+        with self._lock:
+            gone = existing and sid not in self._sessions
+            if not gone:
+                if sid not in self._sessions:
+                    heapq.heappush(self._expiry_heap, (meta.updated_at + self._ttl, sid))
+                self._sessions[sid] = meta
+                self._sessions.move_to_end(sid)
+
+                self._total_bytes += size - self._sizes.get(sid, 0)
+                self._sizes[sid] = size
+
+                self._evict(keep=sid)
+
+        # A removed session already released its previous references.
+        for content_hash in acquired if gone else released:
+            self._documents.release(content_hash)
+        return not gone
+
+    def _evict(self, *, keep: str) -> None:
+        """
+        Evict least recently used sessions until the caps are respected.
+
+        Must be called with ``self._lock`` held.
+
+        Parameters
+        ----------
+        keep : str
+            Session that must survive (the one just written), even if it
+            exceeds the caps on its own.
+        """
+        while self._sessions and (
+            (self._max_sessions and len(self._sessions) > self._max_sessions)
+            or (self._max_bytes and self._total_bytes > self._max_bytes)
+        ):
+            oldest = next(iter(self._sessions))
+            if oldest == keep:
+                break
+            self._drop(oldest)
+            self._evictions += 1
 
     def create(self, *, documents_results: list[DocumentResult]) -> Session:
         """
@@ -85,8 +310,8 @@ class MemorySessionRepo(SessionRepo):
             documents_results=documents_results,
         )
 
-        with self._lock:
-            self._sessions[sid] = session
+        with self._session_locks.write(sid):
+            self._commit(session, before=[], existing=False)
 
         return session
 
@@ -110,22 +335,33 @@ class MemorySessionRepo(SessionRepo):
         - Missing session -> returns None
         - Expired session -> removed and returns None
         - Valid session -> ``updated_at`` is refreshed (sliding TTL)
+
+        Each call returns a new :class:`Session`; changes to it are only
+        persisted through :meth:`save` or :meth:`mutate`.
         """
-        now = datetime.now(UTC)
+        with self._session_locks.read(session_id):
+            meta = self._snapshot(session_id)
+            return self._hydrate(meta) if meta is not None else None
 
-        with self._lock:
-            session = self._sessions.get(session_id)
-            if session is None:
-                return None
+    def get_meta(self, session_id: str) -> SessionMeta | None:
+        """
+        Retrieve a session's metadata by id.
 
-            # TTL expiration check
-            if now - session.updated_at > self._ttl:
-                del self._sessions[session_id]
-                return None
+        Parameters
+        ----------
+        session_id : str
+            Opaque session identifier.
 
-            # Sliding expiration
-            session.updated_at = now
-            return session
+        Returns
+        -------
+        SessionMeta | None
+            The session metadata if it exists and is not expired; otherwise None.
+
+        Notes
+        -----
+        Expiration and sliding TTL behave exactly as in :meth:`get`.
+        """
+        return self._snapshot(session_id)
 
     def save(self, session: Session) -> Session:
         """
@@ -143,8 +379,11 @@ class MemorySessionRepo(SessionRepo):
         """
         now = datetime.now(UTC)
         session.updated_at = now
-        with self._lock:
-            self._sessions[session.session_id] = session
+        with self._session_locks.write(session.session_id):
+            with self._lock:
+                previous = self._sessions.get(session.session_id)
+                before = list(previous.documents_meta) if previous is not None else []
+            self._commit(session, before, existing=previous is not None)
         return session
 
     def mutate(self, session_id: str, fn):
@@ -163,23 +402,91 @@ class MemorySessionRepo(SessionRepo):
         Session | None
             The updated session if it exists; otherwise None.
         """
-        now = datetime.now(UTC)
-        with self._lock:
-            session = self._sessions.get(session_id)
-            if session is None:
+        with self._session_locks.write(session_id):
+            meta = self._snapshot(session_id)
+            current = self._hydrate(meta) if meta is not None else None
+            if current is None:
                 return None
 
-            # TTL expiration check (same as get)
-            if now - session.updated_at > self._ttl:
-                del self._sessions[session_id]
+            # ``fn`` runs under the session's own lock only.
+            session = fn(current)
+            if not self._commit(session, meta.documents_meta, existing=True):
                 return None
+            return session
 
-            # Sliding expiration
-            session.updated_at = now
+    def append_documents(
+        self, session_id: str, documents_results: list[DocumentResult], limits: SessionLimits | None = None
+    ) -> SessionMeta | None:
+        """
+        Atomically append documents to a session.
 
-            session = fn(session)
-            self._sessions[session_id] = session
-            return session
+        Parameters
+        ----------
+        session_id : str
+            Opaque session identifier.
+        documents_results : list[DocumentResult]
+            Documents to append, in order.
+        limits : SessionLimits | None, default=None
+            Limits checked under the session's lock, with the append.
+
+        Returns
+        -------
+        SessionMeta | None
+            The updated session metadata, or None if the session does not exist.
+        """
+        session = self.mutate(session_id, lambda s: append_documents_to(s, documents_results, limits))
+        return session.to_meta() if session is not None else None
+
+    def remove_document(self, session_id: str, doc_id: str) -> SessionMeta | None:
+        """
+        Atomically remove one document from a session.
+
+        Parameters
+        ----------
+        session_id : str
+            Opaque session identifier.
+        doc_id : str
+            Document to remove.
+
+        Returns
+        -------
+        SessionMeta | None
+            The updated session metadata, or None if the session does not exist.
+        """
+        session = self.mutate(session_id, lambda s: remove_document_from(s, doc_id))
+        return session.to_meta() if session is not None else None
+
+    def find_document(self, content_hash: str) -> StoredDocument | None:
+        """
+        Look up an already stored document by content hash.
+
+        Parameters
+        ----------
+        content_hash : str
+            Content address of the document.
+
+        Returns
+        -------
+        StoredDocument | None
+            The shared payload if any live session references it; otherwise None.
+        """
+        return self._documents.get(content_hash)
+
+    def find_documents(self, content_hashes: list[str]) -> list[StoredDocument | None]:
+        """
+        Look up several stored documents by content hash.
+
+        Parameters
+        ----------
+        content_hashes : list[str]
+            Content addresses of the documents.
+
+        Returns
+        -------
+        list[StoredDocument | None]
+            One entry per hash, in order; None where nothing is stored.
+        """
+        return self._documents.get_many(content_hashes)
 
     def cleanup(self) -> int:
         """
@@ -189,15 +496,146 @@ class MemorySessionRepo(SessionRepo):
         -------
         int
             Number of sessions removed.
+
+        Notes
+        -----
+        Scans every session. The background sweeper uses the cheaper
+        heap-driven :meth:`sweep` instead.
         """
         now = datetime.now(UTC)
         removed = 0
 
         with self._lock:
             for sid in list(self._sessions.keys()):
-                session = self._sessions[sid]
-                if now - session.updated_at > self._ttl:
-                    del self._sessions[sid]
+                meta = self._sessions[sid]
+                if now - meta.updated_at > self._ttl:
+                    self._drop(sid)
+                    removed += 1
+            self._expirations += removed
+
+        return removed
+
+    def sweep(self) -> int:
+        """
+        Remove expired sessions whose deadline is due in the expiry heap.
+
+        Returns
+        -------
+        int
+            Number of sessions removed.
+
+        Notes
+        -----
+        Reads slide a session's deadline without touching the heap. A popped
+        entry is therefore re-checked against the session's actual deadline
+        and pushed back if the session was used in the meantime; entries of
+        sessions that no longer exist are discarded.
+        """
+        now = datetime.now(UTC)
+        removed = 0
+
+        with self._lock:
+            while self._expiry_heap and self._expiry_heap[0][0] <= now:
+                _, sid = heapq.heappop(self._expiry_heap)
+                meta = self._sessions.get(sid)
+                if meta is None:
+                    continue
+                deadline = meta.updated_at + self._ttl
+                if deadline < now:
+                    self._drop(sid)
                     removed += 1
+                else:
+                    heapq.heappush(self._expiry_heap, (deadline, sid))
+            self._expirations += removed
 
         return removed
+
+    def demote_idle(self) -> int:
+        """
+        Compress documents no session has read for ``demote_after_seconds``.
+
+        Returns
+        -------
+        int
+            Number of documents demoted (always ``0`` when demotion is
+            disabled or the document store does not support it).
+
+        Notes
+        -----
+        Sessions hold metadata only, so tiering applies to the shared
+        documents: a document is demoted once every session referencing it
+        has been idle, and the next :meth:`get` inflates it transparently.
+        """
+        if not self._demote_after or not isinstance(self._documents, MemoryDocumentStore):
+            return 0
+        return self._documents.demote_idle(self._demote_after)
+
+    def _maintain(self) -> None:
+        """Sweeper pass: expire due sessions, then demote idle documents (throttled)."""
+        self.sweep()
+        now = time.monotonic()
+        # Deadlines can wake the sweeper often; scanning every document that
+        # often would cost more than it saves.
+        if self._demote_after and now - self._last_demotion >= self._demote_after / 4:
+            self._last_demotion = now
+            self.demote_idle()
+
+    def _seconds_until_next_deadline(self) -> float | None:
+        """Return the time left until the earliest deadline in the expiry heap, if any."""
+        with self._lock:
+            deadline = self._expiry_heap[0][0] if self._expiry_heap else None
+        return (deadline - datetime.now(UTC)).total_seconds() if deadline is not None else None
+
+    def start_sweeper(self, interval_seconds: float) -> None:
+        """
+        Start the background expiry sweeper.
+
+        Parameters
+        ----------
+        interval_seconds : float
+            Maximum time between sweeps. The sweeper wakes up earlier when the
+            next deadline in the expiry heap is closer.
+
+        Notes
+        -----
+        The sweeper runs in a daemon thread (see :class:`Sweeper`) and also
+        demotes idle documents when ``demote_after_seconds`` is set. Calling
+        this twice is a no-op.
+        """
+        if self._sweeper is not None and self._sweeper.running:
+            return
+        self._sweeper = Sweeper(
+            self._maintain,
+            interval_seconds=interval_seconds,
+            next_due=self._seconds_until_next_deadline,
+        )
+        self._sweeper.start()
+
+    def stop_sweeper(self) -> None:
+        """Stop the background expiry sweeper, if running."""
+        if self._sweeper is not None:
+            self._sweeper.stop()
+            self._sweeper = None
+
+    def stats(self) -> dict[str, int]:
+        """
+        Report repository counters for monitoring.
+
+        Returns
+        -------
+        dict[str, int]
+            Live session count, their approximate size, and the number of
+            sessions evicted by the caps or removed after expiring. With a
+            :class:`MemoryDocumentStore`, also its tiering counters (hot and
+            cold documents, inflations and inflate time).
+        """
+        with self._lock:
+            stats = {
+                "sessions": len(self._sessions),
+                "approx_bytes": self._total_bytes,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+            }
+        if isinstance(self._documents, MemoryDocumentStore):
+            stats |= self._documents.stats()
+        return stats
@@ -0,0 +1,114 @@
+"""
+Per-process store of memoized merges.
+
+Incremental merges (see :mod:`diff_fuse.domain.incremental_merge`) answer
+with a ``merge_id``; the client's next merge names it as its base, and only
+what its selection changes affect is recomputed. This module keeps the
+:class:`MergeState` behind each ``merge_id`` for a short time.
+
+A state is *taken* out of the store to derive the next one, which updates it
+in place: every merge id serves as a base once. A request naming a base that
+was already used, evicted, expired, or built from another diff tree gets a
+full merge instead.
+
+Notes
+-----
+The store is per process, like the diff cache: with several workers, a
+request landing on another worker falls back to a full merge.
+"""
+
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from threading import Lock
+
+from diff_fuse.domain.incremental_merge import MergeState
+
+
+@dataclass(slots=True)
+class _Entry:
+    """A memoized merge and the diff it merged."""
+
+    state: MergeState
+    diff_id: str
+    expires_at: float
+
+
+class MergeMemo:
+    """
+    Thread-safe LRU store of merge states with a TTL.
+
+    Parameters
+    ----------
+    max_entries : int
+        Maximum number of kept states. ``0`` disables incremental merges.
+    ttl_seconds : float
+        How long a state is kept.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float) -> None:
+        self._max = max(0, int(max_entries))
+        self._ttl = max(0.0, float(ttl_seconds))
+        self._lock = Lock()
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def take(self, merge_id: str, diff_id: str) -> MergeState | None:
+        """
+        Remove and return the state of a merge of ``diff_id``.
+
+        Parameters
+        ----------
+        merge_id : str
+            Identifier returned by the earlier merge.
+        diff_id : str
+            Diff the new merge applies to.
+
+        Returns
+        -------
+        MergeState | None
+            The state, or None if absent, expired, or a merge of another
+            diff.
+        """
+        with self._lock:
+            entry = self._entries.pop(merge_id, None)
+            if entry is None or entry.expires_at <= time.monotonic() or entry.diff_id != diff_id:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return entry.state
+
+    def put(self, merge_id: str, diff_id: str, state: MergeState) -> None:
+        """
+        Keep the state of a merge.
+
+        Parameters
+        ----------
+        merge_id : str
+            Identifier of the merge.
+        diff_id : str
+            Diff it merged.
+        state : MergeState
+            Its state; owned by the store from now on.
+        """
+        if self._max == 0 or self._ttl == 0:
+            return
+        entry = _Entry(state=state, diff_id=diff_id, expires_at=time.monotonic() + self._ttl)
+        with self._lock:
+            self._entries[merge_id] = entry
+            while len(self._entries) > self._max:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def stats(self) -> dict[str, int]:
+        """Report hit/miss counters and the number of kept merge states."""
+        with self._lock:
+            return {
+                "merge_memo_hits": self.hits,
+                "merge_memo_misses": self.misses,
+                "memoized_merges": len(self._entries),
+            }
@@ -0,0 +1,91 @@
+"""
+Redis-backed job store.
+
+Each background job is one Redis hash, so every worker process sharing the
+Redis deployment sees every job:
+
+- ``job``: the :class:`Job` record as JSON;
+- ``cancel``: present once cancellation was requested;
+- ``result``: the encoded result body of a succeeded job.
+
+Every operation touches that single key, so the store works unchanged on
+Redis Cluster. Expiry is native: each write resets the key's TTL.
+"""
+
+from __future__ import annotations
+
+from redis import Redis, RedisCluster
+
+from diff_fuse.models.job import Job
+from diff_fuse.state.job_store import JobStore
+
+REQUEST_CANCEL_SCRIPT = """
+-- KEYS[1]: job key
+-- Sets the cancellation flag of an existing job; returns its record.
+local job = redis.call('HGET', KEYS[1], 'job')
+if not job then
+    return false
+end
+redis.call('HSET', KEYS[1], 'cancel', '1')
+return job
+"""
+
+
+class RedisJobStore(JobStore):
+    """
+    Redis implementation of :class:`JobStore`.
+
+    Parameters
+    ----------
+    redis : Redis | RedisCluster
+        Client with ``decode_responses=False``.
+    ttl_seconds : int
+        How long a job is kept after its last update.
+    key_prefix : str, default="diff-fuse:job:"
+        Prefix of job keys (``{key_prefix}{job_id}``).
+    """
+
+    def __init__(self, redis: Redis | RedisCluster, *, ttl_seconds: int, key_prefix: str = "diff-fuse:job:") -> None:
+        self._r = redis
+        self._ttl = int(ttl_seconds)
+        self._prefix = key_prefix
+        self._request_cancel = redis.register_script(REQUEST_CANCEL_SCRIPT)
+
+    def _key(self, job_id: str) -> str:
+        """Return the Redis key of a job."""
+        return f"{self._prefix}{job_id}"
+
+    def save(self, job: Job, *, result: bytes | None = None) -> bool:
+        """See :meth:`JobStore.save`. One transactional round trip."""
+        key = self._key(job.job_id)
+        fields: dict[str, str | bytes] = {"job": job.model_dump_json(exclude={"cancel_requested"})}
+        if result is not None:
+            fields["result"] = result
+        pipe = self._r.pipeline(transaction=True)
+        pipe.hset(key, mapping=fields)
+        pipe.expire(key, self._ttl)
+        pipe.hexists(key, "cancel")
+        *_, cancel = pipe.execute()
+        return bool(cancel)
+
+    def get(self, job_id: str) -> Job | None:
+        """See :meth:`JobStore.get`."""
+        raw, cancel = self._r.hmget(self._key(job_id), ["job", "cancel"])
+        if raw is None:
+            return None
+        job = Job.model_validate_json(raw)
+        job.cancel_requested = cancel is not None
+        return job
+
+    def get_result(self, job_id: str) -> bytes | None:
+        """See :meth:`JobStore.get_result`."""
+        return self._r.hget(self._key(job_id), "result")
+
+    def request_cancel(self, job_id: str) -> Job | None:
+        """See :meth:`JobStore.request_cancel`. Never creates a key for an unknown job."""
+        raw = self._request_cancel(keys=[self._key(job_id)])
+        if not raw:
+            return None
+        job = Job.model_validate_json(raw)
+        job.cancel_requested = True
+        return job
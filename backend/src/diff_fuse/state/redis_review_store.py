@@ -0,0 +1,99 @@
+"""
+Redis-backed review store.
+
+The review state of a session is one Redis hash, so every worker process
+sharing the Redis deployment sees it:
+
+- ``rev``: the revision;
+- ``null_mode``: the null mode, when not the default;
+- one field per override or selection (see
+  :func:`diff_fuse.state.review_store.entry_field`), holding it as JSON.
+
+Deltas are applied by a Lua script that checks the revision and writes only
+the fields the delta mentions, in one atomic round trip. Every operation
+touches that single key, so the store works unchanged on Redis Cluster.
+Expiry is native: each access resets the key's TTL.
+"""
+
+from __future__ import annotations
+
+from redis import Redis, RedisCluster
+
+from diff_fuse.domain.errors import ReviewConflictError
+from diff_fuse.models.review import Review, ReviewDelta
+from diff_fuse.state.review_store import ReviewStore, decode_review, encode_delta
+
+APPLY_DELTA_SCRIPT = """
+-- KEYS[1]: review key
+-- ARGV[1]: expected revision, or '' to accept any
+-- ARGV[2]: '1' to clear the state first
+-- ARGV[3]: TTL in seconds
+-- ARGV[4..]: field, value pairs; an empty value deletes the field
+-- Returns {1, new revision}, or {0, current revision} on a revision mismatch.
+local rev = tonumber(redis.call('HGET', KEYS[1], 'rev') or '0')
+if ARGV[1] ~= '' and tonumber(ARGV[1]) ~= rev then
+    return {0, rev}
+end
+if ARGV[2] == '1' then
+    redis.call('DEL', KEYS[1])
+end
+for i = 4, #ARGV, 2 do
+    if ARGV[i + 1] == '' then
+        redis.call('HDEL', KEYS[1], ARGV[i])
+    else
+        redis.call('HSET', KEYS[1], ARGV[i], ARGV[i + 1])
+    end
+end
+rev = rev + 1
+redis.call('HSET', KEYS[1], 'rev', rev)
+redis.call('EXPIRE', KEYS[1], ARGV[3])
+return {1, rev}
+"""
+
+
+class RedisReviewStore(ReviewStore):
+    """
+    Redis implementation of :class:`ReviewStore`.
+
+    Parameters
+    ----------
+    redis : Redis | RedisCluster
+        Client with ``decode_responses=False``.
+    ttl_seconds : int
+        How long review state is kept after its last use.
+    key_prefix : str, default="diff-fuse:review:"
+        Prefix of review keys (``{key_prefix}{session_id}``).
+    """
+
+    def __init__(self, redis: Redis | RedisCluster, *, ttl_seconds: int, key_prefix: str = "diff-fuse:review:") -> None:
+        self._r = redis
+        self._ttl = int(ttl_seconds)
+        self._prefix = key_prefix
+        self._apply_delta = redis.register_script(APPLY_DELTA_SCRIPT)
+
+    def _key(self, session_id: str) -> str:
+        """Return the Redis key of a session's review state."""
+        return f"{self._prefix}{session_id}"
+
+    def get(self, session_id: str) -> Review | None:
+        """See :meth:`ReviewStore.get`. One transactional round trip."""
+        key = self._key(session_id)
+        pipe = self._r.pipeline(transaction=True)
+        pipe.hgetall(key)
+        pipe.expire(key, self._ttl)
+        fields, _ = pipe.execute()
+        if not fields:
+            return None
+        revision = int(fields.pop(b"rev", 0))
+        return decode_review(revision, ((f.decode(), v) for f, v in fields.items()))
+
+    def apply(self, session_id: str, delta: ReviewDelta, *, base_revision: int | None = None) -> int:
+        """See :meth:`ReviewStore.apply`."""
+        args: list[str | bytes | int] = ["" if base_revision is None else base_revision, int(delta.replace), self._ttl]
+        for field, value in encode_delta(delta):
+            args += [field, b"" if value is None else value]
+        applied, revision = self._apply_delta(keys=[self._key(session_id)], args=args)
+        if not applied:
+            assert base_revision is not None
+            raise ReviewConflictError(base_revision, int(revision))
+        return int(revision)
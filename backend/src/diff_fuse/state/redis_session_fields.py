@@ -0,0 +1,350 @@
+"""
+Redis hash layout of a session, and server-side scripts editing it.
+
+Shared by :class:`diff_fuse.state.redis_session_repo.RedisSessionRepo` and
+:class:`diff_fuse.state.async_redis_session_repo.AsyncRedisSessionRepo`, so
+both clients read and write exactly the same keys.
+
+Layout
+------
+- Key: ``{prefix}{session_id}``, or ``{prefix}{{session_id}}`` in cluster
+  mode (see :func:`session_key`)
+- Fields ``session_id``, ``created_at``, ``updated_at``: session header
+- Field ``doc_order``: JSON list of document ids, in input order
+- Fields ``doc:{doc_id}``: JSON-serialized :class:`DocumentMeta`
+- Field ``version``: counter incremented (``HINCRBY``) by every write
+
+Server-side edits
+-----------------
+:data:`APPEND_DOCUMENTS_SCRIPT` and :data:`REMOVE_DOCUMENT_SCRIPT` apply the
+two common mutations (append documents, remove a document) atomically inside
+Redis; the append also checks the session's limits (see
+:class:`~diff_fuse.state.session_repo.SessionLimits`) against what it is
+about to write. Unlike a ``WATCH``/``MULTI`` transaction they never conflict,
+so concurrent edits of one session do not retry or re-download it. Their
+replies are decoded by :func:`parse_append_reply` and
+:func:`parse_remove_reply`.
+
+Redis Cluster
+-------------
+A transaction or script may only touch keys of one hash slot. With
+``hash_tag=True`` the session id is wrapped in a hash tag, so every key
+derived from one session (see the ``suffix`` of :func:`session_key`) hashes
+to the same slot, whatever the prefix. Content-addressed documents are shared
+across sessions and cannot follow any one session's slot: they are spread
+over the cluster and read with non-transactional pipelines, which the cluster
+client splits per node.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+
+import orjson
+
+from diff_fuse.models.document import DocumentMeta
+from diff_fuse.models.session import Session, SessionMeta
+from diff_fuse.state.session_repo import (
+    SessionLimits,
+    duplicate_documents_error,
+    last_document_error,
+    unknown_document_error,
+)
+
+DOC_ORDER_FIELD = "doc_order"
+"""Hash field holding the ordered list of document ids."""
+
+DOC_FIELD_PREFIX = "doc:"
+"""Prefix of the hash fields holding per-document metadata."""
+
+VERSION_FIELD = "version"
+"""Hash field holding the write counter used to validate cached copies."""
+
+
+def session_key(prefix: str, session_id: str, *, hash_tag: bool = False, suffix: str = "") -> str:
+    """
+    Build the Redis key of a session, or of another key owned by it.
+
+    Parameters
+    ----------
+    prefix : str
+        Key namespace prefix.
+    session_id : str
+        Session identifier.
+    hash_tag : bool, default=False
+        Wrap the session id in ``{...}`` so that Redis Cluster places every
+        key of the session in the same hash slot.
+    suffix : str, default=""
+        Appended after the session id, for further keys of the same session.
+
+    Returns
+    -------
+    str
+        Redis key.
+    """
+    if hash_tag:
+        return f"{prefix}{{{session_id}}}{suffix}"
+    return f"{prefix}{session_id}{suffix}"
+
+
+def session_fields(session: Session) -> dict[str, str]:
+    """
+    Encode a session as Redis hash fields, without document payloads.
+
+    Parameters
+    ----------
+    session : Session
+        Session to encode.
+
+    Returns
+    -------
+    dict[str, str]
+        Field mapping: timestamps, document order and one metadata field per
+        document. The version field is not included.
+    """
+    fields = {
+        "session_id": session.session_id,
+        "created_at": session.created_at.isoformat(),
+        "updated_at": session.updated_at.isoformat(),
+        DOC_ORDER_FIELD: orjson.dumps([dr.doc_id for dr in session.documents_results]).decode(),
+    }
+    for dr in session.documents_results:
+        fields[DOC_FIELD_PREFIX + dr.doc_id] = dr.to_meta().model_dump_json()
+    return fields
+
+
+def parse_session_fields(raw: dict[bytes, bytes]) -> SessionMeta | None:
+    """
+    Decode the hash fields written by :func:`session_fields`.
+
+    Parameters
+    ----------
+    raw : dict[bytes, bytes]
+        Result of ``HGETALL`` (empty when the key does not exist).
+
+    Returns
+    -------
+    SessionMeta | None
+        Session metadata, or None if the session does not exist.
+    """
+    if not raw:
+        return None
+    fields = {k.decode(): v for k, v in raw.items()}
+    return SessionMeta(
+        session_id=fields["session_id"].decode(),
+        created_at=datetime.fromisoformat(fields["created_at"].decode()),
+        updated_at=datetime.fromisoformat(fields["updated_at"].decode()),
+        documents_meta=[
+            DocumentMeta.model_validate_json(fields[DOC_FIELD_PREFIX + doc_id])
+            for doc_id in orjson.loads(fields[DOC_ORDER_FIELD])
+        ],
+    )
+
+
+def parse_version(raw: dict[bytes, bytes]) -> int:
+    """Return the version stored in ``HGETALL`` output (``0`` if absent)."""
+    return int(raw.get(VERSION_FIELD.encode(), 0))
+
+
+def changed_session_fields(session: Session, previous: SessionMeta) -> tuple[list[str], dict[str, str]]:
+    """
+    Compute the minimal write turning ``previous`` into ``session``.
+
+    Parameters
+    ----------
+    session : Session
+        New session state.
+    previous : SessionMeta
+        Stored state the write is based on.
+
+    Returns
+    -------
+    tuple[list[str], dict[str, str]]
+        Fields to delete (documents that were removed) and fields to set
+        (anything new or changed).
+    """
+    fields = session_fields(session)
+    old_fields = {DOC_FIELD_PREFIX + m.doc_id: m.model_dump_json() for m in previous.documents_meta}
+    removed = [f for f in old_fields if f not in fields]
+    return removed, {f: v for f, v in fields.items() if old_fields.get(f) != v}
+
+
+# The scripts below hard-code the field names defined above.
+
+APPEND_DOCUMENTS_SCRIPT = """
+-- KEYS[1]: session key
+-- ARGV[1]: TTL in seconds, ARGV[2]: updated_at,
+-- ARGV[3..5]: max documents (-1: no limits), max total chars, max bytes (0: none),
+-- ARGV[6..]: pairs of (doc_id, DocumentMeta JSON)
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return {'missing'}
+end
+local order = cjson.decode(redis.call('HGET', KEYS[1], 'doc_order'))
+local taken = {}
+for _, id in ipairs(order) do
+    taken[id] = true
+end
+local duplicates = {}
+for i = 6, #ARGV, 2 do
+    if taken[ARGV[i]] then
+        table.insert(duplicates, ARGV[i])
+    end
+    taken[ARGV[i]] = true
+end
+if #duplicates > 0 then
+    return {'duplicate', unpack(duplicates)}
+end
+local max_docs, max_chars, max_bytes = tonumber(ARGV[3]), tonumber(ARGV[4]), tonumber(ARGV[5])
+if max_docs >= 0 then
+    local metas = {}
+    for _, id in ipairs(order) do
+        table.insert(metas, redis.call('HGET', KEYS[1], 'doc:' .. id))
+    end
+    for i = 7, #ARGV, 2 do
+        table.insert(metas, ARGV[i])
+    end
+    local chars, bytes = 0, 0
+    for _, raw in ipairs(metas) do
+        local meta = cjson.decode(raw)
+        chars = chars + meta.size_chars
+        bytes = bytes + (meta.approx_bytes or 0)
+    end
+    if #metas > max_docs or chars > max_chars or (max_bytes > 0 and bytes > max_bytes) then
+        return {'limits', tostring(#metas), string.format('%d', chars), string.format('%d', bytes)}
+    end
+end
+for i = 6, #ARGV, 2 do
+    table.insert(order, ARGV[i])
+    redis.call('HSET', KEYS[1], 'doc:' .. ARGV[i], ARGV[i + 1])
+end
+-- cjson encodes an empty table as an object
+local encoded = #order == 0 and '[]' or cjson.encode(order)
+redis.call('HSET', KEYS[1], 'doc_order', encoded, 'updated_at', ARGV[2])
+redis.call('HINCRBY', KEYS[1], 'version', 1)
+redis.call('EXPIRE', KEYS[1], ARGV[1])
+return {'ok', unpack(redis.call('HGETALL', KEYS[1]))}
+"""
+
+REMOVE_DOCUMENT_SCRIPT = """
+-- KEYS[1]: session key
+-- ARGV[1]: TTL in seconds, ARGV[2]: updated_at, ARGV[3]: doc_id
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return {'missing'}
+end
+local order = cjson.decode(redis.call('HGET', KEYS[1], 'doc_order'))
+local kept = {}
+for _, id in ipairs(order) do
+    if id ~= ARGV[3] then
+        table.insert(kept, id)
+    end
+end
+if #kept == #order then
+    return {'unknown_doc'}
+end
+if #kept == 0 then
+    return {'last_doc'}
+end
+local removed = redis.call('HGET', KEYS[1], 'doc:' .. ARGV[3])
+redis.call('HDEL', KEYS[1], 'doc:' .. ARGV[3])
+redis.call('HSET', KEYS[1], 'doc_order', cjson.encode(kept), 'updated_at', ARGV[2])
+redis.call('HINCRBY', KEYS[1], 'version', 1)
+redis.call('EXPIRE', KEYS[1], ARGV[1])
+return {'ok', removed, unpack(redis.call('HGETALL', KEYS[1]))}
+"""
+
+
+def append_documents_args(
+    ttl_seconds: int, updated_at: datetime, metas: list[DocumentMeta], limits: SessionLimits | None = None
+) -> list[str | int]:
+    """Build the ``ARGV`` of :data:`APPEND_DOCUMENTS_SCRIPT`."""
+    args: list[str | int] = [ttl_seconds, updated_at.isoformat()]
+    if limits is None:
+        args += [-1, -1, 0]
+    else:
+        args += [limits.max_documents, limits.max_total_chars, limits.max_bytes]
+    for m in metas:
+        args += [m.doc_id, m.model_dump_json()]
+    return args
+
+
+def _pairs_to_hash(items: list[bytes]) -> dict[bytes, bytes]:
+    """Turn a flat ``HGETALL``-style list into a dictionary."""
+    return dict(zip(items[::2], items[1::2], strict=True))
+
+
+def _parse_updated(items: list[bytes]) -> tuple[SessionMeta, int]:
+    """Decode the updated hash returned by a successful script."""
+    raw = _pairs_to_hash(items)
+    meta = parse_session_fields(raw)
+    assert meta is not None, "scripts only succeed on existing sessions"
+    return meta, parse_version(raw)
+
+
+def parse_append_reply(reply: list[bytes], limits: SessionLimits | None = None) -> tuple[SessionMeta, int] | None:
+    """
+    Decode the reply of :data:`APPEND_DOCUMENTS_SCRIPT`.
+
+    Parameters
+    ----------
+    reply : list[bytes]
+        Raw script reply.
+    limits : SessionLimits | None, default=None
+        Limits the script was given.
+
+    Returns
+    -------
+    tuple[SessionMeta, int] | None
+        Updated metadata and version, or None if the session does not exist.
+
+    Raises
+    ------
+    DomainValidationError
+        If some appended document ids were already taken (nothing was written).
+    LimitsExceededError
+        If the session would have exceeded ``limits`` (nothing was written).
+    """
+    status = reply[0].decode()
+    if status == "missing":
+        return None
+    if status == "duplicate":
+        raise duplicate_documents_error([d.decode() for d in reply[1:]])
+    if status == "limits":
+        assert limits is not None, "the script only checks the limits it is given"
+        error = limits.error(*(int(n) for n in reply[1:4]))
+        assert error is not None, "the script and SessionLimits agree on the limits"
+        raise error
+    return _parse_updated(list(reply[1:]))
+
+
+def parse_remove_reply(reply: list[bytes], doc_id: str) -> tuple[SessionMeta, int, DocumentMeta] | None:
+    """
+    Decode the reply of :data:`REMOVE_DOCUMENT_SCRIPT`.
+
+    Parameters
+    ----------
+    reply : list[bytes]
+        Raw script reply.
+    doc_id : str
+        Document the script was asked to remove.
+
+    Returns
+    -------
+    tuple[SessionMeta, int, DocumentMeta] | None
+        Updated metadata, version and the metadata of the removed document,
+        or None if the session does not exist.
+
+    Raises
+    ------
+    DomainValidationError
+        If the document is not in the session or is its last document
+        (nothing was written).
+    """
+    status = reply[0].decode()
+    if status == "missing":
+        return None
+    if status == "unknown_doc":
+        raise unknown_document_error(doc_id)
+    if status == "last_doc":
+        raise last_document_error(doc_id)
+    meta, version = _parse_updated(list(reply[2:]))
+    return meta, version, DocumentMeta.model_validate_json(reply[1])
@@ -7,11 +7,22 @@ multiple application instances must share session state.
 
 Design characteristics
 ----------------------
-- Each session is stored as a single JSON blob.
+- Each session is a small Redis hash holding timestamps, the document order
+  and one metadata field per document (content hashes, no payloads).
+- Document payloads live in a shared :class:`RedisDocumentStore`, one key per
+  content hash no matter how many sessions reference them.
 - TTL expiration is enforced natively by Redis.
-- Sliding expiration is implemented on access.
+- Sliding expiration is implemented on access with pipelined ``EXPIRE``
+  calls; reads never rewrite session data.
+- Metadata-only reads (:meth:`RedisSessionRepo.get_meta`) do not fetch any
+  document payload.
+- Appending and removing documents run as server-side Lua scripts, with no
+  client-side read-modify-write; other mutations use optimistic
+  ``WATCH``/``MULTI`` transactions.
 - No in-process locking is required.
-- Safe for horizontally scaled deployments.
+- Safe for horizontally scaled deployments, including Redis Cluster: every
+  transaction and script touches one session key only, and with
+  ``hash_tag=True`` all keys of a session share a hash slot.
 
 Notes
 -----
@@ -24,59 +35,112 @@ from __future__ import annotations
 from datetime import UTC, datetime
 from uuid import uuid4
 
-from redis import Redis
+from redis import Redis, RedisCluster
+from redis.client import Pipeline
 from redis.exceptions import WatchError
 
-from diff_fuse.models.document import DocumentResult
-from diff_fuse.models.session import Session
-from diff_fuse.state.session_repo import SessionRepo
+from diff_fuse.models.document import DocumentResult, StoredDocument
+from diff_fuse.models.session import Session, SessionMeta
+from diff_fuse.state.document_store import DocumentStore, acquire_new_refs, hydrate_session, sync_document_refs
+from diff_fuse.state.redis_document_store import RedisDocumentStore
+from diff_fuse.state.redis_session_fields import (
+    APPEND_DOCUMENTS_SCRIPT,
+    REMOVE_DOCUMENT_SCRIPT,
+    VERSION_FIELD,
+    append_documents_args,
+    changed_session_fields,
+    parse_append_reply,
+    parse_remove_reply,
+    parse_session_fields,
+    parse_version,
+    session_fields,
+    session_key,
+)
+from diff_fuse.state.session_cache import SessionCache
+from diff_fuse.state.session_repo import SessionLimits, SessionRepo, append_documents_to, remove_document_from
 
 
 class RedisSessionRepo(SessionRepo):
     """
     Redis-backed implementation of :class:`SessionRepo`.
 
-    Sessions are serialized as JSON and stored under a configurable key
-    prefix. Redis TTL is used for expiration, and the TTL is refreshed on
-    each successful access (sliding expiration).
+    Sessions are stored as Redis hashes under a configurable key prefix.
+    Redis TTL is used for expiration, and the TTL is refreshed on each
+    successful access (sliding expiration).
 
     Parameters
     ----------
-    redis : Redis
-        Initialized Redis client instance.
+    redis : Redis | RedisCluster
+        Initialized Redis or Redis Cluster client instance.
     ttl_seconds : int
         Session time-to-live in seconds.
     key_prefix : str, default="diff-fuse:session:"
         Prefix used for Redis keys.
+    hash_tag : bool, default=False
+        Wrap session ids in a hash tag (cluster mode, see
+        :func:`diff_fuse.state.redis_session_fields.session_key`).
+    document_store : DocumentStore | None, default=None
+        Content-addressed store for document payloads. A
+        :class:`RedisDocumentStore` on the same client is created when omitted.
+    cache : SessionCache | None, default=None
+        Per-process cache of decoded sessions, validated against the
+        ``version`` field before use.
 
     Notes
     -----
     Storage model:
-    - Key: ``{key_prefix}{session_id}``
-    - Value: JSON-serialized :class:`Session`
-    - Expiration: Redis TTL
-
-    The entire session is rewritten on each access to update the sliding TTL.
-    This is acceptable for moderate payload sizes but may need optimization
-    if sessions grow very large.
+    - Key: ``{key_prefix}{session_id}``, or ``{key_prefix}{{session_id}}``
+      with ``hash_tag`` (a Redis hash, see
+      :mod:`diff_fuse.state.redis_session_fields`)
+    - Expiration: Redis TTL, also refreshed on the referenced documents
+
+    A read costs one pipelined ``HGETALL`` + ``EXPIRE`` for the session and
+    one pipelined ``HGET`` + ``EXPIRE`` per document payload it needs. With a
+    cache, a read of an unchanged session costs one ``HGET version`` +
+    ``EXPIRE`` and a pipelined ``EXPIRE`` on its documents.
+
+    Transactions are requested explicitly (``pipeline(transaction=True)``):
+    a cluster client's pipelines are not transactional by default.
     """
 
-    def __init__(self, redis: Redis, *, ttl_seconds: int, key_prefix: str = "diff-fuse:session:") -> None:
+    def __init__(
+        self,
+        redis: Redis | RedisCluster,
+        *,
+        ttl_seconds: int,
+        key_prefix: str = "diff-fuse:session:",
+        hash_tag: bool = False,
+        document_store: DocumentStore | None = None,
+        cache: SessionCache | None = None,
+    ) -> None:
         """
         Initialize the Redis session repository.
 
         Parameters
         ----------
-        redis : Redis
-            Configured Redis client.
+        redis : Redis | RedisCluster
+            Configured Redis or Redis Cluster client.
         ttl_seconds : int
             Session expiration time in seconds.
         key_prefix : str, default="diff-fuse:session:"
             Redis key namespace prefix.
+        hash_tag : bool, default=False
+            Wrap session ids in a hash tag, for Redis Cluster.
+        document_store : DocumentStore | None, default=None
+            Content-addressed document store shared by all sessions.
+        cache : SessionCache | None, default=None
+            Per-process cache of decoded sessions. Disabled when omitted.
         """
         self._r = redis
         self._ttl = int(ttl_seconds)
         self._prefix = key_prefix
+        self._hash_tag = hash_tag
+        self._documents = (
+            document_store if document_store is not None else RedisDocumentStore(redis, ttl_seconds=ttl_seconds)
+        )
+        self._cache = cache
+        self._append = redis.register_script(APPEND_DOCUMENTS_SCRIPT)
+        self._remove = redis.register_script(REMOVE_DOCUMENT_SCRIPT)
 
     def _key(self, session_id: str) -> str:
         """
@@ -92,7 +156,138 @@ class RedisSessionRepo(SessionRepo):
         str
             Redis key.
         """
-        return f"{self._prefix}{session_id}"
+        return session_key(self._prefix, session_id, hash_tag=self._hash_tag)
+
+    def _hydrate(self, meta: SessionMeta) -> Session | None:
+        """
+        Attach document payloads to session metadata.
+
+        The TTL of every fetched document is refreshed in the same round trip.
+
+        Parameters
+        ----------
+        meta : SessionMeta
+            Session metadata.
+
+        Returns
+        -------
+        Session | None
+            The full session, or None if a referenced document is gone
+            (e.g. evicted by Redis under memory pressure).
+        """
+        stored_docs = self._documents.get_many([m.content_hash for m in meta.documents_meta], refresh_ttl=True)
+        return hydrate_session(meta, stored_docs)
+
+    def _read_meta(self, session_id: str) -> tuple[SessionMeta, int] | None:
+        """
+        Read session metadata and slide the session TTL in one round trip.
+
+        Parameters
+        ----------
+        session_id : str
+            Session identifier.
+
+        Returns
+        -------
+        tuple[SessionMeta, int] | None
+            Session metadata and version, or None if the session does not exist.
+        """
+        key = self._key(session_id)
+        with self._r.pipeline(transaction=False) as pipe:
+            pipe.hgetall(key)
+            pipe.expire(key, self._ttl)
+            raw, _ = pipe.execute()
+        meta = parse_session_fields(raw)
+        if meta is None:
+            return None
+        return meta, parse_version(raw)
+
+    def _read_version(self, session_id: str) -> int | None:
+        """
+        Read the session version and slide the session TTL in one round trip.
+
+        Parameters
+        ----------
+        session_id : str
+            Session identifier.
+
+        Returns
+        -------
+        int | None
+            Current version, or None if the session does not exist.
+        """
+        key = self._key(session_id)
+        with self._r.pipeline(transaction=False) as pipe:
+            pipe.hget(key, VERSION_FIELD)
+            pipe.expire(key, self._ttl)
+            version, _ = pipe.execute()
+        return int(version) if version is not None else None
+
+    def _remember(self, session: Session, version: int) -> None:
+        """Store ``session`` in the cache, if enabled."""
+        if self._cache is not None:
+            self._cache.put(session, version)
+
+    def _write(self, pipe: Pipeline, session: Session, *, previous: SessionMeta | None) -> None:
+        """
+        Queue the commands that persist ``session`` on a pipeline.
+
+        Only fields that changed since ``previous`` are written, and fields of
+        removed documents are deleted. The version counter is incremented; its
+        new value is the reply of the second-to-last queued command.
+
+        Parameters
+        ----------
+        pipe : Pipeline
+            Pipeline (usually in MULTI mode) to queue commands on.
+        session : Session
+            Session state to persist.
+        previous : SessionMeta | None
+            Stored state the write is based on, or None to rewrite the key.
+        """
+        key = self._key(session.session_id)
+
+        if previous is None:
+            pipe.delete(key)
+            fields = session_fields(session)
+        else:
+            removed, fields = changed_session_fields(session, previous)
+            if removed:
+                pipe.hdel(key, *removed)
+
+        if fields:
+            pipe.hset(key, mapping=fields)
+        pipe.hincrby(key, VERSION_FIELD, 1)
+        pipe.expire(key, self._ttl)
+
+    def _load_watched(self, pipe: Pipeline, session_id: str) -> Session | None:
+        """
+        Load a session on a pipeline in WATCH mode, preferring the cache.
+
+        Parameters
+        ----------
+        pipe : Pipeline
+            Pipeline that is watching the session key.
+        session_id : str
+            Session identifier.
+
+        Returns
+        -------
+        Session | None
+            The current session, or None if it does not exist.
+        """
+        key = self._key(session_id)
+        if self._cache is not None:
+            version = pipe.hget(key, VERSION_FIELD)
+            if version is None:
+                self._cache.invalidate(session_id)
+                return None
+            cached = self._cache.get(session_id, int(version))
+            if cached is not None:
+                return cached
+
+        meta = parse_session_fields(pipe.hgetall(key))
+        return self._hydrate(meta) if meta is not None else None
 
     def create(self, *, documents_results: list[DocumentResult]) -> Session:
         """
@@ -119,10 +314,13 @@ class RedisSessionRepo(SessionRepo):
             session_id=sid,
             created_at=now,
             updated_at=now,
-            documents_results=documents_results,
+            documents_results=sync_document_refs(self._documents, [], documents_results),
         )
 
-        self._r.set(self._key(sid), session.model_dump_json(), ex=self._ttl)
+        with self._r.pipeline(transaction=True) as pipe:
+            self._write(pipe, session, previous=None)
+            version = pipe.execute()[-2]
+        self._remember(session, version)
         return session
 
     def get(self, session_id: str) -> Session | None:
@@ -144,24 +342,58 @@ class RedisSessionRepo(SessionRepo):
         Behavior:
 
         - Missing key -> returns None
-        - Existing key -> TTL is refreshed (sliding expiration)
-        - ``updated_at`` timestamp is updated on each access
+        - Existing key -> TTL is refreshed (sliding expiration), for the
+          session and for the documents it references
+
+        Reads never write session data: the TTL is slid with ``EXPIRE`` only,
+        so ``updated_at`` reflects the last modification for this backend.
+
+        With a cache, only the version is read first; documents are loaded
+        only if the cached copy is missing or stale.
         """
-        raw = self._r.get(self._key(session_id))
-        if raw is None:
+        if self._cache is not None:
+            version = self._read_version(session_id)
+            if version is None:
+                self._cache.invalidate(session_id)
+                return None
+            cached = self._cache.get(session_id, version)
+            if cached is not None:
+                self._documents.touch(dr.content_hash for dr in cached.documents_results)
+                return cached
+
+        loaded = self._read_meta(session_id)
+        if loaded is None:
             return None
+        meta, version = loaded
+        session = self._hydrate(meta)
+        if session is not None:
+            self._remember(session, version)
+        return session
 
-        # redis-py may return bytes depending on decode_responses
-        if isinstance(raw, bytes):
-            raw = raw.decode("utf-8")
+    def get_meta(self, session_id: str) -> SessionMeta | None:
+        """
+        Retrieve a session's metadata without loading document payloads.
 
-        session = Session.model_validate_json(raw)
+        Parameters
+        ----------
+        session_id : str
+            Session identifier.
 
-        # Sliding expiration
-        session.updated_at = datetime.now(UTC)
-        self._r.set(self._key(session_id), session.model_dump_json(), ex=self._ttl)
+        Returns
+        -------
+        SessionMeta | None
+            The session metadata if found; otherwise None.
 
-        return session
+        Notes
+        -----
+        Refreshes the TTL of the session and of its documents, like :meth:`get`.
+        """
+        loaded = self._read_meta(session_id)
+        if loaded is None:
+            return None
+        meta, _ = loaded
+        self._documents.touch(m.content_hash for m in meta.documents_meta)
+        return meta
 
     def save(self, session: Session) -> Session:
         """
@@ -177,8 +409,16 @@ class RedisSessionRepo(SessionRepo):
         Session
             The updated session instance.
         """
+        loaded = self._read_meta(session.session_id)
+        previous = loaded[0] if loaded is not None else None
+        before = previous.documents_meta if previous is not None else []
+        session.documents_results = sync_document_refs(self._documents, before, session.documents_results)
+
         session.updated_at = datetime.now(UTC)
-        self._r.set(self._key(session.session_id), session.model_dump_json(), ex=self._ttl)
+        with self._r.pipeline(transaction=True) as pipe:
+            self._write(pipe, session, previous=previous)
+            version = pipe.execute()[-2]
+        self._remember(session, version)
         return session
 
     def mutate(self, session_id: str, fn):
@@ -202,34 +442,185 @@ class RedisSessionRepo(SessionRepo):
         This method uses Redis transactions to ensure atomicity. It retries a few times
         if concurrent modifications are detected. If the session does not exist,
         it returns None without calling the function.
+
+        Only the hash fields that changed are written back. A cached copy is
+        reused when its version is current.
         """
         key = self._key(session_id)
 
         for _ in range(5):  # small retry loop
-            with self._r.pipeline() as pipe:
+            acquired: list[str] = []
+            with self._r.pipeline(transaction=True) as pipe:
                 try:
                     pipe.watch(key)
-                    raw = pipe.get(key)
-                    if raw is None:
+                    session = self._load_watched(pipe, session_id)
+                    if session is None:
                         pipe.unwatch()
                         return None
-                    if isinstance(raw, bytes):
-                        raw = raw.decode("utf-8")
+                    meta = session.to_meta()
 
-                    session = Session.model_validate_json(raw)
                     session = fn(session)
                     session.updated_at = datetime.now(UTC)
 
+                    # New documents must exist before the session references them;
+                    # removed ones are released only once the write has won.
+                    session.documents_results, acquired, released = acquire_new_refs(
+                        self._documents, meta.documents_meta, session.documents_results
+                    )
+
                     pipe.multi()
-                    pipe.set(key, session.model_dump_json(), ex=self._ttl)
-                    pipe.execute()
-                    return session
+                    self._write(pipe, session, previous=meta)
+                    version = pipe.execute()[-2]
                 except WatchError:
-                    # someone else updated it, retry
+                    # someone else updated it: undo our acquisitions and retry
+                    for content_hash in acquired:
+                        self._documents.release(content_hash)
                     continue
 
+                for content_hash in released:
+                    self._documents.release(content_hash)
+                self._remember(session, version)
+                return session
+
         raise RuntimeError("Failed to update session due to repeated concurrent modifications")
 
+    def append_documents(
+        self, session_id: str, documents_results: list[DocumentResult], limits: SessionLimits | None = None
+    ) -> SessionMeta | None:
+        """
+        Atomically append documents to a session with one server-side script.
+
+        Parameters
+        ----------
+        session_id : str
+            Session identifier.
+        documents_results : list[DocumentResult]
+            Documents to append, in order.
+        limits : SessionLimits | None, default=None
+            Limits checked by the script, against the metadata it appends to.
+
+        Returns
+        -------
+        SessionMeta | None
+            The updated session metadata, or None if the session does not exist.
+
+        Raises
+        ------
+        DomainValidationError
+            If a document id is already used in the session.
+        LimitsExceededError
+            If the session would exceed ``limits`` (nothing is written).
+
+        Notes
+        -----
+        Payloads are stored before the script runs, so the session never
+        references a missing document; they are released again if the script
+        writes nothing. No ``WATCH`` is involved: concurrent appends to the
+        same session never conflict or retry.
+        """
+        now = datetime.now(UTC)
+        results, acquired, _ = acquire_new_refs(self._documents, [], documents_results)
+        args = append_documents_args(self._ttl, now, [dr.to_meta() for dr in results], limits)
+
+        try:
+            loaded = parse_append_reply(self._append(keys=[self._key(session_id)], args=args), limits)
+        except Exception:
+            for content_hash in acquired:
+                self._documents.release(content_hash)
+            raise
+        if loaded is None:
+            for content_hash in acquired:
+                self._documents.release(content_hash)
+            return None
+
+        meta, version = loaded
+        self._documents.touch(m.content_hash for m in meta.documents_meta)
+        if self._cache is not None:
+
+            def _apply(session: Session) -> Session:
+                session = append_documents_to(session, results)
+                session.updated_at = meta.updated_at
+                return session
+
+            self._cache.advance(session_id, version, _apply)
+        return meta
+
+    def remove_document(self, session_id: str, doc_id: str) -> SessionMeta | None:
+        """
+        Atomically remove one document from a session with one server-side script.
+
+        Parameters
+        ----------
+        session_id : str
+            Session identifier.
+        doc_id : str
+            Document to remove.
+
+        Returns
+        -------
+        SessionMeta | None
+            The updated session metadata, or None if the session does not exist.
+
+        Raises
+        ------
+        DomainValidationError
+            If the document is not in the session, or is its last document.
+        """
+        reply = self._remove(keys=[self._key(session_id)], args=[self._ttl, datetime.now(UTC).isoformat(), doc_id])
+        loaded = parse_remove_reply(reply, doc_id)
+        if loaded is None:
+            return None
+
+        meta, version, removed = loaded
+        self._documents.release(removed.content_hash)
+        self._documents.touch(m.content_hash for m in meta.documents_meta)
+        if self._cache is not None:
+
+            def _apply(session: Session) -> Session:
+                session = remove_document_from(session, doc_id)
+                session.updated_at = meta.updated_at
+                return session
+
+            self._cache.advance(session_id, version, _apply)
+        return meta
+
+    def find_document(self, content_hash: str) -> StoredDocument | None:
+        """
+        Look up an already stored document by content hash.
+
+        Parameters
+        ----------
+        content_hash : str
+            Content address of the document.
+
+        Returns
+        -------
+        StoredDocument | None
+            The stored payload if it has not expired; otherwise None.
+        """
+        return self._documents.get(content_hash)
+
+    def find_documents(self, content_hashes: list[str]) -> list[StoredDocument | None]:
+        """
+        Look up several stored documents in one pipelined round trip.
+
+        Parameters
+        ----------
+        content_hashes : list[str]
+            Content addresses of the documents.
+
+        Returns
+        -------
+        list[StoredDocument | None]
+            One entry per hash, in order; None where nothing is stored.
+
+        Notes
+        -----
+        On a cluster the pipeline is split per node and each node is sent its
+        share of the reads at once.
+        """
+        return self._documents.get_many(content_hashes)
+
     def cleanup(self) -> int:
         """
         Perform repository cleanup.
@@ -246,3 +637,22 @@ class RedisSessionRepo(SessionRepo):
         """
         # Redis handles TTL expiry; nothing to do here.
         return 0
+
+    def stats(self) -> dict[str, int]:
+        """
+        Report the per-process session cache counters.
+
+        Returns
+        -------
+        dict[str, int]
+            Cache hits, misses, cached sessions and tiering counters (see
+            :meth:`SessionCache.stats`); all zero when the cache is disabled.
+        """
+        if self._cache is None:
+            return SessionCache(0).stats()
+        return self._cache.stats()
+
+    @property
+    def cache(self) -> SessionCache | None:
+        """The per-process session cache, if enabled."""
+        return self._cache
@@ -0,0 +1,160 @@
+"""
+Review state storage abstraction.
+
+The review state of a session (see :mod:`diff_fuse.models.review`) is kept
+in the same backend as sessions, so that every worker process merges with
+the same selections:
+
+- :class:`diff_fuse.state.memory_review_store.MemoryReviewStore` (single
+  process);
+- :class:`diff_fuse.state.sqlite_review_store.SqliteReviewStore` (processes
+  of one host, on the sessions database);
+- :class:`diff_fuse.state.redis_review_store.RedisReviewStore` (any
+  deployment).
+
+Review state expires like a session: reading or changing it gives it a fresh
+session TTL.
+
+Delta updates
+-------------
+The shared backends store every override and selection as its own entry
+(a hash field, a table row), named by :func:`entry_field`. Applying a
+:class:`ReviewDelta` writes or deletes only the entries it mentions, so the
+cost of an update does not grow with the size of the review.
+"""
+
+from collections.abc import Iterable
+from typing import Any, Protocol
+
+import orjson
+
+from diff_fuse.models.review import Review, ReviewDelta
+
+NULL_MODE_FIELD = "null_mode"
+"""Entry holding a non-default ``null_mode``."""
+
+_STRATEGY_PREFIX = "a:"
+_SELECTION_PREFIX = "s:"
+
+
+class ReviewStore(Protocol):
+    """Storage interface for the review state of sessions."""
+
+    def get(self, session_id: str) -> Review | None:
+        """
+        Fetch a session's review state, refreshing its expiry.
+
+        Parameters
+        ----------
+        session_id : str
+            Session identifier.
+
+        Returns
+        -------
+        Review | None
+            The state, or None if none was stored or it has expired.
+        """
+        ...
+
+    def apply(self, session_id: str, delta: ReviewDelta, *, base_revision: int | None = None) -> int:
+        """
+        Atomically apply a delta to a session's review state.
+
+        Parameters
+        ----------
+        session_id : str
+            Session identifier.
+        delta : ReviewDelta
+            Change to apply. A missing or expired state starts out empty, at
+            revision ``0``.
+        base_revision : int | None, default=None
+            Revision the delta was based on. When given, the delta is only
+            applied if the state is still at that revision.
+
+        Returns
+        -------
+        int
+            The new revision.
+
+        Raises
+        ------
+        ReviewConflictError
+            If ``base_revision`` is not the current revision.
+        """
+        ...
+
+
+def entry_field(kind: str, node_id: str) -> str:
+    """
+    Name the stored entry of one override or selection.
+
+    Parameters
+    ----------
+    kind : str
+        ``"array_strategies_by_node_id"`` or ``"selections_by_node_id"``.
+    node_id : str
+        Canonical node ID.
+
+    Returns
+    -------
+    str
+        Entry name, unique within the session's review state.
+    """
+    prefix = _STRATEGY_PREFIX if kind == "array_strategies_by_node_id" else _SELECTION_PREFIX
+    return prefix + node_id
+
+
+def encode_delta(delta: ReviewDelta) -> list[tuple[str, bytes | None]]:
+    """
+    Translate a delta into entry writes.
+
+    Parameters
+    ----------
+    delta : ReviewDelta
+        Change to encode. ``delta.replace`` is not encoded: the store clears
+        the state itself.
+
+    Returns
+    -------
+    list[tuple[str, bytes | None]]
+        ``(field, value)`` pairs; a None value deletes the entry.
+    """
+    writes: list[tuple[str, bytes | None]] = []
+    if delta.null_mode is not None:
+        writes.append((NULL_MODE_FIELD, delta.null_mode.value.encode()))
+    for kind in ("array_strategies_by_node_id", "selections_by_node_id"):
+        changes: dict[str, Any] = getattr(delta, kind)
+        for node_id, value in changes.items():
+            writes.append((entry_field(kind, node_id), None if value is None else value.model_dump_json().encode()))
+    return writes
+
+
+def decode_review(revision: int, entries: Iterable[tuple[str, bytes]]) -> Review:
+    """
+    Rebuild review state from its stored entries.
+
+    Parameters
+    ----------
+    revision : int
+        Current revision.
+    entries : Iterable[tuple[str, bytes]]
+        ``(field, value)`` pairs written by :func:`encode_delta`.
+
+    Returns
+    -------
+    Review
+        The validated state.
+    """
+    data: dict[str, Any] = {"revision": revision}
+    strategies: dict[str, Any] = {}
+    selections: dict[str, Any] = {}
+    for field, value in entries:
+        if field == NULL_MODE_FIELD:
+            data["null_mode"] = bytes(value).decode()
+        elif field.startswith(_STRATEGY_PREFIX):
+            strategies[field.removeprefix(_STRATEGY_PREFIX)] = orjson.loads(value)
+        elif field.startswith(_SELECTION_PREFIX):
+            selections[field.removeprefix(_SELECTION_PREFIX)] = orjson.loads(value)
+    data["array_strategies_by_node_id"] = strategies
+    data["selections_by_node_id"] = selections
+    return Review.model_validate(data)
@@ -0,0 +1,261 @@
+"""
+Per-process cache of decoded sessions.
+
+With several workers sharing Redis, the same worker often serves consecutive
+requests for one session. Re-downloading and re-decoding every document for
+each of them is wasted work when nothing changed in between.
+
+This module provides a small LRU cache keyed by session id. Every entry is
+stamped with the session's version counter (stored in Redis and incremented
+by every write), so a cached session is used only after a cheap version check
+confirms it is still current. Entries left idle can be kept compressed and
+are inflated on their next hit.
+"""
+
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+from threading import Lock
+
+from diff_fuse.models.document import DocumentResult
+from diff_fuse.models.session import Session, SessionMeta
+from diff_fuse.state.codec import decode_document, encode_document
+
+
+@dataclass(slots=True)
+class _Entry:
+    """A cached session, either decoded (hot) or compressed (cold)."""
+
+    version: int
+    session: Session | None
+    packed: tuple[SessionMeta, list[bytes]] | None
+    used: float
+
+
+def _pack(session: Session) -> tuple[SessionMeta, list[bytes]]:
+    """Compress a session's documents with the document codec."""
+    return session.to_meta(), [encode_document(dr.to_stored()) for dr in session.documents_results]
+
+
+def _unpack(packed: tuple[SessionMeta, list[bytes]]) -> Session:
+    """Rebuild a session compressed by :func:`_pack`."""
+    meta, payloads = packed
+    return Session(
+        session_id=meta.session_id,
+        created_at=meta.created_at,
+        updated_at=meta.updated_at,
+        documents_results=[
+            DocumentResult.from_stored(decode_document(p), doc_id=m.doc_id, name=m.name)
+            for m, p in zip(meta.documents_meta, payloads, strict=True)
+        ],
+    )
+
+
+class SessionCache:
+    """
+    Thread-safe LRU cache of sessions, validated by version stamps.
+
+    Parameters
+    ----------
+    max_entries : int
+        Maximum number of cached sessions. ``0`` disables caching.
+    demote_after_seconds : float, default=0
+        Idle time after which :meth:`demote_idle` compresses a cached session.
+        ``0`` keeps every entry decoded.
+
+    Notes
+    -----
+    Cached sessions are handed out as shallow copies (own object, own
+    document list, shared document results), so callers that mutate the
+    returned session cannot corrupt the cache.
+
+    Tiering: idle entries can be demoted to compressed codec payloads (the
+    *cold* tier) by :meth:`demote_idle`, which the application runs
+    periodically. A hit on a cold entry inflates it back transparently,
+    which is still far cheaper than a round trip to the backing store.
+    """
+
+    def __init__(self, max_entries: int, *, demote_after_seconds: float = 0) -> None:
+        self._max = max(0, int(max_entries))
+        self._demote_after = max(0.0, float(demote_after_seconds))
+        self._lock = Lock()
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.inflations = 0
+        self._inflate_ns = 0
+
+    @property
+    def demote_after_seconds(self) -> float:
+        """Idle time before entries are compressed (``0`` when disabled)."""
+        return self._demote_after
+
+    @staticmethod
+    def _copy(session: Session) -> Session:
+        """Return a shallow copy with its own document list."""
+        return session.model_copy(update={"documents_results": list(session.documents_results)})
+
+    def _inflate(self, session_id: str, entry: _Entry) -> Session:
+        """
+        Decode a cold entry and promote it back to the hot tier.
+
+        Runs without ``self._lock``.
+        """
+        assert entry.packed is not None
+        start = time.perf_counter_ns()
+        session = _unpack(entry.packed)
+        elapsed = time.perf_counter_ns() - start
+        with self._lock:
+            self.inflations += 1
+            self._inflate_ns += elapsed
+            if self._entries.get(session_id) is entry and entry.session is None:
+                entry.session, entry.packed = session, None
+        return session
+
+    def get(self, session_id: str, version: int) -> Session | None:
+        """
+        Return a copy of the cached session if it matches ``version``.
+
+        Parameters
+        ----------
+        session_id : str
+            Session identifier.
+        version : int
+            Current version of the session in the backing store.
+
+        Returns
+        -------
+        Session | None
+            A copy of the cached session, or None on a miss or a stale entry.
+            Stale entries are dropped.
+        """
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is None or entry.version != version:
+                if entry is not None:
+                    del self._entries[session_id]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(session_id)
+            self.hits += 1
+            entry.used = time.monotonic()
+            session = entry.session
+
+        if session is None:
+            session = self._inflate(session_id, entry)
+        return self._copy(session)
+
+    def put(self, session: Session, version: int) -> None:
+        """
+        Cache a copy of ``session`` at ``version``.
+
+        Parameters
+        ----------
+        session : Session
+            Session state matching ``version`` in the backing store.
+        version : int
+            Version stamp to validate the entry against later.
+        """
+        if self._max == 0:
+            return
+        entry = _Entry(version=version, session=self._copy(session), packed=None, used=time.monotonic())
+        with self._lock:
+            self._entries[session.session_id] = entry
+            self._entries.move_to_end(session.session_id)
+            while len(self._entries) > self._max:
+                self._entries.popitem(last=False)
+
+    def advance(self, session_id: str, version: int, fn: Callable[[Session], Session]) -> None:
+        """
+        Update a cached session after a server-side write.
+
+        Parameters
+        ----------
+        session_id : str
+            Session identifier.
+        version : int
+            Version produced by the write. The cached entry is updated only if
+            it is exactly one version behind; otherwise it is dropped.
+        fn : Callable[[Session], Session]
+            Applies the write to a copy of the cached session.
+
+        Notes
+        -----
+        Does not count as a hit or a miss.
+        """
+        with self._lock:
+            entry = self._entries.pop(session_id, None)
+        if entry is None or entry.version != version - 1:
+            return
+        session = entry.session if entry.session is not None else self._inflate(session_id, entry)
+        self.put(fn(self._copy(session)), version)
+
+    def invalidate(self, session_id: str) -> None:
+        """
+        Drop a cached session, if present.
+
+        Parameters
+        ----------
+        session_id : str
+            Session identifier.
+        """
+        with self._lock:
+            self._entries.pop(session_id, None)
+
+    def demote_idle(self) -> int:
+        """
+        Compress sessions not read for ``demote_after_seconds``.
+
+        Returns
+        -------
+        int
+            Number of sessions demoted to the cold tier (``0`` when demotion
+            is disabled).
+
+        Notes
+        -----
+        Encoding runs without the lock; an entry read or replaced while it is
+        being encoded is left alone.
+        """
+        if not self._demote_after:
+            return 0
+        cutoff = time.monotonic() - self._demote_after
+        with self._lock:
+            idle = [
+                (sid, e, e.session) for sid, e in self._entries.items() if e.session is not None and e.used <= cutoff
+            ]
+
+        demoted = 0
+        for session_id, entry, session in idle:
+            packed = _pack(session)
+            with self._lock:
+                if self._entries.get(session_id) is entry and entry.session is session and entry.used <= cutoff:
+                    entry.session, entry.packed = None, packed
+                    demoted += 1
+        return demoted
+
+    def stats(self) -> dict[str, int]:
+        """
+        Report cache counters.
+
+        Returns
+        -------
+        dict[str, int]
+            Hits, misses, cached sessions and how many of them are cold, the
+            number of cold hits that inflated a session, and the total time
+            spent inflating, in microseconds.
+        """
+        with self._lock:
+            return {
+                "cache_hits": self.hits,
+                "cache_misses": self.misses,
+                "cached_sessions": len(self._entries),
+                "cold_sessions": sum(1 for e in self._entries.values() if e.session is None),
+                "cache_inflations": self.inflations,
+                "cache_inflate_us": self._inflate_ns // 1000,
+            }
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
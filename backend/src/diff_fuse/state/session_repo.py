@@ -13,13 +13,92 @@ Notes
 This is a *structural* interface (``typing.Protocol``). Any class that provides
 the same methods with compatible signatures will be accepted by type checkers,
 even if it does not explicitly inherit from :class:`SessionRepo`.
+
+:class:`AsyncSessionRepo` is the awaitable counterpart used by request
+handlers, so that waiting on storage I/O does not occupy a worker thread.
 """
 
-from collections.abc import Callable
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
 from typing import Protocol
 
-from diff_fuse.models.document import DocumentResult
-from diff_fuse.models.session import Session
+from diff_fuse.domain.errors import DomainValidationError, LimitsExceededError
+from diff_fuse.models.document import DocumentMeta, DocumentResult, StoredDocument
+from diff_fuse.models.session import Session, SessionMeta
+
+
+@dataclass(frozen=True, slots=True)
+class SessionLimits:
+    """
+    Per-session limits that appending documents must respect.
+
+    Attributes
+    ----------
+    max_documents : int
+        Maximum number of documents.
+    max_total_chars : int
+        Maximum total size of the uploaded documents, in characters.
+    max_bytes : int, default=0
+        Maximum approximate in-memory size of the parsed documents, in bytes.
+        ``0`` disables it.
+
+    Notes
+    -----
+    Services check the same limits before parsing, to fail fast; only the
+    check made atomically with the append holds under concurrent appends.
+    """
+
+    max_documents: int
+    max_total_chars: int
+    max_bytes: int = 0
+
+    def error(self, count: int, total_chars: int, approx_bytes: int) -> LimitsExceededError | None:
+        """
+        Return the error for a session of the given size, if it breaks a limit.
+
+        Parameters
+        ----------
+        count : int
+            Number of documents.
+        total_chars : int
+            Sum of their ``size_chars``.
+        approx_bytes : int
+            Sum of their ``approx_bytes``.
+
+        Returns
+        -------
+        LimitsExceededError | None
+            The error to raise, or None if the session is within limits.
+        """
+        if count > self.max_documents:
+            return LimitsExceededError("Too many documents", count=count, max_documents_per_session=self.max_documents)
+        if total_chars > self.max_total_chars:
+            return LimitsExceededError(
+                "Total input too large", total_chars=total_chars, max_total_chars_per_session=self.max_total_chars
+            )
+        if self.max_bytes and approx_bytes > self.max_bytes:
+            return LimitsExceededError(
+                "Session too large in memory", approx_bytes=approx_bytes, max_session_bytes=self.max_bytes
+            )
+        return None
+
+    def check(self, documents: Sequence[DocumentMeta]) -> None:
+        """
+        Raise if a session holding ``documents`` would break a limit.
+
+        Parameters
+        ----------
+        documents : Sequence[DocumentMeta]
+            Every document of the session, appended ones included.
+
+        Raises
+        ------
+        LimitsExceededError
+            If any limit is exceeded.
+        """
+        error = self.error(len(documents), sum(d.size_chars for d in documents), sum(d.approx_bytes for d in documents))
+        if error is not None:
+            raise error
 
 
 class SessionRepo(Protocol):
@@ -64,6 +143,26 @@ class SessionRepo(Protocol):
         """
         ...
 
+    def get_meta(self, session_id: str) -> SessionMeta | None:
+        """
+        Fetch an existing session's metadata without document contents.
+
+        Parameters
+        ----------
+        session_id : str
+            Opaque session identifier.
+
+        Returns
+        -------
+        SessionMeta | None
+            The session metadata if it exists and is not expired; otherwise None.
+
+        Notes
+        -----
+        Counts as an access: the session TTL is refreshed like in :meth:`get`.
+        """
+        ...
+
     def save(self, session: Session) -> Session:
         """
         Update an existing session.
@@ -105,6 +204,108 @@ class SessionRepo(Protocol):
         """
         ...
 
+    def find_document(self, content_hash: str) -> StoredDocument | None:
+        """
+        Look up an already stored document by content hash.
+
+        Parameters
+        ----------
+        content_hash : str
+            Content address of the document
+            (see :func:`diff_fuse.domain.fingerprint.document_content_hash`).
+
+        Returns
+        -------
+        StoredDocument | None
+            The stored payload if some session still references it; otherwise None.
+
+        Notes
+        -----
+        Lets the service layer skip parsing and normalization for documents
+        that were already uploaded, e.g. a baseline shared by many sessions.
+        """
+        ...
+
+    def find_documents(self, content_hashes: list[str]) -> list[StoredDocument | None]:
+        """
+        Look up several stored documents at once.
+
+        Parameters
+        ----------
+        content_hashes : list[str]
+            Content addresses of the documents.
+
+        Returns
+        -------
+        list[StoredDocument | None]
+            One entry per hash, in order; None where nothing is stored.
+
+        Notes
+        -----
+        Network backends answer with one batched round trip, rather than one
+        per document as repeated :meth:`find_document` calls would.
+        """
+        ...
+
+    def append_documents(
+        self, session_id: str, documents_results: list[DocumentResult], limits: SessionLimits | None = None
+    ) -> SessionMeta | None:
+        """
+        Atomically append documents to a session.
+
+        Parameters
+        ----------
+        session_id : str
+            Opaque session identifier.
+        documents_results : list[DocumentResult]
+            Documents to append, in order.
+        limits : SessionLimits | None, default=None
+            Limits the session must still respect with the documents
+            appended, checked atomically with the append.
+
+        Returns
+        -------
+        SessionMeta | None
+            The updated session metadata, or None if the session does not exist.
+
+        Raises
+        ------
+        DomainValidationError
+            If a document id is already used in the session.
+        LimitsExceededError
+            If the session would exceed ``limits`` (nothing is written).
+
+        Notes
+        -----
+        Equivalent to a :meth:`mutate` that extends the document list (see
+        :func:`append_documents_to`), but backends can apply it without a
+        client-side read-modify-write.
+        """
+        ...
+
+    def remove_document(self, session_id: str, doc_id: str) -> SessionMeta | None:
+        """
+        Atomically remove one document from a session.
+
+        Parameters
+        ----------
+        session_id : str
+            Opaque session identifier.
+        doc_id : str
+            Document to remove.
+
+        Returns
+        -------
+        SessionMeta | None
+            The updated session metadata, or None if the session does not exist.
+
+        Raises
+        ------
+        DomainValidationError
+            If the document is not in the session, or is its last document.
+        """
+        ...
+
     def cleanup(self) -> int:
         """
         Remove expired sessions.
@@ -115,3 +316,167 @@ class SessionRepo(Protocol):
             The number of sessions removed.
         """
         ...
+
+    def stats(self) -> dict[str, int]:
+        """
+        Report backend-specific counters for monitoring.
+
+        Returns
+        -------
+        dict[str, int]
+            Counter name to value.
+        """
+        ...
+
+
+class AsyncSessionRepo(Protocol):
+    """
+    Asynchronous storage interface for sessions.
+
+    Methods have the same semantics as their :class:`SessionRepo`
+    counterparts. Network backends implement it natively; in-process
+    backends are adapted with
+    :class:`diff_fuse.state.threaded_session_repo.ThreadedSessionRepo`.
+    """
+
+    async def create(self, *, documents_results: list[DocumentResult]) -> Session:
+        """Create and store a new session."""
+        ...
+
+    async def get(self, session_id: str) -> Session | None:
+        """Retrieve a session by id (None if missing or expired)."""
+        ...
+
+    async def get_meta(self, session_id: str) -> SessionMeta | None:
+        """Retrieve a session's metadata by id, without document contents."""
+        ...
+
+    async def save(self, session: Session) -> Session:
+        """Persist an updated session."""
+        ...
+
+    async def mutate(self, session_id: str, fn: Callable[[Session], Session]) -> Session | None:
+        """
+        Atomically apply ``fn`` to a session.
+
+        Notes
+        -----
+        ``fn`` is a plain (synchronous) function. It should be cheap: it may
+        run on the event loop and, with optimistic backends, more than once.
+        """
+        ...
+
+    async def find_document(self, content_hash: str) -> StoredDocument | None:
+        """Look up an already stored document by content hash."""
+        ...
+
+    async def find_documents(self, content_hashes: list[str]) -> list[StoredDocument | None]:
+        """Look up several stored documents at once."""
+        ...
+
+    async def append_documents(
+        self, session_id: str, documents_results: list[DocumentResult], limits: SessionLimits | None = None
+    ) -> SessionMeta | None:
+        """Atomically append documents to a session, within ``limits``."""
+        ...
+
+    async def remove_document(self, session_id: str, doc_id: str) -> SessionMeta | None:
+        """Atomically remove one document from a session."""
+        ...
+
+    async def cleanup(self) -> int:
+        """Remove expired sessions and return how many were removed."""
+        ...
+
+    def stats(self) -> dict[str, int]:
+        """Report backend-specific counters for monitoring."""
+        ...
+
+    async def close(self) -> None:
+        """Release connections held by the repository."""
+        ...
+
+
+def duplicate_documents_error(doc_ids: list[str]) -> DomainValidationError:
+    """Build the error raised when appended document ids are already taken."""
+    return DomainValidationError(field="doc_id", reason=f"Document IDs already exist in session: {sorted(doc_ids)}")
+
+
+def unknown_document_error(doc_id: str) -> DomainValidationError:
+    """Build the error raised when removing a document the session does not hold."""
+    return DomainValidationError(field="doc_id", reason=f"Document '{doc_id}' does not exist in this session")
+
+
+def last_document_error(doc_id: str) -> DomainValidationError:
+    """Build the error raised when removing the only document of a session."""
+    return DomainValidationError(
+        field="documents",
+        reason=f"Cannot remove document '{doc_id}' because a session must have at least 1 document",
+    )
+
+
+def append_documents_to(
+    session: Session, documents_results: list[DocumentResult], limits: SessionLimits | None = None
+) -> Session:
+    """
+    Append documents to a session in place.
+
+    Parameters
+    ----------
+    session : Session
+        Session to update.
+    documents_results : list[DocumentResult]
+        Documents to append.
+    limits : SessionLimits | None, default=None
+        Limits the session must still respect with the documents appended.
+
+    Returns
+    -------
+    Session
+        ``session`` itself.
+
+    Raises
+    ------
+    DomainValidationError
+        If a document id is already used in the session.
+    LimitsExceededError
+        If the session would exceed ``limits`` (it is left unchanged).
+    """
+    taken = {dr.doc_id for dr in session.documents_results}
+    duplicates = [dr.doc_id for dr in documents_results if dr.doc_id in taken]
+    if duplicates:
+        raise duplicate_documents_error(duplicates)
+    if limits is not None:
+        limits.check(session.documents_results + documents_results)
+    session.documents_results.extend(documents_results)
+    return session
+
+
+def remove_document_from(session: Session, doc_id: str) -> Session:
+    """
+    Remove one document from a session in place.
+
+    Parameters
+    ----------
+    session : Session
+        Session to update.
+    doc_id : str
+        Document to remove.
+
+    Returns
+    -------
+    Session
+        ``session`` itself.
+
+    Raises
+    ------
+    DomainValidationError
+        If the document is not in the session, or is its last document.
+    """
+    kept = [dr for dr in session.documents_results if dr.doc_id != doc_id]
+    if len(kept) == len(session.documents_results):
+        raise unknown_document_error(doc_id)
+    if not kept:
+        raise last_document_error(doc_id)
+    session.documents_results = kept
+    return session
@@ -0,0 +1,203 @@
+"""
+SQLite database shared by the SQLite session repository and the stores next to it.
+
+Single-host deployments without Redis can keep sessions in a local SQLite
+file instead of process memory: sessions then survive restarts, idle sessions
+cost disk rather than RAM, and several worker processes on the same host can
+share them.
+
+Configuration
+-------------
+Every connection is opened with:
+
+- ``journal_mode=WAL``: readers never block the writer and vice versa, and
+  commits append to the log instead of rewriting pages;
+- ``synchronous=NORMAL``: durable at checkpoints, which is enough for
+  sessions that expire anyway (``OFF`` for databases on a tmpfs, see
+  below);
+- ``mmap_size``: the database file is memory-mapped, so reads of hot pages
+  are served straight from the OS page cache without copying them through
+  SQLite's own page cache;
+- a busy timeout, so writers from other processes wait instead of failing.
+
+Schema
+------
+- ``sessions``: one row per session holding its :class:`SessionMeta` as JSON
+  (no document payloads), a write counter, and an absolute expiry time
+  indexed by ``sessions_expires_at`` so expired sessions are found without a
+  table scan.
+- ``documents``: content-addressed payloads encoded with
+  :func:`diff_fuse.state.codec.encode_document`, with a reference count.
+- ``jobs``: background job records, cancellation flags and results (see
+  :class:`diff_fuse.state.sqlite_job_store.SqliteJobStore`).
+- ``reviews`` and ``review_entries``: the review state of sessions, one row
+  per override or selection (see
+  :class:`diff_fuse.state.sqlite_review_store.SqliteReviewStore`).
+
+On a tmpfs
+----------
+Placed on a tmpfs such as ``/dev/shm`` (``durable=False``), the database lives
+in RAM and nothing is synced to disk, so writes cost no I/O. It is otherwise
+the same database: every worker process copies the payloads it reads out of
+SQLite and decodes them into its own objects (and its own hot-document
+cache), so decoded documents take memory in each worker that reads them.
+
+Threading
+---------
+SQLite connections must not be used concurrently, so each thread gets its own
+connection (see :meth:`SqliteDatabase.connection`). Writes are serialized by
+SQLite itself; :meth:`SqliteDatabase.transaction` takes the write lock up
+front (``BEGIN IMMEDIATE``) so a read-modify-write cannot deadlock upgrading
+its lock.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id TEXT PRIMARY KEY,
+    meta TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sessions_expires_at ON sessions (expires_at);
+CREATE TABLE IF NOT EXISTS documents (
+    content_hash TEXT PRIMARY KEY,
+    data BLOB NOT NULL,
+    refs INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    record TEXT NOT NULL,
+    cancel INTEGER NOT NULL DEFAULT 0,
+    result BLOB,
+    expires_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS reviews (
+    session_id TEXT PRIMARY KEY,
+    revision INTEGER NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS review_entries (
+    session_id TEXT NOT NULL,
+    field TEXT NOT NULL,
+    value BLOB NOT NULL,
+    PRIMARY KEY (session_id, field)
+) WITHOUT ROWID;
+"""
+
+
+class SqliteDatabase:
+    """
+    Thread-local connections to one SQLite database file.
+
+    Parameters
+    ----------
+    path : str | Path
+        Database file. Created, together with the schema, if missing. Must be
+        a real file: every connection to ``":memory:"`` would see a different
+        database.
+    mmap_bytes : int, default=268_435_456
+        Size of the memory-mapped region of the database file (``0`` disables
+        memory mapping).
+    busy_timeout_seconds : float, default=5.0
+        How long a write waits for another process's write to finish.
+    durable : bool, default=True
+        Whether commits are synced to storage. Disable for databases on a
+        tmpfs, where syncing only costs time.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        *,
+        mmap_bytes: int = 268_435_456,
+        busy_timeout_seconds: float = 5.0,
+        durable: bool = True,
+    ) -> None:
+        self._path = str(path)
+        self._mmap_bytes = max(0, int(mmap_bytes))
+        self._timeout = busy_timeout_seconds
+        self._synchronous = "NORMAL" if durable else "OFF"
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections: list[sqlite3.Connection] = []
+        self.connection().executescript(SCHEMA)
+
+    @property
+    def path(self) -> str:
+        """Path of the database file."""
+        return self._path
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open and configure a new connection."""
+        # Autocommit mode: transactions are delimited explicitly.
+        conn = sqlite3.connect(self._path, timeout=self._timeout, isolation_level=None, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(f"PRAGMA synchronous={self._synchronous}")
+        conn.execute(f"PRAGMA mmap_size={self._mmap_bytes}")
+        with self._lock:
+            self._connections.append(conn)
+        return conn
+
+    def connection(self) -> sqlite3.Connection:
+        """
+        Return the calling thread's connection, opening it on first use.
+
+        Returns
+        -------
+        sqlite3.Connection
+            Connection in autocommit mode: statements outside
+            :meth:`transaction` commit immediately.
+        """
+        conn: sqlite3.Connection | None = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """
+        Run a block in a write transaction on the calling thread's connection.
+
+        Nested calls join the enclosing transaction, so document store
+        operations issued by a repository commit or roll back with it.
+
+        Yields
+        ------
+        sqlite3.Connection
+            The calling thread's connection.
+        """
+        conn = self.connection()
+        if conn.in_transaction:
+            yield conn
+            return
+
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def size_bytes(self) -> int:
+        """Return the size of the main database file (excluding the WAL)."""
+        page_count = self.connection().execute("PRAGMA page_count").fetchone()[0]
+        page_size = self.connection().execute("PRAGMA page_size").fetchone()[0]
+        return int(page_count * page_size)
+
+    def close(self) -> None:
+        """Close every connection opened so far."""
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
@@ -0,0 +1,150 @@
+"""
+SQLite-backed content-addressed document store.
+
+Companion of :class:`diff_fuse.state.sqlite_session_repo.SqliteSessionRepo`.
+
+Storage model
+-------------
+- Table ``documents`` (see :mod:`diff_fuse.state.sqlite_database`)
+- Column ``data``: :class:`StoredDocument` encoded with
+  :func:`diff_fuse.state.codec.encode_document`, after the storage policy
+  dropped the forms it does not keep
+- Column ``refs``: number of session references; the row is deleted when it
+  drops to zero
+
+There is no TTL: the session repository releases references when it removes
+expired sessions, in the same transaction.
+
+Hot documents
+-------------
+Payloads are immutable per content hash, so decoded documents can be cached
+per process without any invalidation. A small LRU of decoded documents means
+a session read repeatedly (diff, then merge, then export) is decoded once.
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from collections.abc import Iterable
+from threading import Lock
+
+from diff_fuse.models.document import StoredDocument
+from diff_fuse.state.codec import decode_document, encode_document
+from diff_fuse.state.document_store import DocumentStore
+from diff_fuse.state.sqlite_database import SqliteDatabase
+from diff_fuse.state.storage_policy import DecodeCache, StoragePolicy, restore_document, strip_document
+
+
+class SqliteDocumentStore(DocumentStore):
+    """
+    SQLite implementation of :class:`DocumentStore`.
+
+    Parameters
+    ----------
+    database : SqliteDatabase
+        Database holding the ``documents`` table. Operations issued inside a
+        :meth:`SqliteDatabase.transaction` join it.
+    policy : StoragePolicy, default="full"
+        Which forms of each document to keep.
+    decode_cache : DecodeCache | None, default=None
+        Cache of re-derived normalized documents, used with ``"raw_only"``.
+    hot_entries : int, default=128
+        Number of decoded documents kept in memory. ``0`` disables the cache.
+
+    Notes
+    -----
+    Cached documents are shared between callers and must be treated as
+    immutable, as with :class:`MemoryDocumentStore`.
+    """
+
+    def __init__(
+        self,
+        database: SqliteDatabase,
+        *,
+        policy: StoragePolicy = "full",
+        decode_cache: DecodeCache | None = None,
+        hot_entries: int = 128,
+    ) -> None:
+        self._db = database
+        self._policy = policy
+        self._decode_cache = decode_cache
+        self._max_hot = max(0, int(hot_entries))
+        self._hot: OrderedDict[str, StoredDocument] = OrderedDict()
+        self._hot_lock = Lock()
+
+    def _remember(self, document: StoredDocument) -> None:
+        """Add a decoded document to the hot cache."""
+        if not self._max_hot:
+            return
+        with self._hot_lock:
+            self._hot[document.content_hash] = document
+            self._hot.move_to_end(document.content_hash)
+            while len(self._hot) > self._max_hot:
+                self._hot.popitem(last=False)
+
+    def _recall(self, content_hash: str) -> StoredDocument | None:
+        """Return a decoded document from the hot cache, if present."""
+        with self._hot_lock:
+            document = self._hot.get(content_hash)
+            if document is not None:
+                self._hot.move_to_end(content_hash)
+            return document
+
+    def _decode(self, data: bytes) -> StoredDocument:
+        """Deserialize a stored payload and cache it."""
+        document = restore_document(decode_document(data), self._decode_cache)
+        self._remember(document)
+        return document
+
+    def get(self, content_hash: str) -> StoredDocument | None:
+        """Return the stored document for ``content_hash``, if any."""
+        return self.get_many([content_hash])[0]
+
+    def get_many(self, content_hashes: list[str], *, refresh_ttl: bool = False) -> list[StoredDocument | None]:
+        """Return the stored documents for ``content_hashes``, reading only those not cached."""
+        found = {h: d for h in set(content_hashes) if (d := self._recall(h)) is not None}
+        missing = [h for h in set(content_hashes) if h not in found]
+        if missing:
+            placeholders = ",".join("?" * len(missing))
+            rows = (
+                self._db.connection()
+                .execute(f"SELECT content_hash, data FROM documents WHERE content_hash IN ({placeholders})", missing)
+                .fetchall()
+            )
+            for content_hash, data in rows:
+                found[content_hash] = self._decode(data)
+        return [found.get(h) for h in content_hashes]
+
+    def acquire(self, document: StoredDocument) -> StoredDocument:
+        """Store ``document`` if absent and add a reference to it."""
+        stored = strip_document(document, self._policy)
+        with self._db.transaction() as conn:
+            bumped = conn.execute(
+                "UPDATE documents SET refs = refs + 1 WHERE content_hash = ?", (document.content_hash,)
+            ).rowcount
+            if not bumped:
+                conn.execute(
+                    "INSERT INTO documents (content_hash, data, refs) VALUES (?, ?, 1)",
+                    (document.content_hash, encode_document(stored)),
+                )
+
+        # Compressed raw-only entries: the caller's complete document is the cheapest copy.
+        canonical = document if self._policy == "raw_only" else stored
+        self._remember(canonical)
+        return canonical
+
+    def release(self, content_hash: str) -> None:
+        """Drop a reference to ``content_hash``; delete the document at zero."""
+        with self._db.transaction() as conn:
+            conn.execute("UPDATE documents SET refs = refs - 1 WHERE content_hash = ?", (content_hash,))
+            deleted = conn.execute("DELETE FROM documents WHERE content_hash = ? AND refs <= 0", (content_hash,))
+        if deleted.rowcount:
+            with self._hot_lock:
+                self._hot.pop(content_hash, None)
+
+    def touch(self, content_hashes: Iterable[str]) -> None:
+        """No-op: stored documents are kept alive by reference counts alone."""
+        return None
+
+    def __len__(self) -> int:
+        return int(self._db.connection().execute("SELECT COUNT(*) FROM documents").fetchone()[0])
@@ -0,0 +1,76 @@
+"""
+SQLite-backed job store.
+
+Keeps background jobs in the ``jobs`` table of the sessions database (see
+:mod:`diff_fuse.state.sqlite_database`), so the worker processes of one host
+share them like they share sessions.
+
+Rows carry an absolute expiry time (seconds since the epoch). Expired rows
+are ignored by reads and deleted whenever a job is saved.
+"""
+
+import time
+
+from diff_fuse.models.job import Job
+from diff_fuse.state.job_store import JobStore
+from diff_fuse.state.sqlite_database import SqliteDatabase
+
+
+class SqliteJobStore(JobStore):
+    """
+    SQLite implementation of :class:`JobStore`.
+
+    Parameters
+    ----------
+    db : SqliteDatabase
+        Sessions database.
+    ttl_seconds : int
+        How long a job is kept after its last update.
+    """
+
+    def __init__(self, db: SqliteDatabase, *, ttl_seconds: int) -> None:
+        self._db = db
+        self._ttl = float(ttl_seconds)
+
+    def save(self, job: Job, *, result: bytes | None = None) -> bool:
+        """See :meth:`JobStore.save`."""
+        now = time.time()
+        record = job.model_dump_json(exclude={"cancel_requested"})
+        with self._db.transaction() as conn:
+            conn.execute("DELETE FROM jobs WHERE expires_at <= ?", (now,))
+            conn.execute(
+                "INSERT INTO jobs (job_id, record, result, expires_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (job_id) DO UPDATE SET record = excluded.record, "
+                "result = COALESCE(excluded.result, result), expires_at = excluded.expires_at",
+                (job.job_id, record, result, now + self._ttl),
+            )
+            (cancel,) = conn.execute("SELECT cancel FROM jobs WHERE job_id = ?", (job.job_id,)).fetchone()
+        return bool(cancel)
+
+    def get(self, job_id: str) -> Job | None:
+        """See :meth:`JobStore.get`."""
+        row = (
+            self._db.connection()
+            .execute("SELECT record, cancel FROM jobs WHERE job_id = ? AND expires_at > ?", (job_id, time.time()))
+            .fetchone()
+        )
+        if row is None:
+            return None
+        job = Job.model_validate_json(row[0])
+        job.cancel_requested = bool(row[1])
+        return job
+
+    def get_result(self, job_id: str) -> bytes | None:
+        """See :meth:`JobStore.get_result`."""
+        row = (
+            self._db.connection()
+            .execute("SELECT result FROM jobs WHERE job_id = ? AND expires_at > ?", (job_id, time.time()))
+            .fetchone()
+        )
+        return bytes(row[0]) if row is not None and row[0] is not None else None
+
+    def request_cancel(self, job_id: str) -> Job | None:
+        """See :meth:`JobStore.request_cancel`."""
+        with self._db.transaction() as conn:
+            conn.execute("UPDATE jobs SET cancel = 1 WHERE job_id = ? AND expires_at > ?", (job_id, time.time()))
+        return self.get(job_id)
@@ -0,0 +1,85 @@
+"""
+SQLite-backed review store.
+
+Keeps the review state of sessions in the sessions database (see
+:mod:`diff_fuse.state.sqlite_database`), so the worker processes of one host
+share it like they share sessions:
+
+- ``reviews``: one row per session with its revision and absolute expiry
+  time (seconds since the epoch);
+- ``review_entries``: one row per override or selection (see
+  :func:`diff_fuse.state.review_store.entry_field`), plus the null mode.
+
+A delta upserts or deletes only the rows it mentions. Expired states are
+ignored by reads and deleted whenever a delta is applied.
+"""
+
+import time
+
+from diff_fuse.domain.errors import ReviewConflictError
+from diff_fuse.models.review import Review, ReviewDelta
+from diff_fuse.state.review_store import ReviewStore, decode_review, encode_delta
+from diff_fuse.state.sqlite_database import SqliteDatabase
+
+
+class SqliteReviewStore(ReviewStore):
+    """
+    SQLite implementation of :class:`ReviewStore`.
+
+    Parameters
+    ----------
+    db : SqliteDatabase
+        Sessions database.
+    ttl_seconds : int
+        How long review state is kept after its last use.
+    """
+
+    def __init__(self, db: SqliteDatabase, *, ttl_seconds: int) -> None:
+        self._db = db
+        self._ttl = float(ttl_seconds)
+
+    def get(self, session_id: str) -> Review | None:
+        """See :meth:`ReviewStore.get`."""
+        now = time.time()
+        with self._db.transaction() as conn:
+            row = conn.execute(
+                "UPDATE reviews SET expires_at = ? WHERE session_id = ? AND expires_at > ? RETURNING revision",
+                (now + self._ttl, session_id, now),
+            ).fetchone()
+            if row is None:
+                return None
+            entries = conn.execute("SELECT field, value FROM review_entries WHERE session_id = ?", (session_id,))
+            return decode_review(row[0], entries.fetchall())
+
+    def apply(self, session_id: str, delta: ReviewDelta, *, base_revision: int | None = None) -> int:
+        """See :meth:`ReviewStore.apply`."""
+        now = time.time()
+        with self._db.transaction() as conn:
+            expired = "SELECT session_id FROM reviews WHERE expires_at <= ?"
+            conn.execute(f"DELETE FROM review_entries WHERE session_id IN ({expired})", (now,))
+            conn.execute("DELETE FROM reviews WHERE expires_at <= ?", (now,))
+
+            row = conn.execute("SELECT revision FROM reviews WHERE session_id = ?", (session_id,)).fetchone()
+            current = row[0] if row is not None else 0
+            if base_revision is not None and base_revision != current:
+                raise ReviewConflictError(base_revision, current)
+
+            if delta.replace:
+                conn.execute("DELETE FROM review_entries WHERE session_id = ?", (session_id,))
+            writes = encode_delta(delta)
+            conn.executemany(
+                "DELETE FROM review_entries WHERE session_id = ? AND field = ?",
+                [(session_id, field) for field, value in writes if value is None],
+            )
+            conn.executemany(
+                "INSERT INTO review_entries (session_id, field, value) VALUES (?, ?, ?) "
+                "ON CONFLICT (session_id, field) DO UPDATE SET value = excluded.value",
+                [(session_id, field, value) for field, value in writes if value is not None],
+            )
+            conn.execute(
+                "INSERT INTO reviews (session_id, revision, expires_at) VALUES (?, ?, ?) "
+                "ON CONFLICT (session_id) DO UPDATE SET revision = excluded.revision, "
+                "expires_at = excluded.expires_at",
+                (session_id, current + 1, now + self._ttl),
+            )
+        return current + 1
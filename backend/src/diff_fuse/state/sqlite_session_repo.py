@@ -0,0 +1,459 @@
+"""
+SQLite-backed session repository.
+
+This module provides a persistent single-host implementation of the session
+storage interface. It targets deployments that run on one machine without
+Redis (edge installs): sessions survive process restarts, idle sessions live
+on disk instead of in RAM, and every worker process on the host shares them.
+
+Design characteristics
+----------------------
+- Each session is one row of the ``sessions`` table holding its metadata as
+  JSON (content hashes, no payloads); see
+  :mod:`diff_fuse.state.sqlite_database` for the schema and connection setup.
+- Document payloads live in a shared :class:`SqliteDocumentStore`, one row
+  per content hash no matter how many sessions reference them. Decoded
+  documents are cached per process, and the database file is memory-mapped,
+  so hot documents are read from the OS page cache and decoded once.
+- Expiry times are stored as absolute timestamps with an index, so
+  :meth:`SqliteSessionRepo.cleanup` deletes expired sessions with an index
+  range scan. Expired sessions are also hidden (and removed) on access.
+- Sliding expiration rewrites the expiry column only once it has drifted by
+  a noticeable fraction of the TTL, so most reads do not write at all.
+- Writes run in ``BEGIN IMMEDIATE`` transactions that also cover document
+  reference counts: a session and its references are always consistent,
+  even across processes or after a crash.
+
+Notes
+-----
+Not suitable for multi-host deployments: SQLite files must not be shared
+over a network filesystem. Use Redis there.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+from collections.abc import Callable
+from datetime import UTC, datetime, timedelta
+from threading import Lock
+from uuid import uuid4
+
+from diff_fuse.models.document import DocumentResult, StoredDocument
+from diff_fuse.models.session import Session, SessionMeta
+from diff_fuse.state.document_store import DocumentStore, hydrate_session, sync_document_refs
+from diff_fuse.state.session_repo import SessionLimits, SessionRepo, append_documents_to, remove_document_from
+from diff_fuse.state.sqlite_database import SqliteDatabase
+from diff_fuse.state.sqlite_document_store import SqliteDocumentStore
+from diff_fuse.state.sweeper import Sweeper
+
+_SLIDE_FRACTION = 0.1
+"""Fraction of the TTL the stored expiry may lag behind before a read refreshes it."""
+
+_MAX_SLIDE_LAG_SECONDS = 60.0
+"""Upper bound of that lag, so long TTLs are still refreshed at least once a minute."""
+
+
+class SqliteSessionRepo(SessionRepo):
+    """
+    SQLite implementation of :class:`SessionRepo`.
+
+    Parameters
+    ----------
+    database : SqliteDatabase
+        Database holding the ``sessions`` and ``documents`` tables.
+    ttl_seconds : int, default=3600
+        Session time-to-live in seconds, refreshed on each access (sliding
+        expiration).
+    document_store : DocumentStore | None, default=None
+        Content-addressed store for document payloads. Must write to the same
+        database so that reference counts are updated in the session's
+        transaction. A :class:`SqliteDocumentStore` on ``database`` is created
+        when omitted.
+
+    Notes
+    -----
+    Storage model:
+    - Row: ``sessions(session_id, meta, version, expires_at)``
+    - Expiration: ``expires_at`` (seconds since the epoch), indexed
+
+    A read costs one primary-key lookup for the session and one ``IN`` query
+    for the documents missing from the decoded-document cache. A mutation
+    runs entirely inside one write transaction.
+    """
+
+    def __init__(
+        self,
+        database: SqliteDatabase,
+        *,
+        ttl_seconds: int = 3600,
+        document_store: DocumentStore | None = None,
+    ) -> None:
+        """
+        Initialize the SQLite session repository.
+
+        Parameters
+        ----------
+        database : SqliteDatabase
+            Database to store sessions in.
+        ttl_seconds : int, default=3600
+            Session expiration time in seconds.
+        document_store : DocumentStore | None, default=None
+            Content-addressed document store shared by all sessions.
+        """
+        self._db = database
+        self._ttl = timedelta(seconds=ttl_seconds)
+        self._slide_lag = min(_MAX_SLIDE_LAG_SECONDS, ttl_seconds * _SLIDE_FRACTION)
+        self._documents = document_store if document_store is not None else SqliteDocumentStore(database)
+        self._expirations = 0
+        self._counter_lock = Lock()
+        self._sweeper: Sweeper | None = None
+
+    def _deadline(self, now: datetime) -> float:
+        """Return the expiry timestamp of a session accessed at ``now``."""
+        return (now + self._ttl).timestamp()
+
+    @staticmethod
+    def _read(conn: sqlite3.Connection, session_id: str) -> tuple[SessionMeta, int, float] | None:
+        """Load a session row as metadata, version and expiry timestamp."""
+        row = conn.execute(
+            "SELECT meta, version, expires_at FROM sessions WHERE session_id = ?", (session_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        meta, version, expires_at = row
+        return SessionMeta.model_validate_json(meta), version, expires_at
+
+    def _delete(self, conn: sqlite3.Connection, session_id: str, meta: SessionMeta) -> None:
+        """
+        Delete a session row and release its document references.
+
+        Must be called inside a transaction.
+        """
+        conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+        for m in meta.documents_meta:
+            self._documents.release(m.content_hash)
+
+    def _write(self, conn: sqlite3.Connection, session: Session, now: datetime) -> None:
+        """
+        Insert or update a session row, bumping its version.
+
+        Must be called inside a transaction.
+        """
+        conn.execute(
+            "INSERT INTO sessions (session_id, meta, version, expires_at) VALUES (?, ?, 1, ?) "
+            "ON CONFLICT (session_id) DO UPDATE SET "
+            "meta = excluded.meta, version = version + 1, expires_at = excluded.expires_at",
+            (session.session_id, session.to_meta().model_dump_json(), self._deadline(now)),
+        )
+
+    def _count_expired(self, n: int) -> None:
+        """Add ``n`` to the expired-session counter."""
+        with self._counter_lock:
+            self._expirations += n
+
+    def _live(self, session_id: str) -> SessionMeta | None:
+        """
+        Return live session metadata and refresh its expiry if needed.
+
+        An expired session is removed and reported as missing.
+        """
+        now = datetime.now(UTC)
+        conn = self._db.connection()
+        row = self._read(conn, session_id)
+        if row is None:
+            return None
+
+        meta, _, expires_at = row
+        if expires_at <= now.timestamp():
+            with self._db.transaction() as tx:
+                # Re-check under the write lock: another process may have refreshed it.
+                current = self._read(tx, session_id)
+                if current is not None and current[2] <= now.timestamp():
+                    self._delete(tx, session_id, current[0])
+                    self._count_expired(1)
+            return None
+
+        # Sliding expiration, written only once the stored deadline lags noticeably.
+        deadline = self._deadline(now)
+        if deadline - expires_at > self._slide_lag:
+            conn.execute("UPDATE sessions SET expires_at = ? WHERE session_id = ?", (deadline, session_id))
+        return meta
+
+    def _hydrate(self, meta: SessionMeta) -> Session | None:
+        """Attach document payloads to session metadata."""
+        return hydrate_session(meta, self._documents.get_many([m.content_hash for m in meta.documents_meta]))
+
+    def create(self, *, documents_results: list[DocumentResult]) -> Session:
+        """
+        Create and store a new session.
+
+        Parameters
+        ----------
+        documents_results : list[DocumentResult]
+            Parsed/normalized results corresponding to the input documents.
+
+        Returns
+        -------
+        Session
+            The newly created session instance.
+        """
+        now = datetime.now(UTC)
+        session = Session(
+            session_id=uuid4().hex,
+            created_at=now,
+            updated_at=now,
+            documents_results=documents_results,
+        )
+
+        with self._db.transaction() as conn:
+            session.documents_results = sync_document_refs(self._documents, [], session.documents_results)
+            self._write(conn, session, now)
+
+        return session
+
+    def get(self, session_id: str) -> Session | None:
+        """
+        Retrieve a session by id.
+
+        Parameters
+        ----------
+        session_id : str
+            Opaque session identifier.
+
+        Returns
+        -------
+        Session | None
+            The session if it exists and is not expired; otherwise None.
+
+        Notes
+        -----
+        Behavior:
+        - Missing session -> returns None
+        - Expired session -> removed and returns None
+        - Valid session -> expiry is pushed back (sliding TTL); the stored
+          metadata, including ``updated_at``, is not rewritten
+        """
+        meta = self._live(session_id)
+        return self._hydrate(meta) if meta is not None else None
+
+    def get_meta(self, session_id: str) -> SessionMeta | None:
+        """
+        Retrieve a session's metadata by id, without loading any document.
+
+        Parameters
+        ----------
+        session_id : str
+            Opaque session identifier.
+
+        Returns
+        -------
+        SessionMeta | None
+            The session metadata if it exists and is not expired; otherwise None.
+        """
+        return self._live(session_id)
+
+    def save(self, session: Session) -> Session:
+        """
+        Persist an updated session.
+
+        Parameters
+        ----------
+        session : Session
+            The session instance to persist. Must have a valid session_id.
+
+        Returns
+        -------
+        Session
+            The updated session instance.
+        """
+        now = datetime.now(UTC)
+        session.updated_at = now
+        with self._db.transaction() as conn:
+            previous = self._read(conn, session.session_id)
+            before = previous[0].documents_meta if previous is not None else []
+            session.documents_results = sync_document_refs(self._documents, before, session.documents_results)
+            self._write(conn, session, now)
+        return session
+
+    def mutate(self, session_id: str, fn: Callable[[Session], Session]) -> Session | None:
+        """
+        Atomically fetch and update a session.
+
+        Parameters
+        ----------
+        session_id : str
+            Opaque session identifier.
+        fn : Callable[[Session], Session]
+            A function that takes the current session and returns an updated session.
+
+        Returns
+        -------
+        Session | None
+            The updated session if it exists; otherwise None.
+
+        Notes
+        -----
+        ``fn`` runs inside the write transaction, which blocks every other
+        writer of the database (in any process) until it returns; keep it
+        short. If it raises, nothing is written.
+        """
+        now = datetime.now(UTC)
+        with self._db.transaction() as conn:
+            row = self._read(conn, session_id)
+            if row is None or row[2] <= now.timestamp():
+                return None
+            meta = row[0]
+            current = self._hydrate(meta)
+            if current is None:
+                return None
+
+            session = fn(current)
+            session.updated_at = now
+            session.documents_results = sync_document_refs(
+                self._documents, meta.documents_meta, session.documents_results
+            )
+            self._write(conn, session, now)
+        return session
+
+    def append_documents(
+        self, session_id: str, documents_results: list[DocumentResult], limits: SessionLimits | None = None
+    ) -> SessionMeta | None:
+        """
+        Atomically append documents to a session.
+
+        Parameters
+        ----------
+        session_id : str
+            Opaque session identifier.
+        documents_results : list[DocumentResult]
+            Documents to append, in order.
+        limits : SessionLimits | None, default=None
+            Limits checked inside the write transaction, with the append.
+
+        Returns
+        -------
+        SessionMeta | None
+            The updated session metadata, or None if the session does not exist.
+        """
+        session = self.mutate(session_id, lambda s: append_documents_to(s, documents_results, limits))
+        return session.to_meta() if session is not None else None
+
+    def remove_document(self, session_id: str, doc_id: str) -> SessionMeta | None:
+        """
+        Atomically remove one document from a session.
+
+        Parameters
+        ----------
+        session_id : str
+            Opaque session identifier.
+        doc_id : str
+            Document to remove.
+
+        Returns
+        -------
+        SessionMeta | None
+            The updated session metadata, or None if the session does not exist.
+        """
+        session = self.mutate(session_id, lambda s: remove_document_from(s, doc_id))
+        return session.to_meta() if session is not None else None
+
+    def find_document(self, content_hash: str) -> StoredDocument | None:
+        """
+        Look up an already stored document by content hash.
+
+        Parameters
+        ----------
+        content_hash : str
+            Content address of the document.
+
+        Returns
+        -------
+        StoredDocument | None
+            The stored payload if any session references it; otherwise None.
+        """
+        return self._documents.get(content_hash)
+
+    def find_documents(self, content_hashes: list[str]) -> list[StoredDocument | None]:
+        """
+        Look up several stored documents by content hash.
+
+        Parameters
+        ----------
+        content_hashes : list[str]
+            Content addresses of the documents.
+
+        Returns
+        -------
+        list[StoredDocument | None]
+            One entry per hash, in order; None where nothing is stored.
+        """
+        return self._documents.get_many(content_hashes)
+
+    def cleanup(self) -> int:
+        """
+        Remove expired sessions.
+
+        Returns
+        -------
+        int
+            Number of sessions removed.
+
+        Notes
+        -----
+        Uses the expiry index: only expired rows are read.
+        """
+        now = datetime.now(UTC).timestamp()
+        with self._db.transaction() as conn:
+            expired = conn.execute("SELECT session_id, meta FROM sessions WHERE expires_at <= ?", (now,)).fetchall()
+            for session_id, meta in expired:
+                self._delete(conn, session_id, SessionMeta.model_validate_json(meta))
+        self._count_expired(len(expired))
+        return len(expired)
+
+    def start_sweeper(self, interval_seconds: float) -> None:
+        """
+        Start the background expiry sweeper.
+
+        Parameters
+        ----------
+        interval_seconds : float
+            Time between two :meth:`cleanup` runs.
+
+        Notes
+        -----
+        The sweeper runs in a daemon thread (see :class:`Sweeper`). Calling
+        this twice is a no-op.
+        """
+        if self._sweeper is not None and self._sweeper.running:
+            return
+        self._sweeper = Sweeper(self.cleanup, interval_seconds=interval_seconds)
+        self._sweeper.start()
+
+    def stop_sweeper(self) -> None:
+        """Stop the background expiry sweeper, if running."""
+        if self._sweeper is not None:
+            self._sweeper.stop()
+            self._sweeper = None
+
+    def stats(self) -> dict[str, int]:
+        """
+        Report repository counters for monitoring.
+
+        Returns
+        -------
+        dict[str, int]
+            Live session and stored document counts, the size of the database
+            file, and the number of expired sessions this process removed.
+        """
+        conn = self._db.connection()
+        now = datetime.now(UTC).timestamp()
+        return {
+            "sessions": int(conn.execute("SELECT COUNT(*) FROM sessions WHERE expires_at > ?", (now,)).fetchone()[0]),
+            "documents": int(conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]),
+            "db_bytes": self._db.size_bytes(),
+            "expirations": self._expirations,
+        }
+
+    def close(self) -> None:
+        """Close the database connections."""
+        self._db.close()
@@ -0,0 +1,150 @@
+"""
+Document storage policies.
+
+A document exists in two forms: the raw text as uploaded and the normalized
+structure derived from it. Keeping both doubles the per-document footprint,
+and either one is enough to serve every operation:
+
+- ``"full"``: keep both forms (fastest reads, largest footprint).
+- ``"raw_on_error"``: keep the normalized form; keep raw text only for
+  documents that failed to parse, so the error can still be shown against
+  the input.
+- ``"raw_only"``: keep only the raw text (compressed at rest) and re-derive
+  the normalized form on access, through a per-process :class:`DecodeCache`.
+
+Document stores apply :func:`strip_document` before storing a payload and
+:func:`restore_document` after loading it, so everything above the storage
+layer sees documents with ``normalized`` populated whatever the policy.
+
+Notes
+-----
+Input limits (see :func:`diff_fuse.services.session_service.enforce_session_input_limits`)
+always count the uploaded size (``size_chars``), and memory limits the size
+estimated at ingestion (``approx_bytes``), whatever the policy: the policy
+changes how documents are kept, not what a session may contain.
+"""
+
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Literal
+
+from diff_fuse.domain.errors import DocumentParseError
+from diff_fuse.domain.normalize import parse_and_normalize_json
+from diff_fuse.models.document import DocumentFormat, StoredDocument
+
+type StoragePolicy = Literal["full", "raw_on_error", "raw_only"]
+
+
+class DecodeCache:
+    """
+    Thread-safe LRU cache of normalized documents, keyed by content hash.
+
+    Parameters
+    ----------
+    max_entries : int
+        Maximum number of cached normalized documents.
+
+    Notes
+    -----
+    Cached values are shared between all sessions that reference the same
+    content and must be treated as immutable.
+    """
+
+    def __init__(self, max_entries: int) -> None:
+        self._max = max(0, int(max_entries))
+        self._lock = Lock()
+        self._entries: OrderedDict[str, Any] = OrderedDict()
+
+    def get_or_derive(self, document: StoredDocument) -> Any:
+        """
+        Return the normalized form of ``document``, deriving it on a miss.
+
+        Parameters
+        ----------
+        document : StoredDocument
+            Document with ``raw`` available.
+
+        Returns
+        -------
+        Any
+            The normalized document.
+        """
+        with self._lock:
+            if document.content_hash in self._entries:
+                self._entries.move_to_end(document.content_hash)
+                return self._entries[document.content_hash]
+
+        # Parse outside the lock; a concurrent miss only costs a duplicate parse.
+        normalized = _derive(document)
+
+        if self._max > 0:
+            with self._lock:
+                self._entries[document.content_hash] = normalized
+                self._entries.move_to_end(document.content_hash)
+                while len(self._entries) > self._max:
+                    self._entries.popitem(last=False)
+        return normalized
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+def _derive(document: StoredDocument) -> Any:
+    """Parse and normalize the raw text of a document known to be valid."""
+    if document.raw is None:
+        raise ValueError(f"Document {document.content_hash} has neither raw nor normalized content")
+    if document.format != DocumentFormat.json:
+        raise ValueError(f"Cannot re-derive a '{document.format}' document")
+    try:
+        return parse_and_normalize_json(document.raw)
+    except DocumentParseError as e:  # pragma: no cover - stored documents parsed once already
+        raise ValueError(f"Stored document {document.content_hash} no longer parses") from e
+
+
+def strip_document(document: StoredDocument, policy: StoragePolicy) -> StoredDocument:
+    """
+    Drop the parts of a document that ``policy`` does not keep.
+
+    Parameters
+    ----------
+    document : StoredDocument
+        Full document (raw and normalized).
+    policy : StoragePolicy
+        Storage policy to apply.
+
+    Returns
+    -------
+    StoredDocument
+        ``document`` itself for ``"full"``, otherwise a stripped copy.
+    """
+    if policy == "raw_on_error" and document.ok:
+        return document.model_copy(update={"raw": None})
+    if policy == "raw_only" and document.ok:
+        return document.model_copy(update={"normalized": None})
+    return document
+
+
+def restore_document(document: StoredDocument, cache: DecodeCache | None) -> StoredDocument:
+    """
+    Re-derive the normalized form of a stripped document, if needed.
+
+    Parameters
+    ----------
+    document : StoredDocument
+        Document as loaded from a store.
+    cache : DecodeCache | None
+        Cache used to avoid parsing the same content repeatedly.
+
+    Returns
+    -------
+    StoredDocument
+        ``document`` itself if nothing is missing, otherwise a copy with
+        ``normalized`` populated.
+    """
+    # Without raw text, the stored normalized value is authoritative (it may
+    # legitimately be None for a document that is just ``null``).
+    if not document.ok or document.normalized is not None or document.raw is None:
+        return document
+    normalized = cache.get_or_derive(document) if cache is not None else _derive(document)
+    return document.model_copy(update={"normalized": normalized})
@@ -0,0 +1,88 @@
+"""
+Background expiry sweeping for session repositories.
+
+Backends without native key expiry (memory, SQLite) would otherwise only drop
+expired sessions lazily, when they are accessed again, so abandoned sessions
+would keep their documents alive. :class:`Sweeper` runs a repository's sweep
+function periodically in a daemon thread.
+"""
+
+from __future__ import annotations
+
+import logging
+from collections.abc import Callable
+from threading import Event, Thread
+
+logger = logging.getLogger(__name__)
+
+_MIN_WAIT_SECONDS = 0.05
+"""Shortest pause between sweeps, so a deadline stuck in the past cannot spin."""
+
+
+class Sweeper:
+    """
+    Daemon thread calling a sweep function periodically.
+
+    Parameters
+    ----------
+    sweep : Callable[[], object]
+        Function removing expired sessions. Exceptions are logged and do not
+        stop the sweeper.
+    interval_seconds : float
+        Maximum time between sweeps.
+    next_due : Callable[[], float | None] | None, default=None
+        Returns the number of seconds until the next known deadline (or None
+        if there is none). When given, the sweeper wakes up early for it.
+    name : str, default="diff-fuse-session-sweeper"
+        Thread name.
+    """
+
+    def __init__(
+        self,
+        sweep: Callable[[], object],
+        *,
+        interval_seconds: float,
+        next_due: Callable[[], float | None] | None = None,
+        name: str = "diff-fuse-session-sweeper",
+    ) -> None:
+        self._sweep = sweep
+        self._interval = interval_seconds
+        self._next_due = next_due
+        self._name = name
+        self._stop = Event()
+        self._thread: Thread | None = None
+
+    @property
+    def running(self) -> bool:
+        """Whether the sweeper thread is alive."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def _run(self) -> None:
+        """Sweep until stopped."""
+        while not self._stop.is_set():
+            try:
+                self._sweep()
+            except Exception:  # pragma: no cover - keep the sweeper alive
+                logger.exception("Session sweep failed")
+
+            wait = self._interval
+            if self._next_due is not None:
+                due = self._next_due()
+                if due is not None:
+                    wait = min(wait, max(0.0, due))
+            self._stop.wait(max(wait, _MIN_WAIT_SECONDS))
+
+    def start(self) -> None:
+        """Start the sweeper thread. Calling this while running is a no-op."""
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = Thread(target=self._run, name=self._name, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the sweeper thread and wait for it, if running."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
@@ -0,0 +1,92 @@
+"""
+Asynchronous adapter for synchronous session repositories.
+
+The in-memory repository does no I/O, but it does block on its locks (and a
+mutation callback may take a while), and the SQLite repository reads and
+writes a local file, so calling either directly from the event loop could
+stall every other request. :class:`ThreadedSessionRepo` exposes a
+synchronous :class:`SessionRepo` as an :class:`AsyncSessionRepo` by running
+each call in the worker thread pool.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from functools import partial
+
+from anyio import to_thread
+
+from diff_fuse.models.document import DocumentResult, StoredDocument
+from diff_fuse.models.session import Session, SessionMeta
+from diff_fuse.state.session_repo import AsyncSessionRepo, SessionLimits, SessionRepo
+
+
+class ThreadedSessionRepo(AsyncSessionRepo):
+    """
+    :class:`AsyncSessionRepo` that delegates to a synchronous repository.
+
+    Parameters
+    ----------
+    repo : SessionRepo
+        Repository to delegate to. Must be thread-safe.
+    """
+
+    def __init__(self, repo: SessionRepo) -> None:
+        self._repo = repo
+
+    @property
+    def wrapped(self) -> SessionRepo:
+        """The synchronous repository calls are delegated to."""
+        return self._repo
+
+    async def create(self, *, documents_results: list[DocumentResult]) -> Session:
+        """Create and store a new session."""
+        return await to_thread.run_sync(partial(self._repo.create, documents_results=documents_results))
+
+    async def get(self, session_id: str) -> Session | None:
+        """Retrieve a session by id."""
+        return await to_thread.run_sync(self._repo.get, session_id)
+
+    async def get_meta(self, session_id: str) -> SessionMeta | None:
+        """Retrieve a session's metadata by id."""
+        return await to_thread.run_sync(self._repo.get_meta, session_id)
+
+    async def save(self, session: Session) -> Session:
+        """Persist an updated session."""
+        return await to_thread.run_sync(self._repo.save, session)
+
+    async def mutate(self, session_id: str, fn: Callable[[Session], Session]) -> Session | None:
+        """Atomically apply ``fn`` to a session (``fn`` runs in the worker thread)."""
+        return await to_thread.run_sync(self._repo.mutate, session_id, fn)
+
+    async def find_document(self, content_hash: str) -> StoredDocument | None:
+        """Look up an already stored document by content hash."""
+        return await to_thread.run_sync(self._repo.find_document, content_hash)
+
+    async def find_documents(self, content_hashes: list[str]) -> list[StoredDocument | None]:
+        """Look up several stored documents at once."""
+        return await to_thread.run_sync(self._repo.find_documents, content_hashes)
+
+    async def append_documents(
+        self, session_id: str, documents_results: list[DocumentResult], limits: SessionLimits | None = None
+    ) -> SessionMeta | None:
+        """Atomically append documents to a session, within ``limits``."""
+        return await to_thread.run_sync(self._repo.append_documents, session_id, documents_results, limits)
+
+    async def remove_document(self, session_id: str, doc_id: str) -> SessionMeta | None:
+        """Atomically remove one document from a session."""
+        return await to_thread.run_sync(self._repo.remove_document, session_id, doc_id)
+
+    async def cleanup(self) -> int:
+        """Remove expired sessions."""
+        return await to_thread.run_sync(self._repo.cleanup)
+
+    def stats(self) -> dict[str, int]:
+        """Report the wrapped repository's counters."""
+        return self._repo.stats()
+
+    async def close(self) -> None:
+        """Close the wrapped repository, if it holds connections (SQLite)."""
+        close = getattr(self._repo, "close", None)
+        if close is not None:
+            await to_thread.run_sync(close)
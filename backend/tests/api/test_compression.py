@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import gzip
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from diff_fuse.api.compression import CompressionMiddleware, negotiate_encoding, supported_encodings
+
+
+def _create_payload(doc_factory, n_keys: int = 10) -> dict:
+    big = {f"key_{i}": "value " * 20 for i in range(n_keys)}
+    return {"documents": [doc_factory(big, name="A"), doc_factory({**big, "x": 1}, name="B")]}
+
+
+def test_gzip_request_body_is_decompressed(client, doc_factory):
+    body = gzip.compress(json.dumps(_create_payload(doc_factory)).encode("utf-8"))
+
+    r = client.post("/", content=body, headers={"Content-Type": "application/json", "Content-Encoding": "gzip"})
+
+    assert r.status_code == 200, r.text
+    assert len(r.json()["documents_meta"]) == 2
+
+
+def test_zstd_request_body_is_decompressed(client, doc_factory):
+    zstandard = pytest.importorskip("zstandard")
+    body = zstandard.ZstdCompressor().compress(json.dumps(_create_payload(doc_factory)).encode("utf-8"))
+
+    r = client.post("/", content=body, headers={"Content-Type": "application/json", "Content-Encoding": "zstd"})
+
+    assert r.status_code == 200, r.text
+
+
+def test_decompressed_size_limit_is_enforced():
+    inner = FastAPI()
+
+    @inner.post("/")
+    def echo(payload: dict) -> dict:
+        return payload
+
+    inner.add_middleware(CompressionMiddleware, minimum_size=1024, max_request_body_bytes=2000)
+    small_client = TestClient(inner)
+
+    # Compresses to far less than the limit but expands beyond it.
+    body = gzip.compress(json.dumps({"pad": "x" * 100_000}).encode("utf-8"))
+    assert len(body) < 2000
+
+    r = small_client.post("/", content=body, headers={"Content-Type": "application/json", "Content-Encoding": "gzip"})
+
+    assert r.status_code == 413
+    assert r.json()["error"]["code"] == "limits_exceeded"
+
+
+def test_chunked_body_without_content_length_is_limited():
+    inner = FastAPI()
+
+    @inner.post("/")
+    def echo(payload: dict) -> dict:
+        return payload
+
+    inner.add_middleware(CompressionMiddleware, minimum_size=1024, max_request_body_bytes=2000)
+    small_client = TestClient(inner)
+
+    def _chunks(n):
+        yield b'{"pad": "'
+        for _ in range(n):
+            yield b"x" * 500
+        yield b'"}'
+
+    r = small_client.post("/", content=_chunks(10), headers={"Content-Type": "application/json"})
+    assert "content-length" not in r.request.headers
+    assert r.status_code == 413
+    assert r.json()["error"]["code"] == "limits_exceeded"
+
+    r = small_client.post("/", content=_chunks(2), headers={"Content-Type": "application/json"})
+    assert r.status_code == 200
+    assert len(r.json()["pad"]) == 1000
+
+
+def test_invalid_compressed_body_is_rejected(client):
+    r = client.post("/", content=b"not gzip", headers={"Content-Type": "application/json", "Content-Encoding": "gzip"})
+
+    assert r.status_code == 400
+    assert r.json()["error"]["code"] == "domain_validation_error"
+
+
+def test_unsupported_request_encoding_is_rejected(client):
+    r = client.post("/", content=b"{}", headers={"Content-Type": "application/json", "Content-Encoding": "br"})
+
+    assert r.status_code == 400
+
+
+def test_large_response_is_compressed(client, doc_factory):
+    session_id = client.post("/", json=_create_payload(doc_factory, n_keys=50)).json()["session_id"]
+
+    r = client.post(f"/{session_id}/diff", json={}, headers={"Accept-Encoding": "gzip"})
+
+    assert r.status_code == 200
+    assert r.headers["content-encoding"] == "gzip"
+    assert "accept-encoding" in r.headers["vary"].lower()
+    assert r.json()["root"]["path"] == ""
+
+
+def test_small_response_is_not_compressed(client):
+    r = client.get("/health", headers={"Accept-Encoding": "gzip"})
+
+    assert r.status_code == 200
+    assert "content-encoding" not in r.headers
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [
+        ("", None),
+        ("identity", None),
+        ("gzip", "gzip"),
+        ("gzip;q=0, deflate", None),
+        ("*", None),  # resolved below depending on zstd availability
+    ],
+)
+def test_negotiate_encoding(header, expected):
+    if header == "*":
+        expected = supported_encodings()[0]
+    assert negotiate_encoding(header) == expected
+
+
+def test_compressed_response_gets_its_own_etag(client, doc_factory):
+    session_id = client.post("/", json=_create_payload(doc_factory, n_keys=50)).json()["session_id"]
+
+    r = client.post(f"/{session_id}/diff", json={}, headers={"Accept-Encoding": "gzip"})
+    assert r.headers["content-encoding"] == "gzip"
+    assert r.headers["etag"].endswith('-gzip"')
+
+    r = client.post(
+        f"/{session_id}/diff", json={}, headers={"Accept-Encoding": "gzip", "If-None-Match": r.headers["etag"]}
+    )
+    assert r.status_code == 304
+    assert "content-encoding" not in r.headers
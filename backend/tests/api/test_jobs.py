@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import threading
+import time
+from datetime import UTC, datetime
+
+import pytest
+
+from diff_fuse.api.dto.diff import DiffRequest
+from diff_fuse.models.job import Job, JobKind, JobStatus
+from diff_fuse.state.job_pool import JobPool
+from diff_fuse.state.memory_job_store import MemoryJobStore
+
+
+def _session(client, doc_factory, a=None, b=None) -> str:
+    a = {"x": 1, "arr": [1, 2]} if a is None else a
+    b = {"x": 2, "arr": [1]} if b is None else b
+    r = client.post("/", json={"documents": [doc_factory(a, name="A"), doc_factory(b, name="B")]})
+    assert r.status_code == 200, r.text
+    return r.json()["session_id"]
+
+
+def _wait(client, session_id: str, job_id: str) -> dict:
+    deadline = time.monotonic() + 10
+    while True:
+        body = client.get(f"/{session_id}/jobs/{job_id}").json()
+        if body["status"] in ("succeeded", "failed", "cancelled") or time.monotonic() > deadline:
+            return body
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def blocked_pool(monkeypatch):
+    """A one-worker pool whose worker is busy until the test ends."""
+    import diff_fuse.deps as deps
+
+    pool = JobPool(workers=1, max_pending=2)
+    monkeypatch.setattr(deps, "_job_pool", pool)
+    started, release = threading.Event(), threading.Event()
+    pool.submit("blocker", lambda cancelled: started.set() or release.wait(10))
+    assert started.wait(5)
+    yield pool
+    release.set()
+    pool.shutdown()
+
+
+def test_diff_job_returns_the_synchronous_diff(client, doc_factory):
+    session_id = _session(client, doc_factory)
+
+    r = client.post(f"/{session_id}/jobs/diff", json={})
+    assert r.status_code == 202, r.text
+    job = r.json()
+    assert job["kind"] == "diff"
+    assert r.headers["location"] == f"/{session_id}/jobs/{job['job_id']}"
+
+    done = _wait(client, session_id, job["job_id"])
+    assert done["status"] == "succeeded"
+    assert done["nodes_processed"] == done["nodes_estimated"] > 0
+
+    result = client.get(f"/{session_id}/jobs/{job['job_id']}/result")
+    assert result.status_code == 200
+    assert result.content == client.post(f"/{session_id}/diff", json={}).content
+
+
+def test_merge_job_returns_the_synchronous_merge(client, doc_factory):
+    session_id = _session(client, doc_factory)
+    body = {"diff_request": {}, "selections_by_node_id": {}}
+
+    job = client.post(f"/{session_id}/jobs/merge", json=body).json()
+
+    assert _wait(client, session_id, job["job_id"])["status"] == "succeeded"
+    result = client.get(f"/{session_id}/jobs/{job['job_id']}/result")
+    assert result.content == client.post(f"/{session_id}/merge", json=body).content
+
+
+def test_failed_job_reports_its_error(client, doc_factory):
+    session_id = _session(client, doc_factory)
+
+    job = client.post(f"/{session_id}/jobs/merge", json={"diff_id": "sha256:unknown"}).json()
+
+    done = _wait(client, session_id, job["job_id"])
+    assert done["status"] == "failed"
+    assert done["error"]["code"] == "diff_expired"
+    r = client.get(f"/{session_id}/jobs/{job['job_id']}/result")
+    assert r.status_code == 410
+    assert r.json()["error"]["code"] == "diff_expired"
+
+
+def test_queued_job_is_cancelled_at_once(client, doc_factory, blocked_pool):
+    session_id = _session(client, doc_factory)
+    job = client.post(f"/{session_id}/jobs/diff", json={}).json()
+    assert client.get(f"/{session_id}/jobs/{job['job_id']}").json()["status"] == "queued"
+
+    r = client.get(f"/{session_id}/jobs/{job['job_id']}/result")
+    assert r.status_code == 409
+    assert r.json()["error"]["code"] == "job_not_finished"
+
+    cancelled = client.post(f"/{session_id}/jobs/{job['job_id']}/cancel").json()
+    assert cancelled["status"] == "cancelled"
+    assert cancelled["cancel_requested"] is True
+
+    r = client.get(f"/{session_id}/jobs/{job['job_id']}/result")
+    assert r.status_code == 409
+    assert r.json()["error"]["code"] == "job_cancelled"
+
+
+def test_queued_jobs_are_recorded_as_cancelled_at_shutdown(client, doc_factory, blocked_pool):
+    from anyio.from_thread import start_blocking_portal
+
+    from diff_fuse.services.job_service import shutdown_jobs
+
+    session_id = _session(client, doc_factory)
+    job = client.post(f"/{session_id}/jobs/diff", json={}).json()
+
+    with start_blocking_portal() as portal:
+        portal.call(shutdown_jobs)
+
+    assert client.get(f"/{session_id}/jobs/{job['job_id']}").json()["status"] == "cancelled"
+
+
+def test_full_pool_refuses_jobs(client, doc_factory, blocked_pool):
+    session_id = _session(client, doc_factory)
+    assert client.post(f"/{session_id}/jobs/diff", json={}).status_code == 202
+
+    r = client.post(f"/{session_id}/jobs/diff", json={})
+
+    assert r.status_code == 503
+    assert r.json()["error"]["code"] == "job_queue_full"
+
+
+def test_running_job_stops_when_cancelled_elsewhere(client, doc_factory, monkeypatch):
+    """Cancellation requested through another worker reaches the job through the store."""
+    from diff_fuse.services.job_service import _diff_body, _run_job
+
+    monkeypatch.setenv("DIFF_FUSE_JOB_PROGRESS_INTERVAL_SECONDS", "0")
+    import diff_fuse.settings as settings
+
+    settings._settings = None  # type: ignore[attr-defined]
+
+    big = {f"k{i}": i for i in range(5000)}
+    session_id = _session(client, doc_factory, a=big, b={**big, "extra": 1})
+
+    class OtherWorkerCancels(MemoryJobStore):
+        def save(self, job, *, result=None):
+            if job.nodes_processed:
+                self.request_cancel(job.job_id)
+            return super().save(job, result=result)
+
+    store = OtherWorkerCancels(ttl_seconds=60)
+    now = datetime.now(UTC)
+    job = Job(job_id="j1", session_id=session_id, kind=JobKind.diff, created_at=now, updated_at=now)
+    store.save(job)
+
+    _run_job(store, job, _diff_body(DiffRequest()), threading.Event())
+
+    stored = store.get("j1")
+    assert stored.status == JobStatus.cancelled
+    assert 0 < stored.nodes_processed < 5000
+    assert store.get_result("j1") is None
+
+
+def test_jobs_are_scoped_to_their_session(client, doc_factory):
+    first, second = _session(client, doc_factory), _session(client, doc_factory)
+    job = client.post(f"/{first}/jobs/diff", json={}).json()
+
+    assert client.get(f"/{second}/jobs/{job['job_id']}").status_code == 404
+    assert client.get(f"/{first}/jobs/unknown").json()["error"]["code"] == "job_not_found"
+    assert client.post("/unknown/jobs/diff", json={}).status_code == 404
+    assert client.post(f"/{first}/jobs/merge", json={}).status_code == 400
@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+
+def _session(client, doc_factory) -> tuple[str, list[str]]:
+    docs = [doc_factory({"x": 1, "y": {"z": 1}}, name="A"), doc_factory({"x": 2, "y": {"z": 2}}, name="B")]
+    r = client.post("/", json={"documents": docs})
+    assert r.status_code == 200, r.text
+    session_id = r.json()["session_id"]
+    meta = client.get(f"/{session_id}/docs-meta").json()
+    return session_id, [d["doc_id"] for d in meta["documents_meta"]]
+
+
+def test_delta_merge_returns_only_changes(client, doc_factory):
+    session_id, (a, b) = _session(client, doc_factory)
+    diff = client.post(f"/{session_id}/diff", json={}).json()
+    x = next(c["node_id"] for c in diff["root"]["children"] if c["key"] == "x")
+
+    full = client.post(f"/{session_id}/merge/delta", json={"diff_id": diff["diff_id"]})
+    assert full.status_code == 200, full.text
+    full = full.json()
+    assert full["base_merge_id"] is None
+    assert full["merged"] == {"y": {}}
+    assert (
+        full["resolved_ref_by_node_id"]
+        == client.post(f"/{session_id}/merge", json={"diff_id": diff["diff_id"]}).json()["resolved_ref_by_node_id"]
+    )
+
+    body = {
+        "diff_id": diff["diff_id"],
+        "base_merge_id": full["merge_id"],
+        "selections_by_node_id": {x: {"kind": "doc", "doc_id": b}},
+    }
+    delta = client.post(f"/{session_id}/merge/delta", json=body).json()
+
+    assert delta["base_merge_id"] == full["merge_id"]
+    assert delta["merged"] is None
+    assert delta["value_by_node_id"] == {x: 2}
+    assert delta["resolved_ref_by_node_id"] == {x: {"present": True, "object_key": "x", "array_index": None}}
+    assert x not in delta["unresolved_node_ids"]
+
+    # A base serves once: reusing it yields a full merge.
+    again = client.post(f"/{session_id}/merge/delta", json=body).json()
+    assert again["base_merge_id"] is None
+    assert again["merged"]["x"] == 2
@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+
+def test_merge_policies_resolve_conflicts_in_bulk(client, doc_factory):
+    docs = [
+        doc_factory({"replicas": 2, "image": "a:1", "env": {"LOG": "debug"}}, name="A"),
+        doc_factory({"replicas": 5, "image": "a:2", "env": {"LOG": "info"}}, name="B"),
+    ]
+    session_id = client.post("/", json={"documents": docs}).json()["session_id"]
+    a, b = (d["doc_id"] for d in client.get(f"/{session_id}/docs-meta").json()["documents_meta"])
+    diff = client.post(f"/{session_id}/diff", json={}).json()
+    image = next(c["node_id"] for c in diff["root"]["children"] if c["key"] == "image")
+
+    body = {
+        "diff_id": diff["diff_id"],
+        "selections_by_node_id": {image: {"kind": "doc", "doc_id": b}},
+        "policies": [
+            {"kind": "prefer_doc", "doc_id": a, "path_prefix": "env"},
+            {"kind": "numeric_max"},
+            {"kind": "prefer_doc", "doc_id": a},
+        ],
+    }
+    r = client.post(f"/{session_id}/merge", json=body)
+
+    assert r.status_code == 200, r.text
+    assert r.json()["merged"] == {"replicas": 5, "image": "a:2", "env": {"LOG": "debug"}}
+    assert r.json()["unresolved_node_ids"] == []
+
+    r = client.post(f"/{session_id}/merge", json={**body, "policies": [{"kind": "coin_flip"}]})
+    assert r.status_code == 422
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+
+def _session(client, doc_factory) -> tuple[str, dict]:
+    docs = [doc_factory({"x": 1, "y": {"z": [1, 2]}}, name="A"), doc_factory({"x": 2, "y": {"z": [1, 2]}}, name="B")]
+    r = client.post("/", json={"documents": docs})
+    assert r.status_code == 200, r.text
+    session_id = r.json()["session_id"]
+    diff = client.post(f"/{session_id}/diff", json={}).json()
+    return session_id, diff
+
+
+def _child(node, key):
+    return next(c for c in node["children"] if c["key"] == key)
+
+
+def test_merge_refs_can_be_omitted_or_scoped(client, doc_factory):
+    session_id, diff = _session(client, doc_factory)
+    y = _child(diff["root"], "y")
+    z = _child(y, "z")
+    full = client.post(f"/{session_id}/merge", json={"diff_id": diff["diff_id"]}).json()
+
+    none = client.post(f"/{session_id}/merge", json={"diff_id": diff["diff_id"], "refs": {"scope": "none"}}).json()
+    assert none["merged"] == full["merged"]
+    assert none["resolved_ref_by_node_id"] == {}
+
+    body = {"diff_id": diff["diff_id"], "refs": {"scope": "nodes", "node_ids": [z["node_id"]]}}
+    nodes = client.post(f"/{session_id}/merge", json=body).json()
+    assert nodes["resolved_ref_by_node_id"] == {z["node_id"]: full["resolved_ref_by_node_id"][z["node_id"]]}
+
+    body = {"diff_id": diff["diff_id"], "refs": {"scope": "subtrees", "node_ids": [y["node_id"]]}}
+    subtree = client.post(f"/{session_id}/merge", json=body).json()
+    expected = [y["node_id"], z["node_id"], *(c["node_id"] for c in z["children"])]
+    assert subtree["resolved_ref_by_node_id"] == {n: full["resolved_ref_by_node_id"][n] for n in expected}
+
+
+def test_merge_refs_columnar_encoding(client, doc_factory):
+    session_id, diff = _session(client, doc_factory)
+    full = client.post(f"/{session_id}/merge", json={"diff_id": diff["diff_id"]}).json()
+
+    body = {"diff_id": diff["diff_id"], "refs": {"encoding": "columnar"}}
+    columnar = client.post(f"/{session_id}/merge", json=body).json()
+
+    assert columnar["resolved_ref_by_node_id"] == {}
+    columns = columnar["resolved_ref_columns"]
+    decoded = {
+        node_id: {
+            "present": present,
+            "object_key": locator if isinstance(locator, str) else None,
+            "array_index": locator if isinstance(locator, int) else None,
+        }
+        for node_id, present, locator in zip(columns["node_ids"], columns["present"], columns["locators"], strict=True)
+    }
+    assert decoded == full["resolved_ref_by_node_id"]
+
+
+def test_merge_refs_rejects_inconsistent_options(client, doc_factory):
+    session_id, diff = _session(client, doc_factory)
+
+    body = {"diff_id": diff["diff_id"], "refs": {"scope": "all", "node_ids": [diff["root"]["node_id"]]}}
+    r = client.post(f"/{session_id}/merge", json=body)
+    assert r.status_code == 400
+    assert r.json()["error"]["details"]["field"] == "refs.node_ids"
+
+    r = client.post(f"/{session_id}/merge/delta", json={"diff_id": diff["diff_id"], "refs": {"scope": "none"}})
+    assert r.status_code == 400
+
+
+def test_merge_copies_subtrees_without_the_diff_cache(client, doc_factory, monkeypatch):
+    import diff_fuse.domain.merge as merge_module
+
+    monkeypatch.setenv("DIFF_FUSE_DIFF_CACHE_MAX_ENTRIES", "0")
+    lookups = []
+    lookup = merge_module.get_value_at_node_tokens
+    monkeypatch.setattr(
+        merge_module, "get_value_at_node_tokens", lambda root, tokens: lookups.append(tokens) or lookup(root, tokens)
+    )
+    session_id, _ = _session(client, doc_factory)
+
+    r = client.post(f"/{session_id}/merge", json={"diff_request": {}})
+
+    assert r.status_code == 200, r.text
+    assert r.json()["merged"]["y"] == {"z": [1, 2]}
+    # "y" is the same in both documents: copied from each, not rebuilt.
+    assert len(lookups) == 2
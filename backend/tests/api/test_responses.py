@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import pytest
+from fastapi.responses import JSONResponse
+
+from diff_fuse.api.dto.diff import DiffResponse
+from diff_fuse.api.dto.merge import MergeResponse
+from diff_fuse.api.responses import model_json_bytes
+from diff_fuse.services.diff_service import build_diff_root
+
+
+def _reference_bytes(model) -> bytes:
+    """What FastAPI sends for a model returned from a route with ``response_model``."""
+    return JSONResponse(content=model.model_dump(mode="json", by_alias=True)).body
+
+
+@pytest.mark.parametrize(
+    "values",
+    [
+        [1, 2.5, "text", None, True, {"nested": [1, {"deep": "é😀"}]}],
+        [0.0001, 1e-10, 1e16, 1.5e300, -0.0],
+        [1.2e-5],
+        [3.2e-7],
+        [1e-9],
+        [2**64 + 1],
+        ["0.00001", "se-7"],
+        ["line\nbreak", "tab\t", "\x00\x1f\x7f", " "],
+    ],
+)
+def test_model_bytes_match_fastapi_json_response(values):
+    a = {"values": values, "same": {"k": values}}
+    b = {"values": list(reversed(values)), "same": {"k": values}}
+    diff = DiffResponse(root=build_diff_root({"a": (True, a), "b": (True, b)}, {}), diff_id="sha256:x")
+    merge = MergeResponse(merged=a, unresolved_node_ids=["n1"], resolved_ref_by_node_id={})
+
+    assert model_json_bytes(diff) == _reference_bytes(diff)
+    assert model_json_bytes(merge) == _reference_bytes(merge)
+
+
+def test_routes_return_validated_json_bytes(client, doc_factory):
+    payload = {"documents": [doc_factory({"x": 1e-6, "y": "é"}, name="A"), doc_factory({"x": 2}, name="B")]}
+    session_id = client.post("/", json=payload).json()["session_id"]
+
+    r = client.post(f"/{session_id}/diff", json={})
+    assert r.status_code == 200, r.text
+    assert r.headers["content-type"] == "application/json"
+    assert r.headers["etag"]
+    assert r.content == _reference_bytes(DiffResponse.model_validate(r.json()))
+
+    r = client.post(f"/{session_id}/merge", json={"diff_id": r.json()["diff_id"]})
+    assert r.status_code == 200, r.text
+    assert r.content == _reference_bytes(MergeResponse.model_validate(r.json()))
+
+
+@pytest.mark.parametrize(
+    ("path", "schema"),
+    [
+        ("/{session_id}/diff", "DiffResponse"),
+        ("/{session_id}/merge", "MergeResponse"),
+        ("/{session_id}/export/text", "ExportTextResponse"),
+    ],
+)
+def test_openapi_still_documents_the_response_models(app, path, schema):
+    operation = app.openapi()["paths"][path]["post"]
+    content = operation["responses"]["200"]["content"]["application/json"]
+
+    assert content["schema"] == {"$ref": f"#/components/schemas/{schema}"}
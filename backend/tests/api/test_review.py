@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+
+def _session(client, doc_factory) -> str:
+    docs = [doc_factory({"x": 1, "y": "a"}, name="A"), doc_factory({"x": 2, "y": "b"}, name="B")]
+    r = client.post("/", json={"documents": docs})
+    assert r.status_code == 200, r.text
+    return r.json()["session_id"]
+
+
+def _doc_ids_and_nodes(client, session_id: str) -> tuple[list[str], dict[str, str]]:
+    meta = client.get(f"/{session_id}/docs-meta").json()
+    doc_ids = [d["doc_id"] for d in meta["documents_meta"]]
+    root = client.post(f"/{session_id}/diff", json={}).json()["root"]
+    return doc_ids, {child["key"]: child["node_id"] for child in root["children"]}
+
+
+def test_merge_and_export_use_the_stored_review(client, doc_factory):
+    session_id = _session(client, doc_factory)
+    (a, b), nodes = _doc_ids_and_nodes(client, session_id)
+    assert client.get(f"/{session_id}/review").json()["revision"] == 0
+
+    r = client.patch(
+        f"/{session_id}/review",
+        json={"base_revision": 0, "selections_by_node_id": {nodes["x"]: {"kind": "doc", "doc_id": a}}},
+    )
+    assert r.status_code == 200, r.text
+    r = client.patch(
+        f"/{session_id}/review",
+        json={
+            "base_revision": 1,
+            "selections_by_node_id": {nodes["x"]: None, nodes["y"]: {"kind": "doc", "doc_id": b}},
+        },
+    )
+    assert r.json() == {"revision": 2}
+
+    review = client.get(f"/{session_id}/review").json()
+    inline = {"diff_request": review["diff_request"], "selections_by_node_id": review["selections_by_node_id"]}
+    assert list(inline["selections_by_node_id"]) == [nodes["y"]]
+
+    stored = client.post(f"/{session_id}/merge", json={"review_revision": 2})
+    assert stored.status_code == 200, stored.text
+    assert stored.json()["merged"] == {"y": "b"}
+    assert stored.json()["unresolved_node_ids"] == [nodes["x"]]
+    assert stored.content == client.post(f"/{session_id}/merge", json=inline).content
+    assert stored.headers["etag"] == client.post(f"/{session_id}/merge", json=inline).headers["etag"]
+
+    export = client.post(f"/{session_id}/export/text", json={"merge_request": {"review_revision": 2}})
+    assert export.status_code == 200, export.text
+    assert export.json()["unresolved_node_ids"] == [nodes["x"]]
+
+
+def test_stale_revisions_are_rejected(client, doc_factory):
+    session_id = _session(client, doc_factory)
+    client.patch(f"/{session_id}/review", json={"null_mode": "value"})
+
+    r = client.patch(f"/{session_id}/review", json={"base_revision": 0, "null_mode": "missing"})
+    assert r.status_code == 409
+    assert r.json()["error"]["code"] == "review_conflict"
+
+    r = client.post(f"/{session_id}/merge", json={"review_revision": 0})
+    assert r.status_code == 409
+    assert r.json()["error"]["details"] == {"expected_revision": 0, "revision": 1}
+
+    r = client.post(f"/{session_id}/jobs/merge", json={"review_revision": 0})
+    assert r.status_code == 409
+
+
+def test_review_revision_excludes_inline_state(client, doc_factory):
+    session_id = _session(client, doc_factory)
+
+    r = client.post(f"/{session_id}/merge", json={"review_revision": 0, "diff_request": {}})
+
+    assert r.status_code == 400
+    assert r.json()["error"]["code"] == "domain_validation_error"
+
+
+def test_review_requires_a_session(client):
+    assert client.get("/unknown/review").status_code == 404
+    assert client.patch("/unknown/review", json={}).status_code == 404
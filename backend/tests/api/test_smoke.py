@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import json
+
 import pytest
 
 
@@ -82,6 +84,7 @@ def test_export_smoke_conflict_handling(client, doc_factory, require_resolved, e
         err = r.json()
         assert err["error"]["code"] == "merge_conflict"
 
+
 @pytest.mark.parametrize(
     "diff_request, expected_status",
     [
@@ -113,3 +116,202 @@ def test_diff_rejects_unknown_null_mode(client, doc_factory):
 
     r = client.post(f"/{session_id}/diff", json={"null_mode": "bogus"})
     assert r.status_code == 422
+
+
+def test_full_session_with_raw_on_error_policy(client, doc_factory, monkeypatch):
+    monkeypatch.setenv("DIFF_FUSE_DOCUMENT_STORAGE_POLICY", "raw_on_error")
+
+    r = client.post(
+        "/",
+        json={"documents": [doc_factory({"a": 1}, name="ok"), doc_factory("{", name="bad")]},
+    )
+    assert r.status_code == 200, r.text
+    sid = r.json()["session_id"]
+
+    r = client.get(f"/{sid}/full")
+    assert r.status_code == 200, r.text
+    docs = r.json()["documents_results"]
+    assert docs[0]["raw"] is None and docs[0]["normalized"] == {"a": 1}
+    assert docs[1]["raw"] == "{" and docs[1]["ok"] is False
+
+
+def test_health_sessions_reports_memory_backend_counters(client, doc_factory):
+    r = client.post("/", json={"documents": [doc_factory({"x": 1})]})
+    assert r.status_code == 200, r.text
+
+    r = client.get("/health/sessions")
+    assert r.status_code == 200
+    body = r.json()
+    assert body["backend"] == "memory"
+    assert body["sessions"] >= 1
+    assert {"approx_bytes", "evictions", "expirations"} <= body.keys()
+
+
+def test_docs_meta_reports_approximate_sizes(client, doc_factory):
+    r = client.post("/", json={"documents": [doc_factory({"x": 1}), doc_factory({"y": [1, 2, 3]})]})
+    assert r.status_code == 200, r.text
+    session_id = r.json()["session_id"]
+
+    r = client.get(f"/{session_id}/docs-meta")
+    assert r.status_code == 200, r.text
+    body = r.json()
+    sizes = [m["approx_bytes"] for m in body["documents_meta"]]
+    assert all(size > 0 for size in sizes)
+    assert body["approx_bytes"] == sum(sizes)
+
+
+def _count_diff_builds(monkeypatch) -> list[int]:
+    import diff_fuse.services.diff_service as diff_service
+
+    builds: list[int] = []
+    original = diff_service.build_diff_root
+
+    def _build(*args, **kwargs):
+        builds.append(1)
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(diff_service, "build_diff_root", _build)
+    return builds
+
+
+def test_merge_and_export_reuse_the_diff_by_id(client, doc_factory, monkeypatch):
+    builds = _count_diff_builds(monkeypatch)
+    r = client.post("/", json={"documents": [doc_factory({"x": 1}, doc_id="a"), doc_factory({"x": 2}, doc_id="b")]})
+    session_id = r.json()["session_id"]
+
+    r = client.post(f"/{session_id}/diff", json={})
+    assert r.status_code == 200, r.text
+    diff_id = r.json()["diff_id"]
+    assert diff_id
+
+    # the same diff, spelled differently, is served from the cache
+    r = client.post(f"/{session_id}/diff", json={"array_strategies_by_node_id": {}, "null_mode": "missing"})
+    assert r.json()["diff_id"] == diff_id
+
+    r = client.post(f"/{session_id}/merge", json={"diff_id": diff_id, "selections_by_node_id": {}})
+    assert r.status_code == 200, r.text
+    merge_body = r.json()
+
+    r = client.post(f"/{session_id}/export/text", json={"merge_request": {"diff_id": diff_id}})
+    assert r.status_code == 200, r.text
+
+    assert len(builds) == 1
+    assert merge_body["unresolved_node_ids"] == r.json()["unresolved_node_ids"]
+
+
+def test_stale_or_expired_diff_id_falls_back_to_the_diff_request(client, doc_factory, monkeypatch):
+    builds = _count_diff_builds(monkeypatch)
+    r = client.post("/", json={"documents": [doc_factory({"x": 1}, doc_id="a")]})
+    session_id = r.json()["session_id"]
+    diff_id = client.post(f"/{session_id}/diff", json={}).json()["diff_id"]
+
+    r = client.post(f"/{session_id}/add-docs", json={"documents": [doc_factory({"x": 2}, doc_id="b")]})
+    assert r.status_code == 200, r.text
+
+    # the handle no longer describes the session's documents
+    r = client.post(f"/{session_id}/merge", json={"diff_id": diff_id})
+    assert r.status_code == 410
+    assert r.json()["error"]["code"] == "diff_expired"
+
+    r = client.post(f"/{session_id}/merge", json={"diff_id": diff_id, "diff_request": {}})
+    assert r.status_code == 200, r.text
+    assert r.json()["unresolved_node_ids"]
+    assert len(builds) == 2
+
+
+def test_diff_request_decides_the_tree_when_a_diff_id_is_also_sent(client, doc_factory):
+    import diff_fuse.deps as deps
+
+    r = client.post("/", json={"documents": [doc_factory({"x": None}, doc_id="a"), doc_factory({"x": 2}, doc_id="b")]})
+    session_id = r.json()["session_id"]
+    diff_id = client.post(f"/{session_id}/diff", json={}).json()["diff_id"]
+    body = {"diff_id": diff_id, "diff_request": {"null_mode": "value"}}
+
+    cached = client.post(f"/{session_id}/merge", json=body)
+    deps._diff_cache = None  # type: ignore[attr-defined]
+    rebuilt = client.post(f"/{session_id}/merge", json=body)
+
+    assert cached.status_code == rebuilt.status_code == 200
+    assert cached.json() == rebuilt.json()
+    assert cached.json()["unresolved_node_ids"]
+    assert cached.headers["etag"] == rebuilt.headers["etag"]
+
+
+def test_merge_requires_a_diff_request_or_id(client, doc_factory):
+    r = client.post("/", json={"documents": [doc_factory({"x": 1})]})
+    session_id = r.json()["session_id"]
+
+    r = client.post(f"/{session_id}/merge", json={"selections_by_node_id": {}})
+    assert r.status_code == 400
+    assert r.json()["error"]["code"] == "domain_validation_error"
+
+
+@pytest.mark.parametrize("pretty", [True, False])
+def test_download_streams_the_same_json_as_the_text_export(client, doc_factory, pretty):
+    r = client.post(
+        "/",
+        json={"documents": [doc_factory({"x": 1, "y": {"b": [1, 2], "a": "é"}}, doc_id="a")]},
+    )
+    session_id = r.json()["session_id"]
+    export_req = {"merge_request": {"diff_request": {}}, "pretty": pretty}
+
+    text = client.post(f"/{session_id}/export/text", json=export_req).json()["text"]
+    r = client.post(f"/{session_id}/export/download", json=export_req)
+
+    assert r.status_code == 200, r.text
+    assert r.headers["content-disposition"] == 'attachment; filename="merged.json"'
+    assert r.content == (text + "\n").encode()
+    assert json.loads(r.content) == {"x": 1, "y": {"a": "é", "b": [1, 2]}}
+
+
+@pytest.mark.parametrize(
+    "path, body",
+    [
+        ("diff", {}),
+        ("merge", {"diff_request": {}}),
+        ("export/text", {"merge_request": {"diff_request": {}}}),
+        ("export/download", {"merge_request": {"diff_request": {}}}),
+    ],
+)
+def test_unchanged_responses_are_not_modified(client, doc_factory, monkeypatch, path, body):
+    builds = _count_diff_builds(monkeypatch)
+    r = client.post("/", json={"documents": [doc_factory({"x": 1}, doc_id="a"), doc_factory({"x": 2}, doc_id="b")]})
+    session_id = r.json()["session_id"]
+    headers = {"Accept-Encoding": "identity"}
+
+    r = client.post(f"/{session_id}/{path}", json=body, headers=headers)
+    assert r.status_code == 200, r.text
+    etag = r.headers["etag"]
+    assert etag.startswith('"') and etag.endswith('"')
+
+    r = client.post(f"/{session_id}/{path}", json=body, headers={**headers, "If-None-Match": f'"other", W/{etag}'})
+    assert r.status_code == 304
+    assert r.headers["etag"] == etag
+    assert r.content == b""
+    assert len(builds) == 1
+
+    # new documents change the tag
+    client.post(f"/{session_id}/add-docs", json={"documents": [doc_factory({"x": 3}, doc_id="c")]})
+    r = client.post(f"/{session_id}/{path}", json=body, headers={**headers, "If-None-Match": etag})
+    assert r.status_code == 200
+    assert r.headers["etag"] != etag
+
+
+def test_equivalent_requests_share_an_etag_and_endpoints_do_not(client, doc_factory):
+    r = client.post("/", json={"documents": [doc_factory({"x": 1})]})
+    session_id = r.json()["session_id"]
+    headers = {"Accept-Encoding": "identity"}
+
+    diff_tag = client.post(f"/{session_id}/diff", json={}, headers=headers).headers["etag"]
+    spelled_out = client.post(
+        f"/{session_id}/diff", json={"null_mode": "missing", "array_strategies_by_node_id": {}}, headers=headers
+    )
+    assert spelled_out.headers["etag"] == diff_tag
+
+    text_tag = client.post(
+        f"/{session_id}/export/text", json={"merge_request": {"diff_request": {}}}, headers=headers
+    ).headers["etag"]
+    download_tag = client.post(
+        f"/{session_id}/export/download", json={"merge_request": {"diff_request": {}}}, headers=headers
+    ).headers["etag"]
+    assert len({diff_tag, text_tag, download_tag}) == 3
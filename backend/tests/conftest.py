@@ -35,6 +35,20 @@ def _reset_singletons_and_env(monkeypatch: pytest.MonkeyPatch) -> None:
 
     settings._settings = None  # type: ignore[attr-defined]
     deps._repo = None  # type: ignore[attr-defined]
+    deps._async_repo = None  # type: ignore[attr-defined]
+    deps._diff_cache = None  # type: ignore[attr-defined]
+    deps._redis = None  # type: ignore[attr-defined]
+    deps._sqlite_db = None  # type: ignore[attr-defined]
+    deps._job_store = None  # type: ignore[attr-defined]
+    deps._job_pool = None  # type: ignore[attr-defined]
+    deps._review_store = None  # type: ignore[attr-defined]
+    deps._merge_memo = None  # type: ignore[attr-defined]
+
+
+@pytest.fixture
+def anyio_backend() -> str:
+    """Run ``@pytest.mark.anyio`` tests on asyncio only."""
+    return "asyncio"
 
 
 @pytest.fixture
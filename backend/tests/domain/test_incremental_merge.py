@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import copy
+import random
+
+import pytest
+
+from diff_fuse.domain.diff import build_stable_root_diff_tree
+from diff_fuse.domain.incremental_merge import merge_incremental
+from diff_fuse.domain.merge import try_merge_from_diff_tree_with_refs
+from diff_fuse.models.arrays import ArrayStrategy, ArrayStrategyMode
+from diff_fuse.models.merge import DocMergeSelection, ManualMergeSelection, NumericMaxPolicy, PreferDocPolicy
+
+DOC_A = {
+    "name": "svc",
+    "ports": [80, 443, 8080],
+    "env": {"LOG": "debug", "MODE": "a", "nested": {"x": 1, "y": [1, 2]}},
+    "users": [{"id": 1, "role": "admin"}, {"id": 2, "role": "dev"}],
+    "cfg": {"k": 1},
+}
+DOC_B = {
+    "name": "svc2",
+    "ports": [80, 8443],
+    "env": {"LOG": "info", "nested": {"x": 2, "z": True}},
+    "users": [{"id": 2, "role": "ops"}, {"id": 3, "role": "dev"}],
+    "cfg": [1, 2],
+}
+
+
+def _root():
+    users_id = "users"
+    root = build_stable_root_diff_tree(
+        per_doc_values={"A": (True, DOC_A), "B": (True, DOC_B)}, array_strategies_by_node_id={}
+    )
+    users = next(c for c in root.children if c.key == users_id)
+    strategies = {users.node_id: ArrayStrategy(mode=ArrayStrategyMode.keyed, key="id")}
+    return build_stable_root_diff_tree(
+        per_doc_values={"A": (True, DOC_A), "B": (True, DOC_B)}, array_strategies_by_node_id=strategies
+    )
+
+
+def _nodes(root):
+    out, stack = [], [root]
+    while stack:
+        node = stack.pop()
+        out.append(node)
+        stack.extend(node.children)
+    return out
+
+
+def _random_selection(rng):
+    choice = rng.random()
+    if choice < 0.35:
+        return DocMergeSelection(doc_id="A")
+    if choice < 0.7:
+        return DocMergeSelection(doc_id="B")
+    if choice < 0.85:
+        return ManualMergeSelection(manual_value=rng.choice([None, 0, "m", {"k": "v"}, [1]]))
+    return None
+
+
+def _locate(root_id, parents, refs, node_id):
+    path = []
+    while node_id != root_id:
+        ref = refs[node_id]
+        path.append(ref.object_key if ref.object_key is not None else ref.array_index)
+        node_id = parents[node_id]
+    return path[::-1]
+
+
+def _apply_delta(doc, delta, root_id, parents, old_refs, new_refs):
+    """Apply a delta to the previous merged document, as a client would."""
+    doc = copy.deepcopy(doc)
+    for node_id, ref in delta.changed_ref_by_node_id.items():
+        old = old_refs.get(node_id)
+        if not ref.present and old is not None and old.present and old.object_key is not None:
+            parent = doc
+            for key in _locate(root_id, parents, old_refs, parents[node_id]):
+                parent = parent[key]
+            parent.pop(old.object_key, None)
+    for node_id, value in delta.value_by_node_id.items():
+        if node_id == root_id:
+            doc = copy.deepcopy(value)
+            continue
+        path = _locate(root_id, parents, new_refs, node_id)
+        parent = doc
+        for key in path[:-1]:
+            parent = parent[key]
+        if isinstance(parent, list) and path[-1] == len(parent):
+            parent.append(copy.deepcopy(value))
+        else:
+            parent[path[-1]] = copy.deepcopy(value)
+    return doc
+
+
+@pytest.mark.parametrize(
+    "policies", [(), (PreferDocPolicy(doc_id="B", path_prefix="env"), NumericMaxPolicy())], ids=["plain", "policies"]
+)
+def test_incremental_merge_matches_full_merge_and_its_delta_applies(policies):
+    root = _root()
+    nodes = _nodes(root)
+    rng = random.Random(7)
+    selections: dict = {}
+
+    state, delta = merge_incremental(root, selections, policies=policies)
+    assert delta is None
+    parents = state.index.parent_by_node_id
+
+    for _ in range(300):
+        old_merged = copy.deepcopy(state.merged(root))
+        old_refs = dict(state.ref_by_node_id)
+
+        selections = dict(selections)
+        for _ in range(rng.randint(1, 3)):
+            node = rng.choice(nodes)
+            sel = _random_selection(rng)
+            if sel is None:
+                selections.pop(node.node_id, None)
+            else:
+                selections[node.node_id] = sel
+
+        state, delta = merge_incremental(root, selections, state, policies)
+        merged, unresolved, refs = try_merge_from_diff_tree_with_refs(root, selections, policies=policies)
+
+        assert state.merged(root) == merged
+        assert state.unresolved_node_ids() == unresolved
+        assert state.ref_by_node_id == refs
+
+        assert set(delta.changed_ref_by_node_id) == {k for k in refs if old_refs.get(k) != refs[k]}
+        assert set(delta.dropped_ref_node_ids) == old_refs.keys() - refs.keys()
+        assert _apply_delta(old_merged, delta, root.node_id, parents, old_refs, refs) == merged
+
+
+def test_unaffected_subtrees_are_reused():
+    root = _root()
+    env = next(c for c in root.children if c.key == "env")
+    name = next(c for c in root.children if c.key == "name")
+    state, _ = merge_incremental(root, {env.node_id: DocMergeSelection(doc_id="A")})
+    env_value = state.value_by_node_id[env.node_id]
+
+    state, delta = merge_incremental(
+        root, {env.node_id: DocMergeSelection(doc_id="A"), name.node_id: DocMergeSelection(doc_id="B")}, state
+    )
+
+    assert state.value_by_node_id[env.node_id] is env_value
+    assert delta.value_by_node_id == {name.node_id: "svc2"}
+    # "name" conflicted, so it was absent until selected.
+    assert list(delta.changed_ref_by_node_id) == [name.node_id]
+    assert name.node_id not in state.unresolved
+
+
+def test_manual_selection_drops_descendant_refs():
+    root = _root()
+    env = next(c for c in root.children if c.key == "env")
+    state, _ = merge_incremental(root, {})
+
+    state, delta = merge_incremental(root, {env.node_id: ManualMergeSelection(manual_value={"LOG": "off"})}, state)
+
+    assert delta.value_by_node_id == {env.node_id: {"LOG": "off"}}
+    assert set(delta.dropped_ref_node_ids) == {n.node_id for n in _nodes(env)} - {env.node_id}
+    assert not any(n.node_id in state.unresolved for n in _nodes(env))
+
+
+def test_changing_policies_merges_from_scratch():
+    root = _root()
+    state, _ = merge_incremental(root, {})
+
+    state, delta = merge_incremental(root, {}, state, [PreferDocPolicy(doc_id="A")])
+
+    assert delta is None
+    assert state.merged(root)["name"] == "svc"
+    assert state.unresolved_node_ids() == []
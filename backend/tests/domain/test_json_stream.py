@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import json
+
+import orjson
+import pytest
+
+from diff_fuse.domain.json_stream import iter_json_bytes
+
+VALUES = [
+    {"b": [1, {"z": 1, "a": []}, {}], "a": "x\ny", "é": 1.5e100, "c": None, "d": {"e": {"f": [True, False]}}},
+    [{"k": [[1, 2], [3]]}, "s", 0.5, {}],
+    {"only": {"deep": {"deeper": {"deepest": [1, 2, 3]}}}},
+    {},
+    [],
+    "scalar",
+    42,
+    None,
+]
+
+
+@pytest.mark.parametrize("value", VALUES)
+def test_pretty_output_matches_the_stdlib_encoder(value):
+    expected = json.dumps(value, indent=2, sort_keys=True, ensure_ascii=False).encode()
+    assert b"".join(iter_json_bytes(value, pretty=True)) == expected
+
+
+@pytest.mark.parametrize("value", VALUES)
+def test_compact_output_matches_orjson(value):
+    expected = orjson.dumps(value, option=orjson.OPT_SORT_KEYS)
+    assert b"".join(iter_json_bytes(value, pretty=False)) == expected
+
+
+def test_output_is_chunked():
+    value = {f"k{i}": list(range(50)) for i in range(200)}
+
+    chunks = list(iter_json_bytes(value, pretty=True, chunk_bytes=1024))
+
+    assert len(chunks) > 10
+    assert json.loads(b"".join(chunks)) == value
+
+
+def test_values_orjson_cannot_encode_fall_back_to_the_stdlib():
+    value = {"big": [2**70], "small": 1}
+
+    assert json.loads(b"".join(iter_json_bytes(value, pretty=True))) == value
+    assert b"".join(iter_json_bytes(value, pretty=False)) == b'{"big":[1180591620717411303424],"small":1}'
+
+
+def test_floats_orjson_spells_differently_fall_back_to_the_stdlib():
+    value = {"tiny": 1e-05, "deep": {"er": {"est": [2.5e-07, 1e-4]}}, "s": "0.00001"}
+
+    pretty = json.dumps(value, indent=2, sort_keys=True, ensure_ascii=False).encode()
+    compact = json.dumps(value, separators=(",", ":"), sort_keys=True, ensure_ascii=False).encode()
+    assert b"".join(iter_json_bytes(value, pretty=True)) == pretty
+    assert b"".join(iter_json_bytes(value, pretty=False)) == compact
@@ -1,12 +1,21 @@
 from __future__ import annotations
 
+import orjson
 import pytest
 
+from diff_fuse.domain import merge as merge_module
 from diff_fuse.domain.diff import build_stable_root_diff_tree
 from diff_fuse.domain.merge import try_merge_from_diff_tree_with_refs
+from diff_fuse.domain.node_access import get_value_at_node_tokens
 from diff_fuse.models.arrays import ArrayStrategy, ArrayStrategyMode
 from diff_fuse.models.diff import NullMode
-from diff_fuse.models.merge import DocMergeSelection, ManualMergeSelection
+from diff_fuse.models.merge import (
+    DocMergeSelection,
+    ManualMergeSelection,
+    NonNullPolicy,
+    NumericMaxPolicy,
+    PreferDocPolicy,
+)
 
 
 def _root(doc_a, doc_b):
@@ -310,3 +319,240 @@ def test_merge_array_strategy_type_error_resolves_with_selection():
 
     assert merged == {"items": [{"id": 1}]}
     assert unresolved == []
+
+
+# --- subtree copies ------------------------------------------------------
+
+
+def _merge_both_ways(doc_a, doc_b, selections=None, array_strategies=None, **kwargs):
+    sources = {"A": (True, doc_a), "B": (True, doc_b)}
+    root = build_stable_root_diff_tree(
+        per_doc_values=sources, array_strategies_by_node_id=array_strategies or {}, **kwargs
+    )
+    slow = try_merge_from_diff_tree_with_refs(root, selections or {})
+    fast = try_merge_from_diff_tree_with_refs(root, selections or {}, sources)
+    return root, slow, fast
+
+
+def _count_lookups(monkeypatch) -> list:
+    lookups = []
+    monkeypatch.setattr(
+        merge_module,
+        "get_value_at_node_tokens",
+        lambda root, tokens: lookups.append(tokens) or get_value_at_node_tokens(root, tokens),
+    )
+    return lookups
+
+
+def test_merge_copies_same_subtree_from_sources(monkeypatch):
+    lookups = _count_lookups(monkeypatch)
+    doc_a = {"cfg": {"deep": {"list": [1, {"x": [2, 3]}], "s": "v"}}, "name": "a"}
+    doc_b = {"cfg": {"deep": {"list": [1, {"x": [2, 3]}], "s": "v"}}, "name": "b"}
+
+    root, slow, fast = _merge_both_ways(doc_a, doc_b)
+
+    assert fast == slow
+    # Copied in one step from each document, not rebuilt.
+    assert len(lookups) == 2
+
+
+def test_merge_subtree_copy_emits_keys_in_sorted_order():
+    doc = {"b": 1, "a": {"z": 1, "y": [{"d": 1, "c": 2}]}}
+
+    _, slow, fast = _merge_both_ways(doc, doc)
+
+    assert orjson.dumps(fast[0]) == orjson.dumps(slow[0]) == b'{"a":{"y":[{"c":2,"d":1}],"z":1},"b":1}'
+
+
+@pytest.mark.parametrize(
+    "doc_a, doc_b, kwargs",
+    [
+        # An explicit null in one document and an absent key in the other agree
+        # under NullMode.missing, but the subtrees differ.
+        ({"cfg": {"a": 1, "n": None}}, {"cfg": {"a": 1}}, {}),
+        ({"cfg": {"a": 1}}, {"cfg": {"a": 1, "n": None}}, {}),
+        ({"cfg": {"l": [None]}}, {"cfg": {"l": []}}, {}),
+        ({"cfg": {"a": 1.0}}, {"cfg": {"a": 1}}, {}),
+        ({"cfg": {"a": 1, "n": None}}, {"cfg": {"a": 1}}, {"null_mode": NullMode.value}),
+    ],
+)
+def test_merge_subtree_copy_matches_node_by_node_merge(doc_a, doc_b, kwargs):
+    root, slow, fast = _merge_both_ways(doc_a, doc_b, **kwargs)
+    cfg = next(c for c in root.children if c.key == "cfg")
+    _, slow_sel, fast_sel = _merge_both_ways(doc_a, doc_b, {cfg.node_id: DocMergeSelection(doc_id="B")}, **kwargs)
+
+    assert fast == slow
+    assert fast_sel == slow_sel
+
+
+def test_merge_subtree_copy_keeps_keyed_array_order():
+    doc_a = {"items": [{"id": 1, "v": "x"}, {"id": 2, "v": "y"}]}
+    doc_b = {"items": [{"id": 2, "v": "y"}, {"id": 1, "v": "x"}]}
+    probe = build_stable_root_diff_tree(per_doc_values={"A": (True, doc_a)}, array_strategies_by_node_id={})
+    items = next(c for c in probe.children if c.key == "items")
+    strategies = {items.node_id: ArrayStrategy(mode=ArrayStrategyMode.keyed, key="id")}
+
+    root, slow, fast = _merge_both_ways(doc_a, doc_b, array_strategies=strategies)
+    _, slow_sel, fast_sel = _merge_both_ways(
+        doc_a, doc_b, {root.node_id: DocMergeSelection(doc_id="B")}, array_strategies=strategies
+    )
+
+    assert fast == slow
+    assert fast_sel == slow_sel
+    assert fast_sel[0]["items"][0]["id"] == 1
+
+
+def test_merge_subtree_with_selection_inside_is_not_copied(monkeypatch):
+    lookups = _count_lookups(monkeypatch)
+    doc_a = {"cfg": {"a": {"x": 1}, "b": {"y": 2}}}
+    doc_b = {"cfg": {"a": {"x": 1}, "b": {"y": 2}}}
+    root = build_stable_root_diff_tree(
+        per_doc_values={"A": (True, doc_a), "B": (True, doc_b)}, array_strategies_by_node_id={}
+    )
+    cfg = next(c for c in root.children if c.key == "cfg")
+    x = next(c for c in cfg.children if c.key == "a").children[0]
+    selections = {x.node_id: ManualMergeSelection(manual_value=5)}
+
+    merged, unresolved, refs = try_merge_from_diff_tree_with_refs(
+        root, selections, {"A": (True, doc_a), "B": (True, doc_b)}
+    )
+
+    assert merged == {"cfg": {"a": {"x": 5}, "b": {"y": 2}}}
+    assert unresolved == []
+    # The sibling without selections is still copied.
+    assert len(lookups) == 2
+    assert refs[x.node_id].object_key == "x"
+
+
+# --- reference scopes ----------------------------------------------------
+
+
+def _scope_fixture():
+    doc_a = {"cfg": {"a": {"x": 1}, "b": [1, 2]}, "name": "a", "same": {"k": [{"v": 1}]}}
+    doc_b = {"cfg": {"a": {"x": 2}, "b": [1, 2]}, "name": "b", "same": {"k": [{"v": 1}]}}
+    sources = {"A": (True, doc_a), "B": (True, doc_b)}
+    root = build_stable_root_diff_tree(per_doc_values=sources, array_strategies_by_node_id={})
+    return root, sources
+
+
+def _descendants(node):
+    out = [node.node_id]
+    for child in node.children:
+        out.extend(_descendants(child))
+    return out
+
+
+@pytest.mark.parametrize("with_sources", [False, True])
+def test_merge_reports_only_requested_refs(with_sources):
+    root, sources = _scope_fixture()
+    sources = sources if with_sources else None
+    merged, unresolved, all_refs = try_merge_from_diff_tree_with_refs(root, {})
+    cfg = next(c for c in root.children if c.key == "cfg")
+    same = next(c for c in root.children if c.key == "same")
+    deep = same.children[0].children[0]
+    requested = [root.node_id, cfg.children[0].node_id, deep.node_id]
+
+    scoped = try_merge_from_diff_tree_with_refs(root, {}, sources, ref_node_ids=requested)
+
+    assert scoped[:2] == (merged, unresolved)
+    assert scoped[2] == {node_id: all_refs[node_id] for node_id in requested}
+
+
+@pytest.mark.parametrize("with_sources", [False, True])
+def test_merge_reports_requested_subtrees(with_sources):
+    root, sources = _scope_fixture()
+    sources = sources if with_sources else None
+    _, _, all_refs = try_merge_from_diff_tree_with_refs(root, {})
+    cfg = next(c for c in root.children if c.key == "cfg")
+    same = next(c for c in root.children if c.key == "same")
+
+    _, _, refs = try_merge_from_diff_tree_with_refs(
+        root, {}, sources, ref_node_ids=[cfg.node_id, same.node_id], ref_subtrees=True
+    )
+
+    expected = _descendants(cfg) + _descendants(same)
+    assert refs == {node_id: all_refs[node_id] for node_id in expected}
+
+
+def test_merge_without_refs_still_merges():
+    root, sources = _scope_fixture()
+    expected = try_merge_from_diff_tree_with_refs(root, {})
+
+    merged, unresolved, refs = try_merge_from_diff_tree_with_refs(root, {}, sources, ref_node_ids=())
+
+    assert (merged, unresolved) == expected[:2]
+    assert refs == {}
+
+
+# --- policies ------------------------------------------------------------
+
+
+def _merge_with_policies(doc_a, doc_b, policies, selections=None, **kwargs):
+    root = build_stable_root_diff_tree(
+        per_doc_values={"A": (True, doc_a), "B": (True, doc_b)}, array_strategies_by_node_id={}, **kwargs
+    )
+    merged, unresolved, _ = try_merge_from_diff_tree_with_refs(root, selections or {}, policies=policies)
+    return root, merged, unresolved
+
+
+def test_merge_prefer_doc_policy_resolves_every_conflict():
+    _, merged, unresolved = _merge_with_policies(
+        {"a": 1, "b": {"c": "x"}, "t": 1}, {"a": 2, "b": {"c": "y"}, "t": "1"}, [PreferDocPolicy(doc_id="B")]
+    )
+
+    assert merged == {"a": 2, "b": {"c": "y"}, "t": "1"}
+    assert unresolved == []
+
+
+def test_merge_policy_path_prefix_stops_at_segment_boundaries():
+    policies = [PreferDocPolicy(doc_id="B", path_prefix="cfg")]
+    root, merged, unresolved = _merge_with_policies(
+        {"cfg": {"x": 1}, "cfgx": 1, "l": [{"cfg": 1}]}, {"cfg": {"x": 2}, "cfgx": 2, "l": [{"cfg": 2}]}, policies
+    )
+
+    assert merged == {"cfg": {"x": 2}, "l": [{}]}
+    cfgx = next(c for c in root.children if c.key == "cfgx")
+    assert cfgx.node_id in unresolved
+    assert len(unresolved) == 2
+
+
+def test_merge_policies_apply_in_order_and_fall_through():
+    # Doc "C" lacks every node, so the next policy applies.
+    policies = [PreferDocPolicy(doc_id="C"), NumericMaxPolicy(), PreferDocPolicy(doc_id="A")]
+    _, merged, unresolved = _merge_with_policies({"n": 3, "s": "a"}, {"n": 7.5, "s": "b"}, policies)
+
+    assert merged == {"n": 7.5, "s": "a"}
+    assert unresolved == []
+
+
+def test_merge_non_null_policy_resolves_null_type_errors():
+    policies = [NonNullPolicy()]
+    _, merged, unresolved = _merge_with_policies(
+        {"a": None, "b": {"k": 1}, "c": 1}, {"a": 1, "b": None, "c": True}, policies, null_mode=NullMode.value
+    )
+
+    assert merged == {"a": 1, "b": {"k": 1}}
+    # 1 and true are different JSON values: still a conflict.
+    assert len(unresolved) == 1
+
+
+def test_merge_numeric_max_ignores_nulls_and_skips_other_types():
+    policies = [NumericMaxPolicy()]
+    _, merged, unresolved = _merge_with_policies({"n": 3, "s": "a"}, {"n": -1, "s": "b"}, policies)
+
+    assert merged == {"n": 3}
+    assert len(unresolved) == 1
+
+
+def test_merge_selections_override_policies():
+    root = build_stable_root_diff_tree(
+        per_doc_values={"A": (True, {"a": 1, "b": 1}), "B": (True, {"a": 2, "b": 2})}, array_strategies_by_node_id={}
+    )
+    a = next(c for c in root.children if c.key == "a")
+
+    merged, unresolved, _ = try_merge_from_diff_tree_with_refs(
+        root, {a.node_id: DocMergeSelection(doc_id="A")}, policies=[NumericMaxPolicy()]
+    )
+
+    assert merged == {"a": 1, "b": 2}
+    assert unresolved == []
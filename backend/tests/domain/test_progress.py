@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+import pytest
+
+from diff_fuse.domain.diff import build_stable_root_diff_tree
+from diff_fuse.domain.progress import Progress, estimate_diff_nodes
+
+
+def _count(node) -> int:
+    return 1 + sum(_count(c) for c in node.children)
+
+
+def test_every_built_node_is_counted():
+    a = {"x": [1, 2, {"y": "z"}], "o": {"p": True}}
+    b = {"x": [1, 3], "o": {"q": None}}
+    progress = Progress(estimate_diff_nodes({"a": (True, a), "b": (True, b)}))
+
+    root = build_stable_root_diff_tree(
+        per_doc_values={"a": (True, a), "b": (True, b)}, array_strategies_by_node_id={}, progress=progress
+    )
+
+    assert progress.done == _count(root)
+    assert progress.estimated == 8
+    assert progress.total == max(8, progress.done)
+
+
+def test_observer_is_called_periodically_and_can_abort():
+    reports: list[int] = []
+
+    def report(p: Progress) -> None:
+        reports.append(p.done)
+        if p.done >= 30:
+            raise RuntimeError("stop")
+
+    doc = {f"k{i}": i for i in range(100)}
+    with pytest.raises(RuntimeError, match="stop"):
+        build_stable_root_diff_tree(
+            per_doc_values={"a": (True, doc)}, array_strategies_by_node_id={}, progress=Progress(101, report, every=10)
+        )
+
+    assert reports == [10, 20, 30]
+
+
+def test_estimate_ignores_absent_documents():
+    assert estimate_diff_nodes({"a": (False, None), "b": (True, [1, 2])}) == 3
+    assert estimate_diff_nodes({}) == 1
@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+import sys
+
+from diff_fuse.domain.normalize import parse_and_normalize_json
+from diff_fuse.domain.sizing import approx_document_bytes, approx_object_bytes
+
+
+def test_scalars_count_their_own_size():
+    assert approx_object_bytes(12345) == sys.getsizeof(12345)
+    assert approx_object_bytes("abc") == sys.getsizeof("abc")
+
+
+def test_containers_include_keys_and_children():
+    value = {"a": [1, 2], "b": "x"}
+    expected = (
+        sys.getsizeof(value)
+        + sys.getsizeof("a")
+        + sys.getsizeof("b")
+        + sys.getsizeof(value["a"])
+        + sys.getsizeof(1)
+        + sys.getsizeof(2)
+        + sys.getsizeof("x")
+    )
+    assert approx_object_bytes(value) == expected
+
+
+def test_deep_structures_do_not_recurse():
+    value: list = []
+    for _ in range(10_000):
+        value = [value]
+    assert approx_object_bytes(value) > 10_000
+
+
+def test_parsed_documents_cost_more_than_their_text():
+    raw = '{"items": [' + ",".join(f'{{"id": {i}, "tags": ["a", "b"]}}' for i in range(100)) + "]}"
+    size = approx_document_bytes(raw, parse_and_normalize_json(raw))
+
+    assert size > 2 * len(raw)
+    assert approx_document_bytes(raw, None) == sys.getsizeof(raw)
+    assert approx_document_bytes(None, None) == 0
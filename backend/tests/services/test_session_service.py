@@ -6,6 +6,7 @@ from diff_fuse.api.dto.session import AddDocsSessionRequest
 from diff_fuse.domain.errors import DomainValidationError, LimitsExceededError
 from diff_fuse.models.document import DocumentFormat, InputDocument
 from diff_fuse.services.session_service import (
+    add_docs_in_session,
     create_session,
 )
 
@@ -14,7 +15,8 @@ def _doc(doc_id: str, content: str, name: str = "doc") -> InputDocument:
     return InputDocument(doc_id=doc_id, name=name, format=DocumentFormat.json, content=content)
 
 
-def test_create_session_rejects_duplicate_doc_ids(monkeypatch):
+@pytest.mark.anyio
+async def test_create_session_rejects_duplicate_doc_ids(monkeypatch):
     req = AddDocsSessionRequest(
         documents=[
             _doc("same", '{"x":1}', name="a"),
@@ -22,7 +24,7 @@ def test_create_session_rejects_duplicate_doc_ids(monkeypatch):
         ]
     )
     with pytest.raises(DomainValidationError):
-        create_session(req)
+        await create_session(req)
 
 
 @pytest.mark.parametrize(
@@ -43,9 +45,15 @@ def test_create_session_rejects_duplicate_doc_ids(monkeypatch):
             lambda: [_doc("a", '{"x":12345}'), _doc("b", '{"y":12345}')],
             LimitsExceededError,
         ),
+        (
+            {"DIFF_FUSE_MAX_SESSION_BYTES": "200"},
+            lambda: [_doc("a", '{"x":[1,2,3,4,5,6,7,8,9,10]}')],
+            LimitsExceededError,
+        ),
     ],
 )
-def test_create_session_enforces_limits(monkeypatch, env, make_docs, exc):
+@pytest.mark.anyio
+async def test_create_session_enforces_limits(monkeypatch, env, make_docs, exc):
     for k, v in env.items():
         monkeypatch.setenv(k, v)
 
@@ -58,7 +66,37 @@ def test_create_session_enforces_limits(monkeypatch, env, make_docs, exc):
     import diff_fuse.deps as deps
 
     deps._repo = None  # type: ignore[attr-defined]
+    deps._async_repo = None  # type: ignore[attr-defined]
 
     req = AddDocsSessionRequest(documents=make_docs())
     with pytest.raises(exc):
-        create_session(req)
+        await create_session(req)
+
+
+@pytest.mark.anyio
+async def test_create_session_reuses_stored_documents():
+    first = await create_session(AddDocsSessionRequest(documents=[_doc("a", '{"x":1}')]))
+    second = await create_session(AddDocsSessionRequest(documents=[_doc("b", '{"x":1}'), _doc("c", '{"x":2}')]))
+
+    assert first.documents_meta[0].content_hash == second.documents_meta[0].content_hash
+    assert second.documents_meta[0].content_hash != second.documents_meta[1].content_hash
+
+    from diff_fuse.deps import get_session_repo
+
+    repo = get_session_repo()
+    a = repo.get(first.session_id).documents_results[0]
+    b = repo.get(second.session_id).documents_results[0]
+    assert b.doc_id == "b"
+    assert b.normalized is a.normalized
+
+
+@pytest.mark.anyio
+async def test_add_docs_parses_only_new_documents():
+    created = await create_session(AddDocsSessionRequest(documents=[_doc("a", '{"x":1}')]))
+    updated = await add_docs_in_session(
+        created.session_id,
+        AddDocsSessionRequest(documents=[_doc("b", '{"x":1}'), _doc("c", "{not json")]),
+    )
+
+    assert [m.doc_id for m in updated.documents_meta] == ["a", "b", "c"]
+    assert [m.ok for m in updated.documents_meta] == [True, True, False]
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import pytest
+
+from diff_fuse.domain.fingerprint import document_content_hash
+from diff_fuse.models.document import DocumentFormat, DocumentResult
+
+fakeredis = pytest.importorskip("fakeredis")
+pytest.importorskip("lupa")
+
+from diff_fuse.state.async_redis_session_repo import AsyncRedisSessionRepo  # noqa: E402
+from diff_fuse.state.redis_session_repo import RedisSessionRepo  # noqa: E402
+from diff_fuse.state.session_cache import SessionCache  # noqa: E402
+
+pytestmark = pytest.mark.anyio
+
+
+def _result(doc_id: str, content: str) -> DocumentResult:
+    return DocumentResult(
+        doc_id=doc_id,
+        name=doc_id,
+        format=DocumentFormat.json,
+        ok=True,
+        error=None,
+        content_hash=document_content_hash("json", content),
+        size_chars=len(content),
+        raw=content,
+        normalized={"content": content},
+    )
+
+
+@pytest.fixture
+def server():
+    return fakeredis.FakeServer()
+
+
+@pytest.fixture
+def repo(server):
+    return AsyncRedisSessionRepo(fakeredis.FakeAsyncRedis(server=server), ttl_seconds=60, cache=SessionCache(8))
+
+
+async def test_create_get_and_mutate(repo):
+    s = await repo.create(documents_results=[_result("a", '{"x":1}'), _result("b", '{"x":2}')])
+
+    def _fn(session):
+        session.documents_results = [dr for dr in session.documents_results if dr.doc_id != "a"]
+        session.documents_results.append(_result("c", '{"x":3}'))
+        return session
+
+    updated = await repo.mutate(s.session_id, _fn)
+    assert [dr.doc_id for dr in updated.documents_results] == ["b", "c"]
+
+    loaded = await repo.get(s.session_id)
+    assert [dr.doc_id for dr in loaded.documents_results] == ["b", "c"]
+    assert loaded.documents_results[1].normalized == {"content": '{"x":3}'}
+
+    meta = await repo.get_meta(s.session_id)
+    assert [m.doc_id for m in meta.documents_meta] == ["b", "c"]
+
+
+async def test_removed_documents_are_released(server, repo):
+    s = await repo.create(documents_results=[_result("a", '{"x":1}'), _result("b", '{"x":2}')])
+
+    def _drop_a(session):
+        session.documents_results = [dr for dr in session.documents_results if dr.doc_id != "a"]
+        return session
+
+    await repo.mutate(s.session_id, _drop_a)
+
+    assert await repo.find_document(document_content_hash("json", '{"x":1}')) is None
+    assert await repo.find_document(document_content_hash("json", '{"x":2}')) is not None
+
+
+async def test_missing_session(repo):
+    assert await repo.get("nope") is None
+    assert await repo.get_meta("nope") is None
+    assert await repo.mutate("nope", lambda s: s) is None
+
+
+async def test_sync_and_async_clients_share_sessions(server, repo):
+    sync_repo = RedisSessionRepo(fakeredis.FakeRedis(server=server), ttl_seconds=60)
+    s = sync_repo.create(documents_results=[_result("a", '{"x":1}')])
+
+    loaded = await repo.get(s.session_id)
+    assert [dr.doc_id for dr in loaded.documents_results] == ["a"]
+
+    def _add(session):
+        session.documents_results.append(_result("b", '{"x":2}'))
+        return session
+
+    await repo.mutate(s.session_id, _add)
+    assert [dr.doc_id for dr in sync_repo.get(s.session_id).documents_results] == ["a", "b"]
+    assert repo.stats()["cache_hits"] == 1
+
+
+async def test_append_and_remove_documents(repo):
+    s = await repo.create(documents_results=[_result("a", '{"x":1}')])
+
+    meta = await repo.append_documents(s.session_id, [_result("b", '{"x":2}')])
+    assert [m.doc_id for m in meta.documents_meta] == ["a", "b"]
+
+    meta = await repo.remove_document(s.session_id, "a")
+    assert [m.doc_id for m in meta.documents_meta] == ["b"]
+    assert [dr.doc_id for dr in (await repo.get(s.session_id)).documents_results] == ["b"]
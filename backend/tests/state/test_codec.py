@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import pytest
+
+from diff_fuse.models.document import DocumentFormat, StoredDocument
+from diff_fuse.state import codec
+
+
+def _doc(raw: str = '{"a": [1, 2, {"b": null}]}', normalized=None) -> StoredDocument:
+    return StoredDocument(
+        content_hash="sha256:x",
+        format=DocumentFormat.json,
+        ok=True,
+        error=None,
+        size_chars=len(raw),
+        approx_bytes=1234,
+        raw=raw,
+        normalized=normalized if normalized is not None else {"a": [1, 2, {"b": None}]},
+    )
+
+
+@pytest.mark.parametrize("compression", [codec.COMPRESSION_NONE, codec.COMPRESSION_ZLIB, codec.COMPRESSION_ZSTD])
+def test_roundtrip(compression):
+    if compression == codec.COMPRESSION_ZSTD:
+        pytest.importorskip("zstandard")
+
+    doc = _doc(raw="x" * 5000, normalized={"k": ["v" * 100] * 50, "f": 1.5, "u": "ü"})
+    payload = codec.encode_document(doc, compression=compression)
+
+    assert payload.startswith(codec.MAGIC)
+    assert codec.decode_document(payload) == doc
+
+
+def test_compression_shrinks_repetitive_documents():
+    doc = _doc(raw="[" + ",".join(['{"key": "value"}'] * 1000) + "]", normalized=[{"key": "value"}] * 1000)
+    assert len(codec.encode_document(doc)) < len(doc.model_dump_json()) / 10
+
+
+def test_small_payloads_are_not_compressed():
+    payload = codec.encode_document(_doc(), compression=codec.COMPRESSION_ZLIB)
+    assert payload[3] & 0x0F == codec.COMPRESSION_NONE
+
+
+def test_lone_surrogates_fall_back_to_stdlib_json():
+    doc = _doc(raw='"\ud800"', normalized="\ud800")
+    assert codec.decode_document(codec.encode_document(doc)) == doc
+
+
+def test_legacy_json_payloads_are_readable():
+    doc = _doc()
+    assert codec.decode_document(doc.model_dump_json().encode()) == doc
+
+
+def test_unknown_version_is_rejected():
+    payload = bytearray(codec.encode_document(_doc()))
+    payload[2] = 99
+    with pytest.raises(ValueError):
+        codec.decode_document(bytes(payload))
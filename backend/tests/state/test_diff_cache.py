@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import time
+
+from diff_fuse.services.diff_service import build_diff_root
+from diff_fuse.state.diff_cache import DiffCache
+
+DOCS = (("a", "sha256:1"), ("b", "sha256:2"))
+SOURCES = {"a": (True, {"x": 1}), "b": (True, {"x": 2})}
+
+
+def _root():
+    return build_diff_root(SOURCES, {})
+
+
+def test_hit_requires_the_same_documents():
+    cache = DiffCache(4, 60)
+    root = _root()
+    cache.put("d1", root, DOCS, SOURCES)
+
+    assert cache.get("d1", DOCS) is root
+    assert cache.get("d1", DOCS[:1]) is None
+    assert cache.get("d2", DOCS) is None
+    assert (cache.hits, cache.misses) == (1, 2)
+    # a document mismatch does not drop the entry
+    assert len(cache) == 1
+
+
+def test_entries_expire_after_the_ttl():
+    cache = DiffCache(4, 0.05)
+    cache.put("d1", _root(), DOCS, SOURCES)
+    time.sleep(0.06)
+
+    assert cache.get("d1", DOCS) is None
+    assert len(cache) == 0
+
+
+def test_least_recently_used_tree_is_evicted():
+    cache = DiffCache(2, 60)
+    for diff_id in ("d1", "d2"):
+        cache.put(diff_id, _root(), DOCS, SOURCES)
+    cache.get("d1", DOCS)
+    cache.put("d3", _root(), DOCS, SOURCES)
+
+    assert cache.get("d2", DOCS) is None
+    assert cache.get("d1", DOCS) is not None
+    assert cache.stats()["cached_diffs"] == 2
+
+
+def test_disabled_cache_keeps_nothing():
+    cache = DiffCache(0, 60)
+    cache.put("d1", _root(), DOCS, SOURCES)
+    assert cache.get("d1", DOCS) is None
+
+
+def test_lookup_returns_the_documents_kept_with_the_tree():
+    cache = DiffCache(4, 60)
+    root = _root()
+    cache.put("d1", root, DOCS, SOURCES)
+
+    assert cache.lookup("d1", DOCS) == (root, SOURCES)
+    assert cache.lookup("d1", DOCS[:1]) is None
+    assert (cache.hits, cache.misses) == (1, 1)
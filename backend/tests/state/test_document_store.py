@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import pytest
+
+from diff_fuse.domain.fingerprint import document_content_hash
+from diff_fuse.models.document import DocumentFormat, DocumentResult
+from diff_fuse.state.memory_document_store import MemoryDocumentStore
+from diff_fuse.state.memory_session_repo import MemorySessionRepo
+
+
+def _result(doc_id: str, content: str) -> DocumentResult:
+    return DocumentResult(
+        doc_id=doc_id,
+        name=doc_id,
+        format=DocumentFormat.json,
+        ok=True,
+        error=None,
+        content_hash=document_content_hash("json", content),
+        size_chars=len(content),
+        raw=content,
+        normalized={"content": content},
+    )
+
+
+def test_content_hash_depends_on_format_and_content():
+    assert document_content_hash("json", "{}") == document_content_hash("json", "{}")
+    assert document_content_hash("json", "{}") != document_content_hash("yaml", "{}")
+    assert document_content_hash("json", "{}") != document_content_hash("json", "[]")
+    # lone surrogates must not crash hashing
+    assert document_content_hash("json", "\ud800").startswith("sha256:")
+
+
+def test_identical_documents_are_stored_once_and_shared():
+    store = MemoryDocumentStore()
+    repo = MemorySessionRepo(ttl_seconds=60, document_store=store)
+
+    s1 = repo.create(documents_results=[_result("a", '{"x":1}'), _result("b", '{"x":2}')])
+    s2 = repo.create(documents_results=[_result("c", '{"x":1}')])
+
+    assert len(store) == 2
+    assert s2.documents_results[0].normalized is s1.documents_results[0].normalized
+    assert s2.documents_results[0].doc_id == "c"
+
+
+def test_documents_are_released_with_their_last_reference():
+    store = MemoryDocumentStore()
+    repo = MemorySessionRepo(ttl_seconds=60, document_store=store)
+    shared = _result("a", '{"x":1}')
+
+    s1 = repo.create(documents_results=[shared, _result("b", '{"x":2}')])
+    s2 = repo.create(documents_results=[_result("c", '{"x":1}')])
+
+    def _drop_b(s):
+        s.documents_results = [dr for dr in s.documents_results if dr.doc_id != "b"]
+        return s
+
+    repo.mutate(s1.session_id, _drop_b)
+    assert len(store) == 1
+
+    repo._ttl = repo._ttl * 0  # expire everything
+    assert repo.cleanup() == 2
+    assert len(store) == 0
+    assert repo.get(s2.session_id) is None
+    assert repo.find_document(shared.content_hash) is None
+
+
+def test_save_accounts_for_added_and_removed_documents():
+    store = MemoryDocumentStore()
+    repo = MemorySessionRepo(ttl_seconds=60, document_store=store)
+
+    s = repo.create(documents_results=[_result("a", '{"x":1}')])
+    s.documents_results = [_result("b", '{"x":2}')]
+    repo.save(s)
+
+    assert repo.find_document(document_content_hash("json", '{"x":1}')) is None
+    assert repo.find_document(document_content_hash("json", '{"x":2}')) is not None
+
+
+def test_redis_store_shares_documents_and_refcounts():
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")
+
+    from diff_fuse.state.redis_document_store import RedisDocumentStore
+    from diff_fuse.state.redis_session_repo import RedisSessionRepo
+
+    r = fakeredis.FakeRedis()
+    repo = RedisSessionRepo(r, ttl_seconds=60, document_store=RedisDocumentStore(r, ttl_seconds=60))
+
+    s1 = repo.create(documents_results=[_result("a", '{"x":1}'), _result("b", '{"x":2}')])
+    s2 = repo.create(documents_results=[_result("c", '{"x":1}')])
+    assert len(r.keys("diff-fuse:doc:*")) == 2
+
+    # the session hash only holds references
+    assert all(b'"raw"' not in v for v in r.hgetall(f"diff-fuse:session:{s2.session_id}").values())
+
+    loaded = repo.get(s2.session_id)
+    assert loaded is not None
+    assert loaded.documents_results[0].doc_id == "c"
+    assert loaded.documents_results[0].normalized == {"content": '{"x":1}'}
+
+    def _drop_b(s):
+        s.documents_results = [dr for dr in s.documents_results if dr.doc_id != "b"]
+        return s
+
+    repo.mutate(s1.session_id, _drop_b)
+    assert len(r.keys("diff-fuse:doc:*")) == 1
+    assert int(r.hget(f"diff-fuse:doc:{s2.documents_results[0].content_hash}", "refs")) == 2
+
+
+def test_idle_documents_are_demoted_and_inflated_on_read():
+    store = MemoryDocumentStore()
+    repo = MemorySessionRepo(ttl_seconds=60, document_store=store, demote_after_seconds=30)
+    s = repo.create(documents_results=[_result("a", '{"x":1}'), _result("b", '{"x":2}')])
+    idle = s.documents_results[0].content_hash
+    store._last_used[idle] -= 60
+
+    assert repo.demote_idle() == 1
+    assert isinstance(store._docs[idle], bytes)
+    assert repo.stats()["cold_documents"] == 1
+
+    loaded = repo.get(s.session_id)
+    assert [dr.normalized for dr in loaded.documents_results] == [d.normalized for d in s.documents_results]
+    stats = repo.stats()
+    assert (stats["hot_documents"], stats["cold_documents"], stats["inflations"]) == (2, 0, 1)
+
+
+def test_raw_only_documents_are_never_demoted():
+    store = MemoryDocumentStore(policy="raw_only")
+    store.acquire(_result("a", '{"x":1}').to_stored())
+    for h in store._last_used:
+        store._last_used[h] -= 10_000
+
+    assert store.demote_idle(1) == 0
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import threading
+
+import pytest
+
+from diff_fuse.domain.errors import JobQueueFullError
+from diff_fuse.state.job_pool import JobPool
+
+
+@pytest.fixture
+def pool():
+    p = JobPool(workers=1, max_pending=2)
+    yield p
+    p.shutdown()
+
+
+def _blocking_job(started: threading.Event, release: threading.Event):
+    def run(cancelled: threading.Event) -> None:
+        started.set()
+        release.wait(5)
+
+    return run
+
+
+def test_pool_refuses_jobs_beyond_its_bound(pool):
+    started, release = threading.Event(), threading.Event()
+    pool.submit("a", _blocking_job(started, release))
+    pool.submit("b", lambda cancelled: None)
+    assert started.wait(5)
+
+    with pytest.raises(JobQueueFullError):
+        pool.submit("c", lambda cancelled: None)
+    assert pool.stats() == {"jobs_running": 1, "jobs_queued": 1}
+
+    release.set()
+
+
+def test_queued_jobs_are_dropped_and_running_jobs_signalled(pool):
+    started, release = threading.Event(), threading.Event()
+    seen: list[threading.Event] = []
+
+    def running(cancelled: threading.Event) -> None:
+        seen.append(cancelled)
+        started.set()
+        release.wait(5)
+
+    ran = []
+    pool.submit("a", running)
+    pool.submit("b", lambda cancelled: ran.append("b"))
+    assert started.wait(5)
+
+    assert pool.cancel("b") is True
+    assert pool.cancel("a") is False
+    assert seen[0].is_set()
+    assert pool.cancel("unknown") is False
+
+    release.set()
+    pool.shutdown()
+    assert ran == []
+
+
+def test_queued_jobs_are_reported_when_dropped(pool):
+    started, release = threading.Event(), threading.Event()
+    ran = []
+    pool.submit("a", _blocking_job(started, release))
+    pool.submit("b", lambda cancelled: ran.append("b"))
+    assert started.wait(5)
+
+    assert pool.drop_queued() == ["b"]
+    assert pool.stats() == {"jobs_running": 1, "jobs_queued": 0}
+
+    release.set()
+    pool.shutdown()
+    assert ran == []
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+from datetime import UTC, datetime
+
+import pytest
+
+from diff_fuse.models.job import Job, JobKind, JobStatus
+from diff_fuse.state.memory_job_store import MemoryJobStore
+from diff_fuse.state.sqlite_database import SqliteDatabase
+from diff_fuse.state.sqlite_job_store import SqliteJobStore
+
+
+def _job(job_id: str = "j1", **changes) -> Job:
+    now = datetime.now(UTC)
+    return Job(job_id=job_id, session_id="s1", kind=JobKind.diff, created_at=now, updated_at=now, **changes)
+
+
+@pytest.fixture(params=["memory", "sqlite", "redis"])
+def stores(request, tmp_path):
+    """Two handles on one job store, as two worker processes would hold."""
+    if request.param == "memory":
+        store = MemoryJobStore(ttl_seconds=60)
+        yield store, store
+    elif request.param == "sqlite":
+        path = tmp_path / "jobs.sqlite3"
+        first, second = SqliteDatabase(path), SqliteDatabase(path)
+        yield SqliteJobStore(first, ttl_seconds=60), SqliteJobStore(second, ttl_seconds=60)
+        first.close()
+        second.close()
+    else:
+        fakeredis = pytest.importorskip("fakeredis")
+        pytest.importorskip("lupa")
+        from diff_fuse.state.redis_job_store import RedisJobStore
+
+        server = fakeredis.FakeServer()
+        yield (
+            RedisJobStore(fakeredis.FakeRedis(server=server), ttl_seconds=60),
+            RedisJobStore(fakeredis.FakeRedis(server=server), ttl_seconds=60),
+        )
+
+
+def test_saved_jobs_are_visible_to_every_handle(stores):
+    writer, reader = stores
+
+    assert writer.save(_job(nodes_processed=10)) is False
+
+    job = reader.get("j1")
+    assert job is not None
+    assert job.nodes_processed == 10
+    assert job.cancel_requested is False
+    assert reader.get("missing") is None
+
+
+def test_cancellation_is_reported_to_the_running_job(stores):
+    runner, api = stores
+    job = _job(status=JobStatus.running)
+    runner.save(job)
+
+    cancelled = api.request_cancel("j1")
+    assert cancelled is not None and cancelled.cancel_requested
+
+    # A progress write must neither lose the flag nor miss it.
+    job.nodes_processed = 500
+    assert runner.save(job) is True
+    assert api.get("j1").cancel_requested
+    assert api.get("j1").nodes_processed == 500
+
+
+def test_cancelling_an_unknown_job_creates_nothing(stores):
+    _, api = stores
+
+    assert api.request_cancel("missing") is None
+    assert api.get("missing") is None
+
+
+def test_results_are_kept_across_later_saves(stores):
+    runner, api = stores
+    job = _job(status=JobStatus.succeeded)
+
+    runner.save(job, result=b'{"ok":true}')
+    runner.save(job)
+
+    assert api.get_result("j1") == b'{"ok":true}'
+    assert api.get_result("missing") is None
+
+
+def test_memory_jobs_expire():
+    store = MemoryJobStore(ttl_seconds=0)
+    store.save(_job(), result=b"{}")
+
+    assert store.get("j1") is None
+    assert store.get_result("j1") is None
+    assert len(store) == 0
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import threading
+import time
+
+from diff_fuse.state.locks import KeyedRWLock, RWLock
+
+
+def test_readers_share_the_lock():
+    lock = RWLock()
+    inside = threading.Barrier(2, timeout=2)
+
+    def reader():
+        with lock.read():
+            inside.wait()  # both readers must be inside at once
+
+    threads = [threading.Thread(target=reader) for _ in range(2)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(timeout=2)
+    assert not inside.broken
+
+
+def test_writer_excludes_readers_and_is_not_starved():
+    lock = RWLock()
+    events: list[str] = []
+
+    lock.acquire_read()
+    writer = threading.Thread(target=lambda: (lock.acquire_write(), events.append("write"), lock.release_write()))
+    writer.start()
+    time.sleep(0.05)
+
+    # A waiting writer blocks new readers.
+    reader = threading.Thread(target=lambda: (lock.acquire_read(), events.append("read"), lock.release_read()))
+    reader.start()
+    time.sleep(0.05)
+    assert events == []
+
+    lock.release_read()
+    writer.join(timeout=2)
+    reader.join(timeout=2)
+    assert events == ["write", "read"]
+
+
+def test_keyed_locks_are_independent_and_discarded_when_unused():
+    locks = KeyedRWLock(stripes=1)
+    acquired = threading.Event()
+
+    with locks.write("a"):
+
+        def other():
+            with locks.write("b"):
+                acquired.set()
+
+        t = threading.Thread(target=other)
+        t.start()
+        assert acquired.wait(timeout=2)
+        t.join(timeout=2)
+        assert len(locks) == 1
+
+    assert len(locks) == 0
@@ -0,0 +1,211 @@
+from __future__ import annotations
+
+import threading
+import time
+from datetime import UTC, datetime, timedelta
+
+import pytest
+
+from diff_fuse.domain.errors import LimitsExceededError
+from diff_fuse.domain.fingerprint import document_content_hash
+from diff_fuse.models.document import DocumentFormat, DocumentResult
+from diff_fuse.state.memory_document_store import MemoryDocumentStore
+from diff_fuse.state.memory_session_repo import MemorySessionRepo
+from diff_fuse.state.session_repo import SessionLimits
+
+
+def _result(doc_id: str, content: str) -> DocumentResult:
+    return DocumentResult(
+        doc_id=doc_id,
+        name=doc_id,
+        format=DocumentFormat.json,
+        ok=True,
+        error=None,
+        content_hash=document_content_hash("json", content),
+        size_chars=len(content),
+        raw=content,
+        normalized={"content": content},
+    )
+
+
+def _age(repo: MemorySessionRepo, session_id: str, seconds: int) -> None:
+    """Pretend a session was last used ``seconds`` ago (heap deadline included)."""
+    past = timedelta(seconds=seconds)
+    repo._sessions[session_id].updated_at -= past
+    repo._expiry_heap = [
+        (deadline - past if sid == session_id else deadline, sid) for deadline, sid in repo._expiry_heap
+    ]
+
+
+def test_sweep_removes_expired_sessions_and_releases_documents():
+    store = MemoryDocumentStore()
+    repo = MemorySessionRepo(ttl_seconds=60, document_store=store)
+
+    old = repo.create(documents_results=[_result("a", '{"x":1}')])
+    fresh = repo.create(documents_results=[_result("b", '{"x":2}')])
+    _age(repo, old.session_id, 120)
+
+    assert repo.sweep() == 1
+    assert repo.get(old.session_id) is None
+    assert repo.get(fresh.session_id) is not None
+    assert len(store) == 1
+    assert repo.stats()["expirations"] == 1
+
+
+def test_sweep_reschedules_sessions_used_since_they_were_queued():
+    repo = MemorySessionRepo(ttl_seconds=60)
+    s = repo.create(documents_results=[_result("a", "{}")])
+
+    # Due in the heap, but the session itself was used recently.
+    repo._expiry_heap = [(datetime.now(UTC) - timedelta(seconds=1), s.session_id)]
+
+    assert repo.sweep() == 0
+    assert repo.get(s.session_id) is not None
+    assert repo._expiry_heap[0][0] > datetime.now(UTC)
+
+
+def test_lru_eviction_by_session_count():
+    store = MemoryDocumentStore()
+    repo = MemorySessionRepo(ttl_seconds=60, document_store=store, max_sessions=2)
+
+    s1 = repo.create(documents_results=[_result("a", '{"x":1}')])
+    s2 = repo.create(documents_results=[_result("b", '{"x":2}')])
+    repo.get(s1.session_id)  # s2 becomes least recently used
+    s3 = repo.create(documents_results=[_result("c", '{"x":3}')])
+
+    assert repo.get(s2.session_id) is None
+    assert repo.get(s1.session_id) is not None
+    assert repo.get(s3.session_id) is not None
+    assert len(store) == 2
+    assert repo.stats()["evictions"] == 1
+
+
+def test_lru_eviction_by_size_makes_room_for_the_session_just_written():
+    repo = MemorySessionRepo(ttl_seconds=60, max_bytes=20)
+
+    s1 = repo.create(documents_results=[_result("a", '{"x":1}')])
+    s2 = repo.create(documents_results=[_result("b", '{"x":2}')])
+    assert repo.stats().items() >= {"sessions": 2, "approx_bytes": 14, "evictions": 0, "expirations": 0}.items()
+
+    big = repo.create(documents_results=[_result("c", '{"x":"' + "y" * 10 + '"}')])
+
+    assert repo.get(s1.session_id) is None
+    assert repo.get(s2.session_id) is None
+    assert repo.get(big.session_id) is not None
+    assert repo.stats()["evictions"] == 2
+
+
+def test_sessions_larger_than_the_budget_are_rejected():
+    repo = MemorySessionRepo(ttl_seconds=60, max_bytes=1000)
+    small = repo.create(documents_results=[_result("a", '{"x":1}')])
+
+    huge = _result("b", '{"x":2}').model_copy(update={"approx_bytes": 5000})
+    with pytest.raises(LimitsExceededError):
+        repo.create(documents_results=[huge])
+    with pytest.raises(LimitsExceededError):
+        repo.append_documents(small.session_id, [huge])
+
+    assert [m.doc_id for m in repo.get_meta(small.session_id).documents_meta] == ["a"]
+    assert repo.stats()["sessions"] == 1
+    assert repo.stats()["evictions"] == 0
+
+
+def test_concurrent_appends_respect_the_session_limits():
+    repo = MemorySessionRepo(ttl_seconds=60)
+    s = repo.create(documents_results=[_result("a", '{"x":1}')])
+    limits = SessionLimits(max_documents=5, max_total_chars=1000)
+    rejected = []
+
+    def _append(i):
+        try:
+            repo.append_documents(s.session_id, [_result(f"d{i}", f'{{"i":{i}}}')], limits)
+        except LimitsExceededError:
+            rejected.append(i)
+
+    threads = [threading.Thread(target=_append, args=(i,)) for i in range(20)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(timeout=5)
+
+    assert len(repo.get_meta(s.session_id).documents_meta) == 5
+    assert len(rejected) == 16
+
+
+def test_size_accounting_prefers_the_in_memory_estimate():
+    repo = MemorySessionRepo(ttl_seconds=60)
+    repo.create(documents_results=[_result("a", '{"x":1}').model_copy(update={"approx_bytes": 321})])
+
+    assert repo.stats()["approx_bytes"] == 321
+
+
+def test_mutate_updates_the_size_accounting():
+    repo = MemorySessionRepo(ttl_seconds=60)
+    s = repo.create(documents_results=[_result("a", '{"x":1}')])
+
+    def _add(session):
+        session.documents_results.append(_result("b", '{"x":22}'))
+        return session
+
+    repo.mutate(s.session_id, _add)
+    assert repo.stats()["approx_bytes"] == 7 + 8
+
+
+def test_background_sweeper_expires_sessions():
+    repo = MemorySessionRepo(ttl_seconds=60)
+    s = repo.create(documents_results=[_result("a", "{}")])
+    _age(repo, s.session_id, 120)
+
+    repo.start_sweeper(0.05)
+    try:
+        deadline = time.monotonic() + 2
+        while repo.stats()["sessions"] and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        repo.stop_sweeper()
+
+    assert repo.stats()["sessions"] == 0
+
+
+def test_slow_mutation_blocks_only_its_own_session():
+    repo = MemorySessionRepo(ttl_seconds=60)
+    busy = repo.create(documents_results=[_result("a", '{"x":1}')])
+    other = repo.create(documents_results=[_result("b", '{"x":2}')])
+
+    started = threading.Event()
+    release = threading.Event()
+
+    def _slow(session):
+        started.set()
+        release.wait(timeout=5)
+        return session
+
+    t = threading.Thread(target=repo.mutate, args=(busy.session_id, _slow))
+    t.start()
+    try:
+        assert started.wait(timeout=2)
+        assert repo.get(other.session_id) is not None
+        assert repo.get_meta(busy.session_id) is not None
+    finally:
+        release.set()
+        t.join(timeout=5)
+
+
+def test_concurrent_mutations_of_one_session_are_serialized():
+    repo = MemorySessionRepo(ttl_seconds=60)
+    s = repo.create(documents_results=[])
+
+    def _append(i):
+        def fn(session):
+            session.documents_results.append(_result(f"d{i}", f'{{"i":{i}}}'))
+            return session
+
+        repo.mutate(s.session_id, fn)
+
+    threads = [threading.Thread(target=_append, args=(i,)) for i in range(20)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(timeout=5)
+
+    assert len(repo.get(s.session_id).documents_results) == 20
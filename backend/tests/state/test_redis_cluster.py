@@ -0,0 +1,108 @@
+"""Integration tests against a real Redis Cluster (``DIFF_FUSE_TEST_REDIS_CLUSTER_URL``)."""
+
+from __future__ import annotations
+
+import os
+
+import pytest
+from redis.asyncio import RedisCluster as AsyncRedisCluster
+from redis.cluster import RedisCluster
+from redis.crc import key_slot
+
+from diff_fuse.domain.fingerprint import document_content_hash
+from diff_fuse.models.document import DocumentFormat, DocumentResult
+from diff_fuse.state.async_redis_document_store import AsyncRedisDocumentStore
+from diff_fuse.state.async_redis_session_repo import AsyncRedisSessionRepo
+from diff_fuse.state.redis_document_store import RedisDocumentStore
+from diff_fuse.state.redis_session_repo import RedisSessionRepo
+from diff_fuse.state.session_cache import SessionCache
+
+CLUSTER_URL = os.environ.get("DIFF_FUSE_TEST_REDIS_CLUSTER_URL")
+
+pytestmark = pytest.mark.skipif(not CLUSTER_URL, reason="DIFF_FUSE_TEST_REDIS_CLUSTER_URL is not set")
+
+PREFIX = "diff-fuse-test:session:"
+DOC_PREFIX = "diff-fuse-test:doc:"
+
+
+def _result(doc_id: str, content: str) -> DocumentResult:
+    return DocumentResult(
+        doc_id=doc_id,
+        name=doc_id,
+        format=DocumentFormat.json,
+        ok=True,
+        error=None,
+        content_hash=document_content_hash("json", content),
+        size_chars=len(content),
+        raw=content,
+        normalized={"content": content},
+    )
+
+
+@pytest.fixture
+def cluster():
+    client = RedisCluster.from_url(CLUSTER_URL)
+    yield client
+    client.close()
+
+
+@pytest.fixture
+def repo(cluster):
+    return RedisSessionRepo(
+        cluster,
+        ttl_seconds=60,
+        key_prefix=PREFIX,
+        hash_tag=True,
+        document_store=RedisDocumentStore(cluster, ttl_seconds=60, key_prefix=DOC_PREFIX),
+        cache=SessionCache(8),
+    )
+
+
+def test_cluster_has_several_primaries(cluster):
+    assert len(cluster.get_primaries()) > 1
+
+
+def test_session_lifecycle_on_a_cluster(cluster, repo):
+    docs = [_result(f"d{i}", f'{{"i":{i}}}') for i in range(8)]
+    s = repo.create(documents_results=docs[:4])
+
+    repo.append_documents(s.session_id, docs[4:])
+    repo.mutate(s.session_id, lambda session: session)
+    repo.remove_document(s.session_id, "d0")
+
+    loaded = repo.get(s.session_id)
+    assert [dr.doc_id for dr in loaded.documents_results] == [f"d{i}" for i in range(1, 8)]
+    assert cluster.hget(f"{PREFIX}{{{s.session_id}}}", "version") == b"4"
+
+
+def test_documents_on_several_nodes_are_read_together(cluster, repo):
+    docs = [_result(f"d{i}", f'{{"n":{i}}}') for i in range(16)]
+    repo.create(documents_results=docs)
+
+    slots = {key_slot(f"{DOC_PREFIX}{dr.content_hash}".encode()) for dr in docs}
+    nodes = {cluster.nodes_manager.get_node_from_slot(slot).name for slot in slots}
+    assert len(nodes) > 1
+
+    found = repo.find_documents([dr.content_hash for dr in docs])
+    assert [d.content_hash for d in found] == [dr.content_hash for dr in docs]
+
+
+@pytest.mark.anyio
+async def test_async_repo_on_a_cluster(cluster, repo):
+    client = AsyncRedisCluster.from_url(CLUSTER_URL)
+    try:
+        async_repo = AsyncRedisSessionRepo(
+            client,
+            ttl_seconds=60,
+            key_prefix=PREFIX,
+            hash_tag=True,
+            document_store=AsyncRedisDocumentStore(client, ttl_seconds=60, key_prefix=DOC_PREFIX),
+        )
+        s = await async_repo.create(documents_results=[_result("a", '{"x":1}')])
+        await async_repo.append_documents(s.session_id, [_result("b", '{"x":2}')])
+        await async_repo.mutate(s.session_id, lambda session: session)
+
+        # both clients share the same hash-tagged keys
+        assert [dr.doc_id for dr in repo.get(s.session_id).documents_results] == ["a", "b"]
+    finally:
+        await client.aclose()
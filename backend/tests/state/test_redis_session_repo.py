@@ -0,0 +1,269 @@
+from __future__ import annotations
+
+import threading
+
+import pytest
+from redis.crc import key_slot
+
+from diff_fuse.domain.errors import DomainValidationError, LimitsExceededError
+from diff_fuse.domain.fingerprint import document_content_hash
+from diff_fuse.models.document import DocumentFormat, DocumentResult
+
+fakeredis = pytest.importorskip("fakeredis")
+pytest.importorskip("lupa")
+
+from diff_fuse.state.redis_session_fields import session_key  # noqa: E402
+from diff_fuse.state.redis_session_repo import RedisSessionRepo  # noqa: E402
+from diff_fuse.state.session_cache import SessionCache  # noqa: E402
+from diff_fuse.state.session_repo import SessionLimits  # noqa: E402
+
+
+def _result(doc_id: str, content: str) -> DocumentResult:
+    return DocumentResult(
+        doc_id=doc_id,
+        name=doc_id,
+        format=DocumentFormat.json,
+        ok=True,
+        error=None,
+        content_hash=document_content_hash("json", content),
+        size_chars=len(content),
+        raw=content,
+        normalized={"content": content},
+    )
+
+
+@pytest.fixture
+def redis():
+    return fakeredis.FakeRedis()
+
+
+@pytest.fixture
+def repo(redis):
+    return RedisSessionRepo(redis, ttl_seconds=60)
+
+
+def test_session_is_a_hash_with_one_field_per_document(redis, repo):
+    s = repo.create(documents_results=[_result("a", '{"x":1}'), _result("b", '{"x":2}')])
+
+    fields = redis.hgetall(f"diff-fuse:session:{s.session_id}")
+    assert {b"session_id", b"created_at", b"updated_at", b"doc_order", b"doc:a", b"doc:b", b"version"} == set(fields)
+
+
+def test_get_slides_ttl_without_rewriting(redis, repo):
+    s = repo.create(documents_results=[_result("a", '{"x":1}')])
+    key = f"diff-fuse:session:{s.session_id}"
+    redis.expire(key, 5)
+    before = redis.hgetall(key)
+
+    loaded = repo.get(s.session_id)
+
+    assert loaded is not None
+    assert [dr.doc_id for dr in loaded.documents_results] == ["a"]
+    assert redis.ttl(key) > 5
+    assert redis.hgetall(key) == before
+
+
+def test_get_meta_does_not_need_document_payloads(redis, repo):
+    s = repo.create(documents_results=[_result("a", '{"x":1}'), _result("b", "[1]")])
+    redis.delete(*redis.keys("diff-fuse:doc:*"))
+
+    meta = repo.get_meta(s.session_id)
+
+    assert meta is not None
+    assert [m.doc_id for m in meta.documents_meta] == ["a", "b"]
+    assert meta.documents_meta[1].size_chars == 3
+    # a full read notices the missing payloads
+    assert repo.get(s.session_id) is None
+
+
+def test_mutate_preserves_order_and_removes_fields(redis, repo):
+    s = repo.create(documents_results=[_result("a", '{"x":1}'), _result("b", '{"x":2}')])
+
+    def _fn(session):
+        session.documents_results = [dr for dr in session.documents_results if dr.doc_id != "a"]
+        session.documents_results.append(_result("c", '{"x":3}'))
+        return session
+
+    updated = repo.mutate(s.session_id, _fn)
+
+    assert [dr.doc_id for dr in updated.documents_results] == ["b", "c"]
+    assert b"doc:a" not in redis.hgetall(f"diff-fuse:session:{s.session_id}")
+    assert [dr.doc_id for dr in repo.get(s.session_id).documents_results] == ["b", "c"]
+
+
+def test_missing_session(repo):
+    assert repo.get("nope") is None
+    assert repo.get_meta("nope") is None
+    assert repo.mutate("nope", lambda s: s) is None
+
+
+def test_every_write_bumps_the_version(redis, repo):
+    s = repo.create(documents_results=[_result("a", '{"x":1}')])
+    key = f"diff-fuse:session:{s.session_id}"
+    assert redis.hget(key, "version") == b"1"
+
+    repo.mutate(s.session_id, lambda session: session)
+    repo.save(repo.get(s.session_id))
+    assert redis.hget(key, "version") == b"3"
+
+
+def test_cache_serves_unchanged_sessions_and_sees_other_workers_writes(redis):
+    worker_a = RedisSessionRepo(redis, ttl_seconds=60, cache=SessionCache(8))
+    worker_b = RedisSessionRepo(redis, ttl_seconds=60, cache=SessionCache(8))
+
+    s = worker_a.create(documents_results=[_result("a", '{"x":1}')])
+    assert worker_a.get(s.session_id) is not None
+    assert worker_a._cache.hits == 1
+
+    def _add(session):
+        session.documents_results.append(_result("b", '{"x":2}'))
+        return session
+
+    worker_b.mutate(s.session_id, _add)
+
+    seen = worker_a.get(s.session_id)
+    assert [dr.doc_id for dr in seen.documents_results] == ["a", "b"]
+    assert worker_a._cache.misses == 1
+
+
+def test_cached_sessions_are_copies(redis):
+    repo = RedisSessionRepo(redis, ttl_seconds=60, cache=SessionCache(8))
+    s = repo.create(documents_results=[_result("a", '{"x":1}')])
+
+    repo.get(s.session_id).documents_results.clear()
+
+    assert len(repo.get(s.session_id).documents_results) == 1
+
+
+def test_cache_forgets_expired_sessions(redis):
+    repo = RedisSessionRepo(redis, ttl_seconds=60, cache=SessionCache(8))
+    s = repo.create(documents_results=[_result("a", '{"x":1}')])
+    redis.delete(f"diff-fuse:session:{s.session_id}")
+
+    assert repo.get(s.session_id) is None
+    assert len(repo._cache) == 0
+
+
+def test_append_and_remove_documents_run_server_side(redis):
+    repo = RedisSessionRepo(redis, ttl_seconds=60, cache=SessionCache(8))
+    s = repo.create(documents_results=[_result("a", '{"x":1}')])
+
+    meta = repo.append_documents(s.session_id, [_result("b", '{"x":2}'), _result("c", '{"x":3}')])
+    assert [m.doc_id for m in meta.documents_meta] == ["a", "b", "c"]
+    assert redis.hget(f"diff-fuse:session:{s.session_id}", "version") == b"2"
+
+    meta = repo.remove_document(s.session_id, "a")
+    assert [m.doc_id for m in meta.documents_meta] == ["b", "c"]
+    assert repo.find_document(document_content_hash("json", '{"x":1}')) is None
+
+    # the cached copy followed both edits without a reload
+    loaded = repo.get(s.session_id)
+    assert [dr.doc_id for dr in loaded.documents_results] == ["b", "c"]
+    assert repo._cache.hits == 1
+
+
+def test_script_edits_validate_like_mutations(redis, repo):
+    s = repo.create(documents_results=[_result("a", '{"x":1}')])
+
+    with pytest.raises(DomainValidationError):
+        repo.append_documents(s.session_id, [_result("a", '{"x":2}')])
+    with pytest.raises(DomainValidationError):
+        repo.remove_document(s.session_id, "zzz")
+    with pytest.raises(DomainValidationError):
+        repo.remove_document(s.session_id, "a")
+
+    # rejected appends do not leak document references
+    assert repo.find_document(document_content_hash("json", '{"x":2}')) is None
+    assert repo.append_documents("nope", [_result("b", "{}")]) is None
+    assert repo.remove_document("nope", "a") is None
+
+
+def test_concurrent_appends_never_conflict(redis, repo):
+    s = repo.create(documents_results=[_result("a", '{"x":1}')])
+
+    def _append(i):
+        repo.append_documents(s.session_id, [_result(f"d{i}", f'{{"i":{i}}}')])
+
+    threads = [threading.Thread(target=_append, args=(i,)) for i in range(20)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(timeout=5)
+
+    assert len(repo.get_meta(s.session_id).documents_meta) == 21
+
+
+def test_script_enforces_the_session_limits(redis, repo):
+    s = repo.create(documents_results=[_result("a", '{"x":1}').model_copy(update={"approx_bytes": 100})])
+    b = _result("b", '{"x":2}').model_copy(update={"approx_bytes": 100})
+
+    for limits, details in [
+        (SessionLimits(1, 1000), {"count": 2, "max_documents_per_session": 1}),
+        (SessionLimits(2, 10), {"total_chars": 14, "max_total_chars_per_session": 10}),
+        (SessionLimits(2, 1000, max_bytes=150), {"approx_bytes": 200, "max_session_bytes": 150}),
+    ]:
+        with pytest.raises(LimitsExceededError) as exc:
+            repo.append_documents(s.session_id, [b], limits)
+        assert exc.value.details == details
+
+    # rejected appends write nothing and do not leak document references
+    assert [m.doc_id for m in repo.get_meta(s.session_id).documents_meta] == ["a"]
+    assert repo.find_document(b.content_hash) is None
+    # limits are inclusive
+    meta = repo.append_documents(s.session_id, [b], SessionLimits(2, 14, 200))
+    assert [m.doc_id for m in meta.documents_meta] == ["a", "b"]
+
+
+def test_concurrent_appends_respect_the_session_limits(redis, repo):
+    s = repo.create(documents_results=[_result("a", '{"x":1}')])
+    limits = SessionLimits(max_documents=5, max_total_chars=1000)
+    rejected = []
+
+    def _append(i):
+        try:
+            repo.append_documents(s.session_id, [_result(f"d{i}", f'{{"i":{i}}}')], limits)
+        except LimitsExceededError:
+            rejected.append(i)
+
+    threads = [threading.Thread(target=_append, args=(i,)) for i in range(20)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(timeout=5)
+
+    assert len(repo.get_meta(s.session_id).documents_meta) == 5
+    assert len(rejected) == 16
+
+
+def test_hash_tagged_keys_keep_a_session_in_one_slot(redis):
+    repo = RedisSessionRepo(redis, ttl_seconds=60, hash_tag=True)
+    s = repo.create(documents_results=[_result("a", '{"x":1}')])
+    key = f"diff-fuse:session:{{{s.session_id}}}"
+
+    assert redis.exists(key)
+    assert key_slot(key.encode()) == key_slot(session_key("other:", s.session_id, hash_tag=True, suffix=":x").encode())
+
+    repo.append_documents(s.session_id, [_result("b", '{"x":2}')])
+    repo.mutate(s.session_id, lambda session: session)
+    repo.remove_document(s.session_id, "a")
+    assert [dr.doc_id for dr in repo.get(s.session_id).documents_results] == ["b"]
+    assert redis.hget(key, "version") == b"4"
+
+
+def test_find_documents_reads_in_one_pipeline(redis, repo, monkeypatch):
+    repo.create(documents_results=[_result("a", '{"x":1}'), _result("b", '{"x":2}')])
+    executed = []
+    original = redis.pipeline
+
+    def _pipeline(*args, **kwargs):
+        pipe = original(*args, **kwargs)
+        executed.append(pipe)
+        return pipe
+
+    monkeypatch.setattr(redis, "pipeline", _pipeline)
+    hashes = [document_content_hash("json", c) for c in ('{"x":2}', "{}", '{"x":1}')]
+
+    found = repo.find_documents(hashes)
+
+    assert [d.content_hash if d is not None else None for d in found] == [hashes[0], None, hashes[2]]
+    assert len(executed) == 1
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import pytest
+
+from diff_fuse.domain.errors import ReviewConflictError
+from diff_fuse.models.arrays import ArrayStrategy
+from diff_fuse.models.diff import NullMode
+from diff_fuse.models.merge import DocMergeSelection, ManualMergeSelection
+from diff_fuse.models.review import ReviewDelta
+from diff_fuse.state.memory_review_store import MemoryReviewStore
+from diff_fuse.state.sqlite_database import SqliteDatabase
+from diff_fuse.state.sqlite_review_store import SqliteReviewStore
+
+
+@pytest.fixture(params=["memory", "sqlite", "redis"])
+def stores(request, tmp_path):
+    """Two handles on one review store, as two worker processes would hold."""
+    if request.param == "memory":
+        store = MemoryReviewStore(ttl_seconds=60)
+        yield store, store
+    elif request.param == "sqlite":
+        path = tmp_path / "reviews.sqlite3"
+        first, second = SqliteDatabase(path), SqliteDatabase(path)
+        yield SqliteReviewStore(first, ttl_seconds=60), SqliteReviewStore(second, ttl_seconds=60)
+        first.close()
+        second.close()
+    else:
+        fakeredis = pytest.importorskip("fakeredis")
+        pytest.importorskip("lupa")
+        from diff_fuse.state.redis_review_store import RedisReviewStore
+
+        server = fakeredis.FakeServer()
+        yield (
+            RedisReviewStore(fakeredis.FakeRedis(server=server), ttl_seconds=60),
+            RedisReviewStore(fakeredis.FakeRedis(server=server), ttl_seconds=60),
+        )
+
+
+def test_deltas_set_and_clear_entries(stores):
+    writer, reader = stores
+    assert reader.get("s1") is None
+
+    first = ReviewDelta(
+        null_mode=NullMode.value,
+        array_strategies_by_node_id={"arr": ArrayStrategy(mode="keyed", key="id")},
+        selections_by_node_id={"a": DocMergeSelection(doc_id="A"), "b": ManualMergeSelection(manual_value=None)},
+    )
+    assert writer.apply("s1", first) == 1
+    assert writer.apply("s1", ReviewDelta(selections_by_node_id={"a": None, "c": DocMergeSelection(doc_id="B")})) == 2
+
+    review = reader.get("s1")
+    assert review is not None
+    assert review.revision == 2
+    assert review.null_mode == NullMode.value
+    assert review.array_strategies_by_node_id["arr"].key == "id"
+    assert review.selections_by_node_id == {
+        "b": ManualMergeSelection(manual_value=None),
+        "c": DocMergeSelection(doc_id="B"),
+    }
+
+
+def test_replace_starts_from_an_empty_state(stores):
+    writer, reader = stores
+    writer.apply(
+        "s1", ReviewDelta(null_mode=NullMode.value, selections_by_node_id={"a": DocMergeSelection(doc_id="A")})
+    )
+
+    writer.apply("s1", ReviewDelta(replace=True, selections_by_node_id={"b": DocMergeSelection(doc_id="B")}))
+
+    review = reader.get("s1")
+    assert review.revision == 2
+    assert review.null_mode == NullMode.missing
+    assert list(review.selections_by_node_id) == ["b"]
+
+
+def test_stale_base_revision_is_rejected(stores):
+    first, second = stores
+    assert first.apply("s1", ReviewDelta(), base_revision=0) == 1
+    assert second.apply("s1", ReviewDelta(selections_by_node_id={"a": DocMergeSelection(doc_id="A")})) == 2
+
+    with pytest.raises(ReviewConflictError) as exc:
+        first.apply("s1", ReviewDelta(selections_by_node_id={"a": None}), base_revision=1)
+
+    assert exc.value.details == {"expected_revision": 1, "revision": 2}
+    assert "a" in second.get("s1").selections_by_node_id
+
+
+def test_sessions_have_separate_states(stores):
+    writer, reader = stores
+    writer.apply("s1", ReviewDelta(selections_by_node_id={"a": DocMergeSelection(doc_id="A")}))
+
+    assert reader.get("s2") is None
+    assert writer.apply("s2", ReviewDelta()) == 1
+    assert reader.get("s2").selections_by_node_id == {}
+
+
+def test_memory_reviews_expire():
+    store = MemoryReviewStore(ttl_seconds=0)
+    store.apply("s1", ReviewDelta())
+
+    assert store.get("s1") is None
+    assert store.apply("s1", ReviewDelta(), base_revision=0) == 1
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+from datetime import UTC, datetime
+
+from diff_fuse.models.document import DocumentFormat, DocumentResult
+from diff_fuse.models.session import Session
+from diff_fuse.state.session_cache import SessionCache
+
+
+def _session(sid: str) -> Session:
+    now = datetime.now(UTC)
+    return Session(session_id=sid, created_at=now, updated_at=now)
+
+
+def test_version_mismatch_is_a_miss_and_drops_the_entry():
+    cache = SessionCache(4)
+    cache.put(_session("a"), 1)
+
+    assert cache.get("a", 1) is not None
+    assert cache.get("a", 2) is None
+    assert cache.get("a", 1) is None
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = SessionCache(2)
+    cache.put(_session("a"), 1)
+    cache.put(_session("b"), 1)
+    cache.get("a", 1)
+    cache.put(_session("c"), 1)
+
+    assert cache.get("b", 1) is None
+    assert cache.get("a", 1) is not None
+    assert cache.get("c", 1) is not None
+
+
+def test_zero_entries_disables_caching():
+    cache = SessionCache(0)
+    cache.put(_session("a"), 1)
+    assert len(cache) == 0
+
+
+def _session_with_doc(sid: str) -> Session:
+    now = datetime.now(UTC)
+    doc = DocumentResult(
+        doc_id="d",
+        name="d",
+        format=DocumentFormat.json,
+        ok=True,
+        error=None,
+        content_hash="sha256:d",
+        size_chars=7,
+        raw='{"x":1}',
+        normalized={"x": 1},
+    )
+    return Session(session_id=sid, created_at=now, updated_at=now, documents_results=[doc])
+
+
+def test_idle_entries_are_demoted_and_inflated_on_hit():
+    cache = SessionCache(4, demote_after_seconds=60)
+    cache.put(_session_with_doc("a"), 1)
+    cache.put(_session_with_doc("b"), 1)
+    cache._entries["a"].used -= 120
+
+    assert cache.demote_idle() == 1
+    assert cache.stats()["cold_sessions"] == 1
+
+    inflated = cache.get("a", 1)
+    assert inflated is not None
+    assert inflated.documents_results[0].normalized == {"x": 1}
+    stats = cache.stats()
+    assert (stats["cold_sessions"], stats["cache_inflations"]) == (0, 1)
+
+
+def test_advance_applies_to_cold_entries():
+    cache = SessionCache(4, demote_after_seconds=60)
+    cache.put(_session_with_doc("a"), 1)
+    cache._entries["a"].used -= 120
+    cache.demote_idle()
+
+    cache.advance("a", 2, lambda s: s.model_copy(update={"documents_results": []}))
+
+    assert cache.get("a", 2).documents_results == []
+
+
+def test_demotion_is_disabled_by_default():
+    cache = SessionCache(4)
+    cache.put(_session_with_doc("a"), 1)
+    cache._entries["a"].used -= 10_000
+
+    assert cache.demote_idle() == 0
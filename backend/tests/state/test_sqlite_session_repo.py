@@ -0,0 +1,227 @@
+from __future__ import annotations
+
+import threading
+import time
+
+import pytest
+
+from diff_fuse.domain.errors import DomainValidationError, LimitsExceededError
+from diff_fuse.domain.fingerprint import document_content_hash
+from diff_fuse.models.document import DocumentFormat, DocumentResult
+from diff_fuse.state.sqlite_database import SqliteDatabase
+from diff_fuse.state.sqlite_document_store import SqliteDocumentStore
+from diff_fuse.state.session_repo import SessionLimits
+from diff_fuse.state.sqlite_session_repo import SqliteSessionRepo
+
+
+def _result(doc_id: str, content: str) -> DocumentResult:
+    return DocumentResult(
+        doc_id=doc_id,
+        name=doc_id,
+        format=DocumentFormat.json,
+        ok=True,
+        error=None,
+        content_hash=document_content_hash("json", content),
+        size_chars=len(content),
+        raw=content,
+        normalized={"content": content},
+    )
+
+
+@pytest.fixture
+def db(tmp_path):
+    database = SqliteDatabase(tmp_path / "sessions.sqlite3")
+    yield database
+    database.close()
+
+
+@pytest.fixture
+def store(db):
+    return SqliteDocumentStore(db)
+
+
+@pytest.fixture
+def repo(db, store):
+    return SqliteSessionRepo(db, ttl_seconds=60, document_store=store)
+
+
+def _expire(db: SqliteDatabase, session_id: str) -> None:
+    """Move a session's deadline into the past."""
+    db.connection().execute("UPDATE sessions SET expires_at = 0 WHERE session_id = ?", (session_id,))
+
+
+def test_uses_write_ahead_logging(db):
+    assert db.connection().execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+
+def test_sessions_survive_reopening_the_database(tmp_path):
+    path = tmp_path / "sessions.sqlite3"
+    first = SqliteDatabase(path)
+    s = SqliteSessionRepo(first).create(documents_results=[_result("a", '{"x":1}')])
+    first.close()
+
+    second = SqliteDatabase(path)
+    try:
+        loaded = SqliteSessionRepo(second).get(s.session_id)
+    finally:
+        second.close()
+
+    assert loaded is not None
+    assert loaded.documents_results[0].raw == '{"x":1}'
+    assert loaded.documents_results[0].normalized == {"content": '{"x":1}'}
+
+
+def test_shared_documents_are_stored_once(repo, store):
+    s1 = repo.create(documents_results=[_result("a", "{}")])
+    s2 = repo.create(documents_results=[_result("b", "{}")])
+
+    assert len(store) == 1
+    assert repo.get(s1.session_id).documents_results[0].doc_id == "a"
+    assert repo.get(s2.session_id).documents_results[0].doc_id == "b"
+
+
+def test_hot_documents_are_decoded_once(db, repo, store, monkeypatch):
+    s = repo.create(documents_results=[_result("a", '{"x":1}')])
+    store._hot.clear()
+
+    decoded = []
+    original = store._decode
+    monkeypatch.setattr(store, "_decode", lambda data: decoded.append(data) or original(data))
+
+    repo.get(s.session_id)
+    repo.get(s.session_id)
+
+    assert len(decoded) == 1
+
+
+def test_get_slides_expiry_only_once_it_lags(db, repo):
+    s = repo.create(documents_results=[_result("a", "{}")])
+
+    def expiry() -> float:
+        return db.connection().execute("SELECT expires_at FROM sessions").fetchone()[0]
+
+    stored = expiry()
+
+    repo.get(s.session_id)
+    assert expiry() == stored
+
+    db.connection().execute("UPDATE sessions SET expires_at = expires_at - 30")
+    repo.get(s.session_id)
+    assert expiry() > stored - 30
+
+
+def test_expired_sessions_are_removed_on_access(db, repo, store):
+    s = repo.create(documents_results=[_result("a", "{}")])
+    _expire(db, s.session_id)
+
+    assert repo.get_meta(s.session_id) is None
+    assert repo.mutate(s.session_id, lambda x: x) is None
+    assert len(store) == 0
+    assert repo.stats()["expirations"] == 1
+
+
+def test_cleanup_removes_expired_sessions_and_releases_documents(db, repo, store):
+    old = repo.create(documents_results=[_result("a", '{"x":1}')])
+    fresh = repo.create(documents_results=[_result("b", '{"x":2}')])
+    _expire(db, old.session_id)
+
+    assert repo.cleanup() == 1
+    assert repo.get(fresh.session_id) is not None
+    assert len(store) == 1
+    assert repo.stats()["sessions"] == 1
+
+
+def test_background_sweeper_expires_sessions(db, repo):
+    s = repo.create(documents_results=[_result("a", "{}")])
+    _expire(db, s.session_id)
+
+    repo.start_sweeper(0.05)
+    try:
+        deadline = time.monotonic() + 2
+        while repo.stats()["sessions"] and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        repo.stop_sweeper()
+
+    assert repo.stats()["expirations"] == 1
+
+
+def test_append_and_remove_documents(repo, store):
+    s = repo.create(documents_results=[_result("a", '{"x":1}')])
+
+    meta = repo.append_documents(s.session_id, [_result("b", '{"x":2}')])
+    assert [m.doc_id for m in meta.documents_meta] == ["a", "b"]
+
+    meta = repo.remove_document(s.session_id, "a")
+    assert [m.doc_id for m in meta.documents_meta] == ["b"]
+    assert len(store) == 1
+
+    with pytest.raises(DomainValidationError):
+        repo.remove_document(s.session_id, "b")
+    with pytest.raises(DomainValidationError):
+        repo.append_documents(s.session_id, [_result("b", "{}")])
+    assert [m.doc_id for m in repo.get_meta(s.session_id).documents_meta] == ["b"]
+
+
+def test_append_respects_the_session_limits(repo, store):
+    s = repo.create(documents_results=[_result("a", '{"x":1}')])
+
+    with pytest.raises(LimitsExceededError):
+        repo.append_documents(s.session_id, [_result("b", '{"x":2}')], SessionLimits(1, 1000))
+    with pytest.raises(LimitsExceededError):
+        repo.append_documents(s.session_id, [_result("b", '{"x":2}')], SessionLimits(2, 10))
+
+    assert [m.doc_id for m in repo.get_meta(s.session_id).documents_meta] == ["a"]
+    assert len(store) == 1
+
+
+def test_failed_mutation_writes_nothing(repo, store):
+    s = repo.create(documents_results=[_result("a", '{"x":1}')])
+
+    def _fail(session):
+        session.documents_results.append(_result("b", '{"x":2}'))
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        repo.mutate(s.session_id, _fail)
+
+    assert [m.doc_id for m in repo.get_meta(s.session_id).documents_meta] == ["a"]
+    assert len(store) == 1
+
+
+def test_concurrent_appends_are_not_lost(repo):
+    s = repo.create(documents_results=[_result("base", "{}")])
+
+    def _append(i: int) -> None:
+        repo.append_documents(s.session_id, [_result(f"d{i}", f'{{"i":{i}}}')])
+
+    threads = [threading.Thread(target=_append, args=(i,)) for i in range(20)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(repo.get_meta(s.session_id).documents_meta) == 21
+
+
+def test_tmpfs_database_is_not_synced(tmp_path):
+    database = SqliteDatabase(tmp_path / "tmpfs.sqlite3", durable=False)
+    try:
+        assert database.connection().execute("PRAGMA synchronous").fetchone()[0] == 0
+    finally:
+        database.close()
+
+
+def test_workers_sharing_a_database_see_each_others_writes(tmp_path):
+    path = tmp_path / "tmpfs.sqlite3"
+    first, second = SqliteDatabase(path, durable=False), SqliteDatabase(path, durable=False)
+    try:
+        writer, reader = SqliteSessionRepo(first), SqliteSessionRepo(second)
+        s = writer.create(documents_results=[_result("a", "{}")])
+        assert reader.get(s.session_id) is not None
+
+        reader.append_documents(s.session_id, [_result("b", '{"x":2}')])
+        assert [m.doc_id for m in writer.get_meta(s.session_id).documents_meta] == ["a", "b"]
+    finally:
+        first.close()
+        second.close()
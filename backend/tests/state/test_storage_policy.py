@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import pytest
+
+from diff_fuse.domain.fingerprint import document_content_hash
+from diff_fuse.domain.normalize import parse_and_normalize_json
+from diff_fuse.models.document import DocumentFormat, DocumentResult
+from diff_fuse.state.memory_document_store import MemoryDocumentStore
+from diff_fuse.state.memory_session_repo import MemorySessionRepo
+from diff_fuse.state.storage_policy import DecodeCache
+
+
+def _result(doc_id: str, content: str, *, ok: bool = True) -> DocumentResult:
+    return DocumentResult(
+        doc_id=doc_id,
+        name=doc_id,
+        format=DocumentFormat.json,
+        ok=ok,
+        error=None if ok else "Invalid JSON",
+        content_hash=document_content_hash("json", content),
+        size_chars=len(content),
+        raw=content,
+        normalized=parse_and_normalize_json(content) if ok else None,
+    )
+
+
+def _repo(policy: str, cache: DecodeCache | None = None) -> MemorySessionRepo:
+    return MemorySessionRepo(ttl_seconds=60, document_store=MemoryDocumentStore(policy=policy, decode_cache=cache))
+
+
+@pytest.mark.parametrize("policy", ["full", "raw_on_error", "raw_only"])
+def test_every_policy_serves_normalized_documents(policy):
+    repo = _repo(policy, DecodeCache(4))
+    s = repo.create(
+        documents_results=[_result("a", '{"x": [1, 2]}'), _result("n", "null"), _result("bad", "{", ok=False)]
+    )
+
+    loaded = repo.get(s.session_id)
+
+    assert loaded.root_inputs == {"a": (True, {"x": [1, 2]}), "n": (True, None), "bad": (False, None)}
+    assert loaded.documents_results[2].raw == "{"
+    assert [dr.size_chars for dr in loaded.documents_results] == [13, 4, 1]
+
+
+def test_raw_on_error_drops_raw_of_valid_documents():
+    repo = _repo("raw_on_error")
+    s = repo.create(documents_results=[_result("a", '{"x":1}')])
+
+    assert repo.get(s.session_id).documents_results[0].raw is None
+
+
+def test_raw_only_keeps_compressed_raw_and_caches_decoding():
+    cache = DecodeCache(4)
+    store = MemoryDocumentStore(policy="raw_only", decode_cache=cache)
+    repo = MemorySessionRepo(ttl_seconds=60, document_store=store)
+    content = '{"items": [' + ",".join(['{"k": "v"}'] * 500) + "]}"
+    s = repo.create(documents_results=[_result("a", content)])
+
+    entry = store._docs[s.documents_results[0].content_hash]
+    assert isinstance(entry, bytes) and len(entry) < len(content)
+
+    first = repo.get(s.session_id).documents_results[0]
+    second = repo.get(s.session_id).documents_results[0]
+    assert first.raw == content
+    assert second.normalized is first.normalized
+    assert len(cache) == 1
+
+
+def test_redis_raw_only_round_trip():
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")
+
+    from diff_fuse.state.codec import decode_document
+    from diff_fuse.state.redis_document_store import RedisDocumentStore
+    from diff_fuse.state.redis_session_repo import RedisSessionRepo
+
+    r = fakeredis.FakeRedis()
+    store = RedisDocumentStore(r, ttl_seconds=60, policy="raw_only", decode_cache=DecodeCache(4))
+    repo = RedisSessionRepo(r, ttl_seconds=60, document_store=store)
+    s = repo.create(documents_results=[_result("a", '{"x":1}')])
+
+    stored = decode_document(r.hget(f"diff-fuse:doc:{s.documents_results[0].content_hash}", "data"))
+    assert stored.normalized is None
+    assert repo.get(s.session_id).documents_results[0].normalized == {"x": 1}